@@ -6,7 +6,7 @@ from logging.config import fileConfig
 from pathlib import Path
 
 from alembic import context
-from sqlalchemy import engine_from_config, pool
+from sqlalchemy import engine_from_config, event, make_url, pool
 
 
 # 添加项目根目录到 sys.path
@@ -17,14 +17,18 @@ from app.core.config import settings
 from app.db.base import Base
 
 # 导入所有模型
-from app.modules.tools.models import ToolUsage  # noqa
+from app.modules.tools.models import ToolUsage, ToolUsageRollup  # noqa
 
 
 # Alembic Config 对象
 config = context.config
 
-# 设置数据库 URL
-config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
+# 设置数据库 URL（迁移使用同步驱动：sqlite+aiosqlite -> sqlite）
+database_url = make_url(settings.DATABASE_URL)
+config.set_main_option(
+    "sqlalchemy.url",
+    database_url.set(drivername=database_url.get_backend_name()).render_as_string(hide_password=False)
+)
 
 # 解析日志配置
 if config.config_file_name is not None:
@@ -56,6 +60,12 @@ def run_migrations_online() -> None:
         poolclass=pool.NullPool,
     )
 
+    if connectable.dialect.name == "sqlite":
+        # 新数据库可能由迁移先建表，auto_vacuum 只在建第一张表之前设置才生效（见 app/db/sqlite.py）
+        @event.listens_for(connectable, "connect")
+        def set_auto_vacuum(dbapi_connection, connection_record):
+            dbapi_connection.execute(f"PRAGMA auto_vacuum={settings.SQLITE_AUTO_VACUUM.upper()}")
+
     with connectable.connect() as connection:
         context.configure(
             connection=connection, target_metadata=target_metadata
@@ -0,0 +1,37 @@
+"""usage keyset pagination indexes
+
+Revision ID: 3c5e8f1a9b42
+Revises:
+Create Date: 2026-10-18 10:30:00.000000
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '3c5e8f1a9b42'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    # 新数据库的表由应用启动时 init_db 按模型创建（已包含新索引）
+    if not sa.inspect(bind).has_table("tool_usage"):
+        return
+
+    # 由 CURRENT_TIMESTAMP 写入的旧记录没有微秒部分，补齐后与应用写入的时间格式一致，游标比较才有序
+    if bind.dialect.name == "sqlite":
+        op.execute("UPDATE tool_usage SET created_at = created_at || '.000000' WHERE length(created_at) = 19")
+
+    op.drop_index("idx_tool_id_created", table_name="tool_usage", if_exists=True)
+    op.create_index("idx_tool_id_created", "tool_usage", ["tool_id", "created_at", "id"])
+    op.create_index("idx_created_id", "tool_usage", ["created_at", "id"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index("idx_created_id", table_name="tool_usage", if_exists=True)
+    op.drop_index("idx_tool_id_created", table_name="tool_usage", if_exists=True)
+    op.create_index("idx_tool_id_created", "tool_usage", ["tool_id", "created_at"])
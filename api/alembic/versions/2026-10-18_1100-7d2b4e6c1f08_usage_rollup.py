@@ -0,0 +1,42 @@
+"""usage rollup table
+
+Revision ID: 7d2b4e6c1f08
+Revises: 3c5e8f1a9b42
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '7d2b4e6c1f08'
+down_revision = '3c5e8f1a9b42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 应用启动时 init_db 可能已按模型创建该表
+    if sa.inspect(op.get_bind()).has_table("tool_usage_rollup"):
+        return
+
+    op.create_table(
+        "tool_usage_rollup",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True, comment="主键ID"),
+        sa.Column("granularity", sa.String(8), nullable=False, comment="分桶粒度（hour / day）"),
+        sa.Column("tool_id", sa.String(100), nullable=False, comment="工具ID"),
+        sa.Column("bucket_start", sa.DateTime(), nullable=False, comment="分桶起始时间（UTC）"),
+        sa.Column("count", sa.Integer(), nullable=False, comment="使用次数"),
+        sa.Column("anonymous_sketch", sa.LargeBinary(), nullable=False, comment="匿名用户ID HyperLogLog 草图"),
+        sa.Column("ip_sketch", sa.LargeBinary(), nullable=False, comment="IP地址 HyperLogLog 草图"),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False, comment="创建时间"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False, comment="更新时间"),
+        sa.UniqueConstraint("granularity", "tool_id", "bucket_start", name="uq_rollup_tool_bucket"),
+    )
+    op.create_index("ix_tool_usage_rollup_id", "tool_usage_rollup", ["id"])
+    op.create_index("idx_rollup_bucket", "tool_usage_rollup", ["granularity", "bucket_start"])
+
+
+def downgrade() -> None:
+    op.drop_table("tool_usage_rollup")
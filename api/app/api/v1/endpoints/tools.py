@@ -1,10 +1,15 @@
 """
 工具管理端点
 """
+from datetime import datetime, timedelta, timezone
+
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.dependencies.deps import get_client_ip, get_db, get_user_agent
+from app.core.constants import USAGE_STATS_DEFAULT_DAYS
+from app.db.base import utcnow
+from app.dependencies.deps import get_client_ip, get_read_db, get_usage_ingest, get_user_agent
+from app.modules.tools.ingest import UsageIngestBuffer
 from app.modules.tools.schemas import ToolDetailResponse, ToolListResponse, ToolRefreshResponse
 from app.modules.tools.service import tool_service
 
@@ -66,27 +71,27 @@ async def refresh_tools():
     )
 
 
-@router.post("/record", summary="记录工具使用")
+@router.post("/record", status_code=202, summary="记录工具使用")
 async def record_usage(
     request: Request,
-    db: AsyncSession = Depends(get_db)
+    ingest: UsageIngestBuffer = Depends(get_usage_ingest)
 ):
     """
     记录工具使用情况
 
+    记录放入写缓冲后立即返回，不等待数据库提交；由后台按批次写入（见 modules/tools/ingest.py）。
+
     Args:
         request: FastAPI 请求对象
-        db: 数据库会话（依赖注入）
+        ingest: 工具使用记录写缓冲（依赖注入）
 
     Returns:
-        记录ID
+        接收结果
 
     Raises:
-        HTTPException: 参数错误时抛出400错误
+        HTTPException: 参数错误时抛出400错误，写缓冲已满时抛出503错误
     """
     try:
-        from app.modules.tools.crud import tool_usage_crud
-
         # 解析请求体
         data = await request.json()
 
@@ -99,12 +104,10 @@ async def record_usage(
             raise HTTPException(status_code=400, detail="tool_id and tool_name are required")
 
         # 获取客户端信息
-        ip_address = get_client_ip(request)
+        ip_address = await get_client_ip(request)
         user_agent = get_user_agent(request)
 
-        # 创建使用记录
-        usage = await tool_usage_crud.create(
-            db=db,
+        accepted = await ingest.record(
             tool_id=tool_id,
             tool_name=tool_name,
             ip_address=ip_address,
@@ -113,48 +116,94 @@ async def record_usage(
             extra_data=extra_data
         )
 
-        await db.commit()
-
-        return {
-            "success": True,
-            "usage_id": usage.id
-        }
-
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    if not accepted:
+        raise HTTPException(status_code=503, detail="Usage buffer is full", headers={"Retry-After": "1"})
+
+    return {"success": True}
+
 
 @router.get("/usage/list", summary="获取工具使用记录")
 async def get_usage_list(
     tool_id: str = Query(None, description="工具ID"),
-    skip: int = Query(0, ge=0, description="跳过数量"),
+    cursor: str = Query(None, description="上一页返回的 next_cursor（为空时获取第一页）"),
     limit: int = Query(100, ge=1, le=1000, description="返回数量"),
-    db: AsyncSession = Depends(get_db)
+    include_total: bool = Query(False, description="是否返回总数（缓存值，可能略有滞后）"),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
-    获取工具使用记录列表
+    获取工具使用记录列表（按创建时间倒序，游标分页）
 
     Args:
         tool_id: 工具ID（可选）
-        skip: 跳过数量
+        cursor: 分页游标
         limit: 返回数量
-        db: 数据库会话
+        include_total: 是否返回总数
+        db: 只读数据库会话
 
     Returns:
-        使用记录列表
+        使用记录列表与下一页游标（没有更多记录时为 null）
     """
-    from app.modules.tools.crud import tool_usage_crud
+    from app.modules.tools.crud import tool_usage_crud, usage_count_cache
+    from app.modules.tools.pagination import InvalidCursorError
     from app.modules.tools.schemas import ToolUsageResponse
 
-    if tool_id:
-        usages = await tool_usage_crud.get_by_tool_id(db, tool_id=tool_id, limit=limit)
-    else:
-        usages = await tool_usage_crud.get_multi(db, skip=skip, limit=limit)
+    try:
+        usages, next_cursor = await tool_usage_crud.get_page(db, tool_id=tool_id, cursor=cursor, limit=limit)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     return {
         "success": True,
         "items": [ToolUsageResponse.model_validate(u) for u in usages],
-        "total": len(usages)
+        "next_cursor": next_cursor,
+        "total": await usage_count_cache.get(db, tool_id=tool_id) if include_total else None
+    }
+
+
+@router.get("/usage/stats", summary="获取工具使用统计")
+async def get_usage_stats(
+    tool_id: str = Query(None, description="工具ID（为空时汇总所有工具）"),
+    granularity: str = Query("day", pattern="^(hour|day)$", description="分桶粒度（hour / day）"),
+    start: datetime = Query(None, description="起始时间（含，默认结束时间前 USAGE_STATS_DEFAULT_DAYS 天）"),
+    end: datetime = Query(None, description="结束时间（不含，默认当前时间）"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    获取时间范围内的使用次数与不重复匿名用户 / IP 数（读取预聚合，不扫描原始记录）
+
+    Args:
+        tool_id: 工具ID（可选）
+        granularity: 分桶粒度
+        start: 起始时间（不带时区时按 UTC）
+        end: 结束时间（不带时区时按 UTC）
+        db: 只读数据库会话
+
+    Returns:
+        范围汇总与各分桶统计（不重复数为 HyperLogLog 近似值）
+    """
+    from app.modules.tools.rollup import usage_rollup
+
+    def as_utc(value: datetime) -> datetime:
+        return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+    end = as_utc(end) if end else utcnow()
+    start = as_utc(start) if start else end - timedelta(days=USAGE_STATS_DEFAULT_DAYS)
+
+    try:
+        stats = await usage_rollup.query(db, granularity=granularity, start=start, end=end, tool_id=tool_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "success": True,
+        "tool_id": tool_id,
+        "granularity": granularity,
+        "start": start,
+        "end": end,
+        **stats
     }
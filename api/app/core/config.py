@@ -14,10 +14,24 @@ class Settings(BaseSettings):
     # 服务器配置（4核4G 单机优化）
     HOST: str = "0.0.0.0"
     PORT: int = 8000
-    WORKERS: int = 1  # 单进程，避免重复加载模型
+    WORKERS: int = 1  # local 推理模式下保持单进程，避免重复加载模型；remote 模式可多进程
 
     # 数据库配置
     DATABASE_URL: str = "sqlite+aiosqlite:///./data/app.db"
+    DATABASE_READ_POOL_SIZE: int = 4  # 只读连接池大小（SQLite 写连接池固定 1 个连接）
+
+    # SQLite 调优（DATABASE_URL 为 SQLite 时在每个连接上执行，见 app/db/sqlite.py）
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_CACHE_SIZE_KB: int = 8192  # 每个连接的页缓存
+    SQLITE_MMAP_SIZE_MB: int = 128
+    SQLITE_TEMP_STORE: str = "MEMORY"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_AUTO_VACUUM: str = "INCREMENTAL"  # 只对新建的数据库生效
+
+    # 使用记录保留与归档（见 app/modules/tools/retention.py）
+    USAGE_RETENTION_DAYS: int = 0  # 超过该天数的使用记录移入归档文件；默认 0 不归档，需显式开启
+    USAGE_ARCHIVE_DIR: Path = Path("./data/archive/tool_usage")
 
     # CORS 配置
     CORS_ORIGINS: str = "*"
@@ -37,6 +51,18 @@ class Settings(BaseSettings):
     THREAD_POOL_SIZE: int = 2  # 线程池大小
     QUEUE_MAX_SIZE: int = 100  # 队列最大长度
 
+    # 模型预热配置（启动时预加载并预热，完成前 /ready 返回 503）
+    MODEL_PRELOAD: bool = True
+    MODEL_WARMUP_RUNS: int = 2  # 每个会话的预热推理次数
+
+    # 推理模式配置
+    INFERENCE_MODE: str = "local"  # local：本进程加载模型；remote：调用独立推理服务（python -m app.inference_server）
+    INFERENCE_SOCKET_PATH: str = "./data/run/inference.sock"  # 推理服务 Unix socket 路径
+
+    # 异步任务队列配置
+    TASK_QUEUE_BACKEND: str = "memory"  # memory / sqlite（持久化，重启不丢任务）
+    TASK_QUEUE_DATABASE_URL: str = "sqlite+aiosqlite:///./data/queue.db"  # 独立数据库，避免与业务表争抢写锁
+
     model_config = ConfigDict(env_file=".env", case_sensitive=True)
 
     @property
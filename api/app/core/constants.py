@@ -19,17 +19,144 @@ MAX_CONCURRENT_INFERENCE = 2
 # 线程池大小（CPU 密集型任务）
 THREAD_POOL_SIZE = 2
 
+# 图像处理线程池（解码 / 预处理 / 后处理 / 编码），与推理并发数相互独立
+IMAGE_WORKER_THREADS = 2
+
+# 图像处理线程池最大已提交任务数（运行中 + 排队中）
+IMAGE_WORKER_MAX_PENDING = 8
+
+# 推理微批处理：单批次最大行数（1 表示关闭合批）
+INFERENCE_MAX_BATCH_SIZE = 4
+
+# 推理微批处理：收集窗口（毫秒）
+INFERENCE_MAX_BATCH_WAIT_MS = 10
+
+# 推理准入控制：等待执行的请求数上限，超出时立即返回 429（后台任务不受此限制）
+INFERENCE_MAX_QUEUE = 32
+
+# 推理准入控制：同步接口的默认截止时间（秒，可由请求头 X-Request-Timeout 缩短），
+# 应小于网关的 proxy_read_timeout
+INFERENCE_REQUEST_TIMEOUT = 60
+
+# 推理准入控制：请求头 X-Request-Timeout 允许的最大值（秒）
+INFERENCE_MAX_REQUEST_TIMEOUT = 240
+
+# 远程推理模式：每个 API 进程到推理服务的最大连接数（即最大在途请求数）
+INFERENCE_CLIENT_CONNECTIONS = 8
+
+# 模型内存预算（MB）：加载新模型前按 LRU 淘汰空闲模型（软限制，固定 / 使用中的模型不淘汰）
+MODEL_MEMORY_BUDGET_MB = 2048
+
+# 模型空闲卸载时间（秒，0 表示不卸载；固定的模型不卸载）
+MODEL_IDLE_UNLOAD_SECONDS = 1800
+
+# 启动预热失败（如推理服务尚未就绪）后的重试间隔（秒）
+MODEL_WARMUP_RETRY_INTERVAL = 5
+
 # 模型文件目录
 MODELS_DIR = PROJECT_ROOT / "data" / "models"
 
+# ============================================
+# ONNX Runtime 会话配置
+# ============================================
+
+# 每个模型的会话数 = min(MAX_CONCURRENT_INFERENCE, CPU 核数)
+# 单会话 intra-op 线程数（0 表示自动：CPU 核数 // 会话数，保证不超订）
+ORT_INTRA_OP_THREADS = 0
+
+# 单会话 inter-op 线程数（仅 parallel 执行模式生效）
+ORT_INTER_OP_THREADS = 1
+
+# 图优化级别：disable / basic / extended / all
+ORT_GRAPH_OPTIMIZATION_LEVEL = "all"
+
+# 执行模式：sequential / parallel
+ORT_EXECUTION_MODE = "sequential"
+
+# 内存 arena 与内存复用模式
+ORT_ENABLE_CPU_MEM_ARENA = True
+ORT_ENABLE_MEM_PATTERN = True
+
+# 优化后模型缓存目录（None 表示不缓存），例如 MODELS_DIR / "optimized"
+ORT_OPTIMIZED_MODEL_DIR = None
+
 # ============================================
 # 抠图配置
 # ============================================
 
 CUTOUT_MODEL_PATH = MODELS_DIR / "model.onnx"
 CUTOUT_DEFAULT_SIZE = 1024
+
+# 模型精度变体（变体名 -> 模型文件）；低精度变体由离线命令生成：
+#   python -m app.infrastructure.models.quantize --precision int8
+# 变体文件不存在时回退到默认变体
+CUTOUT_MODEL_VARIANTS = {
+    "fp32": CUTOUT_MODEL_PATH,
+    "int8": MODELS_DIR / "model.int8.onnx",
+    "fp16": MODELS_DIR / "model.fp16.onnx",
+}
+CUTOUT_DEFAULT_VARIANT = "fp32"
+
+# 变体文件存在性检查结果的缓存时间（秒）：请求路径不再逐次访问文件系统，
+# 离线生成的变体文件最迟在该间隔后生效
+CUTOUT_VARIANT_REFRESH_SECONDS = 30
+
+# 质量档位 -> 模型变体（quality：原始精度；fast：动态量化，CPU 耗时更低）
+CUTOUT_TIER_VARIANTS = {
+    "quality": "fp32",
+    "fast": "int8",
+}
+
+# 推理分辨率阶梯（模型输入边长，升序）：按原图长边选取不小于它的最小档，
+# fast 档位再降一档，推理负载高时继续降档。
+# 模型空间维度固定时只使用其声明的尺寸，以及同目录下按尺寸导出的模型（如 model.512.onnx）
+CUTOUT_RESOLUTION_LADDER = (512, 768, 1024)
+
+# 负载降档：每有这么多推理请求在排队 / 执行中，分辨率降一档（默认为一轮满批次的容量）
+CUTOUT_LOAD_STEP_PENDING = MAX_CONCURRENT_INFERENCE * INFERENCE_MAX_BATCH_SIZE
+
+# 高分辨率模式：工作分辨率长边上限（粗分割后在此分辨率上对边缘分块精修）
 CUTOUT_MAX_SIZE = 2048
 
+# 高分辨率模式：分块边长与相邻分块重叠（工作分辨率像素）
+CUTOUT_HIRES_TILE_SIZE = CUTOUT_DEFAULT_SIZE
+CUTOUT_HIRES_TILE_OVERLAP = 128
+
+# 高分辨率模式：边缘带半径（粗分割蒙版像素，带内使用精修结果）
+CUTOUT_HIRES_EDGE_RADIUS = 6
+
+# 预处理缩放滤波器：nearest / box / bilinear / hamming / bicubic / lanczos
+CUTOUT_RESIZE_FILTER = "bilinear"
+
+# 后处理蒙版放大滤波器（同上；蒙版为平滑概率图，bilinear 与 lanczos 差异很小）
+CUTOUT_MASK_RESIZE_FILTER = "bilinear"
+
+# 大图缩放时先用 reduce() 整数倍缩小，再精确缩放到目标尺寸（None 表示关闭）
+CUTOUT_RESIZE_REDUCING_GAP = 3.0
+
+# 输出编码：PNG 压缩级别（0-9，越小越快、体积越大）
+CUTOUT_PNG_COMPRESS_LEVEL = 1
+
+# 输出编码：有损 WebP 质量（1-100）与编码方法（0-6，越小越快）
+CUTOUT_WEBP_QUALITY = 85
+CUTOUT_WEBP_METHOD = 4
+
+# 输出编码：无损 WebP 编码方法（0-6，越小越快）
+CUTOUT_WEBP_LOSSLESS_METHOD = 0
+
+# 结果缓存（按上传内容 + 模型 + 输出选项寻址）
+CUTOUT_CACHE_ENABLED = True
+
+# 结果缓存：内存层容量（MB）
+CUTOUT_CACHE_MEMORY_MB = 128
+
+# 结果缓存：磁盘层目录（None 表示不启用磁盘层）与容量（MB，按进程计：多个 worker 共享目录时约为 worker 数 × 该值）
+CUTOUT_CACHE_DISK_DIR = PROJECT_ROOT / "data" / "cache" / "cutout"
+CUTOUT_CACHE_DISK_MB = 1024
+
+# 结果缓存：有效期（秒）
+CUTOUT_CACHE_TTL = 7 * 24 * 3600
+
 # ============================================
 # 任务队列配置
 # ============================================
@@ -40,6 +167,41 @@ TASK_TIMEOUT = 300
 # 队列最大长度
 QUEUE_MAX_SIZE = 100
 
+# 任务队列老化时间（秒）：每高一个优先级等价于提前入队的秒数，
+# 低优先级任务等待足够久后会排到新到达的高优先级任务之前，避免饿死
+QUEUE_PRIORITY_AGING_SECONDS = 30
+
+# 持久化队列：任务租约时间（秒），处理期间由心跳续约；进程崩溃后租约到期即重新投递
+TASK_QUEUE_LEASE_SECONDS = 30
+
+# 持久化队列：空闲时检查其他进程入队任务的间隔（秒）
+TASK_QUEUE_IDLE_POLL_SECONDS = 5
+
+# 持久化队列：最大投递次数，超过后不再投递（保留在库中供排查）
+TASK_QUEUE_MAX_ATTEMPTS = 3
+
+# 抠图异步任务：队列消费协程数（推理合批后可多于推理并发数）
+CUTOUT_JOB_WORKERS = 4
+
+# 抠图异步任务：结果保留时间（秒），过期后删除
+CUTOUT_JOB_RESULT_TTL = 600
+
+# 抠图异步任务：上传内容暂存目录
+CUTOUT_JOB_SPOOL_DIR = PROJECT_ROOT / "data" / "jobs"
+
+# 抠图异步任务：队列已满时建议的重试间隔（秒）；有处理耗时数据后按排队数 / 消费协程数 × 平均耗时估算
+CUTOUT_JOB_RETRY_AFTER = 5
+
+# 批量抠图：单次请求最大文件数与请求体总大小（MB，单个文件仍受 MAX_UPLOAD_SIZE 限制）
+CUTOUT_BATCH_MAX_FILES = 200
+CUTOUT_BATCH_MAX_TOTAL_MB = 500
+
+# 批量抠图：每个文件的暂存文件保留在内存中的最大字节数（超过后转存磁盘）
+CUTOUT_BATCH_SPOOL_MAX_MEMORY = 256 * 1024
+
+# 批量抠图：同时处理的文件数（默认为一轮满批次的容量，使每个推理槽都能凑满批次）
+CUTOUT_BATCH_CONCURRENCY = MAX_CONCURRENT_INFERENCE * INFERENCE_MAX_BATCH_SIZE
+
 # ============================================
 # API 配置
 # ============================================
@@ -47,3 +209,65 @@ QUEUE_MAX_SIZE = 100
 # 文件上传最大大小（MB）
 MAX_UPLOAD_SIZE = 10
 
+# 上传暂存：小于该字节数的上传保存在内存中，超过后转存临时文件
+UPLOAD_SPOOL_MAX_MEMORY = 1024 * 1024
+
+# 上传格式探测：在该字节数内仍无法识别图像头则拒绝
+UPLOAD_SNIFF_MAX_BYTES = 256 * 1024
+
+# 允许上传的图像格式（Pillow 格式名）
+UPLOAD_ALLOWED_IMAGE_FORMATS = ("JPEG", "MPO", "PNG", "WEBP", "BMP", "GIF", "TIFF")
+
+# 上传图像最大像素数（防解压炸弹：解码后的 RGB / RGBA 内存与像素数成正比）
+UPLOAD_MAX_IMAGE_PIXELS = 40_000_000
+
+
+# ============================================
+# 工具使用记录写入
+# ============================================
+
+# 写缓冲：内存中最多暂存的记录数（超出时按 USAGE_INGEST_OVERFLOW 处理）
+USAGE_INGEST_MAX_PENDING = 10_000
+
+# 写缓冲：单次多行 INSERT 的最大记录数（暂存数达到该值时立即写入）
+USAGE_INGEST_BATCH_SIZE = 500
+
+# 写缓冲：暂存记录的最长等待写入时间（秒）
+USAGE_INGEST_FLUSH_INTERVAL = 1.0
+
+# 写缓冲已满时的策略：drop（丢弃新记录，接口立即返回）/ block（等待空位，
+# 超过 USAGE_INGEST_BLOCK_TIMEOUT 秒仍无空位时返回 503）
+USAGE_INGEST_OVERFLOW = "drop"
+USAGE_INGEST_BLOCK_TIMEOUT = 0.5
+
+# 写入失败后的重试间隔（秒，期间记录保留在缓冲中）
+USAGE_INGEST_RETRY_INTERVAL = 5.0
+
+# 使用记录数缓存（/tools/usage/list?include_total=true）
+USAGE_COUNT_CACHE_TTL = 30.0  # 缓存有效期（秒）
+USAGE_COUNT_CACHE_MAX_KEYS = 1024  # 最多缓存的工具数，超过时清理过期条目
+
+# 使用记录预聚合（tool_usage_rollup）：不重复匿名用户 / IP 的 HyperLogLog 精度，
+# 标准误差约 1.04 / sqrt(2^precision)（12 -> 1.6%），修改后需重建预聚合；
+# 已归档日期的草图保持原精度，跨越这些日期的查询按其中最低的精度合并
+USAGE_ROLLUP_HLL_PRECISION = 12
+
+# /tools/usage/stats 单次查询的最大分桶数（小时粒度约 41 天）与默认查询天数
+USAGE_STATS_MAX_BUCKETS = 1000
+USAGE_STATS_DEFAULT_DAYS = 7
+
+# 使用记录保留（保留天数与归档目录见 Settings.USAGE_RETENTION_DAYS / USAGE_ARCHIVE_DIR）
+USAGE_RETENTION_CHUNK_SIZE = 5000  # 每个删除事务归档的记录数（事务越小，写缓冲等待写连接的时间越短）
+USAGE_RETENTION_INTERVAL = 6 * 3600  # 归档任务执行间隔（秒）
+USAGE_RETENTION_INITIAL_DELAY = 300  # 启动后首次执行的延迟（秒）
+USAGE_ARCHIVE_ZSTD_LEVEL = 10  # 归档文件 zstd 压缩级别
+
+# ============================================
+# 监控指标
+# ============================================
+
+# 耗时直方图桶上界（秒）：HTTP 请求、抠图流水线各阶段、推理排队与执行
+METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# 推理批次行数直方图桶上界
+METRICS_BATCH_ROWS_BUCKETS = (1, 2, 4, 8, 16, 32)
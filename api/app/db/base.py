@@ -1,6 +1,8 @@
 """
 数据库基类
 """
+from datetime import datetime, timezone
+
 from sqlalchemy import Column, DateTime, Integer, func
 from sqlalchemy.orm import declarative_base
 
@@ -8,10 +10,17 @@ from sqlalchemy.orm import declarative_base
 Base = declarative_base()
 
 
+def utcnow() -> datetime:
+    """当前 UTC 时间（不带时区，与 SQLite CURRENT_TIMESTAMP 一致）"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 class TimestampMixin:
     """时间戳混入类"""
+    # 应用侧写入微秒精度的时间（与游标比较时格式一致），server_default 仅用于直接执行的 SQL
     created_at = Column(
         DateTime(timezone=True),
+        default=utcnow,
         server_default=func.now(),
         nullable=False,
         comment="创建时间"
@@ -3,7 +3,7 @@
 """
 from app.db.base import Base
 from app.db.session import engine
-from app.modules.tools.models import ToolUsage  # noqa
+from app.modules.tools.models import ToolUsage, ToolUsageRollup  # noqa
 
 
 async def init_db():
@@ -1,22 +1,39 @@
 """
 数据库会话管理
+
+SQLite 数据库使用写引擎（单连接）+ 只读引擎（连接池）并按配置调优（见 sqlite.py）；
+其他数据库只使用一个引擎。
 """
 import os
 
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from app.core.config import settings
+from app.db.sqlite import SQLitePragmas, create_sqlite_engines, is_sqlite
 
 
 # 确保数据目录存在
 os.makedirs("data", exist_ok=True)
 
-# 创建异步引擎
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.LOG_LEVEL == "DEBUG",
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
-)
+# 创建异步引擎（engine 用于写入与建表，read_engine 用于只读查询）
+if is_sqlite(settings.DATABASE_URL):
+    engine, read_engine = create_sqlite_engines(
+        settings.DATABASE_URL,
+        SQLitePragmas(
+            journal_mode=settings.SQLITE_JOURNAL_MODE,
+            synchronous=settings.SQLITE_SYNCHRONOUS,
+            cache_size_kb=settings.SQLITE_CACHE_SIZE_KB,
+            mmap_size_mb=settings.SQLITE_MMAP_SIZE_MB,
+            temp_store=settings.SQLITE_TEMP_STORE,
+            busy_timeout_ms=settings.SQLITE_BUSY_TIMEOUT_MS,
+            auto_vacuum=settings.SQLITE_AUTO_VACUUM
+        ),
+        read_pool_size=settings.DATABASE_READ_POOL_SIZE,
+        echo=settings.LOG_LEVEL == "DEBUG"
+    )
+else:
+    engine = create_async_engine(settings.DATABASE_URL, echo=settings.LOG_LEVEL == "DEBUG")
+    read_engine = engine
 
 # 创建异步会话工厂
 AsyncSessionLocal = async_sessionmaker(
@@ -27,6 +44,14 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False
 )
 
+ReadSessionLocal = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False
+)
+
 
 # 依赖注入：获取数据库会话
 async def get_db() -> AsyncSession:
@@ -44,3 +69,24 @@ async def get_db() -> AsyncSession:
             raise
         finally:
             await session.close()
+
+
+async def get_read_db() -> AsyncSession:
+    """
+    获取只读数据库会话（依赖注入；SQLite 下使用独立的只读连接池，不等待写连接）
+
+    Yields:
+        AsyncSession: 数据库会话
+    """
+    async with ReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+async def dispose_engines():
+    """关闭所有数据库连接"""
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
@@ -0,0 +1,139 @@
+"""
+SQLite 连接调优
+
+通过引擎的 connect 事件在每个新连接上执行 PRAGMA：
+- journal_mode=WAL：读写互不阻塞，读连接读取已提交的快照，不等待写事务
+- synchronous=NORMAL：WAL 下只在检查点时 fsync，进程崩溃不丢已提交事务（断电可能丢失最近的事务）
+- cache_size：每个连接的页缓存
+- mmap_size：内存映射读取，减少 read() 系统调用与页拷贝
+- temp_store=MEMORY：排序 / 临时表放在内存中
+- busy_timeout：遇到锁时等待而不是立即返回 SQLITE_BUSY
+- auto_vacuum=INCREMENTAL：删除数据后可用 PRAGMA incremental_vacuum 归还空闲页（只在建表前生效，
+  已有数据库需执行一次 VACUUM 才能切换，见 app/modules/tools/retention.py）
+只读连接不设置 auto_vacuum，额外设置 query_only，误写时直接报错。
+
+读写分离：SQLite 同一时间只有一个写事务，写连接池固定为 1 个连接，
+写请求在连接池中（事件循环侧）排队，不在线程中重试 busy；读连接池独立，
+WAL 模式下读请求不等待写连接。
+"""
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+
+JOURNAL_MODES = ("WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY", "OFF")
+SYNCHRONOUS_LEVELS = ("OFF", "NORMAL", "FULL", "EXTRA")
+TEMP_STORES = ("DEFAULT", "FILE", "MEMORY")
+AUTO_VACUUM_MODES = ("NONE", "FULL", "INCREMENTAL")
+
+
+@dataclass(frozen=True)
+class SQLitePragmas:
+    """连接级 PRAGMA 配置"""
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    cache_size_kb: int = 8192
+    mmap_size_mb: int = 128
+    temp_store: str = "MEMORY"
+    busy_timeout_ms: int = 5000
+    auto_vacuum: str = "INCREMENTAL"
+
+    def __post_init__(self):
+        for value, allowed in (
+            (self.journal_mode, JOURNAL_MODES),
+            (self.synchronous, SYNCHRONOUS_LEVELS),
+            (self.temp_store, TEMP_STORES),
+            (self.auto_vacuum, AUTO_VACUUM_MODES),
+        ):
+            if value.upper() not in allowed:
+                raise ValueError(f"Invalid SQLite pragma value: {value} (allowed: {', '.join(allowed)})")
+
+    def statements(self, read_only: bool = False) -> list[str]:
+        """
+        连接建立后执行的 PRAGMA 语句
+
+        Args:
+            read_only: 是否为只读连接
+
+        Returns:
+            SQL 语句列表
+        """
+        statements = [] if read_only else [f"PRAGMA auto_vacuum={self.auto_vacuum.upper()}"]
+        statements += [
+            f"PRAGMA journal_mode={self.journal_mode.upper()}",
+            f"PRAGMA synchronous={self.synchronous.upper()}",
+            f"PRAGMA cache_size={-int(self.cache_size_kb)}",
+            f"PRAGMA mmap_size={int(self.mmap_size_mb) * 1024 * 1024}",
+            f"PRAGMA temp_store={self.temp_store.upper()}",
+            f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}",
+        ]
+        if read_only:
+            statements.append("PRAGMA query_only=ON")
+        return statements
+
+
+def is_sqlite(database_url: str) -> bool:
+    """是否为 SQLite 数据库 URL"""
+    return database_url.startswith("sqlite")
+
+
+def is_memory_database(database_url: str) -> bool:
+    """是否为内存数据库（各连接不共享数据，不能读写分离）"""
+    return database_url.rstrip("/").endswith(("sqlite", "aiosqlite")) or ":memory:" in database_url
+
+
+def apply_pragmas(engine: AsyncEngine, pragmas: SQLitePragmas, read_only: bool = False):
+    """
+    在引擎的每个新连接上执行 PRAGMA
+
+    Args:
+        engine: 异步引擎
+        pragmas: PRAGMA 配置
+        read_only: 是否为只读连接
+    """
+    statements = pragmas.statements(read_only)
+
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for statement in statements:
+            cursor.execute(statement)
+        cursor.close()
+
+    event.listen(engine.sync_engine, "connect", on_connect)
+
+
+def create_sqlite_engines(
+    database_url: str,
+    pragmas: SQLitePragmas,
+    read_pool_size: int = 4,
+    echo: bool = False
+) -> tuple[AsyncEngine, AsyncEngine]:
+    """
+    创建 SQLite 写引擎与只读引擎
+
+    Args:
+        database_url: 数据库 URL（sqlite+aiosqlite）
+        pragmas: PRAGMA 配置
+        read_pool_size: 只读连接池大小
+        echo: 是否输出 SQL 日志
+
+    Returns:
+        (写引擎, 只读引擎)；内存数据库时两者相同
+    """
+    connect_args = {"check_same_thread": False}
+    if is_memory_database(database_url):
+        engine = create_async_engine(database_url, echo=echo, connect_args=connect_args)
+        apply_pragmas(engine, pragmas)
+        return engine, engine
+
+    write_engine = create_async_engine(
+        database_url, echo=echo, connect_args=connect_args, pool_size=1, max_overflow=0
+    )
+    apply_pragmas(write_engine, pragmas)
+
+    read_engine = create_async_engine(
+        database_url, echo=echo, connect_args=connect_args, pool_size=max(1, read_pool_size), max_overflow=0
+    )
+    apply_pragmas(read_engine, pragmas, read_only=True)
+    return write_engine, read_engine
@@ -3,7 +3,8 @@
 """
 from fastapi import Request
 
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
+from app.modules.tools.ingest import UsageIngestBuffer
 
 
 async def get_client_ip(request: Request) -> str:
@@ -34,5 +35,20 @@ def get_user_agent(request: Request) -> str:
     return request.headers.get("user-agent", "")
 
 
+def get_usage_ingest(request: Request) -> UsageIngestBuffer:
+    """
+    从 app.state 获取工具使用记录写缓冲
+
+    Args:
+        request: FastAPI 请求对象
+
+    Returns:
+        UsageIngestBuffer: 写缓冲
+    """
+    if getattr(request.app.state, "usage_ingest", None) is None:
+        raise RuntimeError("UsageIngestBuffer not initialized. Please check main.py")
+    return request.app.state.usage_ingest
+
+
 # 导出常用的依赖
-__all__ = ["get_db", "get_client_ip", "get_user_agent"]
+__all__ = ["get_db", "get_read_db", "get_client_ip", "get_user_agent", "get_usage_ingest"]
@@ -0,0 +1,42 @@
+"""
+推理服务进程入口
+
+INFERENCE_MODE=remote 时单独启动本进程，由它持有 ONNX 会话，
+API 的多个 uvicorn worker 通过 INFERENCE_SOCKET_PATH 提交推理请求。
+
+运行：
+    python -m app.inference_server
+"""
+import asyncio
+import signal
+
+from app.core.config import settings
+from app.core.logging import setup_logging
+from app.infrastructure.models import ModelLoader
+from app.infrastructure.models.server import InferenceServer
+
+
+logger = setup_logging()
+
+
+async def main():
+    """启动推理服务，收到 SIGTERM / SIGINT 后清理退出"""
+    model_loader = ModelLoader()
+    server = InferenceServer(settings.INFERENCE_SOCKET_PATH, model_loader)
+
+    serve_task = asyncio.create_task(server.serve_forever())
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, serve_task.cancel)
+
+    try:
+        await serve_task
+    except asyncio.CancelledError:
+        pass
+    finally:
+        await model_loader.cleanup()
+        logger.info("Inference server shutdown completed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
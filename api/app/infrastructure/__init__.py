@@ -4,12 +4,14 @@
 提供技术实现能力，包括：
 - 模型管理（ModelLoader）
 - 任务队列（TaskQueue）
+- 工作线程池（WorkerPool）
 - 缓存
 - 仓库实现
 """
 
 from app.infrastructure.models import ModelLoader
 from app.infrastructure.queue import MemoryTaskQueue, Task, TaskPriority
+from app.infrastructure.workers import WorkerPool
 
 
-__all__ = ["ModelLoader", "MemoryTaskQueue", "Task", "TaskPriority"]
+__all__ = ["ModelLoader", "MemoryTaskQueue", "Task", "TaskPriority", "WorkerPool"]
@@ -0,0 +1,11 @@
+"""
+基础设施层 - 缓存
+
+提供按内容寻址的结果缓存：内存 LRU 层 + 可选磁盘层。
+"""
+
+from app.infrastructure.cache.interfaces import CachedResult, ICache
+from app.infrastructure.cache.result_cache import DiskCache, MemoryLRUCache, TieredCache
+
+
+__all__ = ["CachedResult", "ICache", "DiskCache", "MemoryLRUCache", "TieredCache"]
@@ -0,0 +1,62 @@
+"""
+缓存抽象接口
+
+定义结果缓存的统一接口，支持不同的存储层（内存、磁盘）。
+"""
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+@dataclass
+class CachedResult:
+    """缓存条目"""
+    content: bytes
+    metadata: dict = field(default_factory=dict)
+
+    @property
+    def size(self) -> int:
+        return len(self.content)
+
+
+class ICache(ABC):
+    """缓存接口"""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[CachedResult]:
+        """
+        读取缓存
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            缓存条目，未命中或已过期返回 None
+        """
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, value: CachedResult):
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键
+            value: 缓存条目
+        """
+        pass
+
+    @abstractmethod
+    def get_stats(self) -> dict:
+        """
+        获取缓存统计
+
+        Returns:
+            命中、未命中、淘汰等统计信息
+        """
+        pass
+
+    @abstractmethod
+    async def clear(self):
+        """清空缓存"""
+        pass
@@ -0,0 +1,335 @@
+"""
+结果缓存实现
+
+- MemoryLRUCache：按字节数限制容量的内存 LRU 层
+- DiskCache：data/ 下的磁盘层，按字节数限制容量，按最近访问时间淘汰
+- TieredCache：内存层 + 可选磁盘层，磁盘命中自动回填内存层
+
+所有层均支持 TTL（从写入时开始计算，访问不延长），并统计命中、未命中、淘汰和过期次数。
+索引只在事件循环中修改，磁盘读写在默认线程池中执行。
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from app.infrastructure.cache.interfaces import CachedResult, ICache
+
+
+logger = logging.getLogger(__name__)
+
+# 扫描缓存目录时删除早于该时间（秒）的临时文件（其他进程正在写入的临时文件不受影响）
+_STALE_TMP_SECONDS = 3600
+
+
+class MemoryLRUCache(ICache):
+    """内存 LRU 缓存（按字节数限制容量）"""
+
+    def __init__(self, max_bytes: int, ttl: float):
+        """
+        初始化内存缓存
+
+        Args:
+            max_bytes: 最大占用字节数
+            ttl: 条目有效期（秒）
+        """
+        self._entries: OrderedDict[str, tuple[CachedResult, float]] = OrderedDict()
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    async def get(self, key: str) -> Optional[CachedResult]:
+        item = self._entries.get(key)
+        if item is None:
+            self._misses += 1
+            return None
+
+        value, expires_at = item
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self._expirations += 1
+            self._misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return value
+
+    async def set(self, key: str, value: CachedResult):
+        if value.size > self._max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = (value, time.monotonic() + self._ttl)
+        self._bytes += value.size
+
+        while self._bytes > self._max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._evictions += 1
+
+    def _remove(self, key: str):
+        value, _ = self._entries.pop(key)
+        self._bytes -= value.size
+
+    def get_stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self._max_bytes,
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "expirations": self._expirations,
+        }
+
+    async def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+
+class DiskCache(ICache):
+    """
+    磁盘缓存
+
+    文件布局：{directory}/{key[:2]}/{key}，首行为 JSON 元数据，其后为内容。
+    写入先落临时文件（按进程与写入区分文件名）再原子替换，进程崩溃不会留下半个条目。
+
+    索引与容量限制按进程维护：每个进程只索引启动时已存在与自己写入的条目，
+    多个 API worker 共享同一目录时磁盘占用上限约为 worker 数 × max_bytes。
+    条目有效期从写入（文件修改时间）开始计算；淘汰顺序按本进程内的最近访问。
+    """
+
+    def __init__(self, directory: Path, max_bytes: int, ttl: float):
+        """
+        初始化磁盘缓存
+
+        Args:
+            directory: 缓存目录
+            max_bytes: 最大占用字节数
+            ttl: 条目有效期（秒）
+        """
+        self._directory = Path(directory)
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+        # key -> (文件大小, 写入时间)，按最近访问从旧到新排列
+        self._index: Optional[OrderedDict[str, tuple[int, float]]] = None
+        self._index_lock = asyncio.Lock()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    async def get(self, key: str) -> Optional[CachedResult]:
+        index = await self._get_index()
+        item = index.get(key)
+        if item is None:
+            self._misses += 1
+            return None
+
+        if item[1] + self._ttl <= time.time():
+            await self._delete([key])
+            self._expirations += 1
+            self._misses += 1
+            return None
+
+        loop = asyncio.get_event_loop()
+        value = await loop.run_in_executor(None, self._read, self._path(key))
+        if value is None:
+            self._forget(key)
+            self._misses += 1
+            return None
+
+        index.move_to_end(key)
+        self._hits += 1
+        return value
+
+    async def set(self, key: str, value: CachedResult):
+        if value.size > self._max_bytes:
+            return
+
+        index = await self._get_index()
+        loop = asyncio.get_event_loop()
+        try:
+            size = await loop.run_in_executor(None, self._write, self._path(key), value)
+        except OSError as e:
+            logger.warning(f"Disk cache write failed: key={key}, error={e}")
+            return
+
+        self._forget(key)
+        index[key] = (size, time.time())
+        self._bytes += size
+
+        victims = []
+        while self._bytes > self._max_bytes and index:
+            oldest = next(iter(index))
+            victims.append(oldest)
+            self._forget(oldest)
+            self._evictions += 1
+        if victims:
+            await self._delete(victims)
+
+    def get_stats(self) -> dict:
+        return {
+            "entries": len(self._index) if self._index is not None else 0,
+            "bytes": self._bytes,
+            "max_bytes": self._max_bytes,
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "expirations": self._expirations,
+        }
+
+    async def clear(self):
+        index = await self._get_index()
+        await self._delete(list(index.keys()))
+
+    async def _get_index(self) -> OrderedDict:
+        """首次访问时扫描缓存目录构建索引"""
+        if self._index is None:
+            async with self._index_lock:
+                if self._index is None:
+                    loop = asyncio.get_event_loop()
+                    entries = await loop.run_in_executor(None, self._scan)
+                    self._index = OrderedDict(entries)
+                    self._bytes = sum(size for size, _ in self._index.values())
+                    logger.info(
+                        f"DiskCache index built: dir={self._directory}, "
+                        f"entries={len(self._index)}, bytes={self._bytes}"
+                    )
+        return self._index
+
+    def _forget(self, key: str):
+        """从索引中移除（不删除文件）"""
+        item = self._index.pop(key, None) if self._index is not None else None
+        if item is not None:
+            self._bytes -= item[0]
+
+    async def _delete(self, keys: list[str]):
+        """从索引和磁盘删除"""
+        for key in keys:
+            self._forget(key)
+        paths = [self._path(key) for key in keys]
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, self._unlink, paths)
+
+    def _path(self, key: str) -> Path:
+        return self._directory / key[:2] / key
+
+    def _scan(self) -> list[tuple[str, tuple[int, float]]]:
+        """扫描缓存目录（线程池中执行）"""
+        entries = []
+        if not self._directory.exists():
+            return entries
+        for path in self._directory.glob("*/*"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if path.suffix == ".tmp":
+                if stat.st_mtime + _STALE_TMP_SECONDS <= time.time():
+                    path.unlink(missing_ok=True)
+                continue
+            entries.append((path.name, (stat.st_size, stat.st_mtime)))
+        entries.sort(key=lambda entry: entry[1][1])
+        return entries
+
+    @staticmethod
+    def _read(path: Path) -> Optional[CachedResult]:
+        """读取条目（线程池中执行）"""
+        try:
+            with open(path, "rb") as f:
+                metadata = json.loads(f.readline())
+                content = f.read()
+        except (OSError, ValueError):
+            return None
+        return CachedResult(content=content, metadata=metadata)
+
+    @staticmethod
+    def _write(path: Path, value: CachedResult) -> int:
+        """原子写入条目（线程池中执行）"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{uuid.uuid4().hex}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(json.dumps(value.metadata).encode("utf-8"))
+                f.write(b"\n")
+                f.write(value.content)
+            os.replace(tmp_path, path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        return path.stat().st_size
+
+    @staticmethod
+    def _unlink(paths: list[Path]):
+        for path in paths:
+            try:
+                path.unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"Disk cache delete failed: {path}, error={e}")
+
+
+class TieredCache(ICache):
+    """内存层 + 可选磁盘层"""
+
+    def __init__(self, memory: MemoryLRUCache, disk: Optional[DiskCache] = None):
+        """
+        初始化分层缓存
+
+        Args:
+            memory: 内存层
+            disk: 磁盘层（可选）
+        """
+        self._memory = memory
+        self._disk = disk
+        self._hits = 0
+        self._misses = 0
+
+    async def get(self, key: str) -> Optional[CachedResult]:
+        value = await self._memory.get(key)
+        if value is None and self._disk is not None:
+            value = await self._disk.get(key)
+            if value is not None:
+                await self._memory.set(key, value)
+
+        if value is None:
+            self._misses += 1
+        else:
+            self._hits += 1
+        return value
+
+    async def set(self, key: str, value: CachedResult):
+        await self._memory.set(key, value)
+        if self._disk is not None:
+            await self._disk.set(key, value)
+
+    def get_stats(self) -> dict:
+        memory_stats = self._memory.get_stats()
+        disk_stats = self._disk.get_stats() if self._disk is not None else None
+        total = self._hits + self._misses
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / total, 4) if total else 0.0,
+            "evictions": memory_stats["evictions"] + (disk_stats["evictions"] if disk_stats else 0),
+            "memory": memory_stats,
+            "disk": disk_stats,
+        }
+
+    async def clear(self):
+        await self._memory.clear()
+        if self._disk is not None:
+            await self._disk.clear()
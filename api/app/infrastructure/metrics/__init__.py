@@ -0,0 +1,18 @@
+"""
+基础设施层 - 指标
+
+进程内的计数器 / 仪表 / 直方图，以 Prometheus 文本格式导出（GET /metrics）。
+"""
+
+from app.infrastructure.metrics.middleware import MetricsMiddleware
+from app.infrastructure.metrics.registry import (
+    CONTENT_TYPE,
+    REGISTRY,
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+)
+
+
+__all__ = ["CONTENT_TYPE", "REGISTRY", "Counter", "Gauge", "Histogram", "MetricsMiddleware", "MetricsRegistry"]
@@ -0,0 +1,55 @@
+"""
+HTTP 请求指标中间件
+
+纯 ASGI 中间件（不使用 BaseHTTPMiddleware，不包装响应体），按方法与路由模板记录
+请求数与耗时。耗时覆盖到响应体发送完成，流式响应（如批量 ZIP）同样计入。
+路由使用模板（如 /api/v1/cutout/jobs/{job_id}）而不是实际路径，未匹配的请求归为 unmatched，
+避免标签基数随路径增长。
+"""
+import time
+
+from app.core.constants import METRICS_LATENCY_BUCKETS
+from app.infrastructure.metrics.registry import REGISTRY
+
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total", "HTTP 请求数", ("method", "route", "status")
+)
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP 请求耗时（到响应体发送完成）", ("method", "route"),
+    buckets=METRICS_LATENCY_BUCKETS
+)
+HTTP_REQUESTS_IN_PROGRESS = REGISTRY.gauge(
+    "http_requests_in_progress", "处理中的 HTTP 请求数"
+)
+
+
+class MetricsMiddleware:
+    """记录 HTTP 请求数、耗时与处理中请求数"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        HTTP_REQUESTS_IN_PROGRESS.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_PROGRESS.dec()
+            route = scope.get("route")
+            path = route.path if route is not None else "unmatched"
+            HTTP_REQUEST_DURATION.labels(scope["method"], path).observe(time.perf_counter() - start)
+            HTTP_REQUESTS.labels(scope["method"], path, str(status)).inc()
@@ -0,0 +1,318 @@
+"""
+指标注册表实现
+
+按 Prometheus 文本格式（0.0.4）导出计数器、仪表与直方图，不依赖 prometheus_client。
+
+记录开销：
+- 指标对象在模块导入 / 组件初始化时创建，记录时只做属性自增与一次 bisect，
+  不加锁、不格式化字符串（格式化只在 render() 时进行）
+- 带标签的指标先用 labels() 取出子指标；热路径可以缓存子指标，省去一次字典查找
+- 记录只能在事件循环线程中进行（不跨线程共享），因此无需加锁
+
+回调指标（collect）：在 render() 时调用函数读取当前值，用于队列长度、已加载模型数等
+已由组件自身维护的状态，避免在每次变化时同步指标。
+"""
+import bisect
+import contextlib
+import math
+import time
+from collections.abc import Iterator
+from typing import Callable, Optional, Union
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 回调返回单个值（无标签）或 {标签值元组: 值}
+CollectResult = Union[float, dict[tuple, float]]
+
+
+def _escape(value: str) -> str:
+    """标签值转义"""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    """样本值格式化"""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    """{name="value",...}"""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _ValueChild:
+    """计数器 / 仪表的单个标签组合"""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+class _HistogramChild:
+    """直方图的单个标签组合（各桶计数不累积，导出时再累加）"""
+
+    __slots__ = ("_bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: tuple):
+        self._bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        """记录一个观测值"""
+        self.counts[bisect.bisect_left(self._bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    @contextlib.contextmanager
+    def time(self) -> Iterator[None]:
+        """记录代码块（可以包含 await）的耗时（秒）"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+
+class _Metric:
+    """指标基类：按标签值元组管理子指标"""
+
+    type = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple = (),
+        collect: Optional[Callable[[], CollectResult]] = None
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._collect = collect
+        self._children: dict[tuple, object] = {}
+        self._default = self._new_child() if not self.labelnames else None
+        if self._default is not None:
+            self._children[()] = self._default
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """
+        取出（必要时创建）标签组合对应的子指标
+
+        Args:
+            *values: 标签值（与 labelnames 一一对应）
+
+        Returns:
+            子指标
+        """
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            child = self._children[values] = self._new_child()
+        return child
+
+    def _collected(self) -> dict[tuple, float]:
+        """回调指标的当前值"""
+        result = self._collect()
+        if isinstance(result, dict):
+            return result
+        return {(): result}
+
+    def render(self) -> Iterator[str]:
+        """导出文本格式的行"""
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.type}"
+        if self._collect is not None:
+            items = self._collected().items()
+        else:
+            items = ((values, child.value) for values, child in self._children.items())
+        for values, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(value)}"
+
+
+class Counter(_Metric):
+    """只增计数器"""
+
+    type = "counter"
+
+    def _new_child(self) -> _ValueChild:
+        return _ValueChild()
+
+    def inc(self, amount: float = 1.0):
+        """无标签计数器自增"""
+        self._default.value += amount
+
+
+class Gauge(_Metric):
+    """可增可减的仪表"""
+
+    type = "gauge"
+
+    def _new_child(self) -> _ValueChild:
+        return _ValueChild()
+
+    def set(self, value: float):
+        """设置无标签仪表的值"""
+        self._default.value = value
+
+    def inc(self, amount: float = 1.0):
+        """无标签仪表自增"""
+        self._default.value += amount
+
+    def dec(self, amount: float = 1.0):
+        """无标签仪表自减"""
+        self._default.value -= amount
+
+
+class Histogram(_Metric):
+    """直方图（固定桶边界）"""
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self._bounds = tuple(sorted(float(b) for b in buckets if not math.isinf(b)))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self._bounds)
+
+    def observe(self, value: float):
+        """无标签直方图记录一个观测值"""
+        self._default.observe(value)
+
+    def time(self):
+        """记录无标签直方图代码块的耗时"""
+        return self._default.time()
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.type}"
+        bounds = [_format_value(b) for b in self._bounds] + ["+Inf"]
+        for values, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip(bounds, child.counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, values, f'le="{bound}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}_sum{labels} {_format_value(child.sum)}"
+            yield f"{self.name}_count{labels} {child.count}"
+
+
+class MetricsRegistry:
+    """指标注册表（同名指标只能注册一次）"""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple = (),
+        collect: Optional[Callable[[], CollectResult]] = None
+    ) -> Counter:
+        """
+        注册计数器
+
+        Args:
+            name: 指标名（以 _total 结尾）
+            documentation: 说明
+            labelnames: 标签名
+            collect: 回调（导出时读取当前值，设置后不再使用 inc）
+
+        Returns:
+            Counter
+        """
+        return self._register(Counter(name, documentation, labelnames, collect))
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple = (),
+        collect: Optional[Callable[[], CollectResult]] = None
+    ) -> Gauge:
+        """
+        注册仪表
+
+        Args:
+            name: 指标名
+            documentation: 说明
+            labelnames: 标签名
+            collect: 回调（导出时读取当前值，设置后不再使用 set）
+
+        Returns:
+            Gauge
+        """
+        return self._register(Gauge(name, documentation, labelnames, collect))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple = (),
+        buckets: tuple = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """
+        注册直方图
+
+        Args:
+            name: 指标名（以单位结尾，如 _seconds）
+            documentation: 说明
+            labelnames: 标签名
+            buckets: 桶上界（+Inf 自动追加）
+
+        Returns:
+            Histogram
+        """
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """
+        导出所有指标（Prometheus 文本格式）
+
+        Returns:
+            文本
+        """
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+# 进程内默认注册表（HTTP 请求与抠图流水线各阶段）
+REGISTRY = MetricsRegistry()
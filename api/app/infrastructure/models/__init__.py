@@ -4,8 +4,28 @@
 提供统一的模型加载、推理和资源管理能力。
 """
 
+from app.infrastructure.models.admission import (
+    InferenceDeadlineExceeded,
+    InferenceOverloaded,
+    InferenceRejected,
+    admission_scope,
+    current_scope,
+)
 from app.infrastructure.models.interfaces import IModelLoader
 from app.infrastructure.models.loader import ModelLoader
+from app.infrastructure.models.remote import RemoteInferenceError, RemoteModelLoader
+from app.infrastructure.models.variants import ModelVariants
 
 
-__all__ = ["IModelLoader", "ModelLoader"]
+__all__ = [
+    "IModelLoader",
+    "InferenceDeadlineExceeded",
+    "InferenceOverloaded",
+    "InferenceRejected",
+    "ModelLoader",
+    "ModelVariants",
+    "RemoteInferenceError",
+    "RemoteModelLoader",
+    "admission_scope",
+    "current_scope",
+]
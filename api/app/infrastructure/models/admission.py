@@ -0,0 +1,206 @@
+"""
+推理准入控制
+
+推理请求进入模型加载器时检查：
+1. 等待队列有界：等待执行的请求数达到上限时立即拒绝（InferenceOverloaded），
+   不再让请求持有解码后的图像在内存中排队，直到网关超时
+2. 截止时间：请求可以携带截止时间（由 HTTP 层从请求头或默认配置设置，通过 contextvars
+   传递到推理调用，远程推理模式下随请求发送给推理服务）。按实测的单批次执行耗时估算排队时间，
+   预计无法在截止时间前完成的请求立即拒绝；排队 / 执行超过截止时间的请求被取消
+   （均为 InferenceDeadlineExceeded）
+3. 拒绝时附带 Retry-After 估算：清空当前等待队列所需的时间
+
+后台任务（异步任务队列、批量接口）使用 bounded=False 的作用域，不受等待队列上限约束，
+由各自的并发上限控制排队长度。
+"""
+import contextlib
+import contextvars
+import math
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import Optional
+
+
+class InferenceRejected(Exception):
+    """推理请求被准入控制拒绝"""
+
+    status_code = 503
+
+    def __init__(self, detail: str, retry_after: float):
+        super().__init__(detail)
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class InferenceOverloaded(InferenceRejected):
+    """等待队列已满"""
+
+    status_code = 429
+
+
+class InferenceDeadlineExceeded(InferenceRejected):
+    """无法在截止时间前完成"""
+
+    status_code = 503
+
+
+@dataclass(frozen=True)
+class AdmissionScope:
+    """当前请求的准入参数"""
+    deadline: Optional[float] = None  # time.monotonic() 时间点
+    bounded: bool = True  # 是否受等待队列上限约束
+
+    def remaining(self) -> Optional[float]:
+        """距截止时间的秒数（无截止时间时为 None）"""
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+
+
+_DEFAULT_SCOPE = AdmissionScope()
+
+_scope: contextvars.ContextVar[Optional[AdmissionScope]] = contextvars.ContextVar("inference_admission", default=None)
+
+
+def current_scope() -> AdmissionScope:
+    """当前上下文的准入参数（未设置时无截止时间、受等待队列上限约束）"""
+    return _scope.get() or _DEFAULT_SCOPE
+
+
+@contextlib.contextmanager
+def admission_scope(timeout: Optional[float] = None, bounded: bool = True) -> Iterator[AdmissionScope]:
+    """
+    设置作用域内推理调用的截止时间与排队约束
+
+    作用域内创建的任务继承同一设置。
+
+    Args:
+        timeout: 从现在起的超时秒数（None 表示不限）
+        bounded: 是否受等待队列上限约束
+
+    Yields:
+        AdmissionScope
+    """
+    scope = AdmissionScope(
+        deadline=time.monotonic() + timeout if timeout is not None else None,
+        bounded=bounded
+    )
+    token = _scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _scope.reset(token)
+
+
+class AdmissionController:
+    """推理准入控制器（单个模型加载器内的所有模型共享）"""
+
+    def __init__(self, capacity: int, max_waiting: int, smoothing: float = 0.2):
+        """
+        初始化准入控制器
+
+        Args:
+            capacity: 同时执行的请求数上限（并发数 × 单批次行数）
+            max_waiting: 等待执行的请求数上限
+            smoothing: 执行耗时指数移动平均的系数
+        """
+        self.capacity = max(1, capacity)
+        self.max_waiting = max_waiting
+        self._smoothing = smoothing
+        self.pending = 0  # 已准入、尚未完成的请求数
+        self.executing = 0  # 正在执行的请求数
+        self.service_time: Optional[float] = None  # 单次执行耗时（秒，指数移动平均）
+
+        self.admitted = 0
+        self.rejected_overloaded = 0
+        self.rejected_deadline = 0
+        self.expired = 0
+
+    @property
+    def waiting(self) -> int:
+        """等待执行的请求数"""
+        return max(0, self.pending - self.executing)
+
+    def estimate_wait(self, waiting: Optional[int] = None) -> float:
+        """
+        估算新请求的排队时间（秒）
+
+        Args:
+            waiting: 排在前面的请求数（默认当前等待数）
+
+        Returns:
+            秒数（尚无耗时数据时为 0）
+        """
+        if self.service_time is None:
+            return 0.0
+        waiting = self.waiting if waiting is None else waiting
+        return math.ceil(waiting / self.capacity) * self.service_time
+
+    def retry_after(self) -> int:
+        """建议的重试间隔（秒）：当前等待队列排空所需时间，至少 1 秒"""
+        return max(1, math.ceil(self.estimate_wait(self.waiting + self.capacity)))
+
+    def check(self, scope: AdmissionScope):
+        """
+        准入检查（不计入准入次数，用于在解码等准备工作之前提前拒绝）
+
+        Args:
+            scope: 请求的准入参数
+
+        Raises:
+            InferenceOverloaded: 等待队列已满
+            InferenceDeadlineExceeded: 截止时间已过，或预计无法在截止时间前完成
+        """
+        if scope.bounded and self.waiting >= self.max_waiting:
+            self.rejected_overloaded += 1
+            raise InferenceOverloaded(
+                f"推理队列已满（{self.waiting} 个请求等待中）",
+                self.retry_after()
+            )
+
+        remaining = scope.remaining()
+        if remaining is not None:
+            expected = self.estimate_wait() + (self.service_time or 0.0)
+            if remaining <= 0 or expected > remaining:
+                self.rejected_deadline += 1
+                raise InferenceDeadlineExceeded(
+                    f"预计 {expected:.1f} 秒后才能完成，超过请求剩余时间 {max(0.0, remaining):.1f} 秒",
+                    self.retry_after()
+                )
+
+    def admit(self, scope: AdmissionScope):
+        """
+        准入检查并计数（通过后调用方负责 pending 计数）
+
+        Args:
+            scope: 请求的准入参数
+
+        Raises:
+            InferenceOverloaded: 等待队列已满
+            InferenceDeadlineExceeded: 截止时间已过，或预计无法在截止时间前完成
+        """
+        self.check(scope)
+        self.admitted += 1
+
+    def record_service_time(self, seconds: float):
+        """记录一次执行的耗时"""
+        if self.service_time is None:
+            self.service_time = seconds
+        else:
+            self.service_time += self._smoothing * (seconds - self.service_time)
+
+    def get_stats(self) -> dict:
+        """导出统计信息"""
+        return {
+            "pending": self.pending,
+            "executing": self.executing,
+            "waiting": self.waiting,
+            "max_waiting": self.max_waiting,
+            "service_time_ms": round(self.service_time * 1000, 1) if self.service_time is not None else None,
+            "retry_after": self.retry_after(),
+            "admitted": self.admitted,
+            "rejected_overloaded": self.rejected_overloaded,
+            "rejected_deadline": self.rejected_deadline,
+            "expired": self.expired,
+        }
@@ -0,0 +1,239 @@
+"""
+推理微批处理调度器
+
+将同一模型在短时间窗口内到达的并发推理请求合并为一个批次执行，
+摊薄每次 session.run 的固定开销，用少量延迟换取更高的吞吐。
+
+调度流程：
+1. 收集：首个请求到达后，在 max_wait_ms 窗口内继续收集，直到达到 max_batch_size
+2. 获取执行槽：等待推理信号量（等待期间新到达的请求继续并入批次）
+3. 执行：按输入形状分组，沿 batch 维拼接后一次推理
+4. 拆分：按各请求的 batch 行数切分输出，分别回传给等待方
+"""
+import asyncio
+import contextlib
+import logging
+from collections import Counter
+from collections.abc import Awaitable
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _PendingInference:
+    """等待合批的推理请求"""
+    input_data: np.ndarray
+    future: asyncio.Future
+    enqueued_at: float  # loop.time()
+    on_done: Optional[Callable[[], None]] = None  # 请求执行结束或被丢弃时调用（等待方取消后仍会调用）
+
+    @property
+    def rows(self) -> int:
+        return int(self.input_data.shape[0])
+
+
+class BatchStats:
+    """批次统计（记录实际形成的批次大小）"""
+
+    def __init__(self):
+        self.batches = 0
+        self.requests = 0
+        self._histogram: Counter = Counter()
+
+    def record(self, batch_size: int):
+        """
+        记录一次批次执行
+
+        Args:
+            batch_size: 批次中合并的请求数
+        """
+        self.batches += 1
+        self.requests += batch_size
+        self._histogram[batch_size] += 1
+
+    def as_dict(self) -> dict:
+        """导出统计信息"""
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "avg_batch_size": round(self.requests / self.batches, 2) if self.batches else 0.0,
+            "histogram": {str(size): count for size, count in sorted(self._histogram.items())},
+        }
+
+
+class MicroBatcher:
+    """
+    单个模型的微批处理调度器
+
+    每个调度器持有一个后台收集协程，批次执行在独立任务中进行，
+    并发度由外部传入的信号量统一控制。
+    """
+
+    def __init__(
+        self,
+        execute: Callable[[np.ndarray], Awaitable[list]],
+        semaphore: asyncio.Semaphore,
+        max_batch_size: int,
+        max_wait_ms: float,
+        stats: Optional[BatchStats] = None,
+        queue_wait: Optional[Any] = None
+    ):
+        """
+        初始化调度器
+
+        Args:
+            execute: 批次执行函数，输入拼接后的张量，返回输出列表
+            semaphore: 推理并发信号量
+            max_batch_size: 单批次最大行数
+            max_wait_ms: 收集窗口（毫秒）
+            stats: 批次统计对象
+            queue_wait: 排队时间直方图（提交到开始执行，秒；需提供 observe 方法）
+        """
+        self._execute = execute
+        self._semaphore = semaphore
+        self._max_batch_size = max(1, max_batch_size)
+        self._max_wait = max(0.0, max_wait_ms) / 1000
+        self._stats = stats or BatchStats()
+        self._queue_wait = queue_wait
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+        self._inflight: set[asyncio.Task] = set()
+
+    @property
+    def stats(self) -> BatchStats:
+        return self._stats
+
+    async def submit(self, input_data: np.ndarray, on_done: Optional[Callable[[], None]] = None) -> list:
+        """
+        提交推理请求并等待结果
+
+        Args:
+            input_data: 输入张量（第 0 维为 batch 维）
+            on_done: 请求所在批次执行结束（或请求被丢弃）时的回调，等待方取消后仍会调用
+
+        Returns:
+            该请求对应的输出列表（保留 batch 维）
+        """
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put_nowait(_PendingInference(input_data, future, loop.time(), on_done))
+        return await future
+
+    async def close(self):
+        """停止调度器，未执行的请求以 CancelledError 结束"""
+        if self._worker is not None:
+            self._worker.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._worker
+            self._worker = None
+
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+        while not self._queue.empty():
+            pending = self._queue.get_nowait()
+            if not pending.future.done():
+                pending.future.cancel()
+            self._notify_done([pending])
+
+    async def _run(self):
+        """收集协程：组批 -> 获取执行槽 -> 派发"""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await self._queue.get()]
+            rows = batch[0].rows
+            deadline = loop.time() + self._max_wait
+
+            try:
+                while rows < self._max_batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        pending = await asyncio.wait_for(self._queue.get(), timeout=timeout)
+                    except asyncio.TimeoutError:
+                        break
+                    batch.append(pending)
+                    rows += pending.rows
+
+                await self._semaphore.acquire()
+            except asyncio.CancelledError:
+                for pending in batch:
+                    if not pending.future.done():
+                        pending.future.cancel()
+                self._notify_done(batch)
+                raise
+
+            # 等待执行槽期间到达的请求直接并入本批次
+            while rows < self._max_batch_size and not self._queue.empty():
+                pending = self._queue.get_nowait()
+                batch.append(pending)
+                rows += pending.rows
+
+            task = asyncio.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch: list[_PendingInference]):
+        """执行一个批次（按输入形状分组），完成后释放执行槽"""
+        try:
+            groups: dict[tuple, list[_PendingInference]] = {}
+            for pending in batch:
+                key = (pending.input_data.shape[1:], pending.input_data.dtype.str)
+                groups.setdefault(key, []).append(pending)
+
+            for group in groups.values():
+                await self._execute_group(group)
+        finally:
+            self._semaphore.release()
+            self._notify_done(batch)
+
+    @staticmethod
+    def _notify_done(batch: list[_PendingInference]):
+        """调用请求的结束回调"""
+        for pending in batch:
+            if pending.on_done is not None:
+                pending.on_done()
+
+    async def _execute_group(self, group: list[_PendingInference]):
+        """拼接同形状请求，执行推理并拆分输出"""
+        live = [pending for pending in group if not pending.future.done()]
+        if not live:
+            return
+
+        if self._queue_wait is not None:
+            now = asyncio.get_running_loop().time()
+            for pending in live:
+                self._queue_wait.observe(now - pending.enqueued_at)
+
+        if len(live) == 1:
+            batch_input = live[0].input_data
+        else:
+            batch_input = np.concatenate([pending.input_data for pending in live], axis=0)
+
+        try:
+            outputs = await self._execute(batch_input)
+        except Exception as e:
+            logger.error(f"Batch inference failed: batch_size={len(live)}, error={e}")
+            for pending in live:
+                if not pending.future.done():
+                    pending.future.set_exception(e)
+            return
+
+        self._stats.record(len(live))
+
+        offset = 0
+        for pending in live:
+            rows = pending.rows
+            if not pending.future.done():
+                pending.future.set_result([output[offset:offset + rows] for output in outputs])
+            offset += rows
@@ -4,7 +4,7 @@
 定义模型加载器的统一接口，支持不同的模型框架（ONNX、TensorFlow、PyTorch）。
 """
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Optional
 
 
 class IModelLoader(ABC):
@@ -51,6 +51,65 @@ class IModelLoader(ABC):
         """
         pass
 
+    async def warmup(
+        self,
+        model_id: str,
+        input_shape: Optional[tuple] = None,
+        runs: int = 1
+    ) -> dict:
+        """
+        预加载并预热模型（默认只加载，不执行推理）
+
+        Args:
+            model_id: 模型标识符
+            input_shape: 预热输入形状（模型输入含动态维度时必须指定）
+            runs: 每个会话执行的推理次数
+
+        Returns:
+            预热统计
+        """
+        await self.load_model(model_id)
+        return {"model_id": model_id, "runs": 0}
+
+    async def get_input_shape(self, model_id: str) -> Optional[tuple]:
+        """
+        模型声明的输入形状（默认未知）
+
+        Args:
+            model_id: 模型标识符
+
+        Returns:
+            输入形状（动态维度为 None）；未知时返回 None
+        """
+        return None
+
+    def check_admission(self):
+        """
+        按当前准入参数（admission_scope）提前检查推理请求能否被接受（默认不检查）
+
+        Raises:
+            InferenceRejected: 请求会被拒绝
+        """
+        return None
+
+    def get_admission_stats(self) -> dict:
+        """
+        准入控制统计（默认无）
+
+        Returns:
+            统计字典
+        """
+        return {}
+
+    async def render_metrics(self) -> str:
+        """
+        导出加载器的指标（Prometheus 文本格式，默认无）
+
+        Returns:
+            文本
+        """
+        return ""
+
     @abstractmethod
     async def cleanup(self):
         """清理所有模型"""
@@ -0,0 +1,95 @@
+"""
+推理进程间通信协议
+
+Unix socket 上的简单帧格式，张量以原始字节传输，不经过 pickle：
+
+    [4 字节大端头部长度][JSON 头部][数组 0 原始字节][数组 1 原始字节]...
+
+头部的 "arrays" 字段描述后续每个数组的 shape 和 dtype。
+发送端直接发送数组内存（memoryview），接收端预先分配 numpy 数组并用
+sock_recv_into 写入，全程不产生中间 bytes 对象。
+"""
+import asyncio
+import json
+import socket
+import struct
+from typing import Optional
+
+import numpy as np
+
+
+_HEADER_LENGTH = struct.Struct(">I")
+
+# 头部最大长度，防止异常数据导致超大分配
+MAX_HEADER_SIZE = 1024 * 1024
+
+
+class ProtocolError(Exception):
+    """通信协议错误（连接中断或数据格式错误）"""
+    pass
+
+
+async def send_message(sock: socket.socket, header: dict, arrays: Optional[list] = None):
+    """
+    发送一条消息
+
+    Args:
+        sock: 非阻塞 socket
+        header: 头部字典（会被写入 arrays 描述字段）
+        arrays: numpy 数组列表
+    """
+    loop = asyncio.get_running_loop()
+    arrays = [np.ascontiguousarray(array) for array in arrays or []]
+    header = dict(header, arrays=[{"shape": list(a.shape), "dtype": a.dtype.str} for a in arrays])
+
+    encoded = json.dumps(header).encode("utf-8")
+    await loop.sock_sendall(sock, _HEADER_LENGTH.pack(len(encoded)) + encoded)
+    for array in arrays:
+        if array.nbytes:
+            await loop.sock_sendall(sock, memoryview(array).cast("B"))
+
+
+async def recv_message(sock: socket.socket) -> tuple[dict, list]:
+    """
+    接收一条消息
+
+    Args:
+        sock: 非阻塞 socket
+
+    Returns:
+        (头部字典, numpy 数组列表)
+
+    Raises:
+        ProtocolError: 连接关闭或数据格式错误
+    """
+    size_buffer = bytearray(_HEADER_LENGTH.size)
+    await _recv_into(sock, memoryview(size_buffer))
+    (size,) = _HEADER_LENGTH.unpack(size_buffer)
+    if size > MAX_HEADER_SIZE:
+        raise ProtocolError(f"Header too large: {size}")
+
+    header_buffer = bytearray(size)
+    await _recv_into(sock, memoryview(header_buffer))
+    try:
+        header = json.loads(header_buffer)
+    except ValueError as e:
+        raise ProtocolError(f"Invalid header: {e}")
+
+    arrays = []
+    for spec in header.get("arrays", []):
+        array = np.empty(spec["shape"], dtype=np.dtype(spec["dtype"]))
+        if array.nbytes:
+            await _recv_into(sock, memoryview(array).cast("B"))
+        arrays.append(array)
+    return header, arrays
+
+
+async def _recv_into(sock: socket.socket, view: memoryview):
+    """读满缓冲区"""
+    loop = asyncio.get_running_loop()
+    received = 0
+    while received < len(view):
+        n = await loop.sock_recv_into(sock, view[received:])
+        if n == 0:
+            raise ProtocolError("Connection closed")
+        received += n
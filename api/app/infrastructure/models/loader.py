@@ -4,26 +4,75 @@
 提供 ONNX 模型的加载、推理和资源管理。
 
 功能：
-1. 懒加载模型（按需加载）
+1. 懒加载模型（按需加载），也可在启动时预加载并预热（warmup）
 2. 模型复用（避免重复加载）
 3. 自动排队（Semaphore 限制并发）
 4. 线程池执行（CPU 密集型任务）
-5. 内存管理（可卸载模型）
+5. 内存管理（模型注册表：内存预算、LRU 淘汰、空闲卸载、固定常驻模型，见 registry.py）
+6. 微批处理（合并同模型的并发请求，见 batching.py）
+7. 会话池（每个模型 N 个调优过的会话，见 session_pool.py）
+8. 准入控制（有界等待队列、请求截止时间、按实测耗时估算 Retry-After，见 admission.py）
+9. 指标（排队等待、执行耗时、批次行数、信号量等待数、执行线程占用，见 metrics 属性）
 """
 import asyncio
 import logging
+import os
+import time
 from concurrent.futures import ThreadPoolExecutor
-from typing import Any
+from typing import Any, Optional
 
-import onnxruntime as ort
+import numpy as np
 
-from app.core.constants import MAX_CONCURRENT_INFERENCE, THREAD_POOL_SIZE
+from app.core.constants import (
+    INFERENCE_MAX_BATCH_SIZE,
+    INFERENCE_MAX_BATCH_WAIT_MS,
+    INFERENCE_MAX_QUEUE,
+    MAX_CONCURRENT_INFERENCE,
+    METRICS_BATCH_ROWS_BUCKETS,
+    METRICS_LATENCY_BUCKETS,
+    MODEL_IDLE_UNLOAD_SECONDS,
+    MODEL_MEMORY_BUDGET_MB,
+    ORT_ENABLE_CPU_MEM_ARENA,
+    ORT_ENABLE_MEM_PATTERN,
+    ORT_EXECUTION_MODE,
+    ORT_GRAPH_OPTIMIZATION_LEVEL,
+    ORT_INTER_OP_THREADS,
+    ORT_INTRA_OP_THREADS,
+    ORT_OPTIMIZED_MODEL_DIR,
+    THREAD_POOL_SIZE,
+)
+from app.infrastructure.metrics import MetricsRegistry
+from app.infrastructure.models.admission import AdmissionController, InferenceDeadlineExceeded, current_scope
+from app.infrastructure.models.batching import BatchStats, MicroBatcher
 from app.infrastructure.models.interfaces import IModelLoader
+from app.infrastructure.models.registry import ModelRegistry, process_rss_bytes
+from app.infrastructure.models.session_pool import SessionConfig, SessionPool, plan_session_pool
 
 
 logger = logging.getLogger(__name__)
 
 
+class _PendingRequest:
+    """
+    在途请求计数
+
+    请求交给执行任务或微批调度器后（handed_off），即使等待方超时离开，
+    也要等执行结束才释放计数，使等待队列上限与 Retry-After 反映仍占用会话与信号量的请求。
+    """
+
+    def __init__(self, admission: AdmissionController):
+        self._admission = admission
+        self._released = False
+        self.handed_off = False
+        admission.pending += 1
+
+    def release(self, *_):
+        """释放计数（可重复调用，只生效一次）"""
+        if not self._released:
+            self._released = True
+            self._admission.pending -= 1
+
+
 class ModelLoader(IModelLoader):
     """
     ONNX 模型加载器
@@ -31,56 +80,147 @@ class ModelLoader(IModelLoader):
     针对 4核4G 单机场景优化：
     - 严格限制并发数（默认 2）
     - 线程池大小与并发数匹配
-    - 支持模型卸载释放内存
+    - 会话数 × intra-op 线程数 不超过 CPU 核数
+    - 模型总内存受预算约束，超出时淘汰最久未用的空闲模型；长时间空闲的模型自动卸载
+    - 预热过的模型视为常驻模型（固定），不会被淘汰
+    - 支持 batch 维动态的模型自动合批；batch 维固定的模型退化为逐请求推理
     """
 
     def __init__(
         self,
         max_concurrent: int = MAX_CONCURRENT_INFERENCE,
-        thread_pool_size: int = THREAD_POOL_SIZE
+        thread_pool_size: int = THREAD_POOL_SIZE,
+        max_batch_size: int = INFERENCE_MAX_BATCH_SIZE,
+        max_batch_wait_ms: float = INFERENCE_MAX_BATCH_WAIT_MS,
+        session_config: Optional[SessionConfig] = None,
+        memory_budget_mb: float = MODEL_MEMORY_BUDGET_MB,
+        idle_unload_seconds: float = MODEL_IDLE_UNLOAD_SECONDS,
+        max_queue: int = INFERENCE_MAX_QUEUE
     ):
         """
         初始化模型加载器
 
         Args:
             max_concurrent: 最大并发推理数
-            thread_pool_size: 线程池大小
+            thread_pool_size: 线程池大小（不小于会话池大小）
+            max_batch_size: 单批次最大行数（1 表示关闭合批）
+            max_batch_wait_ms: 合批收集窗口（毫秒）
+            session_config: 会话配置（默认按 CPU 核数自动规划线程数）
+            memory_budget_mb: 模型内存预算（MB）
+            idle_unload_seconds: 模型空闲卸载时间（秒，0 表示不卸载）
+            max_queue: 等待执行的推理请求数上限
         """
-        self._models: dict[str, ort.InferenceSession] = {}
+        pool_size, intra_op_threads = plan_session_pool(
+            max_concurrent,
+            intra_op_threads=session_config.intra_op_threads if session_config else ORT_INTRA_OP_THREADS
+        )
+        if session_config is None:
+            session_config = SessionConfig(
+                intra_op_threads=intra_op_threads,
+                inter_op_threads=ORT_INTER_OP_THREADS,
+                graph_optimization_level=ORT_GRAPH_OPTIMIZATION_LEVEL,
+                execution_mode=ORT_EXECUTION_MODE,
+                enable_cpu_mem_arena=ORT_ENABLE_CPU_MEM_ARENA,
+                enable_mem_pattern=ORT_ENABLE_MEM_PATTERN,
+                optimized_model_dir=ORT_OPTIMIZED_MODEL_DIR
+            )
+
+        self._registry = ModelRegistry(
+            load=self._create_pool,
+            unload=self._release_pool,
+            estimate=self._estimate_size,
+            budget_bytes=int(memory_budget_mb * 1024 * 1024),
+            idle_timeout=idle_unload_seconds
+        )
+        self._batchers: dict[str, Optional[MicroBatcher]] = {}
+        self._batch_stats: dict[str, BatchStats] = {}
+        self._warmup_stats: dict[str, dict] = {}
+        self._warmup_tasks: dict[str, asyncio.Task] = {}
+        self._inflight: set[asyncio.Task] = set()  # 不合批的执行任务（等待方取消后仍运行到结束）
         self._semaphore = asyncio.Semaphore(max_concurrent)
-        self._executor = ThreadPoolExecutor(max_workers=thread_pool_size)
+        self._admission = AdmissionController(
+            capacity=max_concurrent * max(1, max_batch_size),
+            max_waiting=max_queue
+        )
+        self._executor = ThreadPoolExecutor(max_workers=max(thread_pool_size, pool_size))
+        self._executor_threads = max(thread_pool_size, pool_size)
+        self._running_sessions = 0
+        self.metrics = self._create_metrics()
         self._max_concurrent = max_concurrent
         self._thread_pool_size = thread_pool_size
+        self._max_batch_size = max_batch_size
+        self._max_batch_wait_ms = max_batch_wait_ms
+        self._pool_size = pool_size
+        self._session_config = session_config
         logger.info(
             f"ModelLoader initialized: max_concurrent={max_concurrent}, "
-            f"thread_pool_size={thread_pool_size}"
+            f"thread_pool_size={thread_pool_size}, max_batch_size={max_batch_size}, "
+            f"max_batch_wait_ms={max_batch_wait_ms}, sessions_per_model={pool_size}, "
+            f"intra_op_threads={session_config.intra_op_threads}, "
+            f"memory_budget_mb={memory_budget_mb}, idle_unload_seconds={idle_unload_seconds}, "
+            f"max_queue={max_queue}"
+        )
+
+    def _create_metrics(self) -> MetricsRegistry:
+        """
+        创建本加载器的指标（独立注册表：remote 模式下由推理服务进程导出）
+
+        Returns:
+            指标注册表
+        """
+        metrics = MetricsRegistry()
+        self._queue_wait = metrics.histogram(
+            "inference_queue_wait_seconds", "推理请求等待执行槽的时间", ("model",), buckets=METRICS_LATENCY_BUCKETS
+        )
+        self._run_seconds = metrics.histogram(
+            "inference_run_seconds", "单次 session.run 耗时（一个批次）", ("model",), buckets=METRICS_LATENCY_BUCKETS
+        )
+        self._batch_rows = metrics.histogram(
+            "inference_batch_rows", "单次 session.run 的输入行数", ("model",), buckets=METRICS_BATCH_ROWS_BUCKETS
+        )
+
+        admission = self._admission
+        metrics.gauge("inference_pending", "在途推理请求数（等待中 + 执行中）", collect=lambda: admission.pending)
+        metrics.gauge("inference_waiting", "等待执行的推理请求数", collect=lambda: admission.waiting)
+        metrics.gauge("inference_max_waiting", "等待队列上限", collect=lambda: admission.max_waiting)
+        metrics.gauge(
+            "inference_semaphore_waiters", "等待推理信号量的批次 / 请求数",
+            collect=lambda: len(self._semaphore._waiters or ())
+        )
+        metrics.gauge("inference_concurrency_limit", "推理信号量上限（MAX_CONCURRENT_INFERENCE）",
+                      collect=lambda: self._max_concurrent)
+        metrics.gauge("inference_executor_threads", "推理线程池线程数", collect=lambda: self._executor_threads)
+        metrics.gauge("inference_executor_busy_threads", "正在执行 session.run 的线程数",
+                      collect=lambda: self._running_sessions)
+        metrics.gauge("inference_loaded_models", "已加载的模型数", collect=lambda: len(self._registry.loaded_models()))
+        metrics.gauge("inference_model_memory_bytes", "已加载模型的估算内存占用",
+                      collect=lambda: self._registry.used_bytes)
+        metrics.gauge(
+            "inference_service_time_seconds", "单次 session.run 耗时的指数移动平均",
+            collect=lambda: admission.service_time or 0.0
+        )
+        metrics.counter("inference_admitted_total", "通过准入检查的推理请求数", collect=lambda: admission.admitted)
+        metrics.counter(
+            "inference_rejected_total", "被准入控制拒绝的推理请求数", ("reason",),
+            collect=lambda: {
+                ("overloaded",): admission.rejected_overloaded,
+                ("deadline",): admission.rejected_deadline,
+                ("expired",): admission.expired,
+            }
         )
+        return metrics
 
     async def load_model(self, model_id: str) -> Any:
         """
-        加载模型（懒加载，线程中执行）
+        加载模型（懒加载，线程中执行；同一模型的并发加载只创建一次会话）
 
         Args:
             model_id: 模型文件路径
 
         Returns:
-            ONNX InferenceSession
+            模型的会话池
         """
-        if model_id not in self._models:
-            logger.info(f"Loading model: {model_id}")
-
-            # 在后台线程加载模型
-            loop = asyncio.get_event_loop()
-            session = await loop.run_in_executor(
-                self._executor,
-                ort.InferenceSession,
-                str(model_id)
-            )
-
-            self._models[model_id] = session  # ← 修复：存储 session 对象
-            logger.info(f"Model loaded: {model_id}")
-
-        return self._models[model_id]
+        return await self._registry.get(model_id)
 
     async def unload_model(self, model_id: str):
         """
@@ -89,9 +229,164 @@ class ModelLoader(IModelLoader):
         Args:
             model_id: 模型标识符
         """
-        if model_id in self._models:
-            del self._models[model_id]
-            logger.info(f"Model unloaded: {model_id}")
+        await self._registry.unload(model_id)
+
+    def pin_model(self, model_id: str, pinned: bool = True):
+        """
+        固定 / 取消固定模型（固定的模型不会被淘汰或空闲卸载）
+
+        Args:
+            model_id: 模型标识符
+            pinned: 是否固定
+        """
+        self._registry.pin(model_id, pinned)
+
+    async def _create_pool(self, model_id: str) -> tuple[SessionPool, int]:
+        """
+        创建会话池并测量内存占用（注册表加载回调）
+
+        Returns:
+            (会话池, 内存占用字节数)
+        """
+        logger.info(f"Loading model: {model_id}")
+
+        def create() -> tuple[list, Optional[int]]:
+            before = process_rss_bytes()
+            sessions = SessionPool.create_sessions(str(model_id), self._pool_size, self._session_config)
+            after = process_rss_bytes()
+            return sessions, after - before if before is not None and after is not None else None
+
+        # 在后台线程创建会话
+        loop = asyncio.get_event_loop()
+        sessions, rss_delta = await loop.run_in_executor(self._executor, create)
+
+        # RSS 增量可能因内存复用偏小，以模型文件大小 × 会话数为下限
+        size_bytes = max(rss_delta or 0, self._estimate_size(model_id))
+        logger.info(f"Model loaded: {model_id}, sessions={len(sessions)}, size={size_bytes / 1024 / 1024:.1f}MB")
+        return SessionPool(model_id, sessions), size_bytes
+
+    async def _release_pool(self, model_id: str, pool: SessionPool):
+        """释放模型关联的资源（注册表卸载回调）"""
+        batcher = self._batchers.pop(model_id, None)
+        if batcher is not None:
+            await batcher.close()
+        self._warmup_stats.pop(model_id, None)
+
+    def _estimate_size(self, model_id: str) -> int:
+        """按模型文件大小 × 会话数估算内存占用（每个会话持有一份权重）"""
+        try:
+            return os.path.getsize(model_id) * self._pool_size
+        except OSError:
+            return 0
+
+    async def warmup(
+        self,
+        model_id: str,
+        input_shape: Optional[tuple] = None,
+        runs: int = 1
+    ) -> dict:
+        """
+        预加载并预热模型
+
+        在池中每个会话上以真实输入形状执行 runs 次推理，使 ORT 首次运行的
+        内存规划、内核选择等初始化在接收流量之前完成。
+        同一模型的并发调用共享同一次预热，已预热的模型直接返回上次的统计。
+        预热完成的模型会被固定（常驻模型不参与淘汰与空闲卸载）。
+
+        Args:
+            model_id: 模型文件路径
+            input_shape: 预热输入形状（为空时使用模型声明的形状，动态 batch 维取 1）
+            runs: 每个会话执行的推理次数
+
+        Returns:
+            预热统计（加载耗时、预热耗时、首次 / 末次推理耗时）
+        """
+        if model_id in self._warmup_stats:
+            return self._warmup_stats[model_id]
+
+        task = self._warmup_tasks.get(model_id)
+        if task is None:
+            task = asyncio.create_task(self._warmup(model_id, input_shape, runs))
+            self._warmup_tasks[model_id] = task
+            task.add_done_callback(lambda _: self._warmup_tasks.pop(model_id, None))
+
+        # 单个调用方被取消不影响其他等待同一次预热的调用方
+        return await asyncio.shield(task)
+
+    async def _warmup(self, model_id: str, input_shape: Optional[tuple], runs: int) -> dict:
+        """执行预热（见 warmup）"""
+        start = time.perf_counter()
+        loop = asyncio.get_event_loop()
+        durations: list[float] = []
+
+        async with self._registry.use(model_id) as pool:
+            load_ms = (time.perf_counter() - start) * 1000
+
+            model_input = pool.get_inputs()[0]
+            shape = self._resolve_input_shape(model_input.shape, input_shape)
+            input_data = np.zeros(shape, dtype=np.float16 if model_input.type == "tensor(float16)" else np.float32)
+
+            async def run_session():
+                async with pool.acquire() as session:
+                    for _ in range(max(1, runs)):
+                        run_start = time.perf_counter()
+                        await loop.run_in_executor(
+                            self._executor, session.run, None, {model_input.name: input_data}
+                        )
+                        durations.append((time.perf_counter() - run_start) * 1000)
+
+            # 同时占用池中所有会话，保证每个会话都被预热
+            warmup_start = time.perf_counter()
+            await asyncio.gather(*(run_session() for _ in range(pool.size)))
+
+        self._registry.pin(model_id)
+        stats = {
+            "model_id": model_id,
+            "input_shape": list(shape),
+            "sessions": pool.size,
+            "runs": max(1, runs),
+            "load_ms": round(load_ms, 1),
+            "warmup_ms": round((time.perf_counter() - warmup_start) * 1000, 1),
+            "first_run_ms": round(durations[0], 1),
+            "last_run_ms": round(durations[-1], 1),
+        }
+        self._warmup_stats[model_id] = stats
+        logger.info(f"Model warmed up: {stats}")
+        return stats
+
+    @staticmethod
+    def _resolve_input_shape(declared: list, requested: Optional[tuple]) -> tuple:
+        """
+        确定预热输入形状
+
+        Raises:
+            ValueError: 模型输入含动态维度（batch 维除外）且未指定形状
+        """
+        if requested is not None:
+            return tuple(requested)
+
+        shape = []
+        for i, dim in enumerate(declared):
+            if isinstance(dim, int) and dim > 0:
+                shape.append(dim)
+            elif i == 0:
+                shape.append(1)
+            else:
+                raise ValueError(f"Model input has dynamic dimension {dim!r}, input_shape is required for warmup")
+        return tuple(shape)
+
+    async def get_input_shape(self, model_id: str) -> Optional[tuple]:
+        """
+        模型声明的输入形状（未加载时加载模型）
+
+        Args:
+            model_id: 模型文件路径
+
+        Returns:
+            输入形状（动态维度为 None）
+        """
+        async with self._registry.use(model_id) as pool:
+            return tuple(dim if isinstance(dim, int) and dim > 0 else None for dim in pool.get_inputs()[0].shape)
 
     async def infer(
         self,
@@ -102,36 +397,142 @@ class ModelLoader(IModelLoader):
         推理（自动排队）
 
         工作流程：
-        1. 获取信号量（如果达到并发数，自动排队）
+        1. 准入检查（等待队列已满、预计超过截止时间时立即拒绝）
         2. 加载模型（懒加载）
-        3. 在后台线程执行推理
-        4. 释放信号量
+        3. 支持合批的模型：提交到微批调度器，与并发请求合并后执行
+        4. 不支持合批的模型：获取信号量后单独执行（batch=1）
+        5. 在后台线程执行推理，释放信号量；超过截止时间的请求停止等待，
+           已开始的执行继续占用会话与信号量直到线程结束，期间仍计入在途请求数
 
         Args:
             model_id: 模型标识符
-            input_data: 输入数据
+            input_data: 输入数据（第 0 维为 batch 维）
 
         Returns:
             推理结果
+
+        Raises:
+            InferenceOverloaded: 等待队列已满
+            InferenceDeadlineExceeded: 无法在截止时间前完成
         """
-        async with self._semaphore:
-            session = await self.load_model(model_id)
+        scope = current_scope()
+        self._admission.admit(scope)
 
-            # 在后台线程执行推理
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                self._executor,
-                session.run,
-                None,
-                {session.get_inputs()[0].name: input_data}
-            )
+        request = _PendingRequest(self._admission)
+        try:
+            remaining = scope.remaining()
+            if remaining is None:
+                return await self._infer(model_id, input_data, request)
+            try:
+                return await asyncio.wait_for(self._infer(model_id, input_data, request), timeout=remaining)
+            except asyncio.TimeoutError:
+                self._admission.expired += 1
+                raise InferenceDeadlineExceeded("推理超过请求截止时间", self._admission.retry_after())
+        finally:
+            if not request.handed_off:
+                request.release()
+
+    async def _infer(self, model_id: str, input_data: Any, request: _PendingRequest) -> Any:
+        """推理（见 infer；请求交给执行任务或调度器后由其在执行结束时释放计数）"""
+        async with self._registry.use(model_id) as pool:
+            batcher = self._get_batcher(model_id, pool)
+            if batcher is not None:
+                request.handed_off = True
+                return await batcher.submit(input_data, on_done=request.release)
 
+            start = time.perf_counter()
+            await self._semaphore.acquire()
+            self._queue_wait.labels(model_id).observe(time.perf_counter() - start)
+            # 执行放在独立任务中（同 MicroBatcher）：等待方超时被取消时后台线程中的 session.run 仍在使用会话，
+            # 任务在执行结束后才归还会话与信号量，不会让新的请求与之并发使用同一会话
+            task = asyncio.create_task(self._run_exclusive(model_id, input_data))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+            task.add_done_callback(request.release)
+            request.handed_off = True
+            return await asyncio.shield(task)
+
+    async def _run_exclusive(self, model_id: str, input_data: Any) -> Any:
+        """单独执行一次推理（batch=1，调用方已获取信号量，结束后释放）"""
+        try:
+            async with self._registry.use(model_id) as pool:
+                result = await self._run_session(model_id, pool, input_data)
+            self._get_batch_stats(model_id).record(1)
+            return result
+        finally:
+            self._semaphore.release()
+
+    async def _run_session(self, model_id: str, pool: SessionPool, input_data: Any) -> Any:
+        """从会话池取出一个会话，在后台线程执行一次 session.run（记录执行中的请求数与耗时）"""
+        loop = asyncio.get_event_loop()
+        rows = input_data.shape[0]
+        async with pool.acquire() as session:
+            self._admission.executing += rows
+            self._running_sessions += 1
+            start = time.perf_counter()
+            try:
+                result = await loop.run_in_executor(
+                    self._executor,
+                    session.run,
+                    None,
+                    {session.get_inputs()[0].name: input_data}
+                )
+            finally:
+                self._admission.executing -= rows
+                self._running_sessions -= 1
+            elapsed = time.perf_counter() - start
+            self._admission.record_service_time(elapsed)
+            self._run_seconds.labels(model_id).observe(elapsed)
+            self._batch_rows.labels(model_id).observe(rows)
             return result
 
+    def _get_batcher(self, model_id: str, pool: SessionPool) -> Optional[MicroBatcher]:
+        """
+        获取模型的微批调度器（首次调用时创建）
+
+        Returns:
+            调度器；合批关闭或模型 batch 维固定时返回 None
+        """
+        if model_id not in self._batchers:
+            batch_dim = pool.get_inputs()[0].shape[0]
+            if self._max_batch_size <= 1 or isinstance(batch_dim, int):
+                self._batchers[model_id] = None
+                logger.info(f"Batching disabled for {model_id}: batch_dim={batch_dim}")
+            else:
+                self._batchers[model_id] = MicroBatcher(
+                    execute=lambda data: self._run_session(model_id, pool, data),
+                    semaphore=self._semaphore,
+                    max_batch_size=self._max_batch_size,
+                    max_wait_ms=self._max_batch_wait_ms,
+                    stats=self._get_batch_stats(model_id),
+                    queue_wait=self._queue_wait.labels(model_id)
+                )
+                logger.info(
+                    f"Batching enabled for {model_id}: max_batch_size={self._max_batch_size}, "
+                    f"max_wait_ms={self._max_batch_wait_ms}"
+                )
+
+        return self._batchers[model_id]
+
+    def _get_batch_stats(self, model_id: str) -> BatchStats:
+        """获取模型的批次统计对象"""
+        if model_id not in self._batch_stats:
+            self._batch_stats[model_id] = BatchStats()
+        return self._batch_stats[model_id]
+
     async def cleanup(self):
         """清理所有模型"""
         logger.info("Cleaning up ModelLoader...")
-        self._models.clear()
+        for task in list(self._warmup_tasks.values()):
+            task.cancel()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        await self._registry.close()
+        for batcher in self._batchers.values():
+            if batcher is not None:
+                await batcher.close()
+        self._batchers.clear()
+        self._warmup_stats.clear()
         self._executor.shutdown(wait=True)
         logger.info("ModelLoader cleanup completed")
 
@@ -140,9 +541,45 @@ class ModelLoader(IModelLoader):
         获取当前队列大小
 
         Returns:
-            可用的信号量数量
+            等待执行的推理请求数
+        """
+        return self._admission.waiting
+
+    def get_pending_count(self) -> int:
+        """
+        获取在途推理请求数（排队中 + 执行中）
+
+        Returns:
+            请求数
         """
-        return self._semaphore._value if self._semaphore else 0
+        return self._admission.pending
+
+    def check_admission(self):
+        """
+        按当前准入参数提前检查推理请求能否被接受（在解码图像之前调用）
+
+        Raises:
+            InferenceRejected: 请求会被拒绝
+        """
+        self._admission.check(current_scope())
+
+    def get_admission_stats(self) -> dict:
+        """
+        获取准入控制统计（在途 / 执行中 / 等待中请求数、单次执行耗时、准入与拒绝次数）
+
+        Returns:
+            统计字典
+        """
+        return self._admission.get_stats()
+
+    async def render_metrics(self) -> str:
+        """
+        导出加载器的指标（Prometheus 文本格式）
+
+        Returns:
+            文本
+        """
+        return self.metrics.render()
 
     def get_loaded_models(self) -> list[str]:
         """
@@ -151,4 +588,36 @@ class ModelLoader(IModelLoader):
         Returns:
             模型 ID 列表
         """
-        return list(self._models.keys())
+        return self._registry.loaded_models()
+
+    def get_model_stats(self) -> dict:
+        """
+        获取模型注册表统计（内存预算与占用、加载 / 淘汰 / 空闲卸载次数、各模型状态）
+
+        Returns:
+            统计字典
+        """
+        return self._registry.get_stats()
+
+    def get_warmup_stats(self) -> dict:
+        """
+        获取已预热模型的统计
+
+        Returns:
+            {model_id: 预热统计} 字典
+        """
+        return dict(self._warmup_stats)
+
+    def get_batch_stats(self, model_id: Optional[str] = None) -> dict:
+        """
+        获取实际形成的批次大小统计
+
+        Args:
+            model_id: 模型标识符，为空时返回所有模型
+
+        Returns:
+            单个模型的统计，或 {model_id: 统计} 字典
+        """
+        if model_id is not None:
+            return self._batch_stats.get(model_id, BatchStats()).as_dict()
+        return {mid: stats.as_dict() for mid, stats in self._batch_stats.items()}
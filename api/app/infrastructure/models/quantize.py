@@ -0,0 +1,113 @@
+"""
+模型离线转换
+
+从 fp32 ONNX 模型生成低精度变体：
+- int8：动态量化（权重离线量化为 int8，激活在推理时按批次动态量化，无需校准数据）
+- fp16：权重与计算转换为 float16（输入输出保持 float32，主要用于支持 fp16 的加速硬件，
+  纯 CPU 推理通常不会更快）
+
+依赖 onnx 包（仅转换时需要，服务运行时不需要）。
+
+运行（在 api 目录下）：
+    python -m app.infrastructure.models.quantize --precision int8
+    python -m app.infrastructure.models.quantize --input data/models/model.onnx \\
+        --output data/models/model.int8.onnx --precision int8
+"""
+import argparse
+import logging
+import time
+from pathlib import Path
+
+from app.core.constants import CUTOUT_MODEL_VARIANTS
+
+
+logger = logging.getLogger(__name__)
+
+PRECISIONS = ("int8", "fp16")
+
+
+def quantize_int8(input_path: Path, output_path: Path, per_channel: bool = False):
+    """
+    动态量化为 int8
+
+    Args:
+        input_path: fp32 模型路径
+        output_path: 输出路径
+        per_channel: 按通道量化权重（精度更高，模型略大）
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(
+        str(input_path),
+        str(output_path),
+        weight_type=QuantType.QUInt8,
+        per_channel=per_channel
+    )
+
+
+def convert_fp16(input_path: Path, output_path: Path):
+    """
+    转换为 fp16（保持 float32 输入输出）
+
+    Args:
+        input_path: fp32 模型路径
+        output_path: 输出路径
+    """
+    import onnx
+    from onnxruntime.transformers.float16 import convert_float_to_float16
+
+    model = onnx.load(str(input_path))
+    onnx.save(convert_float_to_float16(model, keep_io_types=True), str(output_path))
+
+
+def convert(input_path: Path, output_path: Path, precision: str, per_channel: bool = False):
+    """
+    生成低精度模型变体
+
+    Args:
+        input_path: fp32 模型路径
+        output_path: 输出路径
+        precision: int8 / fp16
+        per_channel: int8 按通道量化
+
+    Raises:
+        ValueError: 不支持的精度
+        RuntimeError: 未安装 onnx
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unsupported precision: {precision}, expected one of {PRECISIONS}")
+
+    try:
+        import onnx  # noqa: F401
+    except ImportError:
+        raise RuntimeError("Model conversion requires the 'onnx' package: pip install onnx")
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    if precision == "int8":
+        quantize_int8(input_path, output_path, per_channel=per_channel)
+    else:
+        convert_fp16(input_path, output_path)
+
+    logger.info(
+        f"Converted {input_path} -> {output_path} ({precision}): "
+        f"{input_path.stat().st_size / 1024 / 1024:.1f}MB -> {output_path.stat().st_size / 1024 / 1024:.1f}MB, "
+        f"{time.perf_counter() - start:.1f}s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate low-precision ONNX model variants")
+    parser.add_argument("--precision", choices=PRECISIONS, default="int8", help="目标精度")
+    parser.add_argument("--input", type=Path, default=Path(CUTOUT_MODEL_VARIANTS["fp32"]), help="fp32 模型路径")
+    parser.add_argument("--output", type=Path, default=None, help="输出路径（默认 CUTOUT_MODEL_VARIANTS 中对应变体的路径）")
+    parser.add_argument("--per-channel", action="store_true", help="int8 按通道量化权重")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    output = args.output or Path(CUTOUT_MODEL_VARIANTS[args.precision])
+    convert(args.input, output, args.precision, per_channel=args.per_channel)
+
+
+if __name__ == "__main__":
+    main()
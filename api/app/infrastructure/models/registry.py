@@ -0,0 +1,294 @@
+"""
+模型注册表
+
+管理已加载模型的生命周期与内存预算：
+1. 单飞加载：同一模型的并发加载只构建一次，其余调用方等待同一结果
+2. 内存记账：记录每个模型的内存占用（由加载函数测量并返回）
+3. LRU 淘汰：加载新模型前按最近最少使用顺序卸载空闲、未固定的模型，直到预算足够
+4. 空闲卸载：超过 idle_timeout 未使用且未固定的模型由后台协程卸载
+5. 固定：常驻模型不会被淘汰或空闲卸载
+
+有在途推理的模型不会被自动卸载；无法腾出足够空间时仍然加载并记录警告（预算为软限制）。
+"""
+import asyncio
+import contextlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Awaitable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+def process_rss_bytes() -> Optional[int]:
+    """
+    当前进程的常驻内存（字节）
+
+    Returns:
+        RSS；非 Linux 系统返回 None
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+@dataclass
+class _ModelEntry:
+    """已加载的模型"""
+    model: Any
+    size_bytes: int
+    loaded_at: float
+    last_used: float
+    active: int = 0  # 在途推理数
+
+
+class ModelRegistry:
+    """带内存预算的模型注册表"""
+
+    def __init__(
+        self,
+        load: Callable[[str], Awaitable[tuple[Any, int]]],
+        unload: Callable[[str, Any], Awaitable[None]],
+        estimate: Callable[[str], int],
+        budget_bytes: int,
+        idle_timeout: float = 0,
+        pinned: tuple = ()
+    ):
+        """
+        初始化注册表
+
+        Args:
+            load: 加载函数，返回 (模型, 内存占用字节数)
+            unload: 卸载回调（释放模型关联的资源）
+            estimate: 加载前的内存占用估算函数（用于提前腾出空间）
+            budget_bytes: 内存预算（字节）
+            idle_timeout: 空闲卸载时间（秒，0 表示不卸载）
+            pinned: 固定的模型 ID
+        """
+        self._load_fn = load
+        self._unload_fn = unload
+        self._estimate_fn = estimate
+        self._budget = budget_bytes
+        self._idle_timeout = idle_timeout
+        self._pinned: set[str] = set(pinned)
+        self._entries: OrderedDict[str, _ModelEntry] = OrderedDict()
+        self._loading: dict[str, asyncio.Task] = {}
+        # 串行加载：腾出空间与测量内存时不受其他模型的加载干扰
+        self._load_lock = asyncio.Lock()
+        self._sweeper: Optional[asyncio.Task] = None
+
+        self.loads = 0
+        self.load_failures = 0
+        self.evictions = 0
+        self.idle_unloads = 0
+
+    @property
+    def used_bytes(self) -> int:
+        return sum(entry.size_bytes for entry in self._entries.values())
+
+    def loaded_models(self) -> list[str]:
+        """已加载的模型 ID（按最近使用顺序，最久未用在前）"""
+        return list(self._entries.keys())
+
+    def pin(self, model_id: str, pinned: bool = True):
+        """
+        固定 / 取消固定模型
+
+        Args:
+            model_id: 模型标识符
+            pinned: 是否固定
+        """
+        if pinned:
+            self._pinned.add(model_id)
+        else:
+            self._pinned.discard(model_id)
+
+    async def get(self, model_id: str) -> Any:
+        """
+        获取模型（未加载时加载，并发调用共享同一次加载）
+
+        Args:
+            model_id: 模型标识符
+
+        Returns:
+            模型
+        """
+        entry = self._entries.get(model_id)
+        if entry is not None:
+            self._touch(model_id, entry)
+            return entry.model
+
+        task = self._loading.get(model_id)
+        if task is None:
+            task = asyncio.create_task(self._load(model_id))
+            self._loading[model_id] = task
+            task.add_done_callback(lambda t: self._on_load_done(model_id, t))
+
+        # 单个调用方被取消不影响其他等待同一次加载的调用方
+        return await asyncio.shield(task)
+
+    @asynccontextmanager
+    async def use(self, model_id: str) -> AsyncIterator[Any]:
+        """
+        在使用期间持有模型（计入在途推理，不会被淘汰或空闲卸载）
+
+        Args:
+            model_id: 模型标识符
+
+        Yields:
+            模型
+        """
+        while True:
+            model = await self.get(model_id)
+            entry = self._entries.get(model_id)
+            # 加载完成到恢复执行之间模型可能已被其他加载淘汰，此时重新加载
+            if entry is not None and entry.model is model:
+                break
+
+        entry.active += 1
+        try:
+            yield model
+        finally:
+            entry.active -= 1
+            entry.last_used = time.monotonic()
+
+    async def unload(self, model_id: str):
+        """
+        卸载模型（手动调用，忽略固定与在途推理）
+
+        Args:
+            model_id: 模型标识符
+        """
+        self._pinned.discard(model_id)
+        entry = self._entries.pop(model_id, None)
+        if entry is not None:
+            await self._unload_fn(model_id, entry.model)
+            logger.info(f"Model unloaded: {model_id}")
+
+    async def sweep(self):
+        """卸载空闲超时的模型"""
+        if self._idle_timeout <= 0:
+            return
+
+        now = time.monotonic()
+        idle = [
+            model_id for model_id, entry in self._entries.items()
+            if self._evictable(model_id, entry) and now - entry.last_used >= self._idle_timeout
+        ]
+        for model_id in idle:
+            entry = self._entries.pop(model_id)
+            self.idle_unloads += 1
+            await self._unload_fn(model_id, entry.model)
+            logger.info(f"Idle model unloaded: {model_id}, idle={now - entry.last_used:.0f}s")
+
+    async def close(self):
+        """停止后台协程并卸载所有模型"""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._sweeper
+            self._sweeper = None
+
+        for task in list(self._loading.values()):
+            task.cancel()
+
+        while self._entries:
+            model_id, entry = self._entries.popitem(last=False)
+            await self._unload_fn(model_id, entry.model)
+
+    def get_stats(self) -> dict:
+        """导出统计信息"""
+        now = time.monotonic()
+        return {
+            "budget_bytes": self._budget,
+            "used_bytes": self.used_bytes,
+            "loads": self.loads,
+            "load_failures": self.load_failures,
+            "evictions": self.evictions,
+            "idle_unloads": self.idle_unloads,
+            "models": {
+                model_id: {
+                    "size_bytes": entry.size_bytes,
+                    "pinned": model_id in self._pinned,
+                    "active": entry.active,
+                    "idle_seconds": round(now - entry.last_used, 1),
+                }
+                for model_id, entry in self._entries.items()
+            },
+        }
+
+    def _touch(self, model_id: str, entry: _ModelEntry):
+        """标记最近使用"""
+        entry.last_used = time.monotonic()
+        self._entries.move_to_end(model_id)
+
+    def _evictable(self, model_id: str, entry: _ModelEntry) -> bool:
+        return entry.active == 0 and model_id not in self._pinned
+
+    async def _load(self, model_id: str) -> Any:
+        """加载模型（串行执行）"""
+        async with self._load_lock:
+            entry = self._entries.get(model_id)
+            if entry is not None:
+                return entry.model
+
+            await self._make_room(self._estimate_fn(model_id))
+
+            model, size_bytes = await self._load_fn(model_id)
+            now = time.monotonic()
+            self._entries[model_id] = _ModelEntry(model=model, size_bytes=size_bytes, loaded_at=now, last_used=now)
+            self.loads += 1
+            logger.info(
+                f"Model registered: {model_id}, size={size_bytes / 1024 / 1024:.1f}MB, "
+                f"used={self.used_bytes / 1024 / 1024:.1f}/{self._budget / 1024 / 1024:.0f}MB"
+            )
+
+            self._ensure_sweeper()
+            return model
+
+    async def _make_room(self, needed: int):
+        """按 LRU 顺序淘汰空闲、未固定的模型，直到可以容纳 needed 字节"""
+        while self.used_bytes + needed > self._budget:
+            victim = next(
+                (model_id for model_id, entry in self._entries.items() if self._evictable(model_id, entry)),
+                None
+            )
+            if victim is None:
+                logger.warning(
+                    f"Model memory budget exceeded: used={self.used_bytes / 1024 / 1024:.1f}MB, "
+                    f"needed={needed / 1024 / 1024:.1f}MB, budget={self._budget / 1024 / 1024:.0f}MB"
+                )
+                return
+
+            entry = self._entries.pop(victim)
+            self.evictions += 1
+            await self._unload_fn(victim, entry.model)
+            logger.info(f"Model evicted (LRU): {victim}, freed={entry.size_bytes / 1024 / 1024:.1f}MB")
+
+    def _on_load_done(self, model_id: str, task: asyncio.Task):
+        """加载结束：清除单飞记录，统计失败次数"""
+        self._loading.pop(model_id, None)
+        if not task.cancelled() and task.exception() is not None:
+            self.load_failures += 1
+
+    def _ensure_sweeper(self):
+        """启动空闲卸载协程（首次加载模型时）"""
+        if self._idle_timeout > 0 and (self._sweeper is None or self._sweeper.done()):
+            self._sweeper = asyncio.create_task(self._sweep_loop())
+
+    async def _sweep_loop(self):
+        """定期卸载空闲模型"""
+        interval = max(1.0, min(60.0, self._idle_timeout / 2))
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"Model idle sweep failed: {e}")
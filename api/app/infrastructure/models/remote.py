@@ -0,0 +1,280 @@
+"""
+远程模型加载器
+
+INFERENCE_MODE=remote 时使用：API 进程不加载模型，推理请求通过 Unix socket
+发送到独立的推理服务进程（见 server.py），多个 uvicorn worker 共享同一份模型。
+
+- 连接池：每个连接同一时间只承载一个请求，连接数即最大在途请求数
+- 请求被取消或通信出错时关闭该连接（连接状态不可知），不归还连接池
+- 每个响应附带推理服务的状态快照，get_loaded_models 等同步查询直接返回最近一次快照
+- 推理请求携带当前准入参数（剩余时间、是否受队列上限约束），推理服务拒绝时抛出对应的
+  InferenceRejected 子类；等待连接与等待响应的时间同样计入截止时间
+"""
+import asyncio
+import logging
+import socket
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any, Optional
+
+from app.core.constants import INFERENCE_CLIENT_CONNECTIONS
+from app.infrastructure.models.admission import (
+    AdmissionScope,
+    InferenceDeadlineExceeded,
+    InferenceOverloaded,
+    InferenceRejected,
+    current_scope,
+)
+from app.infrastructure.models.batching import BatchStats
+from app.infrastructure.models.interfaces import IModelLoader
+from app.infrastructure.models.ipc import recv_message, send_message
+
+
+logger = logging.getLogger(__name__)
+
+_REJECTIONS: dict[str, type[InferenceRejected]] = {
+    cls.__name__: cls for cls in (InferenceRejected, InferenceOverloaded, InferenceDeadlineExceeded)
+}
+
+
+class RemoteInferenceError(Exception):
+    """推理服务返回的错误"""
+    pass
+
+
+class RemoteModelLoader(IModelLoader):
+    """通过 Unix socket 调用推理服务的模型加载器"""
+
+    def __init__(self, socket_path: str, max_connections: int = INFERENCE_CLIENT_CONNECTIONS):
+        """
+        初始化远程加载器
+
+        Args:
+            socket_path: 推理服务 Unix socket 路径
+            max_connections: 最大连接数
+        """
+        self._socket_path = str(socket_path)
+        self._idle: list[socket.socket] = []
+        self._slots = asyncio.Semaphore(max(1, max_connections))
+        self._status: dict = {
+            "loaded_models": [], "queue_size": 0, "pending": 0, "batch_stats": {}, "model_stats": {}, "admission": {}
+        }
+        logger.info(f"RemoteModelLoader initialized: socket={socket_path}, max_connections={max_connections}")
+
+    async def load_model(self, model_id: str) -> Any:
+        """
+        在推理服务中加载模型
+
+        Args:
+            model_id: 模型标识符
+
+        Returns:
+            模型标识符（模型实例只存在于推理服务进程）
+        """
+        await self._request({"op": "load", "model_id": model_id})
+        return model_id
+
+    async def unload_model(self, model_id: str):
+        """
+        在推理服务中卸载模型
+
+        Args:
+            model_id: 模型标识符
+        """
+        await self._request({"op": "unload", "model_id": model_id})
+
+    async def warmup(
+        self,
+        model_id: str,
+        input_shape: Optional[tuple] = None,
+        runs: int = 1
+    ) -> dict:
+        """
+        在推理服务中预加载并预热模型（多个 worker 重复调用时推理服务只预热一次）
+
+        Args:
+            model_id: 模型标识符
+            input_shape: 预热输入形状
+            runs: 每个会话执行的推理次数
+
+        Returns:
+            预热统计
+        """
+        header, _ = await self._request({
+            "op": "warmup",
+            "model_id": model_id,
+            "input_shape": list(input_shape) if input_shape is not None else None,
+            "runs": runs,
+        })
+        return header.get("result", {})
+
+    async def get_input_shape(self, model_id: str) -> Optional[tuple]:
+        """
+        推理服务中模型声明的输入形状
+
+        Args:
+            model_id: 模型标识符
+
+        Returns:
+            输入形状（动态维度为 None）
+        """
+        header, _ = await self._request({"op": "input_shape", "model_id": model_id})
+        shape = header.get("result", {}).get("shape")
+        return tuple(shape) if shape is not None else None
+
+    async def infer(
+        self,
+        model_id: str,
+        input_data: Any
+    ) -> Any:
+        """
+        远程推理（在推理服务中排队、合批）
+
+        Args:
+            model_id: 模型标识符
+            input_data: 输入张量（第 0 维为 batch 维）
+
+        Returns:
+            输出数组列表
+
+        Raises:
+            InferenceRejected: 推理服务拒绝，或超过请求截止时间
+        """
+        scope = current_scope()
+        remaining = scope.remaining()
+        header = {"op": "infer", "model_id": model_id, "timeout": remaining, "bounded": scope.bounded}
+        if remaining is None:
+            _, outputs = await self._request(header, [input_data])
+            return outputs
+
+        if remaining <= 0:
+            raise InferenceDeadlineExceeded("请求已超过截止时间", self._retry_after())
+        try:
+            _, outputs = await asyncio.wait_for(self._request(header, [input_data]), timeout=remaining)
+        except asyncio.TimeoutError:
+            raise InferenceDeadlineExceeded("推理超过请求截止时间", self._retry_after())
+        return outputs
+
+    def check_admission(self):
+        """
+        按推理服务最近一次快照提前检查推理请求能否被接受（推理服务收到请求时仍会再次检查）
+
+        Raises:
+            InferenceOverloaded: 等待队列已满
+            InferenceDeadlineExceeded: 请求已超过截止时间
+        """
+        scope: AdmissionScope = current_scope()
+        admission = self._status.get("admission", {})
+        if scope.bounded and admission and admission["waiting"] >= admission["max_waiting"]:
+            raise InferenceOverloaded(f"推理队列已满（{admission['waiting']} 个请求等待中）", self._retry_after())
+        remaining = scope.remaining()
+        if remaining is not None and remaining <= 0:
+            raise InferenceDeadlineExceeded("请求已超过截止时间", self._retry_after())
+
+    async def render_metrics(self) -> str:
+        """
+        推理服务的加载器指标（推理服务不可用时返回空文本，不影响 API 进程的指标导出）
+
+        Returns:
+            Prometheus 文本格式
+        """
+        try:
+            header, _ = await self._request({"op": "metrics"})
+        except (ConnectionError, RemoteInferenceError) as e:
+            logger.warning(f"Failed to fetch inference server metrics: {e}")
+            return ""
+        return header.get("result", {}).get("text", "")
+
+    async def refresh_status(self) -> dict:
+        """
+        从推理服务拉取最新状态
+
+        Returns:
+            状态快照
+        """
+        await self._request({"op": "status"})
+        return self._status
+
+    async def cleanup(self):
+        """关闭所有空闲连接（推理服务中的模型不受影响）"""
+        while self._idle:
+            self._idle.pop().close()
+        logger.info("RemoteModelLoader cleanup completed")
+
+    def get_queue_size(self) -> int:
+        """推理服务的队列大小（最近一次快照）"""
+        return self._status["queue_size"]
+
+    def get_pending_count(self) -> int:
+        """推理服务的在途推理请求数（最近一次快照，包含其他 API 进程的请求）"""
+        return self._status.get("pending", 0)
+
+    def get_admission_stats(self) -> dict:
+        """推理服务的准入控制统计（最近一次快照）"""
+        return dict(self._status.get("admission", {}))
+
+    def get_loaded_models(self) -> list[str]:
+        """推理服务已加载的模型（最近一次快照）"""
+        return list(self._status["loaded_models"])
+
+    def get_model_stats(self) -> dict:
+        """推理服务的模型注册表统计（最近一次快照）"""
+        return dict(self._status.get("model_stats", {}))
+
+    def get_batch_stats(self, model_id: Optional[str] = None) -> dict:
+        """
+        推理服务的批次统计（最近一次快照）
+
+        Args:
+            model_id: 模型标识符，为空时返回所有模型
+
+        Returns:
+            单个模型的统计，或 {model_id: 统计} 字典
+        """
+        stats = self._status["batch_stats"]
+        if model_id is not None:
+            return stats.get(model_id, BatchStats().as_dict())
+        return dict(stats)
+
+    async def _request(self, header: dict, arrays: Optional[list] = None) -> tuple[dict, list]:
+        """发送请求并等待响应"""
+        async with self._connection() as conn:
+            await send_message(conn, header, arrays)
+            response, outputs = await recv_message(conn)
+
+        self._status = response.get("status", self._status)
+        if not response.get("ok"):
+            rejected = response.get("rejected")
+            if rejected is not None:
+                cls = _REJECTIONS.get(rejected.get("kind"), InferenceRejected)
+                raise cls(rejected.get("detail", ""), rejected.get("retry_after", 1))
+            raise RemoteInferenceError(response.get("error", "unknown error"))
+        return response, outputs
+
+    def _retry_after(self) -> int:
+        """建议的重试间隔（最近一次快照，无数据时为 1 秒）"""
+        return self._status.get("admission", {}).get("retry_after", 1)
+
+    @asynccontextmanager
+    async def _connection(self) -> AsyncIterator[socket.socket]:
+        """从连接池取出一个连接，请求正常完成后归还"""
+        async with self._slots:
+            conn = self._idle.pop() if self._idle else await self._connect()
+            try:
+                yield conn
+            except BaseException:
+                conn.close()
+                raise
+            self._idle.append(conn)
+
+    async def _connect(self) -> socket.socket:
+        """建立到推理服务的连接"""
+        loop = asyncio.get_running_loop()
+        conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        conn.setblocking(False)
+        try:
+            await loop.sock_connect(conn, self._socket_path)
+        except OSError as e:
+            conn.close()
+            raise ConnectionError(f"Inference server unavailable at {self._socket_path}: {e}")
+        return conn
@@ -0,0 +1,157 @@
+"""
+推理服务进程
+
+独立进程持有 ONNX 会话（ModelLoader），通过 Unix socket 为多个 uvicorn worker 提供推理，
+模型只在本进程加载一份。来自不同 worker 的并发请求在本进程内由微批调度器合批。
+
+请求头部字段：
+- op：infer / load / unload / warmup / input_shape / metrics / status
+- model_id：模型标识符（status 除外）
+- input_shape / runs：预热参数（仅 warmup）
+- timeout / bounded：准入参数（仅 infer）：剩余时间（秒）、是否受等待队列上限约束
+
+响应头部字段：
+- ok：是否成功；失败时 error 为错误信息，被准入控制拒绝时 rejected 为
+  {"kind": 异常类名, "detail": 说明, "retry_after": 建议重试间隔}
+- result：操作结果（warmup 为预热统计，input_shape 为 {"shape": 输入形状}，
+  metrics 为 {"text": Prometheus 文本格式的加载器指标}）
+- status：加载器状态快照（已加载模型、队列长度、在途请求数、批次统计、模型注册表统计、准入统计），供客户端同步查询
+"""
+import asyncio
+import contextlib
+import logging
+import os
+import socket
+from pathlib import Path
+from typing import Optional
+
+from app.infrastructure.models.admission import InferenceRejected, admission_scope
+from app.infrastructure.models.ipc import ProtocolError, recv_message, send_message
+from app.infrastructure.models.loader import ModelLoader
+
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceServer:
+    """推理服务（Unix socket）"""
+
+    def __init__(self, socket_path: str, model_loader: ModelLoader):
+        """
+        初始化推理服务
+
+        Args:
+            socket_path: Unix socket 路径
+            model_loader: 本进程的模型加载器
+        """
+        self._socket_path = Path(socket_path)
+        self._model_loader = model_loader
+        self._connections: set[asyncio.Task] = set()
+
+    async def serve_forever(self):
+        """监听并处理连接，直到被取消"""
+        self._socket_path.parent.mkdir(parents=True, exist_ok=True)
+        with contextlib.suppress(FileNotFoundError):
+            self._socket_path.unlink()
+
+        server_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server_socket.bind(str(self._socket_path))
+        os.chmod(self._socket_path, 0o660)
+        server_socket.listen(128)
+        server_socket.setblocking(False)
+        logger.info(f"InferenceServer listening on {self._socket_path}")
+
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                conn, _ = await loop.sock_accept(server_socket)
+                conn.setblocking(False)
+                task = asyncio.create_task(self._handle(conn))
+                self._connections.add(task)
+                task.add_done_callback(self._connections.discard)
+        finally:
+            server_socket.close()
+            with contextlib.suppress(FileNotFoundError):
+                self._socket_path.unlink()
+            for task in list(self._connections):
+                task.cancel()
+            if self._connections:
+                await asyncio.gather(*self._connections, return_exceptions=True)
+            logger.info("InferenceServer stopped")
+
+    async def _handle(self, conn: socket.socket):
+        """处理一个客户端连接（连接内请求串行，连接间并发）"""
+        try:
+            while True:
+                try:
+                    header, arrays = await recv_message(conn)
+                except ProtocolError:
+                    return
+
+                try:
+                    with admission_scope(header.get("timeout"), header.get("bounded", True)):
+                        outputs, result = await self._dispatch(header, arrays)
+                    response = {"ok": True}
+                    if result is not None:
+                        response["result"] = result
+                except InferenceRejected as e:
+                    outputs = []
+                    response = {
+                        "ok": False,
+                        "error": f"{type(e).__name__}: {e.detail}",
+                        "rejected": {"kind": type(e).__name__, "detail": e.detail, "retry_after": e.retry_after},
+                    }
+                except Exception as e:
+                    logger.error(f"Inference request failed: op={header.get('op')}, error={e}")
+                    outputs = []
+                    response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+                response["status"] = self._status()
+                await send_message(conn, response, outputs)
+        except (ConnectionError, ProtocolError) as e:
+            logger.warning(f"Inference client disconnected: {e}")
+        finally:
+            conn.close()
+
+    async def _dispatch(self, header: dict, arrays: list) -> tuple[list, Optional[dict]]:
+        """执行请求，返回 (输出数组列表, 操作结果)"""
+        op = header.get("op")
+        model_id = header.get("model_id")
+
+        if op == "infer":
+            if len(arrays) != 1:
+                raise ValueError(f"infer expects 1 input array, got {len(arrays)}")
+            return list(await self._model_loader.infer(model_id, arrays[0])), None
+        if op == "load":
+            await self._model_loader.load_model(model_id)
+            return [], None
+        if op == "unload":
+            await self._model_loader.unload_model(model_id)
+            return [], None
+        if op == "warmup":
+            input_shape = header.get("input_shape")
+            result = await self._model_loader.warmup(
+                model_id,
+                tuple(input_shape) if input_shape is not None else None,
+                header.get("runs", 1)
+            )
+            return [], result
+        if op == "input_shape":
+            shape = await self._model_loader.get_input_shape(model_id)
+            return [], {"shape": list(shape) if shape is not None else None}
+        if op == "metrics":
+            return [], {"text": await self._model_loader.render_metrics()}
+        if op == "status":
+            return [], None
+        raise ValueError(f"Unknown op: {op}")
+
+    def _status(self) -> dict:
+        """加载器状态快照"""
+        return {
+            "loaded_models": self._model_loader.get_loaded_models(),
+            "queue_size": self._model_loader.get_queue_size(),
+            "pending": self._model_loader.get_pending_count(),
+            "batch_stats": self._model_loader.get_batch_stats(),
+            "model_stats": self._model_loader.get_model_stats(),
+            "admission": self._model_loader.get_admission_stats(),
+        }
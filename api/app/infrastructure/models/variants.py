@@ -0,0 +1,94 @@
+"""
+模型变体
+
+同一模型可以注册多个精度变体（如 fp32 原始模型、int8 动态量化模型），
+按变体名解析为 ModelLoader 使用的模型标识符（文件路径）。
+变体文件尚未生成时回退到默认变体，保证请求可用。
+文件存在性检查结果缓存 refresh_seconds 秒，请求路径不逐次访问文件系统。
+"""
+import logging
+import time
+from pathlib import Path
+from typing import Union
+
+from app.core.constants import CUTOUT_VARIANT_REFRESH_SECONDS
+
+
+logger = logging.getLogger(__name__)
+
+
+class ModelVariants:
+    """单个模型的变体表"""
+
+    def __init__(
+        self,
+        variants: dict[str, Union[str, Path]],
+        default: str,
+        refresh_seconds: float = CUTOUT_VARIANT_REFRESH_SECONDS
+    ):
+        """
+        初始化变体表
+
+        Args:
+            variants: {变体名: 模型文件路径}
+            default: 默认变体名（必须存在于 variants 中）
+            refresh_seconds: 文件存在性检查结果的缓存时间（秒）
+        """
+        if default not in variants:
+            raise ValueError(f"Default variant {default!r} not in {list(variants)}")
+
+        self._variants = {name: str(path) for name, path in variants.items()}
+        self._default = default
+        self._refresh_seconds = refresh_seconds
+        self._present: set[str] = set()
+        self._checked_at = float("-inf")
+        self._missing_logged: set[str] = set()
+
+    @property
+    def default(self) -> str:
+        return self._default
+
+    @property
+    def default_id(self) -> str:
+        """默认变体的模型标识符"""
+        return self._variants[self._default]
+
+    def resolve(self, variant: str) -> tuple[str, str]:
+        """
+        解析变体
+
+        Args:
+            variant: 变体名
+
+        Returns:
+            (实际使用的变体名, 模型标识符)；变体未注册或文件不存在时为默认变体
+        """
+        model_id = self._variants.get(variant)
+        if variant == self._default or variant in self._present_variants():
+            return variant, model_id
+
+        if variant not in self._missing_logged:
+            self._missing_logged.add(variant)
+            logger.warning(f"Model variant {variant!r} unavailable ({model_id}), falling back to {self._default!r}")
+        return self._default, self.default_id
+
+    def available(self) -> dict[str, str]:
+        """
+        已生成的变体（默认变体总是包含在内）
+
+        Returns:
+            {变体名: 模型标识符}
+        """
+        present = self._present_variants()
+        return {
+            name: model_id for name, model_id in self._variants.items()
+            if name == self._default or name in present
+        }
+
+    def _present_variants(self) -> set[str]:
+        """文件已存在的变体（缓存过期后重新检查）"""
+        now = time.monotonic()
+        if now - self._checked_at >= self._refresh_seconds:
+            self._present = {name for name, model_id in self._variants.items() if Path(model_id).exists()}
+            self._checked_at = now
+        return self._present
@@ -1,11 +1,21 @@
 """
 基础设施层 - 任务队列
 
-提供统一的任务排队机制，支持多种实现（内存、Redis）。
+提供统一的任务排队机制，支持多种实现（内存、SQLite 持久化）。
 """
 
-from app.infrastructure.queue.interfaces import ITaskQueue, Task, TaskPriority
+from app.infrastructure.queue.factory import create_task_queue
+from app.infrastructure.queue.interfaces import ITaskQueue, QueueFullError, Task, TaskPriority
 from app.infrastructure.queue.memory_queue import MemoryTaskQueue
+from app.infrastructure.queue.sqlite_queue import SQLiteTaskQueue
 
 
-__all__ = ["ITaskQueue", "Task", "TaskPriority", "MemoryTaskQueue"]
+__all__ = [
+    "ITaskQueue",
+    "QueueFullError",
+    "Task",
+    "TaskPriority",
+    "MemoryTaskQueue",
+    "SQLiteTaskQueue",
+    "create_task_queue",
+]
@@ -0,0 +1,40 @@
+"""
+任务队列工厂
+
+根据配置创建任务队列实现：
+- memory：MemoryTaskQueue，进程重启丢失任务
+- sqlite：SQLiteTaskQueue，持久化，至少一次投递
+"""
+from typing import Optional
+
+from app.core.constants import QUEUE_MAX_SIZE
+from app.infrastructure.queue.interfaces import ITaskQueue
+from app.infrastructure.queue.memory_queue import MemoryTaskQueue
+from app.infrastructure.queue.sqlite_queue import SQLiteTaskQueue
+
+
+def create_task_queue(
+    backend: str,
+    database_url: Optional[str] = None,
+    max_size: int = QUEUE_MAX_SIZE
+) -> ITaskQueue:
+    """
+    创建任务队列
+
+    Args:
+        backend: 队列实现（memory / sqlite）
+        database_url: sqlite 队列的数据库 URL
+        max_size: 队列最大长度
+
+    Returns:
+        ITaskQueue
+    """
+    if backend == "memory":
+        return MemoryTaskQueue(max_size=max_size)
+
+    if backend == "sqlite":
+        if not database_url:
+            raise ValueError("database_url is required for sqlite task queue")
+        return SQLiteTaskQueue(database_url, max_size=max_size)
+
+    raise ValueError(f"Unknown task queue backend: {backend}")
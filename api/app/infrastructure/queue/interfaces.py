@@ -9,6 +9,11 @@ from enum import Enum
 from typing import Optional
 
 
+class QueueFullError(Exception):
+    """队列已满（调用方应拒绝请求或稍后重试）"""
+    pass
+
+
 class TaskPriority(Enum):
     """任务优先级"""
     LOW = 0
@@ -39,19 +44,56 @@ class ITaskQueue(ABC):
 
         Returns:
             任务 ID
+
+        Raises:
+            QueueFullError: 队列已满
         """
         pass
 
     @abstractmethod
-    async def dequeue(self) -> Optional[Task]:
+    async def dequeue(self, timeout: Optional[float] = None) -> Optional[Task]:
         """
-        出队
+        出队（队列为空时等待）
+
+        Args:
+            timeout: 最长等待时间（秒），None 表示一直等待
 
         Returns:
-            任务对象，如果队列为空返回 None
+            任务对象，等待超时返回 None
         """
         pass
 
+    async def ack(self, task_id: str):
+        """
+        确认任务已处理完成（至少一次投递的队列实现据此删除任务）
+
+        Args:
+            task_id: 任务 ID
+        """
+        return None
+
+    async def nack(self, task_id: str, delay: float = 0):
+        """
+        放弃任务，延迟后重新投递
+
+        Args:
+            task_id: 任务 ID
+            delay: 重新投递前的延迟（秒）
+        """
+        return None
+
+    async def take_dead_letters(self, limit: int = 100) -> list[Task]:
+        """
+        取出超过最大投递次数、不再投递的任务（取出后从队列删除）
+
+        Args:
+            limit: 单次最多取出的任务数
+
+        Returns:
+            死信任务列表；不限制投递次数的队列实现返回空列表
+        """
+        return []
+
     @abstractmethod
     async def get_queue_size(self) -> int:
         """
@@ -62,7 +104,20 @@ class ITaskQueue(ABC):
         """
         pass
 
+    async def get_stats(self) -> dict:
+        """
+        获取队列统计信息
+
+        Returns:
+            统计信息字典
+        """
+        return {"size": await self.get_queue_size()}
+
     @abstractmethod
     async def clear(self):
         """清空队列"""
         pass
+
+    async def close(self):
+        """释放队列持有的资源"""
+        return None
@@ -12,14 +12,24 @@
 - 进程重启丢失任务
 - 不支持分布式
 - 不支持持久化
+
+调度规则：
+- 二叉堆实现，入队 / 出队均为 O(log n)
+- 排序键为 入队时间 - 优先级 × 老化时间，同一优先级内严格 FIFO
+- 老化：低优先级任务等待超过（优先级差 × 老化时间）后排到新到达的高优先级任务之前
+- 出队在队列为空时挂起等待，入队时唤醒，不轮询
 """
 import asyncio
+import heapq
+import itertools
 import logging
+import time
 import uuid
+from collections import Counter
 from typing import Optional
 
-from app.core.constants import QUEUE_MAX_SIZE
-from app.infrastructure.queue.interfaces import ITaskQueue, Task
+from app.core.constants import QUEUE_MAX_SIZE, QUEUE_PRIORITY_AGING_SECONDS
+from app.infrastructure.queue.interfaces import ITaskQueue, QueueFullError, Task, TaskPriority
 
 
 logger = logging.getLogger(__name__)
@@ -29,19 +39,30 @@ class MemoryTaskQueue(ITaskQueue):
     """
     内存任务队列（单机场景）
 
-    使用 asyncio.Queue 实现，支持优先级排序。
+    使用 heapq + asyncio.Condition 实现，支持优先级排序与老化。
     """
 
-    def __init__(self, max_size: int = QUEUE_MAX_SIZE):
+    def __init__(self, max_size: int = QUEUE_MAX_SIZE, aging_seconds: float = QUEUE_PRIORITY_AGING_SECONDS):
         """
         初始化内存队列
 
         Args:
             max_size: 队列最大长度
+            aging_seconds: 每级优先级对应的老化时间（秒）
         """
-        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        # 堆元素：(排序键, 入队序号, 入队时间, 任务)
+        self._heap: list[tuple[float, int, float, Task]] = []
+        self._counter = itertools.count()
+        self._not_empty = asyncio.Condition()
         self._max_size = max_size
-        logger.info(f"MemoryTaskQueue initialized: max_size={max_size}")
+        self._aging_seconds = aging_seconds
+        self._depths: Counter = Counter()
+        self._enqueued = 0
+        self._dequeued = 0
+        self._aged = 0
+        self._wait_totals: Counter = Counter()
+        self._dequeued_by_priority: Counter = Counter()
+        logger.info(f"MemoryTaskQueue initialized: max_size={max_size}, aging_seconds={aging_seconds}")
 
     async def enqueue(self, task: Task) -> str:
         """
@@ -52,33 +73,65 @@ class MemoryTaskQueue(ITaskQueue):
 
         Returns:
             任务 ID
+
+        Raises:
+            QueueFullError: 队列已满（不阻塞等待，由调用方做背压处理）
         """
         if task.id is None:
             task.id = str(uuid.uuid4())
 
-        await self._queue.put(task)
+        async with self._not_empty:
+            if len(self._heap) >= self._max_size:
+                raise QueueFullError(f"Task queue is full: max_size={self._max_size}")
+
+            now = time.monotonic()
+            sort_key = now - task.priority.value * self._aging_seconds
+            heapq.heappush(self._heap, (sort_key, next(self._counter), now, task))
+            self._depths[task.priority] += 1
+            self._enqueued += 1
+            self._not_empty.notify()
+
         logger.info(
             f"Task enqueued: id={task.id}, type={task.type}, "
-            f"priority={task.priority}, queue_size={self._queue.qsize()}"
+            f"priority={task.priority.name}, queue_size={len(self._heap)}"
         )
         return task.id
 
-    async def dequeue(self) -> Optional[Task]:
+    async def dequeue(self, timeout: Optional[float] = None) -> Optional[Task]:
         """
-        出队
+        出队（队列为空时等待）
+
+        Args:
+            timeout: 最长等待时间（秒），None 表示一直等待
 
         Returns:
-            任务对象，如果队列为空返回 None
+            任务对象，等待超时返回 None
         """
-        try:
-            task = await asyncio.wait_for(
-                self._queue.get(),
-                timeout=1.0  # 避免永久阻塞
-            )
-            logger.info(f"Task dequeued: id={task.id}, type={task.type}")
-            return task
-        except asyncio.TimeoutError:
-            return None
+        async with self._not_empty:
+            if not self._heap:
+                try:
+                    await asyncio.wait_for(self._not_empty.wait_for(lambda: bool(self._heap)), timeout)
+                except asyncio.TimeoutError:
+                    # 超时与唤醒同时发生时把唤醒转交给其他等待者，避免任务滞留
+                    if self._heap:
+                        self._not_empty.notify()
+                    return None
+
+            _, _, enqueued_at, task = heapq.heappop(self._heap)
+            self._depths[task.priority] -= 1
+            if self._heap:
+                self._not_empty.notify()
+
+            # 仍有更高优先级任务在排队，说明本任务是因老化而提前出队
+            if any(self._depths[p] > 0 for p in TaskPriority if p.value > task.priority.value):
+                self._aged += 1
+
+            self._dequeued += 1
+            self._dequeued_by_priority[task.priority] += 1
+            self._wait_totals[task.priority] += time.monotonic() - enqueued_at
+
+        logger.info(f"Task dequeued: id={task.id}, type={task.type}, priority={task.priority.name}")
+        return task
 
     async def get_queue_size(self) -> int:
         """
@@ -87,13 +140,32 @@ class MemoryTaskQueue(ITaskQueue):
         Returns:
             队列中任务数量
         """
-        return self._queue.qsize()
+        return len(self._heap)
+
+    async def get_stats(self) -> dict:
+        """
+        获取队列统计信息
+
+        Returns:
+            队列长度、各优先级排队数量与平均等待时间、老化出队次数
+        """
+        return {
+            "size": len(self._heap),
+            "max_size": self._max_size,
+            "enqueued": self._enqueued,
+            "dequeued": self._dequeued,
+            "aged_dequeues": self._aged,
+            "depths": {p.name.lower(): self._depths[p] for p in TaskPriority},
+            "avg_wait_ms": {
+                p.name.lower(): round(self._wait_totals[p] / self._dequeued_by_priority[p] * 1000, 2)
+                for p in TaskPriority
+                if self._dequeued_by_priority[p]
+            },
+        }
 
     async def clear(self):
         """清空队列"""
-        while not self._queue.empty():
-            try:
-                self._queue.get_nowait()
-            except asyncio.QueueEmpty:
-                break
+        async with self._not_empty:
+            self._heap.clear()
+            self._depths.clear()
         logger.info("MemoryTaskQueue cleared")
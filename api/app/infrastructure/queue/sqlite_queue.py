@@ -0,0 +1,491 @@
+"""
+SQLite 持久化任务队列实现
+
+基于 async SQLAlchemy + aiosqlite，使用独立的 WAL 模式数据库文件，
+进程重启或崩溃后未确认的任务会重新投递（至少一次语义）。
+
+实现要点：
+- 批量写入：并发入队的任务在同一个事务中插入（组提交），
+  入队在事务提交后才返回，保证已返回的任务已落盘
+- 租约：出队时将任务的可见时间推迟 lease_seconds，处理期间由心跳协程续约，
+  处理完成后 ack() 删除；进程崩溃后租约到期，任务重新可见，超过最大投递次数后不再投递
+- 调度：排序键与 MemoryTaskQueue 一致（入队时间 - 优先级 × 老化时间），
+  出队为一条 UPDATE ... RETURNING，按 (sort_key, seq) 索引取第一条可见任务
+- 等待：出队在无可见任务时挂起，由本进程入队或最近一个租约到期唤醒；
+  多进程共用同一数据库时，其他进程的入队最迟在 idle_poll_seconds 后被发现
+"""
+import asyncio
+import contextlib
+import json
+import logging
+import time
+import uuid
+from typing import Optional
+
+from sqlalchemy import (
+    Column,
+    Float,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    delete,
+    func,
+    insert,
+    select,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.core.constants import (
+    QUEUE_MAX_SIZE,
+    QUEUE_PRIORITY_AGING_SECONDS,
+    TASK_QUEUE_IDLE_POLL_SECONDS,
+    TASK_QUEUE_LEASE_SECONDS,
+    TASK_QUEUE_MAX_ATTEMPTS,
+)
+from app.db.sqlite import SQLitePragmas, apply_pragmas
+from app.infrastructure.queue.interfaces import ITaskQueue, QueueFullError, Task, TaskPriority
+
+
+logger = logging.getLogger(__name__)
+
+
+metadata = MetaData()
+
+task_queue_table = Table(
+    "task_queue",
+    metadata,
+    Column("seq", Integer, primary_key=True, autoincrement=True),
+    Column("id", String(64), nullable=False, unique=True),
+    Column("type", String(100), nullable=False),
+    Column("payload", Text, nullable=False),
+    Column("priority", Integer, nullable=False),
+    Column("sort_key", Float, nullable=False),
+    Column("enqueued_at", Float, nullable=False),
+    Column("visible_at", Float, nullable=False),
+    Column("attempts", Integer, nullable=False, default=0),
+    Index("ix_task_queue_sort", "sort_key", "seq"),
+)
+
+
+class SQLiteTaskQueue(ITaskQueue):
+    """
+    SQLite 持久化任务队列
+
+    所有写操作在进程内串行执行，避免多个协程争抢 SQLite 写锁。
+    """
+
+    def __init__(
+        self,
+        database_url: str,
+        max_size: int = QUEUE_MAX_SIZE,
+        aging_seconds: float = QUEUE_PRIORITY_AGING_SECONDS,
+        lease_seconds: float = TASK_QUEUE_LEASE_SECONDS,
+        max_attempts: int = TASK_QUEUE_MAX_ATTEMPTS,
+        idle_poll_seconds: float = TASK_QUEUE_IDLE_POLL_SECONDS
+    ):
+        """
+        初始化持久化队列
+
+        Args:
+            database_url: 队列数据库 URL（sqlite+aiosqlite）
+            max_size: 队列最大长度（含租约中的任务，不含超过投递次数的任务）
+            aging_seconds: 每级优先级对应的老化时间（秒）
+            lease_seconds: 任务租约时间（秒）
+            max_attempts: 最大投递次数
+            idle_poll_seconds: 空闲时检查其他进程入队任务的间隔（秒）
+        """
+        self._database_url = database_url
+        self._max_size = max_size
+        self._aging_seconds = aging_seconds
+        self._lease_seconds = lease_seconds
+        self._max_attempts = max_attempts
+        self._idle_poll_seconds = idle_poll_seconds
+
+        self._engine: Optional[AsyncEngine] = None
+        self._init_lock = asyncio.Lock()
+        self._write_lock = asyncio.Lock()
+        self._available = asyncio.Event()
+
+        # 待写入的 (行数据, Future)，由组提交协程批量插入
+        self._pending: list[tuple[dict, asyncio.Future]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+
+        # 本进程持有租约的任务，由心跳协程续约
+        self._leased: set[str] = set()
+        self._heartbeat_task: Optional[asyncio.Task] = None
+
+        self._enqueued = 0
+        self._dequeued = 0
+        self._redelivered = 0
+        self._batches = 0
+        logger.info(
+            f"SQLiteTaskQueue initialized: url={database_url}, max_size={max_size}, "
+            f"lease={lease_seconds}s, max_attempts={max_attempts}"
+        )
+
+    async def _get_engine(self) -> AsyncEngine:
+        """首次使用时创建引擎并建表"""
+        if self._engine is None:
+            async with self._init_lock:
+                if self._engine is None:
+                    engine = create_async_engine(self._database_url)
+                    apply_pragmas(engine, SQLitePragmas())
+
+                    async with engine.begin() as conn:
+                        await conn.run_sync(metadata.create_all)
+
+                    self._engine = engine
+        return self._engine
+
+    async def enqueue(self, task: Task) -> str:
+        """
+        入队（与同时到达的任务合并为一个事务写入）
+
+        Args:
+            task: 任务对象
+
+        Returns:
+            任务 ID
+
+        Raises:
+            QueueFullError: 队列已满
+        """
+        if task.id is None:
+            task.id = str(uuid.uuid4())
+
+        await self._get_engine()
+
+        now = time.time()
+        row = {
+            "id": task.id,
+            "type": task.type,
+            "payload": json.dumps(task.payload, ensure_ascii=False),
+            "priority": task.priority.value,
+            "sort_key": now - task.priority.value * self._aging_seconds,
+            "enqueued_at": now,
+            "visible_at": 0.0,
+            "attempts": 0,
+        }
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((row, future))
+
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush())
+
+        await future
+        logger.info(f"Task enqueued: id={task.id}, type={task.type}, priority={task.priority.name}")
+        return task.id
+
+    async def _flush(self):
+        """组提交：循环写入积压的入队请求，直到没有新请求"""
+        engine = await self._get_engine()
+
+        while self._pending:
+            batch, self._pending = self._pending, []
+            accepted = []
+
+            try:
+                async with self._write_lock, engine.begin() as conn:
+                    size = (
+                        await conn.execute(
+                            select(func.count())
+                            .select_from(task_queue_table)
+                            .where(task_queue_table.c.attempts < self._max_attempts)
+                        )
+                    ).scalar_one()
+                    free = max(0, self._max_size - size)
+                    accepted, rejected = batch[:free], batch[free:]
+                    if accepted:
+                        await conn.execute(insert(task_queue_table), [row for row, _ in accepted])
+            except Exception as e:
+                logger.error(f"Task queue insert failed: batch={len(batch)}, error={e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self._batches += 1
+            self._enqueued += len(accepted)
+            for _, future in accepted:
+                if not future.done():
+                    future.set_result(None)
+            for _, future in rejected:
+                if not future.done():
+                    future.set_exception(QueueFullError(f"Task queue is full: max_size={self._max_size}"))
+
+            if accepted:
+                self._available.set()
+
+    async def dequeue(self, timeout: Optional[float] = None) -> Optional[Task]:
+        """
+        出队（租约方式，处理完成后需调用 ack）
+
+        Args:
+            timeout: 最长等待时间（秒），None 表示一直等待
+
+        Returns:
+            任务对象，等待超时返回 None
+        """
+        engine = await self._get_engine()
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+
+        while True:
+            self._available.clear()
+            row, next_visible = await self._claim(engine)
+            if row is not None:
+                break
+
+            # 等待本进程入队、最近一个租约到期、空闲检查间隔或超时
+            wait = self._idle_poll_seconds
+            if next_visible is not None:
+                wait = min(wait, max(0.0, next_visible - time.time()))
+            if deadline is not None:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return None
+                wait = min(wait, remaining)
+
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._available.wait(), wait)
+
+        task = Task(
+            id=row.id,
+            type=row.type,
+            payload=json.loads(row.payload),
+            priority=TaskPriority(row.priority)
+        )
+        self._dequeued += 1
+        self._leased.add(task.id)
+        if self._heartbeat_task is None or self._heartbeat_task.done():
+            self._heartbeat_task = asyncio.create_task(self._heartbeat())
+
+        if row.attempts > 1:
+            self._redelivered += 1
+            logger.warning(f"Task redelivered: id={task.id}, attempt={row.attempts}")
+
+        logger.info(f"Task dequeued: id={task.id}, type={task.type}, priority={task.priority.name}")
+        return task
+
+    async def _claim(self, engine: AsyncEngine) -> tuple:
+        """
+        领取一条可见任务
+
+        Returns:
+            (任务行, None)；无可见任务时返回 (None, 最近一个租约的到期时间)
+        """
+        t = task_queue_table
+        now = time.time()
+        candidate = (
+            select(t.c.seq)
+            .where(t.c.visible_at <= now, t.c.attempts < self._max_attempts)
+            .order_by(t.c.sort_key, t.c.seq)
+            .limit(1)
+            .scalar_subquery()
+        )
+
+        async with self._write_lock, engine.begin() as conn:
+            result = await conn.execute(
+                update(t)
+                .where(t.c.seq == candidate)
+                .values(visible_at=now + self._lease_seconds, attempts=t.c.attempts + 1)
+                .returning(t.c.id, t.c.type, t.c.payload, t.c.priority, t.c.attempts)
+            )
+            row = result.first()
+            if row is not None:
+                return row, None
+
+            next_visible = (
+                await conn.execute(
+                    select(func.min(t.c.visible_at))
+                    .where(t.c.visible_at > now, t.c.attempts < self._max_attempts)
+                )
+            ).scalar_one()
+            return None, next_visible
+
+    async def _heartbeat(self):
+        """为本进程持有的租约续约，直到没有租约"""
+        interval = self._lease_seconds / 3
+        while self._leased:
+            await asyncio.sleep(interval)
+            leased = list(self._leased)
+            if not leased:
+                break
+            try:
+                async with self._write_lock, self._engine.begin() as conn:
+                    await conn.execute(
+                        update(task_queue_table)
+                        .where(task_queue_table.c.id.in_(leased))
+                        .values(visible_at=time.time() + self._lease_seconds)
+                    )
+            except Exception as e:
+                logger.error(f"Task lease renewal failed: tasks={len(leased)}, error={e}")
+
+    async def ack(self, task_id: str):
+        """
+        确认任务完成并删除
+
+        Args:
+            task_id: 任务 ID
+        """
+        self._leased.discard(task_id)
+        engine = await self._get_engine()
+        async with self._write_lock, engine.begin() as conn:
+            await conn.execute(delete(task_queue_table).where(task_queue_table.c.id == task_id))
+
+    async def nack(self, task_id: str, delay: float = 0):
+        """
+        放弃租约，延迟后重新投递
+
+        Args:
+            task_id: 任务 ID
+            delay: 重新投递前的延迟（秒）
+        """
+        self._leased.discard(task_id)
+        engine = await self._get_engine()
+        async with self._write_lock, engine.begin() as conn:
+            await conn.execute(
+                update(task_queue_table)
+                .where(task_queue_table.c.id == task_id)
+                .values(visible_at=time.time() + delay)
+            )
+        self._available.set()
+
+    async def take_dead_letters(self, limit: int = 100) -> list[Task]:
+        """
+        取出超过最大投递次数且租约已到期的任务（取出后删除）
+
+        最后一次投递仍在处理（租约未到期）的任务不会被取出。
+
+        Args:
+            limit: 单次最多取出的任务数
+
+        Returns:
+            死信任务列表
+        """
+        engine = await self._get_engine()
+        t = task_queue_table
+        candidates = (
+            select(t.c.seq)
+            .where(t.c.attempts >= self._max_attempts, t.c.visible_at <= time.time())
+            .order_by(t.c.seq)
+            .limit(limit)
+        )
+        async with self._write_lock, engine.begin() as conn:
+            rows = (
+                await conn.execute(
+                    delete(t)
+                    .where(t.c.seq.in_(candidates))
+                    .returning(t.c.id, t.c.type, t.c.payload, t.c.priority, t.c.attempts)
+                )
+            ).all()
+
+        for row in rows:
+            logger.warning(f"Task dead-lettered: id={row.id}, type={row.type}, attempts={row.attempts}")
+        return [
+            Task(
+                id=row.id,
+                type=row.type,
+                payload=json.loads(row.payload),
+                priority=TaskPriority(row.priority)
+            )
+            for row in rows
+        ]
+
+    async def get_queue_size(self) -> int:
+        """
+        获取队列大小
+
+        Returns:
+            等待投递的任务数量（不含租约中和超过投递次数的任务）
+        """
+        engine = await self._get_engine()
+        t = task_queue_table
+        async with engine.connect() as conn:
+            result = await conn.execute(
+                select(func.count())
+                .select_from(t)
+                .where(t.c.visible_at <= time.time(), t.c.attempts < self._max_attempts)
+            )
+            return result.scalar_one()
+
+    async def get_stats(self) -> dict:
+        """
+        获取队列统计信息
+
+        Returns:
+            各优先级等待数量、租约中与死信任务数量、批量写入统计
+        """
+        engine = await self._get_engine()
+        t = task_queue_table
+        now = time.time()
+        async with engine.connect() as conn:
+            rows = (
+                await conn.execute(
+                    select(t.c.priority, func.count())
+                    .where(t.c.visible_at <= now, t.c.attempts < self._max_attempts)
+                    .group_by(t.c.priority)
+                )
+            ).all()
+            leased = (
+                await conn.execute(select(func.count()).select_from(t).where(t.c.visible_at > now))
+            ).scalar_one()
+            dead = (
+                await conn.execute(
+                    select(func.count()).select_from(t).where(t.c.attempts >= self._max_attempts)
+                )
+            ).scalar_one()
+
+        depths = {p.name.lower(): 0 for p in TaskPriority}
+        for priority, count in rows:
+            depths[TaskPriority(priority).name.lower()] = count
+
+        return {
+            "size": sum(depths.values()),
+            "max_size": self._max_size,
+            "enqueued": self._enqueued,
+            "dequeued": self._dequeued,
+            "redelivered": self._redelivered,
+            "leased": leased,
+            "dead": dead,
+            "insert_batches": self._batches,
+            "avg_insert_batch": round(self._enqueued / self._batches, 2) if self._batches else 0.0,
+            "depths": depths,
+        }
+
+    async def clear(self):
+        """清空队列"""
+        engine = await self._get_engine()
+        async with self._write_lock, engine.begin() as conn:
+            await conn.execute(delete(task_queue_table))
+        logger.info("SQLiteTaskQueue cleared")
+
+    async def close(self):
+        """写入积压的入队请求，交还未确认的租约（立即可被其他进程领取），然后关闭引擎"""
+        if self._flush_task is not None and not self._flush_task.done():
+            await self._flush_task
+
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._heartbeat_task
+            self._heartbeat_task = None
+
+        if self._leased and self._engine is not None:
+            # 正常关闭中断的任务不计入投递次数
+            async with self._write_lock, self._engine.begin() as conn:
+                await conn.execute(
+                    update(task_queue_table)
+                    .where(task_queue_table.c.id.in_(list(self._leased)))
+                    .values(visible_at=0.0, attempts=task_queue_table.c.attempts - 1)
+                )
+            logger.info(f"Released {len(self._leased)} leased tasks on shutdown")
+            self._leased.clear()
+
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = None
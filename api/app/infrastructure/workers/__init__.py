@@ -0,0 +1,11 @@
+"""
+基础设施层 - 工作线程池
+
+为图像解码、预处理、后处理、编码等 CPU 密集型阶段提供专用线程池，
+并发限制与模型推理信号量相互独立。
+"""
+
+from app.infrastructure.workers.pool import WorkerPool
+
+
+__all__ = ["WorkerPool"]
@@ -0,0 +1,108 @@
+"""
+工作线程池实现
+
+Pillow 的解码/缩放/编码与 NumPy 运算大部分会释放 GIL，
+放到线程池执行后事件循环只负责 I/O，单个大图不会阻塞其他请求（包括 /health）。
+"""
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from app.core.constants import IMAGE_WORKER_MAX_PENDING, IMAGE_WORKER_THREADS
+from app.infrastructure.metrics import MetricsRegistry
+
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerPool:
+    """
+    CPU 密集型任务线程池
+
+    - 线程数固定，避免与推理线程争抢 CPU
+    - 信号量限制已提交（运行中 + 排队中）的任务数，超出时在事件循环侧等待
+    """
+
+    def __init__(
+        self,
+        max_workers: int = IMAGE_WORKER_THREADS,
+        max_pending: int = IMAGE_WORKER_MAX_PENDING,
+        name: str = "image-worker"
+    ):
+        """
+        初始化线程池
+
+        Args:
+            max_workers: 线程数
+            max_pending: 最大已提交任务数
+            name: 线程名前缀
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._semaphore = asyncio.Semaphore(max(max_workers, max_pending))
+        self._max_workers = max_workers
+        self._max_pending = max_pending
+        self._running = 0
+        self.metrics = self._create_metrics(name)
+        logger.info(f"WorkerPool initialized: name={name}, max_workers={max_workers}, max_pending={max_pending}")
+
+    def _create_metrics(self, name: str) -> MetricsRegistry:
+        """
+        创建线程池占用指标（导出时读取当前值）
+
+        Args:
+            name: 线程池名（标签 pool）
+
+        Returns:
+            指标注册表
+        """
+        metrics = MetricsRegistry()
+        labels = (name,)
+        metrics.gauge("worker_pool_threads", "线程数", ("pool",), collect=lambda: {labels: self._max_workers})
+        metrics.gauge(
+            "worker_pool_busy_threads", "正在执行任务的线程数", ("pool",),
+            collect=lambda: {labels: min(self._running, self._max_workers)}
+        )
+        metrics.gauge(
+            "worker_pool_queued_tasks", "等待线程的任务数（含等待提交的任务）", ("pool",),
+            collect=lambda: {
+                labels: max(0, self._running - self._max_workers) + len(self._semaphore._waiters or ())
+            }
+        )
+        return metrics
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        在线程池中执行函数
+
+        Args:
+            fn: 同步函数
+            *args: 位置参数
+            **kwargs: 关键字参数
+
+        Returns:
+            函数返回值
+        """
+        async with self._semaphore:
+            self._running += 1
+            try:
+                loop = asyncio.get_event_loop()
+                return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+            finally:
+                self._running -= 1
+
+    def get_pending_count(self) -> int:
+        """
+        获取已提交（运行中 + 排队中）的任务数
+
+        Returns:
+            任务数
+        """
+        return self._running
+
+    async def shutdown(self):
+        """关闭线程池（等待已提交任务完成）"""
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, functools.partial(self._executor.shutdown, wait=True))
+        logger.info("WorkerPool shutdown completed")
@@ -1,22 +1,47 @@
 """
 FastAPI 主应用入口
 """
+import asyncio
+import contextlib
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
 from app.api.v1.api import api_router
 from app.core.config import settings
+from app.core.constants import MODEL_WARMUP_RETRY_INTERVAL
 from app.core.logging import setup_logging
 from app.db.init_db import init_db
+from app.infrastructure.metrics import CONTENT_TYPE, REGISTRY, MetricsMiddleware
 
 
 # 配置日志
 logger = setup_logging()
 
 
+async def warmup_models(app: FastAPI):
+    """
+    预加载并预热模型（后台任务），完成后标记就绪
+
+    失败时（模型文件缺失、推理服务尚未启动等）记录错误并定期重试，期间 /ready 保持 503。
+    """
+    readiness = app.state.readiness
+    while True:
+        try:
+            readiness["models"]["cutout"] = await app.state.cutout_service.warmup(settings.MODEL_WARMUP_RUNS)
+            break
+        except Exception as e:
+            readiness["error"] = f"{type(e).__name__}: {e}"
+            logger.error(f"Model warmup failed, retrying in {MODEL_WARMUP_RETRY_INTERVAL}s: {e}")
+            await asyncio.sleep(MODEL_WARMUP_RETRY_INTERVAL)
+
+    readiness["ready"] = True
+    readiness["error"] = None
+    logger.info("Model warmup completed, service is ready")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
@@ -26,6 +51,7 @@ async def lifespan(app: FastAPI):
     - 数据库初始化
     - 模型加载器初始化
     - 业务服务初始化
+    - 模型预加载与预热（后台执行，完成前 /ready 返回 503）
     - 优雅关闭资源
     """
     # ============================================
@@ -43,23 +69,75 @@ async def lifespan(app: FastAPI):
 
     # 初始化基础设施
     try:
-        from app.infrastructure.models import ModelLoader
-        from app.modules.cutout.service import CutoutService
+        from app.db.session import AsyncSessionLocal, ReadSessionLocal
+        from app.infrastructure.models import ModelLoader, RemoteModelLoader
+        from app.infrastructure.queue import create_task_queue
+        from app.infrastructure.workers import WorkerPool
+        from app.modules.cutout.jobs import CutoutJobManager
+        from app.modules.cutout.service import CutoutService, create_result_cache
+        from app.modules.tools.ingest import UsageIngestBuffer
+        from app.modules.tools.retention import UsageRetention
 
         # 创建模型加载器（全局单例）
-        model_loader = ModelLoader()
+        # remote 模式下模型只在独立的推理服务进程中加载一份，API 可以多 worker 部署
+        if settings.INFERENCE_MODE == "remote":
+            model_loader = RemoteModelLoader(settings.INFERENCE_SOCKET_PATH)
+        else:
+            model_loader = ModelLoader()
         app.state.model_loader = model_loader
-        logger.info("ModelLoader initialized")
+        logger.info(f"Model loader initialized: mode={settings.INFERENCE_MODE}")
+
+        # 创建图像处理线程池（解码/编码等 CPU 密集型阶段，不占用事件循环）
+        image_workers = WorkerPool()
+        app.state.image_workers = image_workers
+        logger.info("WorkerPool initialized")
 
         # 初始化抠图服务并存储到 app.state
-        cutout_service = CutoutService(model_loader=model_loader)
+        cutout_service = CutoutService(
+            model_loader=model_loader,
+            worker_pool=image_workers,
+            result_cache=create_result_cache()
+        )
         app.state.cutout_service = cutout_service
         logger.info("CutoutService initialized")
 
+        # 启动抠图异步任务消费者
+        task_queue = create_task_queue(settings.TASK_QUEUE_BACKEND, settings.TASK_QUEUE_DATABASE_URL)
+        app.state.task_queue = task_queue
+        cutout_jobs = CutoutJobManager(service=cutout_service, queue=task_queue)
+        await cutout_jobs.start()
+        app.state.cutout_jobs = cutout_jobs
+        logger.info("CutoutJobManager initialized")
+
+        # 工具使用记录写缓冲（接口只入缓冲，后台批量写入）
+        usage_ingest = UsageIngestBuffer(session_factory=AsyncSessionLocal)
+        await usage_ingest.start()
+        app.state.usage_ingest = usage_ingest
+        logger.info("UsageIngestBuffer initialized")
+
+        # 过期使用记录归档（移入 USAGE_ARCHIVE_DIR 的压缩文件并从业务库删除）
+        app.state.usage_retention = None
+        if settings.USAGE_RETENTION_DAYS > 0:
+            usage_retention = UsageRetention(
+                session_factory=AsyncSessionLocal,
+                read_session_factory=ReadSessionLocal,
+                archive_dir=settings.USAGE_ARCHIVE_DIR,
+                retention_days=settings.USAGE_RETENTION_DAYS
+            )
+            await usage_retention.start()
+            app.state.usage_retention = usage_retention
+            logger.info("UsageRetention initialized")
+
     except Exception as e:
         logger.error(f"Failed to initialize services: {e}")
         raise
 
+    # 预加载并预热模型（不阻塞启动：/health 立即可用，/ready 在预热完成后才返回 200）
+    app.state.readiness = {"ready": not settings.MODEL_PRELOAD, "error": None, "models": {}}
+    app.state.warmup_task = None
+    if settings.MODEL_PRELOAD:
+        app.state.warmup_task = asyncio.create_task(warmup_models(app))
+
     logger.info("All services initialized successfully")
 
     yield
@@ -69,6 +147,27 @@ async def lifespan(app: FastAPI):
     # ============================================
     logger.info("Shutting down Center API...")
 
+    if app.state.warmup_task is not None:
+        app.state.warmup_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await app.state.warmup_task
+
+    if app.state.usage_retention is not None:
+        await app.state.usage_retention.stop()
+
+    # 写入缓冲中剩余的工具使用记录
+    try:
+        await app.state.usage_ingest.stop()
+    except Exception as e:
+        logger.error(f"Failed to flush usage records: {e}")
+
+    # 停止异步任务消费者（先于模型清理，避免处理中的任务访问已释放的会话）
+    try:
+        await app.state.cutout_jobs.stop()
+        await app.state.task_queue.close()
+    except Exception as e:
+        logger.error(f"Failed to stop cutout jobs: {e}")
+
     # 清理模型资源
     try:
         model_loader = app.state.model_loader
@@ -77,6 +176,17 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Failed to cleanup model loader: {e}")
 
+    # 关闭图像处理线程池
+    try:
+        await app.state.image_workers.shutdown()
+        logger.info("Image workers shut down")
+    except Exception as e:
+        logger.error(f"Failed to shutdown image workers: {e}")
+
+    # 关闭数据库连接（SQLite WAL 下最后一个连接关闭时执行检查点）
+    from app.db.session import dispose_engines
+    await dispose_engines()
+
     logger.info("Shutdown completed")
 
 
@@ -99,6 +209,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 请求指标（最外层，耗时包含其他中间件）
+app.add_middleware(MetricsMiddleware)
+
 
 # 全局异常处理
 @app.exception_handler(Exception)
@@ -126,6 +239,44 @@ async def health_check():
     }
 
 
+# 就绪检查
+@app.get("/ready", tags=["系统"])
+async def readiness_check(request: Request):
+    """就绪检查接口（模型预热完成前返回 503，供容器健康检查 / 负载均衡摘除流量）"""
+    readiness = getattr(request.app.state, "readiness", None)
+    if readiness is None:
+        return JSONResponse(status_code=503, content={"status": "starting"})
+
+    return JSONResponse(
+        status_code=200 if readiness["ready"] else 503,
+        content={
+            "status": "ready" if readiness["ready"] else "warming_up",
+            "models": readiness["models"],
+            "error": readiness["error"],
+        }
+    )
+
+
+# 监控指标
+@app.get("/metrics", tags=["系统"], include_in_schema=False)
+async def metrics(request: Request):
+    """
+    Prometheus 指标（HTTP 请求、抠图流水线各阶段耗时、推理排队 / 执行、线程池占用）
+
+    指标按进程统计：多 worker 部署时每次抓取只返回一个 worker 的数据；
+    remote 模式下推理相关指标由推理服务进程提供，对所有 worker 一致。
+    """
+    parts = [REGISTRY.render()]
+    for component in ("image_workers", "usage_ingest"):
+        instance = getattr(request.app.state, component, None)
+        if instance is not None:
+            parts.append(instance.metrics.render())
+    model_loader = getattr(request.app.state, "model_loader", None)
+    if model_loader is not None:
+        parts.append(await model_loader.render_metrics())
+    return Response(content="".join(parts), media_type=CONTENT_TYPE)
+
+
 # 根路径
 @app.get("/", tags=["系统"])
 async def root():
@@ -151,5 +302,5 @@ if __name__ == "__main__":
         host=settings.HOST,
         port=settings.PORT,
         reload=settings.LOG_LEVEL == "DEBUG",
-        workers=1  # 单进程，避免重复加载模型
+        workers=settings.WORKERS if settings.INFERENCE_MODE == "remote" else 1  # local 模式单进程，避免重复加载模型
     )
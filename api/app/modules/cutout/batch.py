@@ -0,0 +1,163 @@
+"""
+批量抠图
+
+一次请求上传多个文件，结果按完成顺序写入流式 ZIP 响应：
+1. 最多 CUTOUT_BATCH_CONCURRENCY 个文件同时进入 CutoutService.segment，
+   推理请求由模型加载器的微批调度器合批，推理槽保持忙碌
+2. 每完成一个文件立即写出对应的 ZIP 条目（ZIP_STORED，输出格式本身已压缩），
+   响应体不在内存中整体缓冲
+3. 单个文件失败（上传检查未通过、解码或推理出错）不影响其他文件，
+   错误记录在最后写出的 manifest.json 中
+4. 客户端断开时生成器被关闭，取消尚未完成的文件并释放暂存文件
+5. 并发数由 concurrency 控制，推理请求不受推理等待队列上限约束（不会因 429 丢失单个文件）
+"""
+import asyncio
+import json
+import logging
+import time
+import zipfile
+from collections.abc import AsyncIterator
+from pathlib import PurePosixPath, PureWindowsPath
+from typing import Optional, Union
+
+from app.core.constants import CUTOUT_BATCH_CONCURRENCY
+from app.infrastructure.models import admission_scope
+from app.modules.cutout.encoders import EncodedImage, EncodeOptions, OutputFormat
+from app.modules.cutout.inference import InferenceOptions
+from app.modules.cutout.service import CutoutService
+from app.modules.cutout.upload import SpooledUpload, UploadFailure
+
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+
+
+class _ZipChunks:
+    """只写、不可 seek 的输出流：zipfile 写入的数据暂存在这里，由生成器取出发送"""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def result_name(index: int, filename: str, options: EncodeOptions, extension: str) -> str:
+    """
+    ZIP 条目名：序号 + 原文件名（去除目录部分）+ 结果后缀
+
+    Args:
+        index: 文件在请求中的序号（从 0 开始）
+        filename: 原始文件名
+        options: 编码选项
+        extension: 输出扩展名
+
+    Returns:
+        条目名
+    """
+    basename = PureWindowsPath(PurePosixPath(filename).name).name or "image"
+    suffix = "mask" if options.format == OutputFormat.MASK else "no_bg"
+    return f"{index:04d}_{basename}_{suffix}.{extension}"
+
+
+async def stream_batch_zip(
+    service: CutoutService,
+    items: list[Union[SpooledUpload, UploadFailure]],
+    options: EncodeOptions,
+    inference: Optional[InferenceOptions] = None,
+    concurrency: int = CUTOUT_BATCH_CONCURRENCY
+) -> AsyncIterator[bytes]:
+    """
+    处理批量上传的文件，按完成顺序生成 ZIP 数据块
+
+    生成器结束或被关闭时关闭所有 SpooledUpload。
+
+    Args:
+        service: 抠图服务
+        items: receive_image_uploads() 的结果
+        options: 输出编码选项
+        inference: 推理选项
+        concurrency: 同时处理的文件数
+
+    Yields:
+        ZIP 数据块
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    manifest: list[dict] = []
+    tasks: dict[asyncio.Task, tuple[int, SpooledUpload]] = {}
+
+    async def process(upload: SpooledUpload) -> tuple[EncodedImage, float]:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                with admission_scope(bounded=False):
+                    encoded = await service.segment(upload.file, options, digest=upload.digest, inference=inference)
+            finally:
+                upload.close()
+            return encoded, (time.perf_counter() - start) * 1000
+
+    for index, item in enumerate(items):
+        if isinstance(item, UploadFailure):
+            manifest.append({
+                "index": index,
+                "filename": item.filename,
+                "status": "error",
+                "status_code": item.status_code,
+                "error": item.detail,
+            })
+        else:
+            tasks[asyncio.create_task(process(item))] = (index, item)
+
+    output = _ZipChunks()
+    archive = zipfile.ZipFile(output, mode="w", compression=zipfile.ZIP_STORED)
+    succeeded = 0
+    try:
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                index, upload = tasks[task]
+                entry = {"index": index, "filename": upload.filename}
+                try:
+                    encoded, elapsed_ms = task.result()
+                except Exception as e:
+                    logger.warning(f"Batch item failed: index={index}, filename={upload.filename}, error={e}")
+                    entry.update(status="error", status_code=500, error=f"处理失败: {e}")
+                else:
+                    name = result_name(index, upload.filename, options, encoded.extension)
+                    archive.writestr(zipfile.ZipInfo(name, time.localtime()[:6]), encoded.content)
+                    entry.update(status="ok", output=name, bytes=len(encoded.content),
+                                 cached=encoded.cached, elapsed_ms=round(elapsed_ms, 1))
+                    succeeded += 1
+                manifest.append(entry)
+
+                data = output.take()
+                if data:
+                    yield data
+
+        manifest.sort(key=lambda entry: entry["index"])
+        archive.writestr(
+            zipfile.ZipInfo(MANIFEST_NAME, time.localtime()[:6]),
+            json.dumps({"total": len(items), "succeeded": succeeded, "items": manifest}, ensure_ascii=False, indent=2)
+        )
+        archive.close()
+        yield output.take()
+
+        logger.info(f"Batch cutout completed: total={len(items)}, succeeded={succeeded}")
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for item in items:
+            if isinstance(item, SpooledUpload):
+                item.close()
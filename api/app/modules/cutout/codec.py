@@ -0,0 +1,33 @@
+"""
+抠图图像解码
+
+同步函数，由 CutoutService 提交到工作线程池执行，不在事件循环中调用。
+编码见 encoders.py。
+"""
+import io
+from typing import BinaryIO, Union
+
+from PIL import Image
+
+
+def decode_image(source: Union[bytes, BinaryIO]) -> Image.Image:
+    """
+    解码上传的图像为 RGB
+
+    Args:
+        source: 图像文件内容，或可 seek 的文件对象（如上传暂存文件）
+
+    Returns:
+        已完成解码的 RGB 图像
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    else:
+        source.seek(0)
+
+    image = Image.open(source)
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    image.load()
+    return image
+
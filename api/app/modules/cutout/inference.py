@@ -0,0 +1,107 @@
+"""
+抠图推理选项
+
+- 质量档位：quality 使用原始精度模型，fast 使用低精度变体（见 CUTOUT_TIER_VARIANTS），
+  变体文件不存在时回退到原始精度
+- 高分辨率模式：大图在粗分割后对边缘分块精修（见 refine.py）
+- 自适应分辨率：按原图尺寸、质量档位与推理负载从分辨率阶梯中选取模型输入边长
+  （见 CUTOUT_RESOLUTION_LADDER）。小图不再放大到 1024 推理；过载时降档而不是排队超时
+"""
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+from typing import Optional
+
+from app.core.constants import CUTOUT_TIER_VARIANTS
+
+
+class QualityTier(str, Enum):
+    """质量 / 速度档位"""
+    QUALITY = "quality"
+    FAST = "fast"
+
+    @property
+    def variant(self) -> str:
+        """档位对应的模型变体名"""
+        return CUTOUT_TIER_VARIANTS[self.value]
+
+    @property
+    def resolution_step(self) -> int:
+        """档位相对原图尺寸所需分辨率的降档数"""
+        return 1 if self == QualityTier.FAST else 0
+
+
+@dataclass(frozen=True)
+class InferenceOptions:
+    """推理选项"""
+    tier: QualityTier = QualityTier.QUALITY
+    hires: bool = False
+
+
+def resolution_model_path(model_id: str, size: int) -> str:
+    """
+    按尺寸导出的模型路径（model.onnx -> model.512.onnx，model.int8.onnx -> model.int8.512.onnx）
+
+    Args:
+        model_id: 模型文件路径
+        size: 模型输入边长
+
+    Returns:
+        模型文件路径
+    """
+    path = Path(model_id)
+    return str(path.with_name(f"{path.stem}.{size}{path.suffix}"))
+
+
+def model_resolutions(
+    model_id: str,
+    input_shape: Optional[tuple],
+    ladder: tuple,
+    default_size: int
+) -> dict[int, str]:
+    """
+    模型支持的推理分辨率
+
+    Args:
+        model_id: 模型文件路径
+        input_shape: 模型声明的输入形状（动态维度为 None；为空表示未知）
+        ladder: 分辨率阶梯
+        default_size: 形状未知时使用的边长
+
+    Returns:
+        {模型输入边长: 模型标识符}
+    """
+    if input_shape is not None and len(input_shape) == 4 and input_shape[2] is None and input_shape[3] is None:
+        return {size: model_id for size in ladder}
+
+    fixed = input_shape[-1] if input_shape is not None and isinstance(input_shape[-1], int) else default_size
+    resolutions = {fixed: model_id}
+    for size in ladder:
+        path = resolution_model_path(model_id, size)
+        if size != fixed and Path(path).exists():
+            resolutions[size] = path
+    return resolutions
+
+
+def select_resolution(
+    available: list[int],
+    source_size: tuple[int, int],
+    tier: QualityTier = QualityTier.QUALITY,
+    load_steps: int = 0
+) -> int:
+    """
+    选择推理分辨率
+
+    Args:
+        available: 可用的模型输入边长
+        source_size: 原图尺寸 (width, height)
+        tier: 质量档位
+        load_steps: 负载降档数
+
+    Returns:
+        模型输入边长
+    """
+    sizes = sorted(available)
+    long_edge = max(source_size)
+    index = next((i for i, size in enumerate(sizes) if size >= long_edge), len(sizes) - 1)
+    return sizes[max(0, index - tier.resolution_step - load_steps)]
@@ -0,0 +1,522 @@
+"""
+抠图异步任务
+
+大图或高峰期的同步请求容易超过网关超时，异步任务接口先返回任务 ID，
+由队列消费协程在后台处理，客户端轮询状态并下载结果。
+
+- 上传内容、结果与任务元数据（JSON）暂存到 CUTOUT_JOB_SPOOL_DIR，队列中只保存可序列化的任务参数；
+  使用持久化队列时，重启后或其他 worker 进程也能查询任务状态并继续处理
+- 队列已满时 submit() 抛出 QueueFullError，由路由层返回 429，
+  Retry-After 按排队任务数、消费协程数与实测的单个任务处理耗时估算（见 retry_after()）
+- 任务在队列中等待或处理超过 TASK_TIMEOUT 即判定失败；超过最大投递次数的任务
+  （如反复导致进程崩溃或内存不足）由清理协程判定失败，同样按结果保留时间删除暂存文件
+- 结果在完成 CUTOUT_JOB_RESULT_TTL 秒后过期删除
+"""
+import asyncio
+import contextlib
+import json
+import logging
+import math
+import os
+import shutil
+import time
+import uuid
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+from typing import BinaryIO, Optional, Union
+
+from app.core.constants import (
+    CUTOUT_JOB_RESULT_TTL,
+    CUTOUT_JOB_RETRY_AFTER,
+    CUTOUT_JOB_SPOOL_DIR,
+    CUTOUT_JOB_WORKERS,
+    TASK_TIMEOUT,
+)
+from app.infrastructure.models import admission_scope
+from app.infrastructure.queue import ITaskQueue, Task, TaskPriority
+from app.modules.cutout.encoders import EncodedImage, EncodeOptions, OutputFormat
+from app.modules.cutout.inference import InferenceOptions, QualityTier
+from app.modules.cutout.service import CutoutService
+
+
+logger = logging.getLogger(__name__)
+
+JOB_TASK_TYPE = "cutout.segment"
+
+
+class JobStatus(str, Enum):
+    """任务状态"""
+    QUEUED = "queued"
+    PROCESSING = "processing"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+@dataclass
+class CutoutJob:
+    """抠图任务"""
+    id: str
+    filename: str
+    options: EncodeOptions
+    inference: InferenceOptions = field(default_factory=InferenceOptions)
+    status: JobStatus = JobStatus.QUEUED
+    created_at: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    media_type: Optional[str] = None
+    extension: Optional[str] = None
+    result_size: int = 0
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JobStatus.SUCCEEDED, JobStatus.FAILED)
+
+
+class CutoutJobManager:
+    """
+    抠图任务管理器
+
+    持有任务元数据，启动固定数量的队列消费协程，并定期清理过期结果。
+    """
+
+    def __init__(
+        self,
+        service: CutoutService,
+        queue: ITaskQueue,
+        workers: int = CUTOUT_JOB_WORKERS,
+        task_timeout: float = TASK_TIMEOUT,
+        result_ttl: float = CUTOUT_JOB_RESULT_TTL,
+        spool_dir: Path = CUTOUT_JOB_SPOOL_DIR
+    ):
+        """
+        初始化任务管理器
+
+        Args:
+            service: 抠图服务
+            queue: 任务队列
+            workers: 消费协程数量
+            task_timeout: 任务超时时间（秒，从提交开始计算）
+            result_ttl: 结果保留时间（秒）
+            spool_dir: 上传内容与结果的暂存目录
+        """
+        self._service = service
+        self._queue = queue
+        self._worker_count = max(1, workers)
+        self._task_timeout = task_timeout
+        self._result_ttl = result_ttl
+        self._spool_dir = Path(spool_dir)
+        self._jobs: dict[str, CutoutJob] = {}
+        self._active: set[str] = set()
+        self._service_time: Optional[float] = None  # 单个任务处理耗时（秒，指数移动平均）
+        self._tasks: list[asyncio.Task] = []
+
+    async def start(self):
+        """启动消费协程和过期清理协程"""
+        if self._tasks:
+            return
+
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, self._prepare_spool_dir)
+
+        for i in range(self._worker_count):
+            self._tasks.append(asyncio.create_task(self._worker_loop(i)))
+        self._tasks.append(asyncio.create_task(self._sweep_loop()))
+
+        logger.info(
+            f"CutoutJobManager started: workers={self._worker_count}, "
+            f"timeout={self._task_timeout}s, result_ttl={self._result_ttl}s"
+        )
+
+    async def stop(self):
+        """停止所有协程（处理中的任务被取消）"""
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self._tasks.clear()
+        logger.info("CutoutJobManager stopped")
+
+    async def submit(
+        self,
+        contents: Union[bytes, BinaryIO],
+        filename: str,
+        options: EncodeOptions,
+        priority: TaskPriority = TaskPriority.NORMAL,
+        inference: Optional[InferenceOptions] = None
+    ) -> CutoutJob:
+        """
+        提交任务
+
+        Args:
+            contents: 上传的图像文件内容，或上传暂存文件对象
+            filename: 原始文件名
+            options: 输出编码选项
+            priority: 任务优先级
+            inference: 推理选项（质量档位、高分辨率模式）
+
+        Returns:
+            CutoutJob
+
+        Raises:
+            QueueFullError: 队列已满
+        """
+        job = CutoutJob(
+            id=uuid.uuid4().hex,
+            filename=filename,
+            options=options,
+            inference=inference or InferenceOptions(),
+            created_at=time.time()
+        )
+        input_path = self._input_path(job.id)
+
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, self._write_input, input_path, contents)
+
+        task = Task(
+            id=job.id,
+            type=JOB_TASK_TYPE,
+            payload={
+                "filename": filename,
+                "created_at": job.created_at,
+                "format": options.format.value,
+                "png_compress_level": options.png_compress_level,
+                "webp_quality": options.webp_quality,
+                "tier": job.inference.tier.value,
+                "hires": job.inference.hires,
+            },
+            priority=priority
+        )
+
+        self._jobs[job.id] = job
+        try:
+            await self._save(job)
+            await self._queue.enqueue(task)
+        except Exception:
+            self._jobs.pop(job.id, None)
+            await loop.run_in_executor(None, self._unlink, [input_path, self._meta_path(job.id)])
+            raise
+
+        return job
+
+    async def get(self, job_id: str) -> Optional[CutoutJob]:
+        """
+        查询任务（本进程没有时从暂存目录读取元数据）
+
+        Args:
+            job_id: 任务 ID
+
+        Returns:
+            CutoutJob；不存在或已过期返回 None
+        """
+        job = self._jobs.get(job_id)
+        if job is None and job_id.isalnum():
+            loop = asyncio.get_event_loop()
+            job = await loop.run_in_executor(None, self._load, job_id)
+        return job
+
+    async def read_result(self, job: CutoutJob) -> Optional[EncodedImage]:
+        """
+        读取已完成任务的结果
+
+        Args:
+            job: 状态为 succeeded 的任务
+
+        Returns:
+            EncodedImage；结果文件已被清理时返回 None
+        """
+        loop = asyncio.get_event_loop()
+        try:
+            content = await loop.run_in_executor(None, self._result_path(job.id).read_bytes)
+        except FileNotFoundError:
+            return None
+        return EncodedImage(
+            content=content,
+            media_type=job.media_type,
+            extension=job.extension,
+            encode_ms=0.0
+        )
+
+    async def retry_after(self) -> int:
+        """
+        队列已满时建议的重试间隔（秒）
+
+        按当前排队任务数与消费协程数估算排空队列所需时间，至少 1 秒；
+        尚无处理耗时数据时为 CUTOUT_JOB_RETRY_AFTER。
+        """
+        if self._service_time is None:
+            return CUTOUT_JOB_RETRY_AFTER
+        size = await self._queue.get_queue_size()
+        return max(1, math.ceil(math.ceil(size / self._worker_count) * self._service_time))
+
+    async def get_stats(self) -> dict:
+        """任务统计"""
+        counts = {status.value: 0 for status in JobStatus}
+        for job in self._jobs.values():
+            counts[job.status.value] += 1
+        return {
+            "queue": await self._queue.get_stats(),
+            "workers": self._worker_count,
+            "jobs": counts,
+        }
+
+    async def _worker_loop(self, worker_id: int):
+        """队列消费协程"""
+        while True:
+            task = await self._queue.dequeue()
+            if task is None:
+                continue
+            if task.type != JOB_TASK_TYPE:
+                logger.warning(f"Worker {worker_id} skipped unknown task type: {task.type}")
+                await self._queue.ack(task.id)
+                continue
+
+            self._active.add(task.id)
+            try:
+                await self._process(task)
+            except asyncio.CancelledError:
+                # 关闭时不确认，持久化队列会在租约交还后重新投递
+                raise
+            except Exception as e:
+                logger.error(f"Worker {worker_id} failed to process job {task.id}: {e}", exc_info=True)
+            finally:
+                self._active.discard(task.id)
+
+            await self._queue.ack(task.id)
+
+    async def _process(self, task: Task):
+        """处理单个任务"""
+        job = await self._job_for_task(task)
+        if job.finished:
+            return
+
+        remaining = job.created_at + self._task_timeout - time.time()
+        if remaining <= 0:
+            await self._finish(job, error=f"任务在队列中等待超过 {self._task_timeout:.0f} 秒")
+            return
+
+        job.status = JobStatus.PROCESSING
+        job.started_at = time.time()
+        await self._save(job)
+        loop = asyncio.get_event_loop()
+
+        try:
+            contents = await loop.run_in_executor(None, self._input_path(job.id).read_bytes)
+            # 并发数由任务队列控制，不受推理等待队列上限约束；超时由 wait_for 处理
+            with admission_scope(bounded=False):
+                encoded = await asyncio.wait_for(
+                    self._service.segment(contents, job.options, inference=job.inference),
+                    timeout=remaining
+                )
+            await loop.run_in_executor(None, self._result_path(job.id).write_bytes, encoded.content)
+        except asyncio.TimeoutError:
+            await self._finish(job, error=f"任务处理超过 {self._task_timeout:.0f} 秒")
+            return
+        except FileNotFoundError:
+            await self._finish(job, error="任务输入已丢失")
+            return
+        except Exception as e:
+            logger.error(f"Cutout job {job.id} failed: {e}")
+            await self._finish(job, error=f"处理失败: {e}")
+            return
+
+        job.media_type = encoded.media_type
+        job.extension = encoded.extension
+        job.result_size = len(encoded.content)
+        await self._finish(job)
+
+    async def _finish(self, job: CutoutJob, error: Optional[str] = None):
+        """结束任务并删除输入文件"""
+        job.status = JobStatus.FAILED if error else JobStatus.SUCCEEDED
+        job.error = error
+        job.finished_at = time.time()
+
+        await self._save(job)
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, self._unlink, [self._input_path(job.id)])
+
+        if job.started_at is not None:
+            self._record_service_time(job.finished_at - job.started_at)
+
+        duration = job.finished_at - job.created_at
+        logger.info(f"Cutout job finished: id={job.id}, status={job.status.value}, duration={duration:.2f}s")
+
+    def _record_service_time(self, seconds: float, smoothing: float = 0.2):
+        """记录一个任务的处理耗时"""
+        if self._service_time is None:
+            self._service_time = seconds
+        else:
+            self._service_time += smoothing * (seconds - self._service_time)
+
+    async def _job_for_task(self, task: Task) -> CutoutJob:
+        """获取队列任务对应的任务元数据"""
+        job = self._jobs.get(task.id)
+        if job is None:
+            # 任务由持久化队列重新投递（重启或来自其他进程），优先读取暂存的元数据
+            loop = asyncio.get_event_loop()
+            job = await loop.run_in_executor(None, self._load, task.id) or self._restore_job(task)
+            self._jobs[job.id] = job
+        return job
+
+    async def _sweep_loop(self):
+        """定期结束死信 / 超时任务并删除过期的任务结果"""
+        interval = max(1.0, min(60.0, self._result_ttl / 2))
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self._sweep()
+            except Exception as e:
+                logger.error(f"Cutout job sweep failed: {e}", exc_info=True)
+
+    async def _sweep(self):
+        """结束死信任务和超时未完成的任务，删除过期任务"""
+        for task in await self._queue.take_dead_letters():
+            if task.type != JOB_TASK_TYPE:
+                continue
+            job = await self._job_for_task(task)
+            if not job.finished:
+                await self._finish(job, error="任务多次处理均未完成，可能导致了进程崩溃或内存不足")
+
+        # 超过截止时间仍未结束、且不在本进程处理中的任务直接判定失败，之后按结果保留时间删除；
+        # 队列再次投递时因任务已结束而直接确认
+        now = time.time()
+        stale = [
+            job for job_id, job in self._jobs.items()
+            if not job.finished and job_id not in self._active and job.created_at + self._task_timeout <= now
+        ]
+        for job in stale:
+            await self._finish(job, error=f"任务在 {self._task_timeout:.0f} 秒内未完成")
+
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished and job.finished_at + self._result_ttl <= now
+        ]
+        if not expired:
+            return
+
+        paths = []
+        for job_id in expired:
+            del self._jobs[job_id]
+            paths.extend([self._input_path(job_id), self._result_path(job_id), self._meta_path(job_id)])
+
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, self._unlink, paths)
+        logger.info(f"Expired {len(expired)} cutout jobs")
+
+    @staticmethod
+    def _restore_job(task: Task) -> CutoutJob:
+        """根据队列中的任务参数重建任务元数据"""
+        payload = task.payload
+        return CutoutJob(
+            id=task.id,
+            filename=payload.get("filename", task.id),
+            options=EncodeOptions(
+                format=OutputFormat(payload["format"]),
+                png_compress_level=payload["png_compress_level"],
+                webp_quality=payload["webp_quality"]
+            ),
+            inference=CutoutJobManager._restore_inference(payload),
+            created_at=payload.get("created_at", time.time())
+        )
+
+    @staticmethod
+    def _restore_inference(data: dict) -> InferenceOptions:
+        """从任务参数 / 元数据中恢复推理选项（兼容旧版本写入的数据）"""
+        return InferenceOptions(
+            tier=QualityTier(data.get("tier", QualityTier.QUALITY.value)),
+            hires=data.get("hires", False)
+        )
+
+    async def _save(self, job: CutoutJob):
+        """写入任务元数据"""
+        data = {
+            "id": job.id,
+            "filename": job.filename,
+            "format": job.options.format.value,
+            "png_compress_level": job.options.png_compress_level,
+            "webp_quality": job.options.webp_quality,
+            "tier": job.inference.tier.value,
+            "hires": job.inference.hires,
+            "status": job.status.value,
+            "created_at": job.created_at,
+            "started_at": job.started_at,
+            "finished_at": job.finished_at,
+            "error": job.error,
+            "media_type": job.media_type,
+            "extension": job.extension,
+            "result_size": job.result_size,
+        }
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, self._write_json, self._meta_path(job.id), data)
+
+    def _load(self, job_id: str) -> Optional[CutoutJob]:
+        """读取任务元数据（线程池中执行）"""
+        try:
+            with open(self._meta_path(job_id), encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        return CutoutJob(
+            id=data["id"],
+            filename=data["filename"],
+            options=EncodeOptions(
+                format=OutputFormat(data["format"]),
+                png_compress_level=data["png_compress_level"],
+                webp_quality=data["webp_quality"]
+            ),
+            inference=self._restore_inference(data),
+            status=JobStatus(data["status"]),
+            created_at=data["created_at"],
+            started_at=data["started_at"],
+            finished_at=data["finished_at"],
+            error=data["error"],
+            media_type=data["media_type"],
+            extension=data["extension"],
+            result_size=data["result_size"]
+        )
+
+    @staticmethod
+    def _write_input(path: Path, contents: Union[bytes, BinaryIO]):
+        """写入任务输入（线程池中执行）"""
+        if isinstance(contents, (bytes, bytearray)):
+            path.write_bytes(contents)
+            return
+        contents.seek(0)
+        with open(path, "wb") as f:
+            shutil.copyfileobj(contents, f)
+
+    @staticmethod
+    def _write_json(path: Path, data: dict):
+        """原子写入 JSON（线程池中执行）"""
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _prepare_spool_dir(self):
+        """创建暂存目录并清理上次运行遗留的过期文件（线程池中执行）"""
+        self._spool_dir.mkdir(parents=True, exist_ok=True)
+        cutoff = time.time() - self._task_timeout - self._result_ttl
+        stale = [path for path in self._spool_dir.iterdir() if path.stat().st_mtime < cutoff]
+        self._unlink(stale)
+
+    def _input_path(self, job_id: str) -> Path:
+        return self._spool_dir / f"{job_id}.input"
+
+    def _result_path(self, job_id: str) -> Path:
+        return self._spool_dir / f"{job_id}.result"
+
+    def _meta_path(self, job_id: str) -> Path:
+        return self._spool_dir / f"{job_id}.json"
+
+    @staticmethod
+    def _unlink(paths: list[Path]):
+        for path in paths:
+            try:
+                path.unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"Failed to delete job file: {path}, error={e}")
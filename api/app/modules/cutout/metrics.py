@@ -0,0 +1,26 @@
+"""
+抠图流水线指标
+
+按阶段记录耗时（cutout_stage_seconds{stage=...}），每次执行一个阶段记录一次：
+- upload：流式接收单个上传文件（同步接口与异步任务提交）
+- decode：解码
+- preprocess：缩放与归一化（高分辨率模式下每个分块各记录一次）
+- inference：模型加载器的推理调用（含排队，排队与执行的拆分见 inference_queue_wait_seconds /
+  inference_run_seconds）
+- postprocess：预测 -> 蒙版、RGBA 合成
+- encode：编码
+"""
+from app.core.constants import METRICS_LATENCY_BUCKETS
+from app.infrastructure.metrics import REGISTRY
+
+
+CUTOUT_STAGE_SECONDS = REGISTRY.histogram(
+    "cutout_stage_seconds", "抠图流水线各阶段耗时", ("stage",), buckets=METRICS_LATENCY_BUCKETS
+)
+
+UPLOAD_SECONDS = CUTOUT_STAGE_SECONDS.labels("upload")
+DECODE_SECONDS = CUTOUT_STAGE_SECONDS.labels("decode")
+PREPROCESS_SECONDS = CUTOUT_STAGE_SECONDS.labels("preprocess")
+INFERENCE_SECONDS = CUTOUT_STAGE_SECONDS.labels("inference")
+POSTPROCESS_SECONDS = CUTOUT_STAGE_SECONDS.labels("postprocess")
+ENCODE_SECONDS = CUTOUT_STAGE_SECONDS.labels("encode")
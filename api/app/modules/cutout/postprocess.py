@@ -0,0 +1,103 @@
+"""
+抠图后处理
+
+模型输出 -> 原图尺寸蒙版 -> RGBA 输出图像。
+
+相比 float64 归一化 + LANCZOS 放大 + 拷贝合成：
+1. 归一化：在模型输出（float32）上原地减最小值、乘缩放系数，只在转换为 uint8 时分配一份
+   模型分辨率的蒙版
+2. 放大：滤波器可配置（默认 bilinear，蒙版本身是平滑的概率图，LANCZOS 的锐化收益很小）
+3. 合成：convert("RGBA") 生成输出图像，putalpha() 将蒙版写入其 alpha 通道；
+   调用方在编码前释放解码图像与蒙版，编码期间只保留输出图像
+
+同步函数，由 CutoutService 提交到工作线程池执行。
+"""
+from typing import Optional
+
+import numpy as np
+from PIL import Image
+
+from app.core.constants import CUTOUT_MASK_RESIZE_FILTER
+from app.modules.cutout.preprocess import RESIZE_FILTERS
+
+
+def normalize_prediction(pred: np.ndarray) -> np.ndarray:
+    """
+    模型输出 -> uint8 蒙版（最小 / 最大值拉伸到 0-255）
+
+    float32 输出会被原地修改，调用方之后不应再使用 pred。
+
+    Args:
+        pred: 模型输出（[1, 1, H, W] / [1, H, W] / [H, W]）
+
+    Returns:
+        [H, W] uint8 数组
+    """
+    while pred.ndim > 2:
+        pred = pred[0]
+    if pred.dtype != np.float32 or not pred.flags.writeable:
+        pred = pred.astype(np.float32)
+
+    mi = pred.min()
+    ma = pred.max()
+    if ma - mi <= 0:
+        return np.zeros(pred.shape, dtype=np.uint8)
+
+    np.subtract(pred, mi, out=pred)
+    np.multiply(pred, np.float32(255) / (ma - mi), out=pred)
+    return pred.astype(np.uint8)
+
+
+def prediction_to_mask(
+    pred: np.ndarray,
+    size: tuple[int, int],
+    resize_filter: Optional[str] = None
+) -> Image.Image:
+    """
+    模型输出 -> 原图尺寸的 L 模式蒙版
+
+    Args:
+        pred: 模型输出（会被原地修改）
+        size: 原图尺寸 (width, height)
+        resize_filter: 放大滤波器名称（默认 CUTOUT_MASK_RESIZE_FILTER）
+
+    Returns:
+        L 模式蒙版
+    """
+    return resize_mask(Image.fromarray(normalize_prediction(pred)), size, resize_filter)
+
+
+def resize_mask(mask: Image.Image, size: tuple[int, int], resize_filter: Optional[str] = None) -> Image.Image:
+    """
+    按配置的滤波器缩放蒙版
+
+    Args:
+        mask: L 模式蒙版
+        size: 目标尺寸 (width, height)
+        resize_filter: 滤波器名称（默认 CUTOUT_MASK_RESIZE_FILTER）
+
+    Returns:
+        L 模式蒙版
+    """
+    if mask.size == tuple(size):
+        return mask
+    return mask.resize(size, RESIZE_FILTERS[resize_filter or CUTOUT_MASK_RESIZE_FILTER])
+
+
+def compose_rgba(image: Image.Image, mask: Image.Image) -> Image.Image:
+    """
+    合成带透明通道的输出图像
+
+    convert("RGBA") 生成输出图像（输入已是 RGBA 时复制一份，不修改调用方的图像），
+    再由 putalpha() 将蒙版写入 alpha 通道。
+
+    Args:
+        image: RGB 图像
+        mask: 同尺寸 L 模式蒙版
+
+    Returns:
+        RGBA 图像
+    """
+    output = image.convert("RGBA") if image.mode != "RGBA" else image.copy()
+    output.putalpha(mask)
+    return output
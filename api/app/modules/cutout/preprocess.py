@@ -0,0 +1,157 @@
+"""
+抠图预处理
+
+将输入图像转换为模型输入张量（NCHW float32，像素值 pixel / 255 - 0.5）。
+
+相比逐步 divide / subtract / transpose / expand_dims（每步一份完整副本），
+这里直接写入预分配的 NCHW 缓冲区：
+1. 缩放：可配置滤波器，大图先 reduce() 整数倍缩小
+2. 归一化：uint8 -> float32 转换、偏移与 HWC -> CHW 转置在同一次 ufunc 中写入缓冲区，
+   随后原地缩放，全程不产生整幅临时数组
+3. 缓冲区按工作线程复用，归还后供同一线程的下一次预处理使用
+"""
+import threading
+import weakref
+from typing import Optional
+
+import numpy as np
+from PIL import Image
+
+from app.core.constants import CUTOUT_RESIZE_FILTER, CUTOUT_RESIZE_REDUCING_GAP
+
+
+RESIZE_FILTERS = {
+    "nearest": Image.NEAREST,
+    "box": Image.BOX,
+    "bilinear": Image.BILINEAR,
+    "hamming": Image.HAMMING,
+    "bicubic": Image.BICUBIC,
+    "lanczos": Image.LANCZOS,
+}
+
+# pixel / 255 - 0.5 == (pixel - 127.5) * (1 / 255)
+_PIXEL_OFFSET = np.float32(127.5)
+_PIXEL_SCALE = np.float32(1 / 255)
+
+
+class TensorBufferPool:
+    """
+    按线程复用的张量缓冲区池
+
+    每个线程维护自己的空闲列表，缓冲区归还时回到分配它的线程的列表，
+    无论归还发生在哪个线程。
+    """
+
+    def __init__(self, max_per_thread: int = 2):
+        """
+        初始化缓冲区池
+
+        Args:
+            max_per_thread: 每个线程最多缓存的空闲缓冲区数量
+        """
+        self._max_per_thread = max_per_thread
+        self._local = threading.local()
+        self._owners: dict[int, list] = {}
+
+    def acquire(self, shape: tuple) -> np.ndarray:
+        """
+        获取一个 float32 缓冲区（内容未初始化）
+
+        Args:
+            shape: 缓冲区形状
+
+        Returns:
+            np.ndarray
+        """
+        free = self._free_list()
+        for i, buffer in enumerate(free):
+            if buffer.shape == shape:
+                return free.pop(i)
+
+        buffer = np.empty(shape, dtype=np.float32)
+        self._owners[id(buffer)] = free
+        weakref.finalize(buffer, self._owners.pop, id(buffer), None)
+        return buffer
+
+    def release(self, buffer: np.ndarray):
+        """
+        归还缓冲区
+
+        Args:
+            buffer: acquire() 获得的缓冲区
+        """
+        free = self._owners.get(id(buffer))
+        if free is None or len(free) >= self._max_per_thread:
+            return
+        # 重复归还同一缓冲区时只保留一份，避免之后被两个调用方同时获取
+        if not any(item is buffer for item in free):
+            free.append(buffer)
+
+    def _free_list(self) -> list:
+        """当前线程的空闲列表"""
+        free = getattr(self._local, "free", None)
+        if free is None:
+            free = self._local.free = []
+        return free
+
+
+class ImagePreprocessor:
+    """图像预处理器"""
+
+    def __init__(
+        self,
+        resize_filter: str = CUTOUT_RESIZE_FILTER,
+        reducing_gap: Optional[float] = CUTOUT_RESIZE_REDUCING_GAP,
+        buffer_pool: Optional[TensorBufferPool] = None
+    ):
+        """
+        初始化预处理器
+
+        Args:
+            resize_filter: 缩放滤波器名称（见 RESIZE_FILTERS）
+            reducing_gap: 大图先整数倍缩小的阈值（None 表示关闭）
+            buffer_pool: 张量缓冲区池
+        """
+        if resize_filter not in RESIZE_FILTERS:
+            raise ValueError(f"Unknown resize filter: {resize_filter}")
+
+        self._resample = RESIZE_FILTERS[resize_filter]
+        self._reducing_gap = reducing_gap
+        self._buffer_pool = buffer_pool or TensorBufferPool()
+
+    def to_tensor(self, img: Image.Image, target_size: int) -> np.ndarray:
+        """
+        图像 -> [1, 3, target_size, target_size] 张量
+
+        返回的张量来自缓冲区池，使用完毕后应调用 release() 归还。
+
+        Args:
+            img: 输入图像
+            target_size: 模型输入边长
+
+        Returns:
+            np.ndarray: NCHW float32 张量
+        """
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        if img.size != (target_size, target_size):
+            img = img.resize(
+                (target_size, target_size),
+                self._resample,
+                reducing_gap=self._reducing_gap
+            )
+
+        pixels = np.asarray(img)
+        tensor = self._buffer_pool.acquire((1, 3, target_size, target_size))
+        np.subtract(pixels.transpose(2, 0, 1), _PIXEL_OFFSET, out=tensor[0], dtype=np.float32)
+        np.multiply(tensor, _PIXEL_SCALE, out=tensor)
+        return tensor
+
+    def release(self, tensor: np.ndarray):
+        """
+        归还 to_tensor() 返回的张量
+
+        Args:
+            tensor: 输入张量
+        """
+        self._buffer_pool.release(tensor)
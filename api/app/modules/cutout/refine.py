@@ -0,0 +1,216 @@
+"""
+抠图高分辨率精修
+
+粗分割（整图缩放到模型输入尺寸）只能给出 CUTOUT_DEFAULT_SIZE 分辨率的蒙版，
+大图直接放大后边缘模糊。高分辨率模式：
+1. 由粗分割结果找出主体边缘带（前景 / 背景交界以及不确定区域）
+2. 将图像缩放到工作分辨率（长边不超过 CUTOUT_MAX_SIZE），按重叠网格切块，
+   只保留与边缘带相交的分块送入模型（主体内部与纯背景分块跳过）
+3. 分块结果按羽化权重拼接，在边缘带内替换粗分割结果，带外保持粗分割结果
+
+同步函数，由 CutoutService 提交到工作线程池执行。
+"""
+import math
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+from PIL import Image, ImageFilter
+
+from app.modules.cutout.postprocess import resize_mask
+
+
+Box = tuple[int, int, int, int]  # (left, top, right, bottom)
+
+
+@dataclass
+class RefinePlan:
+    """精修计划"""
+    working_size: tuple[int, int]
+    tiles: list[Box]  # 需要精修的分块（工作分辨率坐标）
+    grid_size: int  # 完整网格的分块数（未跳过时的推理次数）
+    edge_weight: np.ndarray  # 工作分辨率上的边缘带权重（0-1，带内使用精修结果）
+
+
+def prediction_to_prob(pred: np.ndarray, value_range: Optional[tuple[float, float]] = None) -> tuple[np.ndarray, tuple[float, float]]:
+    """
+    模型输出 -> 归一化到 0-1 的二维概率图
+
+    Args:
+        pred: 模型输出（[1, 1, H, W] / [1, H, W] / [H, W]）
+        value_range: 归一化区间；为空时使用本次输出的最小 / 最大值
+            （分块沿用粗分割的区间，避免各块独立拉伸）
+
+    Returns:
+        (float32 概率图, 归一化区间)
+    """
+    while pred.ndim > 2:
+        pred = pred[0]
+
+    if value_range is None:
+        value_range = (float(np.min(pred)), float(np.max(pred)))
+
+    mi, ma = value_range
+    if ma - mi <= 0:
+        return np.zeros(pred.shape, dtype=np.float32), value_range
+
+    prob = (pred.astype(np.float32) - np.float32(mi)) / np.float32(ma - mi)
+    np.clip(prob, 0.0, 1.0, out=prob)
+    return prob, value_range
+
+
+def resize_prob(prob: np.ndarray, size: tuple[int, int]) -> np.ndarray:
+    """
+    双线性缩放概率图
+
+    Args:
+        prob: float32 概率图
+        size: 目标尺寸 (width, height)
+
+    Returns:
+        float32 概率图
+    """
+    if prob.shape[::-1] == tuple(size):
+        return prob
+    return np.asarray(Image.fromarray(prob).resize(size, Image.BILINEAR))
+
+
+def working_size(size: tuple[int, int], max_size: int) -> tuple[int, int]:
+    """
+    工作分辨率：按比例缩小到长边不超过 max_size（不放大）
+
+    Args:
+        size: 原图尺寸 (width, height)
+        max_size: 长边上限
+
+    Returns:
+        (width, height)
+    """
+    width, height = size
+    scale = min(1.0, max_size / max(width, height))
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def tile_positions(length: int, tile: int, overlap: int) -> list[int]:
+    """
+    一维分块起点：最少的分块数覆盖全长，相邻分块至少重叠 overlap，起点均匀分布
+
+    Args:
+        length: 总长度
+        tile: 分块长度
+        overlap: 最小重叠
+
+    Returns:
+        起点列表
+    """
+    if length <= tile:
+        return [0]
+    count = math.ceil((length - overlap) / (tile - overlap))
+    return [round(i * (length - tile) / (count - 1)) for i in range(count)]
+
+
+def edge_band(prob: np.ndarray, radius: int) -> np.ndarray:
+    """
+    边缘带权重：前景 / 背景交界 radius 范围内以及不确定区域为 1，向外羽化到 0
+
+    Args:
+        prob: 粗分割概率图
+        radius: 边缘带半径（像素）
+
+    Returns:
+        float32 权重图（与 prob 同尺寸）
+    """
+    binary = Image.fromarray(np.where(prob >= 0.5, 255, 0).astype(np.uint8))
+    blurred = np.asarray(binary.filter(ImageFilter.BoxBlur(radius)))
+
+    # 邻域内同时存在前景与背景 -> 交界；概率居中 -> 半透明区域（发丝等）
+    band = ((blurred > 0) & (blurred < 255)) | ((prob > 0.05) & (prob < 0.95))
+
+    feather = Image.fromarray(band.astype(np.uint8) * 255).filter(ImageFilter.BoxBlur(max(1, radius // 2)))
+    weight = np.asarray(feather, dtype=np.float32) * np.float32(2 / 255)
+    return np.minimum(weight, 1.0, out=weight)
+
+
+def plan_refinement(
+    prob: np.ndarray,
+    image_size: tuple[int, int],
+    max_size: int,
+    tile_size: int,
+    overlap: int,
+    edge_radius: int
+) -> RefinePlan:
+    """
+    根据粗分割结果规划需要精修的分块
+
+    Args:
+        prob: 粗分割概率图（模型输出分辨率）
+        image_size: 原图尺寸 (width, height)
+        max_size: 工作分辨率长边上限
+        tile_size: 分块边长
+        overlap: 相邻分块最小重叠
+        edge_radius: 边缘带半径（粗分割像素）
+
+    Returns:
+        RefinePlan
+    """
+    size = working_size(image_size, max_size)
+    weight = resize_prob(edge_band(prob, edge_radius), size)
+
+    width, height = size
+    grid = [
+        (left, top, min(left + tile_size, width), min(top + tile_size, height))
+        for top in tile_positions(height, tile_size, overlap)
+        for left in tile_positions(width, tile_size, overlap)
+    ]
+    tiles = [box for box in grid if weight[box[1]:box[3], box[0]:box[2]].any()]
+
+    return RefinePlan(working_size=size, tiles=tiles, grid_size=len(grid), edge_weight=weight)
+
+
+def _feather_window(width: int, height: int, ramp: int) -> np.ndarray:
+    """分块拼接权重：边缘 ramp 像素内线性衰减（保持为正，单块覆盖处不受影响）"""
+    def ramp_1d(n: int) -> np.ndarray:
+        x = np.arange(n, dtype=np.float32)
+        return np.minimum(1.0, np.minimum(x + 1, n - x) / max(1, ramp))
+
+    return np.outer(ramp_1d(height), ramp_1d(width))
+
+
+def compose_mask(
+    coarse: np.ndarray,
+    plan: RefinePlan,
+    tile_probs: list[np.ndarray],
+    image_size: tuple[int, int],
+    overlap: int
+) -> Image.Image:
+    """
+    拼接分块结果，与粗分割融合为原图尺寸的蒙版
+
+    Args:
+        coarse: 粗分割概率图（模型输出分辨率）
+        plan: 精修计划
+        tile_probs: 各分块概率图（与 plan.tiles 一一对应，尺寸等于分块尺寸）
+        image_size: 原图尺寸 (width, height)
+        overlap: 相邻分块最小重叠（羽化宽度）
+
+    Returns:
+        L 模式蒙版
+    """
+    result = resize_prob(coarse, plan.working_size).copy()
+
+    if plan.tiles:
+        width, height = plan.working_size
+        refined = np.zeros((height, width), dtype=np.float32)
+        weights = np.zeros((height, width), dtype=np.float32)
+        for (left, top, right, bottom), tile_prob in zip(plan.tiles, tile_probs):
+            window = _feather_window(right - left, bottom - top, overlap)
+            refined[top:bottom, left:right] += tile_prob * window
+            weights[top:bottom, left:right] += window
+
+        covered = weights > 0
+        refined[covered] /= weights[covered]
+        alpha = np.where(covered, plan.edge_weight, 0.0).astype(np.float32)
+        result += alpha * (refined - result)
+
+    mask = Image.fromarray(np.clip(result * 255, 0, 255).astype(np.uint8))
+    return resize_mask(mask, image_size)
@@ -3,20 +3,44 @@
 
 提供图像分割 RESTful 接口。
 """
-import io
+import asyncio
 import logging
 import urllib.parse
+from collections.abc import Awaitable
+from typing import Literal, Optional, TypeVar
 
-from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile
-from fastapi.responses import StreamingResponse
-from PIL import Image
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
 
-from app.core.constants import MAX_UPLOAD_SIZE
+from app.core.constants import (
+    CUTOUT_PNG_COMPRESS_LEVEL,
+    CUTOUT_WEBP_QUALITY,
+    INFERENCE_MAX_REQUEST_TIMEOUT,
+    INFERENCE_REQUEST_TIMEOUT,
+)
+from app.infrastructure.models import InferenceRejected, admission_scope
+from app.infrastructure.queue import QueueFullError, TaskPriority
+from app.modules.cutout.batch import stream_batch_zip
+from app.modules.cutout.encoders import EncodedImage, EncodeOptions, OutputFormat, negotiate_format
+from app.modules.cutout.inference import InferenceOptions, QualityTier
+from app.modules.cutout.jobs import CutoutJob, CutoutJobManager, JobStatus
+from app.modules.cutout.metrics import UPLOAD_SECONDS
+from app.modules.cutout.schemas import CutoutJobResponse
 from app.modules.cutout.service import CutoutService
+from app.modules.cutout.upload import (
+    BATCH_UPLOAD_OPENAPI,
+    UPLOAD_OPENAPI,
+    SpooledUpload,
+    UploadRejected,
+    receive_image_upload,
+    receive_image_uploads,
+)
 
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 router = APIRouter(prefix="/cutout", tags=["抠图工具"])
 
 
@@ -27,46 +51,270 @@ def get_cutout_service(request: Request) -> CutoutService:
     return request.app.state.cutout_service
 
 
-@router.post("/segment")
-async def segment_image(
-    file: UploadFile,
-    service: CutoutService = Depends(get_cutout_service)
-):
-    """图像分割接口"""
+def get_job_manager(request: Request) -> CutoutJobManager:
+    """从 app.state 获取抠图任务管理器"""
+    if not hasattr(request.app.state, 'cutout_jobs') or request.app.state.cutout_jobs is None:
+        raise RuntimeError("CutoutJobManager not initialized. Please check main.py")
+    return request.app.state.cutout_jobs
+
+
+async def _receive_upload(request: Request) -> SpooledUpload:
+    """流式接收上传文件（超限、格式不支持时在读完请求体之前拒绝）"""
+    try:
+        with UPLOAD_SECONDS.time():
+            return await receive_image_upload(request)
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+
+async def _until_disconnect(request: Request, work: Awaitable[T]) -> T:
+    """
+    执行处理流程，客户端断开连接时取消（释放推理队列中的位置）
+
+    请求体已读完后，receive() 只会在客户端断开时返回 http.disconnect。
+
+    Raises:
+        HTTPException: 客户端已断开（499，不会被客户端收到）
+    """
+    task = asyncio.ensure_future(work)
+
+    async def wait_disconnect():
+        while (await request.receive())["type"] != "http.disconnect":
+            pass
+
+    watcher = asyncio.create_task(wait_disconnect())
     try:
-        contents = await file.read()
-        if len(contents) == 0:
-            raise HTTPException(status_code=400, detail="文件内容为空")
+        await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    except BaseException:
+        task.cancel()
+        raise
+    finally:
+        watcher.cancel()
 
-        if len(contents) > MAX_UPLOAD_SIZE * 1024 * 1024:
-            raise HTTPException(status_code=413, detail=f"文件大小超过限制 {MAX_UPLOAD_SIZE}MB")
+    if not task.done():
+        task.cancel()
+        logger.info(f"Client disconnected, request cancelled: {request.url.path}")
+        raise HTTPException(status_code=499, detail="客户端已断开连接")
+    return task.result()
 
-        input_image = Image.open(io.BytesIO(contents))
-        if input_image.mode != "RGB":
-            input_image = input_image.convert("RGB")
 
-        output_image = await service.process(input_image)
+def _rejected(e: InferenceRejected) -> HTTPException:
+    """推理准入拒绝 -> 429 / 503（附带 Retry-After）"""
+    return HTTPException(status_code=e.status_code, detail=e.detail, headers={"Retry-After": str(e.retry_after)})
 
-        output_buffer = io.BytesIO()
-        output_image.save(output_buffer, format="PNG")
-        output_buffer.seek(0)
 
-        encoded_filename = urllib.parse.quote(f"{file.filename}_no_bg.png")
+def _result_response(encoded: EncodedImage, filename: Optional[str], options: EncodeOptions) -> Response:
+    """构造图片结果响应"""
+    suffix = "mask" if options.format == OutputFormat.MASK else "no_bg"
+    encoded_filename = urllib.parse.quote(f"{filename}_{suffix}.{encoded.extension}")
 
-        return StreamingResponse(
-            output_buffer,
-            media_type="image/png",
-            headers={
-                "Content-Disposition": f"attachment; filename*=UTF-8''{encoded_filename}"
-            }
+    return Response(
+        content=encoded.content,
+        media_type=encoded.media_type,
+        headers={
+            "Content-Disposition": f"attachment; filename*=UTF-8''{encoded_filename}",
+            "Vary": "Accept",
+            "X-Cache": "HIT" if encoded.cached else "MISS"
+        }
+    )
+
+
+def _job_response(request: Request, job: CutoutJob) -> CutoutJobResponse:
+    """构造任务状态响应"""
+    result_url = None
+    if job.status == JobStatus.SUCCEEDED:
+        result_url = str(request.url_for("get_cutout_job_result", job_id=job.id))
+
+    return CutoutJobResponse(
+        job_id=job.id,
+        status=job.status.value,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        error=job.error,
+        result_url=result_url
+    )
+
+
+@router.post("/segment", openapi_extra=UPLOAD_OPENAPI)
+async def segment_image(
+    request: Request,
+    format: Optional[OutputFormat] = Query(None, description="输出格式（默认根据 Accept 头协商）"),
+    compress_level: int = Query(CUTOUT_PNG_COMPRESS_LEVEL, ge=0, le=9, description="PNG 压缩级别"),
+    quality: int = Query(CUTOUT_WEBP_QUALITY, ge=1, le=100, description="有损 WebP 质量"),
+    hires: bool = Query(False, description="高分辨率模式（大图在粗分割后对边缘分块精修）"),
+    tier: QualityTier = Query(QualityTier.QUALITY, description="质量档位：quality（原始精度）/ fast（量化模型、推理分辨率降一档，更快）"),
+    accept: Optional[str] = Header(None),
+    x_request_timeout: Optional[float] = Header(
+        None, gt=0, le=INFERENCE_MAX_REQUEST_TIMEOUT,
+        description=f"处理截止时间（秒，从接收完上传内容起计算，默认 {INFERENCE_REQUEST_TIMEOUT}）"
+    ),
+    service: CutoutService = Depends(get_cutout_service)
+):
+    """
+    图像分割接口
+
+    解码、推理、编码均在 CutoutService 的线程池 / 推理队列中完成，
+    处理函数本身只负责流式接收上传内容和返回结果。
+
+    输出格式：png / webp-lossless / webp / mask（单通道蒙版，客户端自行合成）。
+    hires=true 时长边超过模型输入尺寸的图像在工作分辨率（最长 CUTOUT_MAX_SIZE）上精修边缘。
+    tier=fast 使用量化模型（未生成时回退到原始精度模型）。
+    推理分辨率按原图尺寸从 CUTOUT_RESOLUTION_LADDER 中选取，推理负载高时自动降档。
+
+    推理队列已满时返回 429，预计无法在截止时间（X-Request-Timeout）前完成时返回 503，
+    均附带 Retry-After。客户端断开连接时取消处理。
+    """
+    upload = await _receive_upload(request)
+    try:
+        options = EncodeOptions(
+            format=negotiate_format(format, accept),
+            png_compress_level=compress_level,
+            webp_quality=quality
         )
+        inference = InferenceOptions(tier=tier, hires=hires)
+        with admission_scope(x_request_timeout or INFERENCE_REQUEST_TIMEOUT):
+            encoded = await _until_disconnect(
+                request,
+                service.segment(upload.file, options, digest=upload.digest, inference=inference)
+            )
+
+        return _result_response(encoded, upload.filename, options)
 
     except HTTPException:
         raise
+    except InferenceRejected as e:
+        raise _rejected(e)
     except Exception as e:
         import traceback
         logger.error(f"错误: {e}\n{traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=f"处理失败: {str(e)}")
+    finally:
+        upload.close()
+
+
+@router.post("/segment/batch", openapi_extra=BATCH_UPLOAD_OPENAPI)
+async def segment_images_batch(
+    request: Request,
+    format: Optional[OutputFormat] = Query(None, description="输出格式（默认 png）"),
+    compress_level: int = Query(CUTOUT_PNG_COMPRESS_LEVEL, ge=0, le=9, description="PNG 压缩级别"),
+    quality: int = Query(CUTOUT_WEBP_QUALITY, ge=1, le=100, description="有损 WebP 质量"),
+    hires: bool = Query(False, description="高分辨率模式（大图在粗分割后对边缘分块精修）"),
+    tier: QualityTier = Query(QualityTier.QUALITY, description="质量档位：quality（原始精度）/ fast（量化模型、推理分辨率降一档，更快）"),
+    service: CutoutService = Depends(get_cutout_service)
+):
+    """
+    批量图像分割接口
+
+    以重复的 files 字段上传多个文件，响应为流式 ZIP（application/zip）：
+    每个文件处理完成后立即写出结果条目，最后写出 manifest.json，
+    记录每个文件的状态、结果条目名或错误信息。单个文件失败不影响其他文件。
+    文件数量超过 CUTOUT_BATCH_MAX_FILES 或请求总大小超过 CUTOUT_BATCH_MAX_TOTAL_MB 时返回 413。
+    """
+    try:
+        items = await receive_image_uploads(request)
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    options = EncodeOptions(
+        format=format or OutputFormat.PNG,
+        png_compress_level=compress_level,
+        webp_quality=quality
+    )
+    return StreamingResponse(
+        stream_batch_zip(service, items, options, InferenceOptions(tier=tier, hires=hires)),
+        media_type="application/zip",
+        headers={"Content-Disposition": "attachment; filename=cutout_batch.zip"}
+    )
+
+
+@router.post("/jobs", status_code=202, response_model=CutoutJobResponse, openapi_extra=UPLOAD_OPENAPI)
+async def create_cutout_job(
+    request: Request,
+    format: Optional[OutputFormat] = Query(None, description="输出格式（默认根据 Accept 头协商）"),
+    compress_level: int = Query(CUTOUT_PNG_COMPRESS_LEVEL, ge=0, le=9, description="PNG 压缩级别"),
+    quality: int = Query(CUTOUT_WEBP_QUALITY, ge=1, le=100, description="有损 WebP 质量"),
+    hires: bool = Query(False, description="高分辨率模式（大图在粗分割后对边缘分块精修）"),
+    tier: QualityTier = Query(QualityTier.QUALITY, description="质量档位：quality（原始精度）/ fast（量化模型、推理分辨率降一档，更快）"),
+    priority: Literal["low", "normal", "high", "urgent"] = Query("normal", description="任务优先级"),
+    accept: Optional[str] = Header(None),
+    manager: CutoutJobManager = Depends(get_job_manager)
+):
+    """
+    提交异步抠图任务
+
+    立即返回任务 ID，通过 GET /cutout/jobs/{job_id} 查询状态，
+    完成后从 result_url 下载结果。队列已满时返回 429（Retry-After 按排队任务数与实测处理耗时估算）。
+    高优先级任务先于低优先级任务处理（低优先级任务等待过久会被提前）。
+    """
+    options = EncodeOptions(
+        format=negotiate_format(format, accept),
+        png_compress_level=compress_level,
+        webp_quality=quality
+    )
+
+    upload = await _receive_upload(request)
+    try:
+        job = await manager.submit(
+            upload.file,
+            upload.filename,
+            options,
+            priority=TaskPriority[priority.upper()],
+            inference=InferenceOptions(tier=tier, hires=hires)
+        )
+    except QueueFullError:
+        raise HTTPException(
+            status_code=429,
+            detail="任务队列已满，请稍后重试",
+            headers={"Retry-After": str(await manager.retry_after())}
+        )
+    finally:
+        upload.close()
+
+    return _job_response(request, job)
+
+
+@router.get("/jobs/stats")
+async def get_cutout_job_stats(
+    manager: CutoutJobManager = Depends(get_job_manager)
+):
+    """异步任务队列统计（各优先级排队数量、平均等待时间、任务状态分布）"""
+    return await manager.get_stats()
+
+
+@router.get("/jobs/{job_id}", response_model=CutoutJobResponse)
+async def get_cutout_job(
+    request: Request,
+    job_id: str,
+    manager: CutoutJobManager = Depends(get_job_manager)
+):
+    """查询异步抠图任务状态"""
+    job = await manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="任务不存在或已过期")
+    return _job_response(request, job)
+
+
+@router.get("/jobs/{job_id}/result", name="get_cutout_job_result")
+async def get_cutout_job_result(
+    job_id: str,
+    manager: CutoutJobManager = Depends(get_job_manager)
+):
+    """下载异步抠图任务结果"""
+    job = await manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="任务不存在或已过期")
+
+    if job.status == JobStatus.FAILED:
+        raise HTTPException(status_code=409, detail=f"任务失败: {job.error}")
+    if job.status != JobStatus.SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"任务尚未完成: {job.status.value}")
+
+    encoded = await manager.read_result(job)
+    if encoded is None:
+        raise HTTPException(status_code=404, detail="任务结果已过期")
+
+    return _result_response(encoded, job.filename, job.options)
 
 
 @router.get("/health")
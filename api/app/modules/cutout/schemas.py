@@ -3,6 +3,7 @@
 
 定义请求和响应的 Pydantic 模型。
 """
+from typing import Optional
 
 from pydantic import BaseModel
 
@@ -11,9 +12,28 @@ class CutoutHealthResponse(BaseModel):
     """抠图服务健康检查响应"""
     service: str
     model_loaded: bool
+    model_variants: dict  # 可用的模型变体（变体名 -> 模型文件）
     queue_size: int
+    batch_stats: dict  # 实际形成的批次大小统计
+    model_stats: dict  # 模型注册表：内存占用、加载 / 淘汰 / 空闲卸载次数
+    admission_stats: dict  # 推理准入控制：等待 / 执行中请求数、单次执行耗时、拒绝次数
+    resolution_stats: dict  # 各推理分辨率的请求数，以及因负载降档的请求数
+    encoder_stats: dict  # 各输出格式的编码耗时与体积
+    cache_stats: Optional[dict] = None  # 结果缓存命中 / 未命中 / 淘汰统计
+
+
+class CutoutJobResponse(BaseModel):
+    """抠图异步任务状态响应"""
+    success: bool = True
+    job_id: str
+    status: str  # queued / processing / succeeded / failed
+    created_at: float  # Unix 时间戳（秒）
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    result_url: Optional[str] = None  # 仅 succeeded 时返回
 
 
 class CutoutResponse(BaseModel):
     """抠图响应（用于 OpenAPI 文档）"""
-    pass  # 实际返回 PNG 图片流，这里仅用于文档
+    pass  # 实际返回图片流（PNG / WebP / 蒙版 PNG），这里仅用于文档
@@ -7,74 +7,257 @@
 1. 使用统一的 ModelLoader 管理模型
 2. 自动排队和并发控制
 3. 支持资源管理
+4. 解码 -> 预处理 -> 推理 -> 后处理 -> 编码 分阶段执行，
+   CPU 密集型阶段在专用线程池中运行，事件循环只处理 I/O
+5. 结果缓存：相同内容 + 模型 + 输出选项直接返回已编码结果
+6. 高分辨率模式：大图在粗分割后只对边缘分块精修（见 refine.py）
+7. 模型变体：按请求的质量档位选择原始精度或量化模型（见 inference.py）
+8. 自适应分辨率：按原图尺寸、质量档位与在途推理数选择模型输入边长，过载时降档；
+   因负载降档的结果不写入缓存
 """
+import asyncio
+import hashlib
 import logging
+from typing import BinaryIO, Optional, Union
 
 import numpy as np
 from PIL import Image
 
-from app.core.constants import CUTOUT_DEFAULT_SIZE, CUTOUT_MODEL_PATH
-from app.infrastructure.models import IModelLoader
+from app.core.constants import (
+    CUTOUT_CACHE_DISK_DIR,
+    CUTOUT_CACHE_DISK_MB,
+    CUTOUT_CACHE_ENABLED,
+    CUTOUT_CACHE_MEMORY_MB,
+    CUTOUT_CACHE_TTL,
+    CUTOUT_DEFAULT_SIZE,
+    CUTOUT_DEFAULT_VARIANT,
+    CUTOUT_HIRES_EDGE_RADIUS,
+    CUTOUT_HIRES_TILE_OVERLAP,
+    CUTOUT_HIRES_TILE_SIZE,
+    CUTOUT_LOAD_STEP_PENDING,
+    CUTOUT_MAX_SIZE,
+    CUTOUT_MODEL_VARIANTS,
+    CUTOUT_RESOLUTION_LADDER,
+    CUTOUT_TIER_VARIANTS,
+)
+from app.infrastructure.cache import CachedResult, DiskCache, ICache, MemoryLRUCache, TieredCache
+from app.infrastructure.models import IModelLoader, ModelVariants, admission_scope, current_scope
+from app.infrastructure.workers import WorkerPool
+from app.modules.cutout.codec import decode_image
+from app.modules.cutout.encoders import EncodedImage, EncodeOptions, EncoderStats, OutputFormat, encode_image
+from app.modules.cutout.inference import InferenceOptions, model_resolutions, select_resolution
+from app.modules.cutout.metrics import (
+    DECODE_SECONDS,
+    ENCODE_SECONDS,
+    INFERENCE_SECONDS,
+    POSTPROCESS_SECONDS,
+    PREPROCESS_SECONDS,
+)
+from app.modules.cutout.postprocess import compose_rgba, prediction_to_mask
+from app.modules.cutout.preprocess import ImagePreprocessor
+from app.modules.cutout.refine import compose_mask, plan_refinement, prediction_to_prob, resize_prob
 
 
 logger = logging.getLogger(__name__)
 
 
+def create_result_cache() -> Optional[ICache]:
+    """
+    按常量配置创建抠图结果缓存
+
+    Returns:
+        分层缓存；未启用时返回 None
+    """
+    if not CUTOUT_CACHE_ENABLED:
+        return None
+
+    memory = MemoryLRUCache(max_bytes=CUTOUT_CACHE_MEMORY_MB * 1024 * 1024, ttl=CUTOUT_CACHE_TTL)
+    disk = None
+    if CUTOUT_CACHE_DISK_DIR is not None:
+        disk = DiskCache(CUTOUT_CACHE_DISK_DIR, max_bytes=CUTOUT_CACHE_DISK_MB * 1024 * 1024, ttl=CUTOUT_CACHE_TTL)
+    return TieredCache(memory, disk)
+
+
 class CutoutService:
     """抠图服务类"""
 
-    def __init__(self, model_loader: IModelLoader):
+    def __init__(
+        self,
+        model_loader: IModelLoader,
+        worker_pool: WorkerPool,
+        result_cache: Optional[ICache] = None
+    ):
         """
         初始化服务
 
         Args:
             model_loader: 模型加载器
+            worker_pool: 图像处理线程池
+            result_cache: 结果缓存（可选）
         """
         self._model_loader = model_loader
-        self._model_id = str(CUTOUT_MODEL_PATH)
+        self._workers = worker_pool
+        self._cache = result_cache
+        self._variants = ModelVariants(CUTOUT_MODEL_VARIANTS, CUTOUT_DEFAULT_VARIANT)
+        self._preprocessor = ImagePreprocessor()
+        self._encoder_stats = EncoderStats()
+        self._resolutions: dict[str, dict[int, str]] = {}
+        self._resolution_counts: dict[int, int] = {}
+        self._degraded = 0
+        self._inflight = 0  # 已开始解码、推理尚未完成的请求数
+
+    @property
+    def _model_id(self) -> str:
+        """默认变体的模型标识符"""
+        return self._variants.default_id
 
-    def _normalize_image(self, img: Image.Image, target_size: int = 1024) -> np.ndarray:
+    def _resolve_model(self, inference: InferenceOptions) -> str:
+        """质量档位 -> 模型标识符（变体不可用时回退到默认变体）"""
+        _, model_id = self._variants.resolve(inference.tier.variant)
+        return model_id
+
+    async def _model_resolutions(self, model_id: str) -> dict[int, str]:
+        """模型支持的推理分辨率（首次查询时读取模型输入形状）"""
+        resolutions = self._resolutions.get(model_id)
+        if resolutions is None:
+            input_shape = await self._model_loader.get_input_shape(model_id)
+            resolutions = model_resolutions(model_id, input_shape, CUTOUT_RESOLUTION_LADDER, CUTOUT_DEFAULT_SIZE)
+            self._resolutions[model_id] = resolutions
+            logger.info(f"Inference resolutions for {model_id}: input_shape={input_shape}, sizes={sorted(resolutions)}")
+        return resolutions
+
+    async def _plan_resolution(
+        self,
+        model_id: str,
+        source_size: tuple[int, int],
+        inference: InferenceOptions
+    ) -> tuple[int, str, bool]:
         """
-        图像归一化预处理
-        使用 pixel / 255 - 0.5 的归一化方式
+        选择推理分辨率
+
+        Args:
+            model_id: 模型标识符
+            source_size: 原图尺寸 (width, height)
+            inference: 推理选项
+
+        Returns:
+            (模型输入边长, 该边长对应的模型标识符, 是否因负载降档)
         """
-        im = img.convert("RGB").resize((target_size, target_size), Image.LANCZOS)
-        im_ary = np.array(im, dtype=np.float32)
+        resolutions = await self._model_resolutions(model_id)
+
+        # 高分辨率模式的粗分割与分块精修固定使用分块边长
+        if inference.hires and max(source_size) > CUTOUT_DEFAULT_SIZE:
+            size = CUTOUT_HIRES_TILE_SIZE if CUTOUT_HIRES_TILE_SIZE in resolutions else max(resolutions)
+            return size, resolutions[size], False
+
+        size = select_resolution(list(resolutions), source_size, inference.tier, self._load_steps())
+        nominal = select_resolution(list(resolutions), source_size, inference.tier)
+        return size, resolutions[size], size != nominal
 
-        im_ary = im_ary / 255.0
-        im_ary = im_ary - 0.5
-        im_ary = im_ary.transpose((2, 0, 1))
-        im_ary = np.expand_dims(im_ary, 0)
+    def _load_steps(self) -> int:
+        """
+        负载降档数
 
-        return im_ary
+        取推理队列中的请求数与本服务其他在途请求数（突发流量下请求先积压在解码阶段，
+        尚未进入推理队列）的较大值；远程推理模式下前者包含其他 API 进程的请求。
+        """
+        pending = max(self._model_loader.get_pending_count(), self._inflight - 1)
+        return pending // CUTOUT_LOAD_STEP_PENDING
 
-    async def _predict(self, img: Image.Image) -> Image.Image:
+    async def _predict(self, img: Image.Image, model_id: str, size: int, hires: bool = False) -> Image.Image:
         """
         模型预测（异步，自动排队）
+
+        Args:
+            img: RGB 图像
+            model_id: 模型标识符
+            size: 模型输入边长
+            hires: 高分辨率模式（长边超过模型输入尺寸时对边缘分块精修）
         """
-        input_data = self._normalize_image(img, target_size=CUTOUT_DEFAULT_SIZE)
+        pred = await self._infer_tensor(img, model_id, size)
+
+        if not hires or max(img.size) <= CUTOUT_DEFAULT_SIZE:
+            with POSTPROCESS_SECONDS.time():
+                return await self._workers.run(prediction_to_mask, pred, img.size)
+        return await self._refine(img, pred, model_id, size)
+
+    async def _infer_tensor(self, img: Image.Image, model_id: str, size: int) -> np.ndarray:
+        """
+        图像 -> 模型输出（预处理在线程池中执行，推理自动排队）
+        """
+        with PREPROCESS_SECONDS.time():
+            input_data = await self._workers.run(
+                self._preprocessor.to_tensor, img, target_size=size
+            )
 
         # 调用模型加载器进行推理（自动排队）
-        ort_outs = await self._model_loader.infer(
-            model_id=self._model_id,
-            input_data=input_data
+        with INFERENCE_SECONDS.time():
+            ort_outs = await self._model_loader.infer(
+                model_id=model_id,
+                input_data=input_data
+            )
+
+        # 仅在推理正常完成后归还缓冲区（取消时后台线程可能仍在读取）
+        self._preprocessor.release(input_data)
+
+        return ort_outs[0]
+
+    async def _refine(self, img: Image.Image, pred: np.ndarray, model_id: str, size: int) -> Image.Image:
+        """
+        高分辨率精修：根据粗分割结果只对边缘分块推理，拼接为原图尺寸蒙版
+
+        各分块并发提交，由模型加载器的微批调度器合批推理。
+        请求在粗分割时已通过准入，分块推理不再受等待队列上限约束（避免流水线中途被拒绝），截止时间不变。
+        """
+        coarse, value_range = await self._workers.run(prediction_to_prob, pred)
+        plan = await self._workers.run(
+            plan_refinement,
+            coarse,
+            img.size,
+            max_size=CUTOUT_MAX_SIZE,
+            tile_size=CUTOUT_HIRES_TILE_SIZE,
+            overlap=CUTOUT_HIRES_TILE_OVERLAP,
+            edge_radius=CUTOUT_HIRES_EDGE_RADIUS
         )
 
-        pred = ort_outs[0]
+        working = img
+        if plan.tiles and plan.working_size != img.size:
+            working = await self._workers.run(img.resize, plan.working_size, Image.LANCZOS)
+
+        with admission_scope(current_scope().remaining(), bounded=False):
+            tile_probs = await asyncio.gather(*(
+                self._infer_tile(working, box, value_range, model_id, size) for box in plan.tiles
+            ))
+
+        logger.info(
+            f"Hires refinement: image={img.size}, working={plan.working_size}, "
+            f"tiles={len(plan.tiles)}/{plan.grid_size}"
+        )
 
-        if len(pred.shape) == 4:
-            pred = pred[0, 0, :, :]
-        elif len(pred.shape) == 3:
-            pred = pred[0, :, :]
+        with POSTPROCESS_SECONDS.time():
+            return await self._workers.run(
+                compose_mask, coarse, plan, list(tile_probs), img.size, CUTOUT_HIRES_TILE_OVERLAP
+            )
 
-        ma = np.max(pred)
-        mi = np.min(pred)
-        pred = (pred - mi) / (ma - mi) if ma - mi > 0 else np.zeros_like(pred)
+    async def _infer_tile(
+        self,
+        working: Image.Image,
+        box: tuple,
+        value_range: tuple,
+        model_id: str,
+        size: int
+    ) -> np.ndarray:
+        """
+        单个分块推理，返回分块尺寸的概率图
+        """
+        tile = await self._workers.run(working.crop, box)
+        pred = await self._infer_tensor(tile, model_id, size)
 
-        mask = Image.fromarray((pred * 255).astype("uint8"), mode="L")
-        mask = mask.resize(img.size, Image.LANCZOS)
+        def to_prob():
+            prob, _ = prediction_to_prob(pred, value_range)
+            return resize_prob(prob, tile.size)
 
-        return mask
+        return await self._workers.run(to_prob)
 
     async def process(self, image: Image.Image) -> Image.Image:
         """
@@ -86,24 +269,184 @@ class CutoutService:
         Returns:
             带透明背景的图像 (PIL.Image)
         """
-        input_image = image.convert("RGB")
+        if image.mode != "RGB":
+            image = await self._workers.run(image.convert, "RGB")
 
-        logger.info(f"Processing image: {input_image.size}")
+        logger.info(f"Processing image: {image.size}")
 
         # 推理（自动排队）
-        mask = await self._predict(input_image)
+        size, model_id, _ = await self._plan_resolution(self._model_id, image.size, InferenceOptions())
+        mask = await self._predict(image, model_id, size)
 
-        output_image = input_image.convert("RGBA")
-        output_image.putalpha(mask)
+        output_image = await self._workers.run(compose_rgba, image, mask)
 
         logger.info("Image processing completed")
 
         return output_image
 
+    async def segment(
+        self,
+        contents: Union[bytes, BinaryIO],
+        options: Optional[EncodeOptions] = None,
+        digest: Optional[str] = None,
+        inference: Optional[InferenceOptions] = None
+    ) -> EncodedImage:
+        """
+        完整处理流水线：解码 -> 预处理 -> 推理 -> 后处理 -> 编码
+
+        Args:
+            contents: 上传的图像文件内容，或上传暂存文件对象
+            options: 输出编码选项（默认 PNG）
+            digest: 内容的 SHA-256（流式接收时已计算，为空时按需计算）
+            inference: 推理选项（质量档位、高分辨率模式）
+
+        Returns:
+            EncodedImage: 编码后的结果
+
+        Raises:
+            InferenceRejected: 推理请求被准入控制拒绝（队列已满 / 无法在截止时间前完成）
+        """
+        options = options or EncodeOptions()
+        inference = inference or InferenceOptions()
+        model_id = self._resolve_model(inference)
+
+        cache_key = None
+        if self._cache is not None:
+            if digest is None:
+                digest = await self._workers.run(self._content_digest, contents)
+            cache_key = self._cache_key(digest, model_id, options, inference)
+            cached = await self._cache.get(cache_key)
+            if cached is not None:
+                return EncodedImage(
+                    content=cached.content,
+                    media_type=cached.metadata["media_type"],
+                    extension=cached.metadata["extension"],
+                    encode_ms=0.0,
+                    cached=True
+                )
+
+        # 推理队列已满或已超过截止时间时，在解码之前拒绝
+        self._model_loader.check_admission()
+
+        self._inflight += 1
+        try:
+            with DECODE_SECONDS.time():
+                input_image = await self._workers.run(decode_image, contents)
+            size, size_model_id, degraded = await self._plan_resolution(model_id, input_image.size, inference)
+            self._record_resolution(size, degraded)
+            logger.info(
+                f"Processing image: {input_image.size}, format={options.format.value}, "
+                f"tier={inference.tier.value}, hires={inference.hires}, resolution={size}, degraded={degraded}"
+            )
+
+            mask = await self._predict(input_image, size_model_id, size, hires=inference.hires)
+        finally:
+            self._inflight -= 1
+
+        # mask 格式跳过 RGBA 合成；编码前释放解码图像与蒙版，编码期间只保留输出图像
+        if options.needs_composite:
+            with POSTPROCESS_SECONDS.time():
+                output_image = await self._workers.run(compose_rgba, input_image, mask)
+        else:
+            output_image = mask
+        del input_image, mask
+
+        with ENCODE_SECONDS.time():
+            encoded = await self._workers.run(encode_image, output_image, options)
+        self._encoder_stats.record(options.format, encoded)
+
+        logger.info(f"Image processing completed: encode_ms={encoded.encode_ms:.1f}, bytes={len(encoded.content)}")
+
+        # 缓存键只含档位、不含实际分辨率：只缓存正常负载下的结果，避免降档结果被之后的请求命中
+        if cache_key is not None and not degraded:
+            await self._cache.set(
+                cache_key,
+                CachedResult(
+                    content=encoded.content,
+                    metadata={"media_type": encoded.media_type, "extension": encoded.extension}
+                )
+            )
+
+        return encoded
+
+    def _record_resolution(self, size: int, degraded: bool):
+        """记录推理分辨率分布"""
+        self._resolution_counts[size] = self._resolution_counts.get(size, 0) + 1
+        if degraded:
+            self._degraded += 1
+
+    @staticmethod
+    def _content_digest(contents: Union[bytes, BinaryIO]) -> str:
+        """上传内容的 SHA-256（在线程池中执行）"""
+        if isinstance(contents, (bytes, bytearray)):
+            return hashlib.sha256(contents).hexdigest()
+
+        sha256 = hashlib.sha256()
+        contents.seek(0)
+        for chunk in iter(lambda: contents.read(1024 * 1024), b""):
+            sha256.update(chunk)
+        return sha256.hexdigest()
+
+    def _cache_key(self, content_digest: str, model_id: str, options: EncodeOptions, inference: InferenceOptions) -> str:
+        """
+        结果缓存键：内容摘要 + 实际使用的模型 + 影响输出字节的编码选项 + 推理选项
+
+        质量档位决定推理分辨率（fast 降一档），即使两个档位回退到同一模型变体也不能共用结果；
+        正常负载下分辨率由原图（即内容摘要）与档位唯一确定。
+        """
+        parts = [content_digest, model_id, options.format.value, f"tier={inference.tier.value}"]
+        if options.format in (OutputFormat.PNG, OutputFormat.MASK):
+            parts.append(f"level={options.png_compress_level}")
+        elif options.format == OutputFormat.WEBP:
+            parts.append(f"quality={options.webp_quality}")
+        if inference.hires:
+            parts.append("hires")
+        return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+    async def warmup(self, runs: int = 1) -> dict:
+        """
+        预加载各质量档位使用的模型变体并以真实输入尺寸预热
+
+        变体的每个推理分辨率都会预热，按尺寸导出的模型文件（如 model.512.onnx）各自加载并被固定，
+        不会被淘汰；输入空间维度动态的模型所有分辨率共用一个文件，只以默认边长预热一次。
+
+        Args:
+            runs: 每个会话执行的推理次数
+
+        Returns:
+            {变体名: {模型输入边长: 预热统计}}
+        """
+        stats: dict[str, dict[str, dict]] = {}
+        for variant in dict.fromkeys(CUTOUT_TIER_VARIANTS.values()):
+            variant, model_id = self._variants.resolve(variant)
+            if variant in stats:
+                continue
+
+            resolutions = await self._model_resolutions(model_id)
+            stats[variant] = {}
+            warmed = set()
+            for size in sorted(resolutions, key=lambda s: (s != CUTOUT_DEFAULT_SIZE, s)):
+                size_model_id = resolutions[size]
+                if size_model_id in warmed:
+                    continue
+                warmed.add(size_model_id)
+                stats[variant][str(size)] = await self._model_loader.warmup(size_model_id, (1, 3, size, size), runs)
+        return stats
+
     async def health_check(self) -> dict:
         """健康检查"""
         return {
             "service": "CutoutService",
             "model_loaded": self._model_id in self._model_loader.get_loaded_models(),
+            "model_variants": self._variants.available(),
             "queue_size": self._model_loader.get_queue_size(),
+            "batch_stats": self._model_loader.get_batch_stats(self._model_id),
+            "model_stats": self._model_loader.get_model_stats(),
+            "admission_stats": self._model_loader.get_admission_stats(),
+            "resolution_stats": {
+                "requests": {str(size): count for size, count in sorted(self._resolution_counts.items())},
+                "degraded": self._degraded,
+            },
+            "encoder_stats": self._encoder_stats.as_dict(),
+            "cache_stats": self._cache.get_stats() if self._cache is not None else None,
         }
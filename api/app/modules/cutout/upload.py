@@ -0,0 +1,538 @@
+"""
+流式上传接收
+
+直接解析请求体流（multipart/form-data），不经过 UploadFile + file.read()：
+1. 先检查 Content-Length，明显超限的请求在读取请求体之前拒绝
+2. 分块读取，累计字节数超过 MAX_UPLOAD_SIZE 立即拒绝
+3. 从最先到达的数据中探测图像头（格式、尺寸），格式不支持或像素数超限立即拒绝，
+   只解析头部，不分配像素内存；头部超过探测缓冲区（如 JPEG 内嵌大 ICC 配置文件）但文件头魔数
+   属于允许的格式时，推迟到数据全部到达后从暂存文件探测
+4. 通过检查的数据写入 SpooledTemporaryFile（小文件在内存，大文件转存磁盘），
+   同时增量计算 SHA-256，供结果缓存复用
+
+每个请求的峰值内存约为 UPLOAD_SPOOL_MAX_MEMORY + 探测缓冲区，与上传大小无关。
+批量上传（receive_image_uploads）逐个文件检查，单个文件不合格只影响该文件。
+"""
+import asyncio
+import hashlib
+import io
+import tempfile
+import warnings
+from dataclasses import dataclass, field
+from typing import Optional, Union
+
+from fastapi import Request
+from PIL import Image
+from python_multipart import MultipartParser
+from python_multipart.multipart import parse_options_header
+
+from app.core.constants import (
+    CUTOUT_BATCH_MAX_FILES,
+    CUTOUT_BATCH_MAX_TOTAL_MB,
+    CUTOUT_BATCH_SPOOL_MAX_MEMORY,
+    MAX_UPLOAD_SIZE,
+    UPLOAD_ALLOWED_IMAGE_FORMATS,
+    UPLOAD_MAX_IMAGE_PIXELS,
+    UPLOAD_SNIFF_MAX_BYTES,
+    UPLOAD_SPOOL_MAX_MEMORY,
+)
+
+
+# multipart 边界、分段头等额外开销的上限
+_MULTIPART_OVERHEAD = 64 * 1024
+
+# 文件头魔数 -> Pillow 格式名（WEBP 为 RIFF 容器，单独判断）
+_MAGIC_NUMBERS = (
+    (b"\xff\xd8\xff", "JPEG"),
+    (b"\x89PNG\r\n\x1a\n", "PNG"),
+    (b"GIF87a", "GIF"),
+    (b"GIF89a", "GIF"),
+    (b"BM", "BMP"),
+    (b"II*\x00", "TIFF"),
+    (b"MM\x00*", "TIFF"),
+)
+
+# 无 UploadFile 参数时 OpenAPI 无法推断请求体，这里手动声明
+UPLOAD_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                }
+            }
+        },
+    }
+}
+
+BATCH_UPLOAD_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["files"],
+                    "properties": {"files": {"type": "array", "items": {"type": "string", "format": "binary"}}},
+                }
+            }
+        },
+    }
+}
+
+
+class UploadRejected(Exception):
+    """上传被拒绝（携带 HTTP 状态码）"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+@dataclass
+class SpooledUpload:
+    """已接收并通过检查的上传文件"""
+    file: tempfile.SpooledTemporaryFile
+    filename: str
+    size: int
+    digest: str  # SHA-256（十六进制）
+    format: str
+    width: int
+    height: int
+
+    def read(self) -> bytes:
+        """读取全部内容（会把内容加载到内存，仅在必须得到 bytes 时使用）"""
+        self.file.seek(0)
+        return self.file.read()
+
+    def close(self):
+        self.file.close()
+
+
+@dataclass
+class UploadFailure:
+    """批量上传中未通过检查的文件"""
+    filename: str
+    status_code: int
+    detail: str
+
+
+def _magic_format(head: bytes) -> Optional[str]:
+    """按文件头魔数判断图像格式（无法判断时返回 None）"""
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "WEBP"
+    for magic, image_format in _MAGIC_NUMBERS:
+        if head.startswith(magic):
+            return image_format
+    return None
+
+
+class _ImageCheck:
+    """单个文件的增量检查：累计大小、SHA-256、图像头探测"""
+
+    def __init__(self, max_bytes: int, max_pixels: int, sniff_bytes: int, allowed_formats: tuple):
+        self.max_bytes = max_bytes
+        self.max_pixels = max_pixels
+        self.sniff_bytes = sniff_bytes
+        self.allowed_formats = allowed_formats
+
+        self.size = 0
+        self.format: Optional[str] = None
+        self.width = 0
+        self.height = 0
+        self.deferred = False  # 头部超过探测缓冲区，等待数据全部到达后用 sniff_file 探测
+        self._sha256 = hashlib.sha256()
+        self._head = bytearray()
+
+    def feed(self, chunk: bytes):
+        """
+        检查新到达的数据
+
+        Raises:
+            UploadRejected: 超出大小限制，或图像头可识别但不符合要求
+        """
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise UploadRejected(413, f"文件大小超过限制 {self.max_bytes // 1024 // 1024}MB")
+
+        self._sha256.update(chunk)
+        if self.format is None and not self.deferred:
+            self._head += chunk
+            self.sniff()
+
+    def finish(self):
+        """
+        文件数据已全部到达
+
+        Raises:
+            UploadRejected: 文件为空或无法识别
+        """
+        if self.size == 0:
+            raise UploadRejected(400, "文件内容为空")
+        if self.format is None and not self.deferred:
+            self.sniff(final=True)
+
+    def sniff(self, final: bool = False):
+        """
+        根据已接收的头部数据识别图像格式与尺寸
+
+        头部超过探测缓冲区仍无法解析时，文件头魔数属于允许的格式则不再缓冲，
+        标记为 deferred，由调用方在数据全部到达后调用 sniff_file。
+
+        Args:
+            final: 数据已全部到达（仍无法识别则拒绝）
+        """
+        header = self._read_header(io.BytesIO(self._head))
+        if header is None:
+            # 数据不足以解析图像头，或不是图像
+            if final:
+                raise UploadRejected(415, "无法识别的图像格式")
+            if len(self._head) >= self.sniff_bytes:
+                if _magic_format(self._head) not in self.allowed_formats:
+                    raise UploadRejected(415, "无法识别的图像格式")
+                self.deferred = True
+                self._head = bytearray()
+            return
+        self._accept(*header)
+
+    def sniff_file(self, file):
+        """
+        从暂存文件识别图像格式与尺寸（deferred 的文件，数据全部到达后调用；阻塞，只读取头部）
+
+        Args:
+            file: 暂存文件
+        """
+        file.seek(0)
+        header = self._read_header(file)
+        if header is None:
+            raise UploadRejected(415, "无法识别的图像格式")
+        self.deferred = False
+        self._accept(*header)
+
+    def _read_header(self, fp) -> Optional[tuple]:
+        """解析图像头，返回 (格式, 宽, 高)；无法解析时返回 None"""
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", Image.DecompressionBombWarning)
+                with Image.open(fp) as image:
+                    return image.format, image.size[0], image.size[1]
+        except Image.DecompressionBombError:
+            raise UploadRejected(422, f"图像像素数超过限制 {self.max_pixels}")
+        except Exception:
+            return None
+
+    def _accept(self, image_format: str, width: int, height: int):
+        """检查格式与像素数，记录探测结果"""
+        if image_format not in self.allowed_formats:
+            raise UploadRejected(415, f"不支持的图像格式: {image_format}")
+        if width * height > self.max_pixels:
+            raise UploadRejected(422, f"图像尺寸 {width}x{height} 超过限制（最多 {self.max_pixels} 像素）")
+
+        self.format, self.width, self.height = image_format, width, height
+        self._head = bytearray()
+
+    @property
+    def digest(self) -> str:
+        return self._sha256.hexdigest()
+
+
+@dataclass
+class _ReceivedFile:
+    """接收中的文件"""
+    filename: str
+    check: _ImageCheck
+    spool: tempfile.SpooledTemporaryFile
+    error: Optional[UploadRejected] = None
+    written: int = 0  # 已写入暂存文件的字节数（超过 max_size 后 SpooledTemporaryFile 转存磁盘）
+
+    def upload(self) -> SpooledUpload:
+        self.spool.seek(0)
+        return SpooledUpload(
+            file=self.spool,
+            filename=self.filename,
+            size=self.check.size,
+            digest=self.check.digest,
+            format=self.check.format,
+            width=self.check.width,
+            height=self.check.height
+        )
+
+
+@dataclass
+class _Receiver:
+    """
+    multipart 解析回调：只接收目标字段，边接收边检查
+
+    max_files=1 时只接收第一个目标字段，其余同名字段忽略（仍计入请求体总大小限制）；
+    fail_fast=False 时单个文件的检查失败只记录在该文件上，继续接收其余文件。
+    """
+    field_name: str
+    max_bytes: int
+    max_pixels: int
+    sniff_bytes: int
+    allowed_formats: tuple
+    spool_max_memory: int
+    max_files: int = 1
+    fail_fast: bool = True
+
+    files: list = field(default_factory=list)
+    pending: list = field(default_factory=list)  # [(接收中的文件, 数据)]，由接收循环写入
+    deferred: list = field(default_factory=list)  # 待从暂存文件探测的文件，由接收循环在写入数据后检查
+
+    def __post_init__(self):
+        self._header_field = bytearray()
+        self._header_value = bytearray()
+        self._part_headers: dict[bytes, bytes] = {}
+        self._current: Optional[_ReceivedFile] = None
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        }
+
+    def finish(self):
+        """请求体结束：检查未正常结束的文件分段"""
+        if self._current is not None:
+            self._on_part_end()
+
+    def close(self):
+        """关闭所有暂存文件"""
+        for received in self.files:
+            received.spool.close()
+
+    def _on_part_begin(self):
+        self._part_headers = {}
+
+    def _on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._part_headers[bytes(self._header_field).lower()] = bytes(self._header_value)
+        self._header_field.clear()
+        self._header_value.clear()
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._part_headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("utf-8", "replace")
+        self._current = None
+        if name != self.field_name:
+            return
+
+        if len(self.files) >= self.max_files:
+            if self.max_files == 1:
+                return
+            raise UploadRejected(413, f"文件数量超过限制 {self.max_files}")
+
+        filename = options.get(b"filename")
+        self._current = _ReceivedFile(
+            filename=filename.decode("utf-8", "replace") if filename else self.field_name,
+            check=_ImageCheck(self.max_bytes, self.max_pixels, self.sniff_bytes, self.allowed_formats),
+            spool=tempfile.SpooledTemporaryFile(max_size=self.spool_max_memory)  # noqa: SIM115 由 close 关闭
+        )
+        self.files.append(self._current)
+
+    def _on_part_data(self, data: bytes, start: int, end: int):
+        current = self._current
+        if current is None or current.error is not None:
+            return
+
+        chunk = data[start:end]
+        try:
+            current.check.feed(chunk)
+        except UploadRejected as e:
+            self._fail(current, e)
+            return
+        self.pending.append((current, chunk))
+
+    def _on_part_end(self):
+        current = self._current
+        self._current = None
+        if current is not None and current.error is None:
+            try:
+                current.check.finish()
+            except UploadRejected as e:
+                self._fail(current, e)
+                return
+            if current.check.deferred:
+                self.deferred.append(current)
+
+    def _fail(self, received: _ReceivedFile, error: UploadRejected):
+        """单个文件检查失败：fail_fast 时拒绝整个请求，否则丢弃该文件的数据"""
+        if self.fail_fast:
+            raise error
+        received.error = error
+        self.pending = [(item, chunk) for item, chunk in self.pending if item is not received]
+
+
+async def _receive(request: Request, receiver: _Receiver, max_body: int, too_large: str):
+    """
+    解析请求体并把通过检查的数据写入暂存文件
+
+    Raises:
+        UploadRejected: 请求格式错误、请求体超限，或 fail_fast 时文件检查失败
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise UploadRejected(400, "请使用 multipart/form-data 上传文件")
+
+    content_length = request.headers.get("content-length")
+    if content_length is not None:
+        try:
+            declared = int(content_length)
+        except ValueError:
+            raise UploadRejected(400, "无效的 Content-Length")
+        if declared > max_body:
+            raise UploadRejected(413, too_large)
+
+    parser = MultipartParser(boundary, receiver.callbacks())
+    loop = asyncio.get_running_loop()
+
+    async def flush():
+        pending, receiver.pending = receiver.pending, []
+        for received_file, data in pending:
+            # 超过内存上限的写入（触发转存磁盘及之后的写入）在线程池中执行，避免阻塞事件循环
+            received_file.written += len(data)
+            if received_file.written > receiver.spool_max_memory:
+                await loop.run_in_executor(None, received_file.spool.write, data)
+            else:
+                received_file.spool.write(data)
+
+        # 推迟探测的文件：数据已全部写入暂存文件后再探测
+        deferred, receiver.deferred = receiver.deferred, []
+        for received_file in deferred:
+            try:
+                await loop.run_in_executor(None, received_file.check.sniff_file, received_file.spool)
+            except UploadRejected as e:
+                receiver._fail(received_file, e)
+
+    try:
+        received = 0
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > max_body:
+                raise UploadRejected(413, too_large)
+
+            parser.write(chunk)
+            await flush()
+
+        parser.finalize()
+        receiver.finish()
+        await flush()
+    except UploadRejected:
+        receiver.close()
+        raise
+    except Exception as e:
+        receiver.close()
+        raise UploadRejected(400, f"无效的 multipart 请求: {e}")
+
+
+async def receive_image_upload(
+    request: Request,
+    field_name: str = "file",
+    max_bytes: int = MAX_UPLOAD_SIZE * 1024 * 1024,
+    max_pixels: int = UPLOAD_MAX_IMAGE_PIXELS,
+    sniff_bytes: int = UPLOAD_SNIFF_MAX_BYTES,
+    spool_max_memory: int = UPLOAD_SPOOL_MAX_MEMORY
+) -> SpooledUpload:
+    """
+    流式接收 multipart 上传的图像
+
+    Args:
+        request: 请求对象
+        field_name: 文件字段名
+        max_bytes: 文件最大字节数
+        max_pixels: 图像最大像素数
+        sniff_bytes: 图像头探测的最大字节数
+        spool_max_memory: 暂存文件保留在内存中的最大字节数
+
+    Returns:
+        SpooledUpload（调用方负责 close）
+
+    Raises:
+        UploadRejected: 请求格式错误、超出大小限制或不是支持的图像
+    """
+    receiver = _Receiver(
+        field_name=field_name,
+        max_bytes=max_bytes,
+        max_pixels=max_pixels,
+        sniff_bytes=sniff_bytes,
+        allowed_formats=UPLOAD_ALLOWED_IMAGE_FORMATS,
+        spool_max_memory=spool_max_memory
+    )
+    await _receive(request, receiver, max_bytes + _MULTIPART_OVERHEAD, f"文件大小超过限制 {max_bytes // 1024 // 1024}MB")
+
+    if not receiver.files:
+        raise UploadRejected(400, f"缺少文件字段 {field_name}")
+    return receiver.files[0].upload()
+
+
+async def receive_image_uploads(
+    request: Request,
+    field_name: str = "files",
+    max_files: int = CUTOUT_BATCH_MAX_FILES,
+    max_total_bytes: int = CUTOUT_BATCH_MAX_TOTAL_MB * 1024 * 1024,
+    max_bytes: int = MAX_UPLOAD_SIZE * 1024 * 1024,
+    max_pixels: int = UPLOAD_MAX_IMAGE_PIXELS,
+    sniff_bytes: int = UPLOAD_SNIFF_MAX_BYTES,
+    spool_max_memory: int = CUTOUT_BATCH_SPOOL_MAX_MEMORY
+) -> list[Union[SpooledUpload, UploadFailure]]:
+    """
+    流式接收 multipart 上传的多个图像
+
+    单个文件超限或格式不支持时只记录为 UploadFailure，其余文件照常接收；
+    文件数量或请求体总大小超限时拒绝整个请求。
+
+    Args:
+        request: 请求对象
+        field_name: 文件字段名（可重复）
+        max_files: 最大文件数
+        max_total_bytes: 请求体最大字节数
+        max_bytes: 单个文件最大字节数
+        max_pixels: 图像最大像素数
+        sniff_bytes: 图像头探测的最大字节数
+        spool_max_memory: 每个暂存文件保留在内存中的最大字节数
+
+    Returns:
+        按上传顺序排列的 SpooledUpload / UploadFailure（调用方负责 close SpooledUpload）
+
+    Raises:
+        UploadRejected: 请求格式错误、没有文件、文件数量或总大小超限
+    """
+    receiver = _Receiver(
+        field_name=field_name,
+        max_bytes=max_bytes,
+        max_pixels=max_pixels,
+        sniff_bytes=sniff_bytes,
+        allowed_formats=UPLOAD_ALLOWED_IMAGE_FORMATS,
+        spool_max_memory=spool_max_memory,
+        max_files=max_files,
+        fail_fast=False
+    )
+    await _receive(request, receiver, max_total_bytes, f"请求总大小超过限制 {max_total_bytes // 1024 // 1024}MB")
+
+    if not receiver.files:
+        receiver.close()
+        raise UploadRejected(400, f"缺少文件字段 {field_name}")
+
+    results: list[Union[SpooledUpload, UploadFailure]] = []
+    for received in receiver.files:
+        if received.error is None:
+            results.append(received.upload())
+        else:
+            received.spool.close()
+            results.append(UploadFailure(received.filename, received.error.status_code, received.error.detail))
+    return results
@@ -3,9 +3,9 @@
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.dependencies.deps import get_client_ip, get_db, get_user_agent
+from app.dependencies.deps import get_client_ip, get_usage_ingest, get_user_agent
+from app.modules.tools.ingest import UsageIngestBuffer
 from app.modules.tools.schemas import ToolDetailResponse, ToolListResponse, ToolRefreshResponse
 from app.modules.tools.service import tool_service
 
@@ -67,26 +67,28 @@ async def refresh_tools():
     )
 
 
-@router.post("/record", summary="记录工具使用")
+@router.post("/record", status_code=202, summary="记录工具使用")
 async def record_usage(
     request: Request,
-    db: AsyncSession = Depends(get_db),
+    ingest: UsageIngestBuffer = Depends(get_usage_ingest)
 ):
     """
     记录工具使用情况
 
+    记录放入写缓冲后立即返回，不等待数据库提交；由后台按批次写入（见 modules/tools/ingest.py）。
+
     Args:
         request: FastAPI 请求对象
-        db: 数据库会话（依赖注入）
+        ingest: 工具使用记录写缓冲（依赖注入）
 
     Returns:
-        记录ID
+        接收结果
 
     Raises:
-        HTTPException: 参数错误时抛出400错误
+        HTTPException: 参数错误时抛出400错误，写缓冲已满时抛出503错误
     """
     try:
-        from app.modules.tools.crud import tool_usage_crud
+        # 解析请求体
         data = await request.json()
 
         tool_id = data.get("tool_id")
@@ -97,11 +99,11 @@ async def record_usage(
         if not tool_id or not tool_name:
             raise HTTPException(status_code=400, detail="tool_id and tool_name are required")
 
-        ip_address = get_client_ip(request)
+        # 获取客户端信息
+        ip_address = await get_client_ip(request)
         user_agent = get_user_agent(request)
 
-        usage = await tool_usage_crud.create(
-            db=db,
+        accepted = await ingest.record(
             tool_id=tool_id,
             tool_name=tool_name,
             ip_address=ip_address,
@@ -110,16 +112,12 @@ async def record_usage(
             extra_data=extra_data
         )
 
-        await db.commit()
-
-        return {
-            "success": True,
-            "usage_id": usage.id
-        }
-
     except HTTPException:
-        await db.rollback()
         raise
     except Exception as e:
-        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
+
+    if not accepted:
+        raise HTTPException(status_code=503, detail="Usage buffer is full", headers={"Retry-After": "1"})
+
+    return {"success": True}
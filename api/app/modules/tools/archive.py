@@ -0,0 +1,148 @@
+"""
+工具使用记录归档文件
+
+归档目录按创建日期（UTC）分区，每个分区由若干 zstd 压缩的 NDJSON 文件组成：
+
+    {USAGE_ARCHIVE_DIR}/date=2026-01-01/part-000000001200-000000006199.ndjson.zst
+
+每行一条记录（与 tool_usage 的列一致，时间为 ISO 8601 字符串）。文件名由该文件中记录的
+最小 / 最大 id 决定，同一批记录重复归档时覆盖同名文件；归档截止时间取整到天（见 retention.py），
+中断后重新归档时同一分区读到的记录集合不变。文件先写入临时文件再原子重命名，读取方不会看到写了一半的文件。
+
+截止时间变化（如调小保留天数）等情况下同一记录仍可能出现在两个文件中，读取时在分区内按 id 去重。
+归档任务通过 archive_lock 保证同一归档目录同时只有一个进程写入（多 worker / 手动执行时）。
+"""
+import contextlib
+import fcntl
+import io
+import json
+import os
+from collections.abc import Iterator
+from datetime import date, datetime
+from pathlib import Path
+from typing import Optional
+
+import zstandard
+
+from app.core.constants import USAGE_ARCHIVE_ZSTD_LEVEL
+
+
+ARCHIVE_SUFFIX = ".ndjson.zst"
+LOCK_NAME = ".lock"
+
+
+def _partition_dir(archive_dir: Path, day: date) -> Path:
+    return archive_dir / f"date={day.isoformat()}"
+
+
+@contextlib.contextmanager
+def archive_lock(archive_dir: Path) -> Iterator[bool]:
+    """
+    归档目录的进程间互斥锁（非阻塞，进程退出时自动释放）
+
+    Args:
+        archive_dir: 归档根目录
+
+    Yields:
+        是否获得锁（已被其他进程持有时为 False）
+    """
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    with open(archive_dir / LOCK_NAME, "a") as f:
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def write_partitions(archive_dir: Path, rows: list[dict], level: int = USAGE_ARCHIVE_ZSTD_LEVEL) -> list[Path]:
+    """
+    按创建日期分区写入归档文件（阻塞调用，需在线程中执行）
+
+    Args:
+        archive_dir: 归档根目录
+        rows: 记录字典列表（含 id 与 created_at）
+        level: zstd 压缩级别
+
+    Returns:
+        写入的文件路径列表
+    """
+    partitions: dict[date, list[dict]] = {}
+    for row in rows:
+        partitions.setdefault(row["created_at"].date(), []).append(row)
+
+    compressor = zstandard.ZstdCompressor(level=level)
+    paths = []
+    for day, day_rows in sorted(partitions.items()):
+        directory = _partition_dir(archive_dir, day)
+        directory.mkdir(parents=True, exist_ok=True)
+        ids = [row["id"] for row in day_rows]
+        path = directory / f"part-{min(ids):012d}-{max(ids):012d}{ARCHIVE_SUFFIX}"
+
+        payload = "".join(json.dumps(row, ensure_ascii=False, default=_encode) + "\n" for row in day_rows)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(compressor.compress(payload.encode()))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        paths.append(path)
+    return paths
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def scan_archive(
+    archive_dir: Path,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    tool_id: Optional[str] = None
+) -> Iterator[dict]:
+    """
+    流式读取归档记录（只打开日期范围内的分区，逐行解压解析，分区内按 id 去重）
+
+    Args:
+        archive_dir: 归档根目录
+        start: 起始时间（含，UTC）
+        end: 结束时间（不含，UTC）
+        tool_id: 工具ID（可选）
+
+    Yields:
+        记录字典（created_at / updated_at 为 datetime）
+    """
+    if not archive_dir.exists():
+        return
+
+    decompressor = zstandard.ZstdDecompressor()
+    for directory in sorted(archive_dir.glob("date=*")):
+        day = date.fromisoformat(directory.name.removeprefix("date="))
+        if start is not None and day < start.date():
+            continue
+        if end is not None and datetime.combine(day, datetime.min.time()) >= end:
+            continue
+
+        # 同一记录只会出现在其创建日期的分区中，去重集合只需覆盖一个分区
+        seen: set[int] = set()
+        for path in sorted(directory.glob(f"*{ARCHIVE_SUFFIX}")):
+            with open(path, "rb") as f, io.TextIOWrapper(decompressor.stream_reader(f), encoding="utf-8") as lines:
+                for line in lines:
+                    row = json.loads(line)
+                    if row["id"] in seen:
+                        continue
+                    seen.add(row["id"])
+                    if tool_id and row["tool_id"] != tool_id:
+                        continue
+                    row["created_at"] = datetime.fromisoformat(row["created_at"])
+                    if (start is not None and row["created_at"] < start) or (end is not None and row["created_at"] >= end):
+                        continue
+                    if row.get("updated_at"):
+                        row["updated_at"] = datetime.fromisoformat(row["updated_at"])
+                    yield row
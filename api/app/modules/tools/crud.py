@@ -1,12 +1,15 @@
 """
 工具管理 CRUD 操作
 """
+import time
 from typing import Optional
 
-from sqlalchemy import desc, select
+from sqlalchemy import desc, func, insert, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.constants import USAGE_COUNT_CACHE_MAX_KEYS, USAGE_COUNT_CACHE_TTL
 from app.modules.tools.models import ToolUsage
+from app.modules.tools.pagination import decode_cursor, encode_cursor
 
 
 class ToolUsageCRUD:
@@ -50,6 +53,22 @@ class ToolUsageCRUD:
         await db.flush()
         return db_obj
 
+    async def create_many(self, db: AsyncSession, rows: list[dict]) -> int:
+        """
+        批量创建工具使用记录（单条多行 INSERT，不回读主键）
+
+        Args:
+            db: 数据库会话
+            rows: 记录字典列表（键与 create 的参数一致，可包含 created_at / updated_at）
+
+        Returns:
+            写入的记录数
+        """
+        if not rows:
+            return 0
+        await db.execute(insert(ToolUsage.__table__).values(rows))
+        return len(rows)
+
     async def get(self, db: AsyncSession, id: int) -> Optional[ToolUsage]:
         """根据 ID 获取工具使用记录"""
         result = await db.execute(select(ToolUsage).where(ToolUsage.id == id))
@@ -105,6 +124,107 @@ class ToolUsageCRUD:
         )
         return result.scalars().all()
 
+    async def get_page(
+        self,
+        db: AsyncSession,
+        *,
+        tool_id: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> tuple[list[ToolUsage], Optional[str]]:
+        """
+        按 (created_at, id) 倒序键集分页获取使用记录
+
+        Args:
+            db: 数据库会话
+            tool_id: 工具ID（可选）
+            cursor: 上一页返回的游标（为空时获取第一页）
+            limit: 返回数量
+
+        Returns:
+            (使用记录列表, 下一页游标)；没有更多记录时游标为 None
+
+        Raises:
+            InvalidCursorError: 游标格式错误
+        """
+        query = select(ToolUsage)
+        if tool_id:
+            query = query.where(ToolUsage.tool_id == tool_id)
+        if cursor:
+            query = query.where(tuple_(ToolUsage.created_at, ToolUsage.id) < tuple_(*decode_cursor(cursor)))
+
+        result = await db.execute(
+            query.order_by(desc(ToolUsage.created_at), desc(ToolUsage.id)).limit(limit + 1)
+        )
+        usages = list(result.scalars().all())
+        if len(usages) <= limit:
+            return usages, None
+
+        usages = usages[:limit]
+        return usages, encode_cursor(usages[-1].created_at, usages[-1].id)
+
+    async def count(self, db: AsyncSession, tool_id: Optional[str] = None) -> int:
+        """
+        统计使用记录数
+
+        Args:
+            db: 数据库会话
+            tool_id: 工具ID（可选）
+
+        Returns:
+            记录数
+        """
+        query = select(func.count()).select_from(ToolUsage)
+        if tool_id:
+            query = query.where(ToolUsage.tool_id == tool_id)
+        return (await db.execute(query)).scalar_one()
+
+
+class UsageCountCache:
+    """使用记录数缓存（COUNT(*) 需扫描索引，结果缓存 ttl 秒，允许短时间内偏小）"""
+
+    def __init__(self, ttl: float = USAGE_COUNT_CACHE_TTL, max_keys: int = USAGE_COUNT_CACHE_MAX_KEYS):
+        """
+        初始化缓存
+
+        Args:
+            ttl: 缓存有效期（秒）
+            max_keys: 最多缓存的条目数
+        """
+        self._ttl = ttl
+        self._max_keys = max_keys
+        self._counts: dict[Optional[str], tuple[int, float]] = {}
+
+    async def get(self, db: AsyncSession, tool_id: Optional[str] = None) -> int:
+        """
+        获取使用记录数（缓存过期时重新统计）
+
+        Args:
+            db: 数据库会话
+            tool_id: 工具ID（可选）
+
+        Returns:
+            记录数
+        """
+        key = tool_id or None
+        cached = self._counts.get(key)
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+
+        count = await tool_usage_crud.count(db, tool_id=key)
+        now = time.monotonic()
+        if len(self._counts) >= self._max_keys:
+            self._counts = {k: v for k, v in self._counts.items() if v[1] > now}
+            if len(self._counts) >= self._max_keys:
+                self._counts.clear()
+        self._counts[key] = (count, now + self._ttl)
+        return count
+
+    def clear(self):
+        """清空缓存"""
+        self._counts.clear()
+
 
 # 全局 CRUD 实例
 tool_usage_crud = ToolUsageCRUD()
+usage_count_cache = UsageCountCache()
@@ -0,0 +1,244 @@
+"""
+工具使用记录写缓冲（write-behind）
+
+POST /tools/record 只把记录放入进程内缓冲后立即返回，不打开数据库会话、不等待提交：
+1. 缓冲有界（USAGE_INGEST_MAX_PENDING），已满时按策略处理（未接收的记录计入 dropped，接口返回 503）：
+   - drop：立即丢弃新记录
+   - block：等待写入腾出空位（背压），超过 USAGE_INGEST_BLOCK_TIMEOUT 秒仍无空位时丢弃
+2. 后台写入协程在暂存数达到 USAGE_INGEST_BATCH_SIZE 或距上次写入超过
+   USAGE_INGEST_FLUSH_INTERVAL 秒时，按批次用单条多行 INSERT 写入，每批一次提交（一次 fsync）
+   同一事务中更新预聚合（见 rollup.py）
+3. 写入失败时记录保留在缓冲头部，间隔 USAGE_INGEST_RETRY_INTERVAL 秒后重试
+4. 应用关闭时（lifespan）停止后台协程并写入剩余记录
+
+记录的 created_at 为接收时间而不是写入时间。进程崩溃时尚未写入的记录会丢失。
+"""
+import asyncio
+import contextlib
+import logging
+import time
+from collections import deque
+from typing import Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.constants import (
+    USAGE_INGEST_BATCH_SIZE,
+    USAGE_INGEST_BLOCK_TIMEOUT,
+    USAGE_INGEST_FLUSH_INTERVAL,
+    USAGE_INGEST_MAX_PENDING,
+    USAGE_INGEST_OVERFLOW,
+    USAGE_INGEST_RETRY_INTERVAL,
+)
+from app.db.base import utcnow
+from app.infrastructure.metrics import MetricsRegistry
+from app.modules.tools.crud import tool_usage_crud
+from app.modules.tools.rollup import usage_rollup
+
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = ("drop", "block")
+
+
+class UsageIngestBuffer:
+    """工具使用记录写缓冲"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        max_pending: int = USAGE_INGEST_MAX_PENDING,
+        batch_size: int = USAGE_INGEST_BATCH_SIZE,
+        flush_interval: float = USAGE_INGEST_FLUSH_INTERVAL,
+        overflow: str = USAGE_INGEST_OVERFLOW,
+        block_timeout: float = USAGE_INGEST_BLOCK_TIMEOUT,
+        retry_interval: float = USAGE_INGEST_RETRY_INTERVAL
+    ):
+        """
+        初始化写缓冲
+
+        Args:
+            session_factory: 数据库会话工厂
+            max_pending: 最多暂存的记录数
+            batch_size: 单次 INSERT 的最大记录数
+            flush_interval: 暂存记录的最长等待写入时间（秒）
+            overflow: 缓冲已满时的策略（drop / block）
+            block_timeout: block 策略下等待空位的最长时间（秒）
+            retry_interval: 写入失败后的重试间隔（秒）
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+
+        self._session_factory = session_factory
+        self._max_pending = max(1, max_pending)
+        self._batch_size = max(1, batch_size)
+        self._flush_interval = flush_interval
+        self._overflow = overflow
+        self._block_timeout = block_timeout
+        self._retry_interval = retry_interval
+
+        self._pending: deque[dict] = deque()
+        self._flush_needed: Optional[asyncio.Event] = None
+        self._space_available: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        self.accepted = 0
+        self.dropped = 0
+        self.written = 0
+        self.flushes = 0
+        self.flush_errors = 0
+        self.metrics = self._create_metrics()
+
+    def _create_metrics(self) -> MetricsRegistry:
+        """创建写缓冲指标（导出时读取当前值）"""
+        metrics = MetricsRegistry()
+        metrics.gauge("tool_usage_ingest_pending", "暂存待写入的工具使用记录数", collect=lambda: len(self._pending))
+        metrics.counter("tool_usage_ingest_accepted_total", "接收的工具使用记录数", collect=lambda: self.accepted)
+        metrics.counter("tool_usage_ingest_dropped_total", "缓冲已满被丢弃的工具使用记录数", collect=lambda: self.dropped)
+        metrics.counter("tool_usage_ingest_written_total", "已写入数据库的工具使用记录数", collect=lambda: self.written)
+        metrics.counter("tool_usage_ingest_flush_errors_total", "批量写入失败次数", collect=lambda: self.flush_errors)
+        return metrics
+
+    async def start(self):
+        """启动后台写入协程"""
+        self._flush_needed = asyncio.Event()
+        self._space_available = asyncio.Event()
+        self._worker = asyncio.create_task(self._run())
+        logger.info(
+            f"UsageIngestBuffer started: max_pending={self._max_pending}, batch_size={self._batch_size}, "
+            f"flush_interval={self._flush_interval}, overflow={self._overflow}"
+        )
+
+    async def stop(self):
+        """停止后台写入协程（先写入剩余记录；不取消进行中的写入，避免已提交的批次被重复写入）"""
+        if self._worker is not None:
+            self._stopping = True
+            self._flush_needed.set()
+            await self._worker
+            self._worker = None
+
+        if self._pending:
+            logger.error(f"UsageIngestBuffer stopped with {len(self._pending)} unwritten records")
+        logger.info(f"UsageIngestBuffer stopped: {self.get_stats()}")
+
+    async def record(
+        self,
+        *,
+        tool_id: str,
+        tool_name: str,
+        ip_address: str,
+        user_agent: Optional[str] = None,
+        anonymous_id: Optional[str] = None,
+        extra_data: Optional[dict] = None
+    ) -> bool:
+        """
+        接收一条工具使用记录（不等待写入）
+
+        Args:
+            tool_id: 工具ID
+            tool_name: 工具名称
+            ip_address: IP地址
+            user_agent: 用户代理
+            anonymous_id: 匿名用户ID
+            extra_data: 额外数据
+
+        Returns:
+            是否已放入缓冲（缓冲已满且 drop 策略 / block 超时时为 False）
+        """
+        if len(self._pending) >= self._max_pending and not await self._wait_for_space():
+            self.dropped += 1
+            return False
+
+        now = utcnow()
+        self._pending.append({
+            "tool_id": tool_id,
+            "tool_name": tool_name,
+            "ip_address": ip_address,
+            "user_agent": user_agent or "",
+            "anonymous_id": anonymous_id,
+            "extra_data": extra_data or {},
+            "created_at": now,
+            "updated_at": now,
+        })
+        self.accepted += 1
+        if len(self._pending) >= self._batch_size and self._flush_needed is not None:
+            self._flush_needed.set()
+        return True
+
+    async def _wait_for_space(self) -> bool:
+        """block 策略：等待写入腾出空位"""
+        if self._overflow != "block" or self._space_available is None:
+            return False
+
+        deadline = time.monotonic() + self._block_timeout
+        while len(self._pending) >= self._max_pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            self._space_available.clear()
+            self._flush_needed.set()
+            try:
+                await asyncio.wait_for(self._space_available.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                return False
+        return True
+
+    async def _run(self):
+        """后台写入协程：按数量 / 时间触发批量写入，失败后按重试间隔再次写入"""
+        timeout = self._flush_interval
+        while True:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._flush_needed.wait(), timeout=timeout)
+            self._flush_needed.clear()
+
+            succeeded = await self._flush_all()
+            if self._stopping:
+                return
+            timeout = self._flush_interval if succeeded else self._retry_interval
+
+    async def _flush_all(self) -> bool:
+        """写入所有暂存记录（遇到失败时停止）"""
+        while self._pending:
+            if not await self._flush_batch():
+                return False
+        return True
+
+    async def _flush_batch(self) -> bool:
+        """
+        写入一个批次（单条多行 INSERT + 一次提交）
+
+        Returns:
+            是否写入成功（失败时记录放回缓冲头部）
+        """
+        batch = [self._pending.popleft() for _ in range(min(self._batch_size, len(self._pending)))]
+        start = time.perf_counter()
+        try:
+            async with self._session_factory() as session:
+                await tool_usage_crud.create_many(session, batch)
+                await usage_rollup.apply(session, batch)
+                await session.commit()
+        except Exception as e:
+            self._pending.extendleft(reversed(batch))
+            self.flush_errors += 1
+            logger.error(f"Failed to write usage records: count={len(batch)}, error={e}")
+            return False
+
+        self.written += len(batch)
+        self.flushes += 1
+        if self._space_available is not None:
+            self._space_available.set()
+        logger.debug(f"Usage records written: count={len(batch)}, elapsed_ms={(time.perf_counter() - start) * 1000:.1f}")
+        return True
+
+    def get_stats(self) -> dict:
+        """导出统计信息"""
+        return {
+            "pending": len(self._pending),
+            "max_pending": self._max_pending,
+            "accepted": self.accepted,
+            "dropped": self.dropped,
+            "written": self.written,
+            "flushes": self.flushes,
+            "flush_errors": self.flush_errors,
+        }
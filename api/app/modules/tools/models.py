@@ -1,7 +1,7 @@
 """
 工具管理模型
 """
-from sqlalchemy import JSON, Column, Index, String
+from sqlalchemy import JSON, Column, DateTime, Index, Integer, LargeBinary, String, UniqueConstraint
 
 from app.db.base import BaseModel, TimestampMixin
 
@@ -23,9 +23,33 @@ class ToolUsage(BaseModel, TimestampMixin):
     # 额外数据
     extra_data = Column(JSON, default={}, nullable=False, comment="额外数据")
 
+    # 键集分页按 (created_at, id) 倒序：全部记录走 idx_created_id，按工具筛选走 idx_tool_id_created
     __table_args__ = (
-        Index('idx_tool_id_created', 'tool_id', 'created_at'),
+        Index('idx_tool_id_created', 'tool_id', 'created_at', 'id'),
+        Index('idx_created_id', 'created_at', 'id'),
     )
 
     def __repr__(self):
         return f"<ToolUsage {self.tool_name} - {self.created_at}>"
+
+
+class ToolUsageRollup(BaseModel, TimestampMixin):
+    """工具使用记录预聚合（按工具、小时 / 天分桶，随使用记录写入同一事务更新）"""
+
+    __tablename__ = "tool_usage_rollup"
+
+    granularity = Column(String(8), nullable=False, comment="分桶粒度（hour / day）")
+    tool_id = Column(String(100), nullable=False, comment="工具ID")
+    bucket_start = Column(DateTime, nullable=False, comment="分桶起始时间（UTC）")
+
+    count = Column(Integer, default=0, nullable=False, comment="使用次数")
+    anonymous_sketch = Column(LargeBinary, nullable=False, comment="匿名用户ID HyperLogLog 草图")
+    ip_sketch = Column(LargeBinary, nullable=False, comment="IP地址 HyperLogLog 草图")
+
+    __table_args__ = (
+        UniqueConstraint('granularity', 'tool_id', 'bucket_start', name='uq_rollup_tool_bucket'),
+        Index('idx_rollup_bucket', 'granularity', 'bucket_start'),
+    )
+
+    def __repr__(self):
+        return f"<ToolUsageRollup {self.tool_id} {self.granularity} {self.bucket_start}>"
@@ -0,0 +1,52 @@
+"""
+工具使用记录游标分页
+
+按 (created_at, id) 倒序做键集分页：下一页条件为 (created_at, id) < 上一页最后一行，
+由 (created_at, id) / (tool_id, created_at, id) 索引直接定位，翻页耗时与页码无关。
+游标为上一页最后一行的 (created_at, id)，编码为不透明的 URL 安全字符串。
+"""
+import base64
+import json
+from datetime import datetime
+
+
+class InvalidCursorError(ValueError):
+    """游标格式错误"""
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    """
+    编码游标
+
+    Args:
+        created_at: 最后一行的创建时间
+        id: 最后一行的主键
+
+    Returns:
+        URL 安全的游标字符串
+    """
+    payload = json.dumps([created_at.isoformat(), id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    解码游标
+
+    Args:
+        cursor: encode_cursor 生成的游标
+
+    Returns:
+        (created_at, id)
+
+    Raises:
+        InvalidCursorError: 游标格式错误
+    """
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id = json.loads(payload)
+        if not isinstance(id, int) or isinstance(id, bool):
+            raise TypeError(id)
+        return datetime.fromisoformat(created_at), id
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
@@ -0,0 +1,265 @@
+"""
+工具使用记录保留与归档
+
+默认关闭（USAGE_RETENTION_DAYS=0）。设置 USAGE_RETENTION_DAYS > 0 后，
+后台任务每隔 USAGE_RETENTION_INTERVAL 秒把创建时间早于 USAGE_RETENTION_DAYS 天的记录移出业务库：
+1. 截止时间在每次执行开始时确定，并向下取整到 UTC 零点，只归档完整的日期
+2. 按 (created_at, id) 顺序每次读取 USAGE_RETENTION_CHUNK_SIZE 条，写入按日期分区的归档文件（见 archive.py）
+3. 文件落盘后在一个短事务中删除这批记录，写缓冲只需等待一个小事务
+4. 全部归档后执行 PRAGMA incremental_vacuum 归还空闲页，并截断 WAL
+
+中途失败或进程退出时，下次从同一批记录重新开始：截止时间取整到天，之后的执行即使截止时间更晚，
+已有分区读到的记录集合也不变，同名归档文件被覆盖，不会重复或丢失。
+每次执行持有归档目录的文件锁，多个 worker 进程（WORKERS>1）或手动执行时只有一个进程归档，其余跳过。
+使用统计的预聚合（rollup.py）不删除，归档后仍可查询历史统计。
+
+已有数据库需执行一次 VACUUM 切换到 auto_vacuum=INCREMENTAL（会重写整个数据库文件，需停机执行）：
+
+    python -m app.modules.tools.retention vacuum
+
+手动归档 / 读取归档：
+
+    python -m app.modules.tools.retention run [--days 90]
+    python -m app.modules.tools.retention scan --start 2025-01-01 --end 2025-02-01 [--tool-id remove-bg]
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Optional
+
+from sqlalchemy import delete, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.constants import (
+    USAGE_RETENTION_CHUNK_SIZE,
+    USAGE_RETENTION_INITIAL_DELAY,
+    USAGE_RETENTION_INTERVAL,
+)
+from app.db.base import utcnow
+from app.modules.tools.archive import archive_lock, scan_archive, write_partitions
+from app.modules.tools.models import ToolUsage
+
+
+logger = logging.getLogger(__name__)
+
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+class UsageRetention:
+    """工具使用记录归档任务"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        archive_dir: Path,
+        retention_days: int,
+        read_session_factory: Optional[Callable[[], AsyncSession]] = None,
+        chunk_size: int = USAGE_RETENTION_CHUNK_SIZE,
+        interval: float = USAGE_RETENTION_INTERVAL,
+        initial_delay: float = USAGE_RETENTION_INITIAL_DELAY
+    ):
+        """
+        初始化归档任务
+
+        Args:
+            session_factory: 数据库会话工厂（删除记录、vacuum）
+            archive_dir: 归档根目录
+            retention_days: 业务库中保留的天数
+            read_session_factory: 只读会话工厂（读取待归档记录，默认同 session_factory）
+            chunk_size: 每个删除事务的记录数
+            interval: 执行间隔（秒）
+            initial_delay: 启动后首次执行的延迟（秒）
+        """
+        self._session_factory = session_factory
+        self._read_session_factory = read_session_factory or session_factory
+        self._archive_dir = archive_dir
+        self._retention_days = retention_days
+        self._chunk_size = max(1, chunk_size)
+        self._interval = interval
+        self._initial_delay = initial_delay
+        self._worker: Optional[asyncio.Task] = None
+        self._vacuum_warned = False
+
+        self.runs = 0
+        self.archived = 0
+        self.reclaimed_bytes = 0
+
+    async def start(self):
+        """启动后台归档任务"""
+        self._worker = asyncio.create_task(self._run())
+        logger.info(
+            f"UsageRetention started: retention_days={self._retention_days}, archive_dir={self._archive_dir}, "
+            f"interval={self._interval}s"
+        )
+
+    async def stop(self):
+        """停止后台归档任务（中断的批次下次重新归档）"""
+        if self._worker is not None:
+            self._worker.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._worker
+            self._worker = None
+        logger.info(f"UsageRetention stopped: {self.get_stats()}")
+
+    async def _run(self):
+        await asyncio.sleep(self._initial_delay)
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Usage retention failed: {e}")
+            await asyncio.sleep(self._interval)
+
+    async def run_once(self, now: Optional[datetime] = None) -> int:
+        """
+        归档并删除过期记录，然后归还空闲页（其他进程正在归档时跳过）
+
+        Args:
+            now: 当前时间（UTC，测试用）
+
+        Returns:
+            归档的记录数
+        """
+        with archive_lock(self._archive_dir) as locked:
+            if not locked:
+                logger.info("Usage retention skipped: another process is archiving")
+                return 0
+            return await self._run_locked(now or utcnow())
+
+    async def _run_locked(self, now: datetime) -> int:
+        cutoff = (now - timedelta(days=self._retention_days)).replace(hour=0, minute=0, second=0, microsecond=0)
+        started = time.perf_counter()
+        total = 0
+        while True:
+            archived = await self._archive_chunk(cutoff)
+            if not archived:
+                break
+            total += archived
+            await asyncio.sleep(0)
+
+        if total:
+            await self._incremental_vacuum()
+        self.runs += 1
+        self.archived += total
+        logger.info(
+            f"Usage retention completed: archived={total}, cutoff={cutoff.isoformat()}, "
+            f"elapsed={time.perf_counter() - started:.1f}s"
+        )
+        return total
+
+    async def _archive_chunk(self, cutoff: datetime) -> int:
+        """归档一批过期记录（先写文件，再删除），返回记录数"""
+        table = ToolUsage.__table__
+        async with self._read_session_factory() as session:
+            result = await session.execute(
+                select(table)
+                .where(table.c.created_at < cutoff)
+                .order_by(table.c.created_at, table.c.id)
+                .limit(self._chunk_size)
+            )
+            rows = [dict(row) for row in result.mappings()]
+        if not rows:
+            return 0
+
+        await asyncio.to_thread(write_partitions, self._archive_dir, rows)
+
+        # 过期记录不再修改，按读取时最后一行的 (created_at, id) 删除同一批记录
+        last = rows[-1]
+        async with self._session_factory() as session:
+            await session.execute(
+                delete(table).where(
+                    table.c.created_at < cutoff,
+                    tuple_(table.c.created_at, table.c.id) <= tuple_(last["created_at"], last["id"])
+                )
+            )
+            await session.commit()
+        return len(rows)
+
+    async def _incremental_vacuum(self):
+        """归还空闲页并截断 WAL（仅 SQLite 且 auto_vacuum=INCREMENTAL 时）"""
+        async with self._session_factory() as session:
+            if session.bind.dialect.name != "sqlite":
+                return
+
+            if (await session.execute(text("PRAGMA auto_vacuum"))).scalar_one() != AUTO_VACUUM_INCREMENTAL:
+                if not self._vacuum_warned:
+                    self._vacuum_warned = True
+                    logger.warning(
+                        "auto_vacuum is not INCREMENTAL, deleted pages are kept in the database file; "
+                        "run `python -m app.modules.tools.retention vacuum` once to enable it"
+                    )
+                return
+
+            page_size = (await session.execute(text("PRAGMA page_size"))).scalar_one()
+            free_pages = (await session.execute(text("PRAGMA freelist_count"))).scalar_one()
+            # sqlite3 的 execute 对该 PRAGMA 只执行一步（只归还一页），executescript 才会执行到结束
+            connection = await session.connection()
+            raw_connection = await connection.get_raw_connection()
+            await raw_connection.driver_connection.executescript("PRAGMA incremental_vacuum; PRAGMA wal_checkpoint(TRUNCATE);")
+
+        self.reclaimed_bytes += free_pages * page_size
+        logger.info(f"Incremental vacuum reclaimed {free_pages * page_size / 1024 / 1024:.1f} MB")
+
+    def get_stats(self) -> dict:
+        """导出统计信息"""
+        return {
+            "retention_days": self._retention_days,
+            "runs": self.runs,
+            "archived": self.archived,
+            "reclaimed_bytes": self.reclaimed_bytes,
+        }
+
+
+async def _run(args):
+    from app.core.config import settings
+    from app.db.init_db import init_db
+    from app.db.session import AsyncSessionLocal, dispose_engines
+
+    await init_db()
+    if args.command == "run":
+        days = args.days if args.days is not None else settings.USAGE_RETENTION_DAYS
+        if days <= 0:
+            logger.error("Usage retention is disabled (USAGE_RETENTION_DAYS=0), pass --days to archive manually")
+            await dispose_engines()
+            return
+        retention = UsageRetention(AsyncSessionLocal, settings.USAGE_ARCHIVE_DIR, days)
+        await retention.run_once()
+    else:
+        async with AsyncSessionLocal() as session:
+            await session.execute(text("PRAGMA auto_vacuum=INCREMENTAL"))
+            await session.execute(text("VACUUM"))
+        logger.info("Database vacuumed, auto_vacuum=INCREMENTAL")
+    await dispose_engines()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive old tool usage records")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="立即归档过期记录")
+    run_parser.add_argument("--days", type=int, default=None, help="保留天数（默认 USAGE_RETENTION_DAYS）")
+    subparsers.add_parser("vacuum", help="执行 VACUUM 并切换到 auto_vacuum=INCREMENTAL（需停机）")
+    scan_parser = subparsers.add_parser("scan", help="以 NDJSON 输出归档记录")
+    scan_parser.add_argument("--start", type=datetime.fromisoformat, default=None, help="起始时间（UTC，含）")
+    scan_parser.add_argument("--end", type=datetime.fromisoformat, default=None, help="结束时间（UTC，不含）")
+    scan_parser.add_argument("--tool-id", default=None, help="工具ID")
+    args = parser.parse_args()
+
+    if args.command == "scan":
+        from app.core.config import settings
+
+        for row in scan_archive(settings.USAGE_ARCHIVE_DIR, start=args.start, end=args.end, tool_id=args.tool_id):
+            sys.stdout.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+        return
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
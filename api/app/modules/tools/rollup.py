@@ -0,0 +1,314 @@
+"""
+工具使用记录预聚合
+
+按 (粒度, 工具, 分桶起始时间) 维护使用次数与不重复匿名用户 / IP 的 HyperLogLog 草图：
+1. 写缓冲每写入一批原始记录，在同一事务中把该批记录合并进对应的小时 / 天分桶，
+   原始记录与预聚合一起提交或回滚，不会重复计数
+2. /tools/usage/stats 只读取时间范围内的分桶行并合并草图，耗时与原始记录数无关
+3. 预聚合上线前的历史记录（或修改草图精度后）用离线命令重建：
+
+    python -m app.modules.tools.rollup --since 2026-01-01
+
+重建只覆盖业务库中最早记录所在日期及之后的分桶：已归档（从业务库删除，见 retention.py）的日期
+只剩预聚合，不会被删除。
+
+不重复数为近似值（见 USAGE_ROLLUP_HLL_PRECISION）；跨分桶的不重复数由草图合并得到，不是各分桶之和。
+"""
+import argparse
+import asyncio
+import logging
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.constants import USAGE_ROLLUP_HLL_PRECISION, USAGE_STATS_MAX_BUCKETS
+from app.modules.tools.models import ToolUsage, ToolUsageRollup
+from app.utils.hyperloglog import HyperLogLog
+
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+
+
+def bucket_start(timestamp: datetime, granularity: str) -> datetime:
+    """
+    计算时间所在分桶的起始时间
+
+    Args:
+        timestamp: 时间（UTC，不带时区）
+        granularity: 分桶粒度（hour / day）
+
+    Returns:
+        分桶起始时间
+    """
+    timestamp = timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(hour=0) if granularity == "day" else timestamp
+
+
+@dataclass
+class _Bucket:
+    """内存中的分桶聚合值"""
+    count: int
+    anonymous: HyperLogLog
+    ips: HyperLogLog
+
+
+def _union(a: HyperLogLog, b: HyperLogLog) -> HyperLogLog:
+    """合并两个草图（精度不同时降到较低的精度）"""
+    precision = min(a.precision, b.precision)
+    merged = a.reduce(precision)
+    merged.merge(b.reduce(precision))
+    return merged
+
+
+class UsageRollup:
+    """工具使用记录预聚合"""
+
+    def __init__(self, precision: int = USAGE_ROLLUP_HLL_PRECISION):
+        """
+        初始化预聚合
+
+        Args:
+            precision: HyperLogLog 精度
+        """
+        self._precision = precision
+
+    def _new_bucket(self, precision: Optional[int] = None) -> _Bucket:
+        precision = precision or self._precision
+        return _Bucket(count=0, anonymous=HyperLogLog(precision), ips=HyperLogLog(precision))
+
+    def _aggregate(self, rows: Iterable, buckets: dict[tuple, _Bucket]):
+        """把原始记录（字典或带同名属性的行）累加到内存分桶"""
+        for row in rows:
+            if isinstance(row, dict):
+                tool_id, created_at = row["tool_id"], row["created_at"]
+                anonymous_id, ip_address = row.get("anonymous_id"), row.get("ip_address")
+            else:
+                tool_id, created_at, anonymous_id, ip_address = row.tool_id, row.created_at, row.anonymous_id, row.ip_address
+
+            for granularity in GRANULARITIES:
+                key = (granularity, tool_id, bucket_start(created_at, granularity))
+                bucket = buckets.get(key)
+                if bucket is None:
+                    bucket = buckets[key] = self._new_bucket()
+                bucket.count += 1
+                if anonymous_id:
+                    bucket.anonymous.add(anonymous_id)
+                if ip_address:
+                    bucket.ips.add(ip_address)
+
+    async def _merge(self, db: AsyncSession, buckets: dict[tuple, _Bucket]):
+        """把内存分桶合并进预聚合表（已存在的行合并草图，否则插入新行）"""
+        if not buckets:
+            return
+
+        result = await db.execute(
+            select(ToolUsageRollup).where(
+                tuple_(ToolUsageRollup.granularity, ToolUsageRollup.tool_id, ToolUsageRollup.bucket_start).in_(
+                    list(buckets)
+                )
+            )
+        )
+        existing = {(row.granularity, row.tool_id, row.bucket_start): row for row in result.scalars()}
+
+        for key, bucket in buckets.items():
+            row = existing.get(key)
+            if row is None:
+                granularity, tool_id, start = key
+                db.add(ToolUsageRollup(
+                    granularity=granularity,
+                    tool_id=tool_id,
+                    bucket_start=start,
+                    count=bucket.count,
+                    anonymous_sketch=bucket.anonymous.to_bytes(),
+                    ip_sketch=bucket.ips.to_bytes()
+                ))
+                continue
+
+            anonymous = _union(HyperLogLog.from_bytes(row.anonymous_sketch), bucket.anonymous)
+            ips = _union(HyperLogLog.from_bytes(row.ip_sketch), bucket.ips)
+            row.count += bucket.count
+            row.anonymous_sketch = anonymous.to_bytes()
+            row.ip_sketch = ips.to_bytes()
+        await db.flush()
+
+    async def apply(self, db: AsyncSession, rows: list[dict]):
+        """
+        把一批新写入的原始记录合并进预聚合（由调用方提交）
+
+        需在同一事务中先写入原始记录：SQLite 写事务此时已持有写锁，
+        读取-合并-写回分桶行的过程不会与其他进程交错。
+
+        Args:
+            db: 数据库会话
+            rows: 原始记录字典列表（含 tool_id / created_at / anonymous_id / ip_address）
+        """
+        buckets: dict[tuple, _Bucket] = {}
+        self._aggregate(rows, buckets)
+        await self._merge(db, buckets)
+
+    async def rebuild(self, db: AsyncSession, since: Optional[datetime] = None) -> int:
+        """
+        从原始记录重建预聚合（由调用方提交；在一个写事务中完成，期间写入的记录等待该事务）
+
+        起始时间不早于业务库中最早记录所在的日期：更早的日期已归档，原始记录不在业务库中，
+        其预聚合保持不变。因此修改 HyperLogLog 精度后重建只以新精度重写仍有原始记录的日期，
+        已归档日期的草图保持原精度；查询跨越这些日期时统一降到其中最低的精度再合并
+        （调高精度只对未归档的日期生效）。
+
+        Args:
+            db: 数据库会话
+            since: 起始时间（向下取整到天；为空时从最早记录所在日期开始）
+
+        Returns:
+            参与重建的原始记录数
+        """
+        earliest = (await db.execute(select(func.min(ToolUsage.created_at)))).scalar_one()
+        if earliest is None:
+            return 0
+        earliest_day = bucket_start(earliest, "day")
+        since = earliest_day if since is None else max(earliest_day, bucket_start(since, "day"))
+
+        query = select(
+            ToolUsage.tool_id, ToolUsage.created_at, ToolUsage.anonymous_id, ToolUsage.ip_address
+        ).where(ToolUsage.created_at >= since)
+        await db.execute(delete(ToolUsageRollup).where(ToolUsageRollup.bucket_start >= since))
+
+        buckets: dict[tuple, _Bucket] = {}
+        total = 0
+        result = await db.stream(query.execution_options(yield_per=5000))
+        async for partition in result.partitions():
+            self._aggregate(partition, buckets)
+            total += len(partition)
+
+        await self._merge(db, buckets)
+        return total
+
+    async def query(
+        self,
+        db: AsyncSession,
+        *,
+        granularity: str,
+        start: datetime,
+        end: datetime,
+        tool_id: Optional[str] = None
+    ) -> dict:
+        """
+        查询时间范围内的使用统计
+
+        Args:
+            db: 数据库会话
+            granularity: 分桶粒度（hour / day）
+            start: 起始时间（含，向下取整到分桶）
+            end: 结束时间（不含）
+            tool_id: 工具ID（为空时汇总所有工具）
+
+        Returns:
+            {"total": {...}, "buckets": [...]}；只包含有记录的分桶
+
+        Raises:
+            ValueError: 粒度无效、时间范围为空或分桶数超过 USAGE_STATS_MAX_BUCKETS
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Invalid granularity: {granularity}")
+        start = bucket_start(start, granularity)
+        if end <= start:
+            raise ValueError("end must be later than start")
+        if (end - start) / GRANULARITIES[granularity] > USAGE_STATS_MAX_BUCKETS:
+            raise ValueError(f"Time range exceeds {USAGE_STATS_MAX_BUCKETS} {granularity} buckets")
+
+        query = select(
+            ToolUsageRollup.bucket_start,
+            ToolUsageRollup.count,
+            ToolUsageRollup.anonymous_sketch,
+            ToolUsageRollup.ip_sketch
+        ).where(
+            ToolUsageRollup.granularity == granularity,
+            ToolUsageRollup.bucket_start >= start,
+            ToolUsageRollup.bucket_start < end
+        )
+        if tool_id:
+            query = query.where(ToolUsageRollup.tool_id == tool_id)
+        result = await db.execute(query.order_by(ToolUsageRollup.bucket_start))
+
+        rows = [
+            (
+                row.bucket_start,
+                row.count,
+                HyperLogLog.from_bytes(row.anonymous_sketch),
+                HyperLogLog.from_bytes(row.ip_sketch)
+            )
+            for row in result
+        ]
+        # 修改精度前写入的草图（已归档日期不参与重建）精度不同：统一降到最低精度再合并
+        precision = min(
+            (sketch.precision for _, _, anonymous, ips in rows for sketch in (anonymous, ips)),
+            default=self._precision
+        )
+
+        # 同一分桶的各工具行先合并，范围汇总再合并各分桶
+        buckets: dict[datetime, _Bucket] = {}
+        for key, count, anonymous, ips in rows:
+            anonymous = anonymous.reduce(precision)
+            ips = ips.reduce(precision)
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = _Bucket(count=count, anonymous=anonymous, ips=ips)
+                continue
+            bucket.count += count
+            bucket.anonymous.merge(anonymous)
+            bucket.ips.merge(ips)
+
+        total = self._new_bucket(precision)
+        for bucket in buckets.values():
+            total.count += bucket.count
+            total.anonymous.merge(bucket.anonymous)
+            total.ips.merge(bucket.ips)
+
+        def summary(bucket: _Bucket) -> dict:
+            return {
+                "count": bucket.count,
+                "unique_anonymous": bucket.anonymous.count(),
+                "unique_ips": bucket.ips.count(),
+            }
+
+        return {
+            "total": summary(total),
+            "buckets": [{"bucket_start": key, **summary(bucket)} for key, bucket in buckets.items()],
+        }
+
+
+# 全局预聚合实例
+usage_rollup = UsageRollup()
+
+
+async def _rebuild(since: Optional[datetime]):
+    from app.db.init_db import init_db
+    from app.db.session import AsyncSessionLocal, dispose_engines
+
+    await init_db()
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as session:
+        total = await usage_rollup.rebuild(session, since=since)
+        await session.commit()
+    await dispose_engines()
+    logger.info(f"Usage rollup rebuilt: rows={total}, since={since}, elapsed={time.perf_counter() - started:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild tool usage rollups from raw records")
+    parser.add_argument("--since", type=datetime.fromisoformat, default=None, help="起始日期（UTC，默认从业务库最早记录所在日期开始）")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    asyncio.run(_rebuild(args.since))
+
+
+if __name__ == "__main__":
+    main()
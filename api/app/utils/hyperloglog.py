@@ -0,0 +1,124 @@
+"""
+HyperLogLog 基数估计
+
+用固定大小的寄存器（2^precision 字节）估计不重复元素数，标准误差约 1.04 / sqrt(2^precision)；
+两个草图按寄存器取最大值即可合并（并集），适合按时间分桶预聚合后再跨桶求不重复数。
+精度不同的草图先由 reduce() 降到较低的精度再合并（结果与直接以低精度构建的草图相同）。
+"""
+import hashlib
+import math
+import zlib
+from typing import Optional
+
+import numpy as np
+
+
+class HyperLogLog:
+    """HyperLogLog 草图"""
+
+    def __init__(self, precision: int = 10, registers: Optional[np.ndarray] = None):
+        """
+        初始化草图
+
+        Args:
+            precision: 寄存器数量的位数（4-16），寄存器数为 2^precision
+            registers: 已有的寄存器（反序列化时使用）
+        """
+        if not 4 <= precision <= 16:
+            raise ValueError(f"Invalid HyperLogLog precision: {precision}")
+
+        self.precision = precision
+        self._m = 1 << precision
+        self._rank_bits = 64 - precision
+        if registers is None:
+            registers = np.zeros(self._m, dtype=np.uint8)
+        elif registers.shape != (self._m,):
+            raise ValueError(f"Invalid HyperLogLog registers: expected {self._m}, got {registers.shape}")
+        self.registers = registers
+
+    def add(self, value: str):
+        """
+        添加元素
+
+        Args:
+            value: 元素
+        """
+        x = int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+        index = x >> self._rank_bits
+        rank = self._rank_bits - (x & ((1 << self._rank_bits) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog"):
+        """
+        合并另一个草图（原地取并集）
+
+        Args:
+            other: 精度相同的草图
+        """
+        if other.precision != self.precision:
+            raise ValueError(f"Cannot merge HyperLogLog with precision {other.precision} into {self.precision}")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def reduce(self, precision: int) -> "HyperLogLog":
+        """
+        降低精度
+
+        低精度下的寄存器下标是原下标的高位，被舍去的低位成为秩计算的前导位：
+        低位非零时秩由其首个 1 的位置决定，全零时在原秩上加舍去的位数。
+
+        Args:
+            precision: 目标精度（不高于当前精度）
+
+        Returns:
+            目标精度的草图（精度相同时返回自身）
+
+        Raises:
+            ValueError: 目标精度高于当前精度
+        """
+        if precision == self.precision:
+            return self
+        if precision > self.precision:
+            raise ValueError(f"Cannot increase HyperLogLog precision from {self.precision} to {precision}")
+
+        dropped = self.precision - precision
+        groups = self.registers.reshape(1 << precision, 1 << dropped)
+        low_ranks = np.array([dropped - low.bit_length() + 1 for low in range(1 << dropped)], dtype=np.uint8)
+        low_ranks[0] = 0
+        ranks = np.where(groups == 0, 0, np.where(low_ranks == 0, groups + dropped, low_ranks))
+        return HyperLogLog(precision, ranks.max(axis=1).astype(np.uint8))
+
+    def count(self) -> int:
+        """
+        估计不重复元素数
+
+        Returns:
+            基数估计值
+        """
+        m = self._m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / float(np.sum(np.ldexp(1.0, -self.registers.astype(np.int32))))
+
+        # 小基数时使用线性计数（空寄存器比例）修正
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return round(estimate)
+
+    def to_bytes(self) -> bytes:
+        """序列化（寄存器经 zlib 压缩，稀疏草图只占几十字节）"""
+        return bytes([self.precision]) + zlib.compress(self.registers.tobytes())
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HyperLogLog":
+        """
+        反序列化
+
+        Args:
+            data: to_bytes 的结果
+
+        Returns:
+            HyperLogLog 草图
+        """
+        registers = np.frombuffer(zlib.decompress(data[1:]), dtype=np.uint8).copy()
+        return cls(precision=data[0], registers=registers)
@@ -0,0 +1,116 @@
+"""
+模型变体基准测试
+
+对已生成的各精度变体（见 CUTOUT_MODEL_VARIANTS）与 fp32 比较：
+- 单张推理耗时（预热后多次运行取中位数，单会话，线程数与服务单会话一致）
+- 蒙版 IoU：各变体与 fp32 的蒙版按 128 二值化后计算交并比（取所有样本的平均值与最小值）
+- 蒙版平均绝对误差（0-255）
+
+样本图像默认随机生成；真实质量对比应使用 --images 指定的照片目录。
+
+运行：
+    python -m app.infrastructure.models.quantize --precision int8
+    python -m benchmarks.bench_model_variants [--images DIR] [--runs 10] [--threads 4]
+"""
+import argparse
+import os
+import statistics
+import time
+from pathlib import Path
+
+import numpy as np
+import onnxruntime as ort
+from PIL import Image
+
+from app.core.constants import CUTOUT_DEFAULT_SIZE, CUTOUT_DEFAULT_VARIANT, CUTOUT_MODEL_VARIANTS
+from app.infrastructure.models.session_pool import SessionConfig, build_session_options
+from app.modules.cutout.postprocess import normalize_prediction
+from app.modules.cutout.preprocess import ImagePreprocessor
+
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp"}
+
+
+def load_samples(images_dir: Path, count: int) -> list[Image.Image]:
+    """读取样本图像（未指定目录时生成随机色块图像）"""
+    if images_dir is not None:
+        paths = sorted(p for p in images_dir.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)[:count]
+        return [Image.open(p).convert("RGB") for p in paths]
+
+    rng = np.random.default_rng(0)
+    samples = []
+    for _ in range(count):
+        pixels = rng.integers(0, 256, (8, 8, 3), dtype=np.uint8)
+        samples.append(Image.fromarray(pixels).resize((1600, 1200), Image.BILINEAR))
+    return samples
+
+
+def predict_mask(session: ort.InferenceSession, tensor: np.ndarray) -> np.ndarray:
+    """推理并返回模型分辨率的 uint8 蒙版"""
+    outputs = session.run(None, {session.get_inputs()[0].name: tensor})
+    return normalize_prediction(outputs[0])
+
+
+def measure_time(session: ort.InferenceSession, tensor: np.ndarray, runs: int) -> float:
+    """返回中位耗时（毫秒）"""
+    predict_mask(session, tensor)  # 预热
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        predict_mask(session, tensor)
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durations)
+
+
+def mask_iou(a: np.ndarray, b: np.ndarray) -> float:
+    """二值化蒙版交并比（两者均为空时记为 1）"""
+    fg_a = a >= 128
+    fg_b = b >= 128
+    union = np.logical_or(fg_a, fg_b).sum()
+    if union == 0:
+        return 1.0
+    return float(np.logical_and(fg_a, fg_b).sum() / union)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Model variant benchmark")
+    parser.add_argument("--images", type=Path, default=None, help="样本图像目录（默认随机生成）")
+    parser.add_argument("--samples", type=int, default=8, help="样本数量")
+    parser.add_argument("--runs", type=int, default=10, help="计时运行次数")
+    parser.add_argument("--threads", type=int, default=os.cpu_count() or 1, help="单会话 intra-op 线程数")
+    args = parser.parse_args()
+
+    variants = {name: Path(path) for name, path in CUTOUT_MODEL_VARIANTS.items() if Path(path).exists()}
+    if CUTOUT_DEFAULT_VARIANT not in variants:
+        raise SystemExit(f"Reference model not found: {CUTOUT_MODEL_VARIANTS[CUTOUT_DEFAULT_VARIANT]}")
+
+    preprocessor = ImagePreprocessor()
+    tensors = [preprocessor.to_tensor(img, target_size=CUTOUT_DEFAULT_SIZE) for img in load_samples(args.images, args.samples)]
+    options = build_session_options(SessionConfig(intra_op_threads=args.threads))
+
+    reference = None
+    print(f"samples={len(tensors)}, input={CUTOUT_DEFAULT_SIZE}, threads={args.threads}, runs={args.runs}")
+    print(f"{'variant':<10}{'size_mb':>10}{'latency_ms':>12}{'speedup':>10}{'iou_mean':>10}{'iou_min':>10}{'mae':>8}")
+    # 参考变体排在第一位
+    for name in sorted(variants, key=lambda n: n != CUTOUT_DEFAULT_VARIANT):
+        session = ort.InferenceSession(str(variants[name]), options, providers=["CPUExecutionProvider"])
+        latency = measure_time(session, tensors[0], args.runs)
+        masks = [predict_mask(session, tensor) for tensor in tensors]
+
+        if reference is None:
+            reference = (latency, masks)
+        ref_latency, ref_masks = reference
+        ious = [mask_iou(ref, mask) for ref, mask in zip(ref_masks, masks)]
+        mae = statistics.mean(
+            float(np.abs(ref.astype(np.int16) - mask.astype(np.int16)).mean()) for ref, mask in zip(ref_masks, masks)
+        )
+
+        size_mb = variants[name].stat().st_size / 1024 / 1024
+        print(
+            f"{name:<10}{size_mb:>10.1f}{latency:>12.1f}{ref_latency / latency:>9.2f}x"
+            f"{statistics.mean(ious):>10.4f}{min(ious):>10.4f}{mae:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+抠图后处理基准测试
+
+对比旧实现（float64 归一化 + LANCZOS 放大 + 编码期间保留解码图像）与 postprocess 模块：
+- 后处理（归一化 + 放大）与合成的单次耗时（多次运行取中位数）
+- 解码 -> 后处理 -> 合成 -> PNG 编码 全流程的峰值 RSS 增量
+  （每个变体在独立子进程中运行；Pillow 的像素内存不经过 tracemalloc，只能看 RSS，
+  通过 /proc/self/clear_refs 重置峰值，仅支持 Linux）
+
+运行：
+    python -m benchmarks.bench_postprocess [--size 4000x3000] [--runs 10]
+"""
+import argparse
+import io
+import multiprocessing
+import statistics
+import time
+
+import numpy as np
+from PIL import Image
+
+from app.core.constants import CUTOUT_DEFAULT_SIZE, CUTOUT_MASK_RESIZE_FILTER
+from app.modules.cutout.codec import decode_image
+from app.modules.cutout.encoders import EncodeOptions, encode_image
+from app.modules.cutout.postprocess import compose_rgba, prediction_to_mask
+
+
+def legacy_mask(pred: np.ndarray, size: tuple[int, int]) -> Image.Image:
+    """旧实现（CutoutService._prediction_to_mask）"""
+    pred = pred[0, 0, :, :]
+    ma = np.max(pred)
+    mi = np.min(pred)
+    pred = (pred - mi) / (ma - mi)
+    mask = Image.fromarray((pred * 255).astype("uint8"))
+    return mask.resize(size, Image.LANCZOS)
+
+
+def legacy_compose(image: Image.Image, mask: Image.Image) -> Image.Image:
+    """旧实现（CutoutService._apply_mask）"""
+    output_image = image.convert("RGBA")
+    output_image.putalpha(mask)
+    return output_image
+
+
+def legacy_pipeline(contents: bytes, pred: np.ndarray):
+    """旧流程：合成与编码在同一步中执行，编码期间解码图像与蒙版仍被引用"""
+    image = decode_image(contents)
+    mask = legacy_mask(pred, image.size)
+    encode_image(legacy_compose(image, mask), EncodeOptions())
+
+
+def optimized_pipeline(contents: bytes, pred: np.ndarray):
+    """新流程：编码前释放解码图像与蒙版"""
+    image = decode_image(contents)
+    mask = prediction_to_mask(pred, image.size)
+    output_image = compose_rgba(image, mask)
+    del image, mask
+    encode_image(output_image, EncodeOptions())
+
+
+def _read_status_kb(field: str) -> int:
+    """读取 /proc/self/status 中的内存字段（KB）"""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    raise RuntimeError(f"{field} not found in /proc/self/status")
+
+
+def _peak_rss_worker(name: str, contents: bytes, pred: np.ndarray, queue):
+    """子进程：记录全流程的峰值 RSS 增量（KB）"""
+    pipeline = legacy_pipeline if name == "legacy" else optimized_pipeline
+    # 重置 VmHWM（峰值 RSS）为当前 RSS
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")
+    before = _read_status_kb("VmRSS")
+    pipeline(contents, pred)
+    queue.put(_read_status_kb("VmHWM") - before)
+
+
+def measure_peak_rss(name: str, contents: bytes, pred: np.ndarray) -> float:
+    """返回峰值 RSS 增量（MB）"""
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_peak_rss_worker, args=(name, contents, pred, queue))
+    process.start()
+    delta = queue.get()
+    process.join()
+    return delta / 1024
+
+
+def measure_time(fn, runs: int) -> float:
+    """返回中位耗时（毫秒）"""
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Postprocess benchmark")
+    parser.add_argument("--size", default="4000x3000", help="输入图像尺寸 WxH（默认 12MP）")
+    parser.add_argument("--runs", type=int, default=10, help="运行次数")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.split("x"))
+    rng = np.random.default_rng(0)
+    image = Image.fromarray(rng.integers(0, 256, (height, width, 3), dtype=np.uint8))
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=90)
+    contents = buffer.getvalue()
+    pred = rng.random((1, 1, CUTOUT_DEFAULT_SIZE, CUTOUT_DEFAULT_SIZE), dtype=np.float32)
+    size = image.size
+
+    legacy_fns = (lambda: legacy_mask(pred, size), lambda: legacy_compose(image, mask_legacy))
+    # prediction_to_mask 会原地修改输入，每次传入副本（复制 4MB 计入耗时，结果偏保守）
+    optimized_fns = (lambda: prediction_to_mask(pred.copy(), size), lambda: compose_rgba(image, mask_optimized))
+
+    mask_legacy = legacy_mask(pred, size)
+    mask_optimized = prediction_to_mask(pred.copy(), size)
+    max_diff = int(np.abs(np.asarray(mask_legacy, dtype=np.int16) - np.asarray(mask_optimized, dtype=np.int16)).max())
+
+    print(f"input={width}x{height}, mask_filter={CUTOUT_MASK_RESIZE_FILTER}, runs={args.runs}")
+    print(f"{'variant':<12}{'mask_ms':>10}{'compose_ms':>12}{'peak_rss_mb':>14}")
+    for name, (mask_fn, compose_fn) in (("legacy", legacy_fns), ("optimized", optimized_fns)):
+        mask_ms = measure_time(mask_fn, args.runs)
+        compose_ms = measure_time(compose_fn, args.runs)
+        peak_mb = measure_peak_rss(name, contents, pred)
+        print(f"{name:<12}{mask_ms:>10.2f}{compose_ms:>12.2f}{peak_mb:>14.1f}")
+    print(f"max abs mask diff vs legacy (filter change): {max_diff}")
+
+
+if __name__ == "__main__":
+    main()
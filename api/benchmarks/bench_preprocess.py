@@ -0,0 +1,95 @@
+"""
+抠图预处理基准测试
+
+对比旧的逐步归一化实现与 ImagePreprocessor（预分配缓冲区 + 原地归一化）：
+- 单次耗时（多次运行取中位数）
+- Python 侧内存分配（tracemalloc 统计的分配峰值与块数）
+
+运行：
+    python -m benchmarks.bench_preprocess [--size 3000x2000] [--runs 20]
+"""
+import argparse
+import statistics
+import time
+import tracemalloc
+
+import numpy as np
+from PIL import Image
+
+from app.core.constants import CUTOUT_DEFAULT_SIZE
+from app.modules.cutout.preprocess import ImagePreprocessor
+
+
+def legacy_normalize(img: Image.Image, target_size: int) -> np.ndarray:
+    """旧实现（CutoutService._normalize_image）"""
+    im = img.convert("RGB").resize((target_size, target_size), Image.LANCZOS)
+    im_ary = np.array(im, dtype=np.float32)
+
+    im_ary = im_ary / 255.0
+    im_ary = im_ary - 0.5
+    im_ary = im_ary.transpose((2, 0, 1))
+    im_ary = np.expand_dims(im_ary, 0)
+
+    return im_ary
+
+
+def measure_time(fn, runs: int) -> float:
+    """返回中位耗时（毫秒）"""
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durations)
+
+
+def measure_allocations(fn) -> tuple[int, int]:
+    """返回 (分配峰值字节数, 新分配块数)"""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "lineno") if stat.count_diff > 0)
+    return peak, blocks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Preprocess benchmark")
+    parser.add_argument("--size", default="3000x2000", help="输入图像尺寸 WxH")
+    parser.add_argument("--runs", type=int, default=20, help="运行次数")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.split("x"))
+    rng = np.random.default_rng(0)
+    img = Image.fromarray(rng.integers(0, 256, (height, width, 3), dtype=np.uint8))
+    target = CUTOUT_DEFAULT_SIZE
+
+    preprocessor = ImagePreprocessor()
+
+    def optimized():
+        tensor = preprocessor.to_tensor(img, target)
+        preprocessor.release(tensor)
+
+    # 预热，同时填充缓冲区池
+    legacy_normalize(img, target)
+    optimized()
+
+    reference = legacy_normalize(img, target)
+    tensor = preprocessor.to_tensor(img, target)
+    max_diff = float(np.abs(reference - tensor).max())
+    preprocessor.release(tensor)
+
+    print(f"input={width}x{height}, target={target}, runs={args.runs}")
+    print(f"{'variant':<12}{'median_ms':>12}{'peak_alloc_mb':>16}{'alloc_blocks':>14}")
+    for name, fn in (("legacy", lambda: legacy_normalize(img, target)), ("optimized", optimized)):
+        median_ms = measure_time(fn, args.runs)
+        peak, blocks = measure_allocations(fn)
+        print(f"{name:<12}{median_ms:>12.2f}{peak / 1024 / 1024:>16.2f}{blocks:>14}")
+    print(f"max abs diff vs legacy (filter change): {max_diff:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+SQLite 调优基准测试
+
+并发混合读写工具使用记录，对比：
+- default：单个默认引擎（回滚日志、默认连接池），读写共用
+- tuned：按配置调优的写引擎（单连接）+ 只读引擎（见 app/db/sqlite.py）
+
+写入为逐条 create + commit（record_usage 未经写缓冲时的路径，写入压力最大），
+读取为 get_usage_list（按工具筛选 / 分页各一半）。
+
+运行：
+    python -m benchmarks.bench_sqlite_profile [--writers 16] [--readers 16] [--ops 200] [--rows 20000]
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+from app.db.base import Base
+from app.db.sqlite import SQLitePragmas, create_sqlite_engines
+from app.modules.tools.crud import tool_usage_crud
+
+
+TOOLS = [f"tool-{i}" for i in range(8)]
+
+
+async def seed(engine: AsyncEngine, rows: int):
+    """建表并写入初始数据"""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    for offset in range(0, rows, 1000):
+        async with session_factory() as session:
+            await tool_usage_crud.create_many(session, [
+                {"tool_id": TOOLS[i % len(TOOLS)], "tool_name": "bench", "ip_address": "127.0.0.1",
+                 "user_agent": "bench", "extra_data": {"i": i}}
+                for i in range(offset, min(offset + 1000, rows))
+            ])
+            await session.commit()
+
+
+async def run_mixed(write_engine: AsyncEngine, read_engine: AsyncEngine, writers: int, readers: int, ops: int) -> dict:
+    """并发执行读写，返回吞吐（按各自完成时间计算）与延迟"""
+    write_sessions = async_sessionmaker(write_engine, expire_on_commit=False)
+    read_sessions = async_sessionmaker(read_engine, expire_on_commit=False)
+    latencies = {"write": [], "read": []}
+    errors = {"write": 0, "read": 0}
+    finished = {"write": 0.0, "read": 0.0}
+
+    async def write(worker: int):
+        for i in range(ops):
+            start = time.perf_counter()
+            try:
+                async with write_sessions() as session:
+                    await tool_usage_crud.create(
+                        session, tool_id=TOOLS[(worker + i) % len(TOOLS)], tool_name="bench", ip_address="127.0.0.1"
+                    )
+                    await session.commit()
+            except Exception:
+                errors["write"] += 1
+                continue
+            latencies["write"].append(time.perf_counter() - start)
+        finished["write"] = max(finished["write"], time.perf_counter())
+
+    async def read(worker: int):
+        for i in range(ops):
+            start = time.perf_counter()
+            try:
+                async with read_sessions() as session:
+                    tool_id = TOOLS[(worker + i) % len(TOOLS)] if i % 2 else None
+                    await tool_usage_crud.get_page(session, tool_id=tool_id, limit=100)
+            except Exception:
+                errors["read"] += 1
+                continue
+            latencies["read"].append(time.perf_counter() - start)
+        finished["read"] = max(finished["read"], time.perf_counter())
+
+    started = time.perf_counter()
+    await asyncio.gather(*(write(w) for w in range(writers)), *(read(r) for r in range(readers)))
+
+    result = {}
+    for kind, values in latencies.items():
+        result[f"{kind}_rate"] = len(values) / (finished[kind] - started)
+        result[f"{kind}_p95_ms"] = statistics.quantiles(values, n=20)[-1] * 1000 if len(values) >= 2 else 0.0
+        result[f"{kind}_errors"] = errors[kind]
+    return result
+
+
+def print_row(name: str, result: dict):
+    print(
+        f"{name:<10}{result['write_rate']:>10.0f}{result['write_p95_ms']:>12.1f}{result['write_errors']:>8}"
+        f"{result['read_rate']:>10.0f}{result['read_p95_ms']:>12.1f}{result['read_errors']:>8}"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="SQLite profile benchmark")
+    parser.add_argument("--writers", type=int, default=16, help="并发写入协程数")
+    parser.add_argument("--readers", type=int, default=16, help="并发读取协程数")
+    parser.add_argument("--ops", type=int, default=200, help="每个协程的操作数")
+    parser.add_argument("--rows", type=int, default=20000, help="初始记录数")
+    parser.add_argument("--read-pool-size", type=int, default=4, help="只读连接池大小")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    print(f"writers={args.writers}, readers={args.readers}, ops={args.ops}, rows={args.rows}")
+    print(f"{'profile':<10}{'write/s':>10}{'write p95':>12}{'errors':>8}{'read/s':>10}{'read p95':>12}{'errors':>8}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite+aiosqlite:///{Path(tmp) / 'default.db'}"
+        engine = create_async_engine(url, connect_args={"check_same_thread": False})
+        await seed(engine, args.rows)
+        print_row("default", await run_mixed(engine, engine, args.writers, args.readers, args.ops))
+        await engine.dispose()
+
+        url = f"sqlite+aiosqlite:///{Path(tmp) / 'tuned.db'}"
+        write_engine, read_engine = create_sqlite_engines(url, SQLitePragmas(), read_pool_size=args.read_pool_size)
+        await seed(write_engine, args.rows)
+        print_row("tuned", await run_mixed(write_engine, read_engine, args.writers, args.readers, args.ops))
+        await write_engine.dispose()
+        await read_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
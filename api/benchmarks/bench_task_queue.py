@@ -0,0 +1,78 @@
+"""
+任务队列吞吐基准测试
+
+对比 MemoryTaskQueue 与 SQLiteTaskQueue 的入队 / 出队吞吐：
+- 入队：concurrency 个生产者并发入队（SQLite 队列会将并发入队合并为一个事务）
+- 出队：workers 个消费者 dequeue + ack
+
+运行：
+    python -m benchmarks.bench_task_queue [--tasks 2000] [--workers 4]
+"""
+import argparse
+import asyncio
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+from app.infrastructure.queue import ITaskQueue, MemoryTaskQueue, SQLiteTaskQueue, Task, TaskPriority
+
+
+async def run_enqueue(queue: ITaskQueue, tasks: int, concurrency: int) -> float:
+    """返回入队吞吐（任务/秒）"""
+    priorities = list(TaskPriority)
+    start = time.perf_counter()
+    for offset in range(0, tasks, concurrency):
+        await asyncio.gather(*(
+            queue.enqueue(Task(id=f"t{i}", type="bench", payload={"i": i}, priority=priorities[i % len(priorities)]))
+            for i in range(offset, min(offset + concurrency, tasks))
+        ))
+    return tasks / (time.perf_counter() - start)
+
+
+async def run_dequeue(queue: ITaskQueue, tasks: int, workers: int) -> float:
+    """返回出队 + 确认吞吐（任务/秒）"""
+    remaining = tasks
+
+    async def consume():
+        nonlocal remaining
+        while remaining > 0:
+            task = await queue.dequeue(timeout=0.5)
+            if task is None:
+                return
+            remaining -= 1
+            await queue.ack(task.id)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(consume() for _ in range(workers)))
+    return tasks / (time.perf_counter() - start)
+
+
+async def bench(name: str, queue: ITaskQueue, tasks: int, concurrency: int, workers: int):
+    enqueue_rate = await run_enqueue(queue, tasks, concurrency)
+    dequeue_rate = await run_dequeue(queue, tasks, workers)
+    await queue.close()
+    print(f"{name:<24}{concurrency:>12}{enqueue_rate:>14.0f}{dequeue_rate:>14.0f}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Task queue benchmark")
+    parser.add_argument("--tasks", type=int, default=2000, help="任务数量")
+    parser.add_argument("--workers", type=int, default=4, help="消费者数量")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    print(f"tasks={args.tasks}, workers={args.workers}")
+    print(f"{'queue':<24}{'concurrency':>12}{'enqueue/s':>14}{'dequeue/s':>14}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for concurrency in (1, 32):
+            await bench("memory", MemoryTaskQueue(max_size=args.tasks), args.tasks, concurrency, args.workers)
+
+            url = f"sqlite+aiosqlite:///{Path(tmp) / f'queue-{concurrency}.db'}"
+            await bench("sqlite (WAL)", SQLiteTaskQueue(url, max_size=args.tasks), args.tasks, concurrency, args.workers)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
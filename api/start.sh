@@ -14,6 +14,12 @@ fi
 
 mkdir -p logs
 
+# 启动 worker 之前执行数据库迁移（已有数据库的新增索引等，create_all 不会修改已存在的表）
+if ! alembic upgrade head; then
+    echo "数据库迁移失败"
+    exit 1
+fi
+
 gunicorn app.main:app \
     --bind 0.0.0.0:8000 \
     --workers 1 \
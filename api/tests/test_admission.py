@@ -0,0 +1,132 @@
+"""
+推理准入控制测试用例
+"""
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.infrastructure.models.admission import (
+    AdmissionController,
+    InferenceDeadlineExceeded,
+    InferenceOverloaded,
+    admission_scope,
+    current_scope,
+)
+from app.infrastructure.models.loader import ModelLoader
+from app.infrastructure.models.session_pool import SessionPool
+
+
+def test_bounded_queue_and_deadline_estimate():
+    """测试等待队列满时拒绝（后台作用域不受限），预计超过截止时间时拒绝，Retry-After 按实测耗时估算"""
+    controller = AdmissionController(capacity=2, max_waiting=4)
+    controller.pending = 6
+    controller.executing = 2
+
+    with admission_scope(), pytest.raises(InferenceOverloaded):
+        controller.admit(current_scope())
+    with admission_scope(bounded=False):
+        controller.admit(current_scope())
+
+    # 4 个等待，容量 2：新请求需等待 2 轮 + 自身 1 轮 = 1.5 秒
+    controller.record_service_time(0.5)
+    with admission_scope(timeout=1.0, bounded=False), pytest.raises(InferenceDeadlineExceeded) as exc_info:
+        controller.admit(current_scope())
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.retry_after == 2
+
+    with admission_scope(timeout=2.0, bounded=False):
+        controller.admit(current_scope())
+
+    stats = controller.get_stats()
+    assert stats["waiting"] == 4
+    assert stats["rejected_overloaded"] == 1
+    assert stats["rejected_deadline"] == 1
+    assert stats["admitted"] == 2
+
+
+@pytest.mark.asyncio
+async def test_scope_is_inherited_by_tasks():
+    """测试截止时间随上下文传递到作用域内创建的任务"""
+    async def remaining():
+        return current_scope().remaining()
+
+    with admission_scope(timeout=10):
+        task = asyncio.create_task(remaining())
+    assert current_scope().deadline is None
+
+    value = await task
+    assert 9 < value <= 10
+
+
+class _SlowSession:
+    """batch 维固定的会话：记录同时执行 run 的线程数"""
+
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+        self._lock = threading.Lock()
+
+    def get_inputs(self):
+        return [SimpleNamespace(name="input", shape=[1, 3, 8, 8])]
+
+    def run(self, output_names, feeds):
+        with self._lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.2)
+        with self._lock:
+            self.running -= 1
+        return [feeds["input"]]
+
+
+class _SlowModelLoader(ModelLoader):
+    def __init__(self, session: _SlowSession, max_queue: int = 4):
+        super().__init__(max_concurrent=1, max_batch_size=1, max_queue=max_queue)
+        self._session = session
+
+    async def _create_pool(self, model_id: str):
+        return SessionPool(model_id, [self._session]), 0
+
+
+@pytest.mark.asyncio
+async def test_deadline_does_not_release_session_while_running():
+    """测试超过截止时间的请求停止等待，但会话与信号量在 session.run 结束前不被其他请求使用"""
+    session = _SlowSession()
+    loader = _SlowModelLoader(session)
+    data = np.zeros((1, 3, 8, 8), dtype=np.float32)
+    try:
+        with admission_scope(timeout=0.05), pytest.raises(InferenceDeadlineExceeded):
+            await loader.infer("slow", data)
+
+        assert session.running == 1
+        await loader.infer("slow", data)
+        assert session.max_running == 1
+    finally:
+        await loader.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_timed_out_request_counts_until_run_finishes():
+    """测试超过截止时间的请求在执行结束前仍计入在途请求数，占满等待队列时新请求被拒绝"""
+    session = _SlowSession()
+    loader = _SlowModelLoader(session, max_queue=1)
+    data = np.zeros((1, 3, 8, 8), dtype=np.float32)
+    try:
+        with admission_scope(timeout=0.05), pytest.raises(InferenceDeadlineExceeded):
+            await loader.infer("slow", data)
+        assert session.running == 1
+        assert loader.get_pending_count() == 1
+
+        queued = asyncio.create_task(loader.infer("slow", data))
+        await asyncio.sleep(0.01)
+        with pytest.raises(InferenceOverloaded):
+            await loader.infer("slow", data)
+
+        await queued
+        assert loader.get_pending_count() == 0
+    finally:
+        await loader.cleanup()
@@ -17,6 +17,15 @@ async def test_health_check():
     assert response.json()["status"] == "healthy"
 
 
+@pytest.mark.asyncio
+async def test_ready_check_before_startup():
+    """测试未完成启动预热时就绪检查返回 503"""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.get("/ready")
+    assert response.status_code == 503
+
+
 @pytest.mark.asyncio
 async def test_cutout_health():
     """测试抠图服务健康检查"""
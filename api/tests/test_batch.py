@@ -0,0 +1,104 @@
+"""
+批量抠图测试用例
+"""
+import asyncio
+import io
+import json
+import zipfile
+
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from PIL import Image
+
+from app.modules.cutout.batch import MANIFEST_NAME, stream_batch_zip
+from app.modules.cutout.encoders import EncodedImage, EncodeOptions
+from app.modules.cutout.upload import UploadRejected, receive_image_uploads
+
+
+class _StubService:
+    """输出原文件内容的抠图服务（记录最大并发数）"""
+
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+
+    async def segment(self, contents, options: EncodeOptions, digest=None, inference=None) -> EncodedImage:
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(0.01)
+            return EncodedImage(content=contents.read(), media_type="image/png", extension="png", encode_ms=0.0)
+        finally:
+            self.active -= 1
+
+
+def _make_app(service: _StubService) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/batch")
+    async def batch(request: Request):
+        try:
+            items = await receive_image_uploads(request, max_files=5, max_pixels=10_000)
+        except UploadRejected as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+        return StreamingResponse(stream_batch_zip(service, items, EncodeOptions(), concurrency=2))
+
+    return app
+
+
+def _png(width: int, height: int) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (255, 0, 0)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+async def _post(service: _StubService, files: list) -> httpx.Response:
+    transport = httpx.ASGITransport(app=_make_app(service))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.post("/batch", files=[("files", f) for f in files])
+
+
+@pytest.mark.asyncio
+async def test_batch_zip_contains_results_and_per_item_errors():
+    """测试 ZIP 包含成功文件的结果，上传检查与处理失败的文件记录在 manifest 中"""
+    service = _StubService()
+    files = [
+        ("a.png", _png(10, 10), "image/png"),
+        ("../../etc/b.png", _png(20, 10), "image/png"),
+        ("c.txt", b"not an image" * 10, "text/plain"),
+        ("d.png", _png(200, 200), "image/png"),
+        ("e.png", _png(10, 20), "image/png"),
+    ]
+    response = await _post(service, files)
+    assert response.status_code == 200
+
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    manifest = json.loads(archive.read(MANIFEST_NAME))
+    assert manifest["total"] == 5
+    assert manifest["succeeded"] == 3
+    assert [item["status"] for item in manifest["items"]] == ["ok", "ok", "error", "error", "ok"]
+    assert [item.get("status_code") for item in manifest["items"][2:4]] == [415, 422]
+
+    assert manifest["items"][1]["output"] == "0001_b.png_no_bg.png"
+    assert archive.read("0001_b.png_no_bg.png") == files[1][1]
+    assert service.max_active <= 2
+
+
+@pytest.mark.asyncio
+async def test_batch_rejects_too_many_files_and_reports_processing_errors():
+    """测试文件数超限返回 413，处理失败的文件不影响其他文件"""
+    service = _StubService()
+    response = await _post(service, [(f"{i}.png", _png(10, 10), "image/png") for i in range(6)])
+    assert response.status_code == 413
+
+    # 文件头是合法 PNG，但服务处理失败
+    async def failing(contents, options, digest=None, inference=None):
+        raise ValueError("decode failed")
+
+    service.segment = failing
+    response = await _post(service, [("a.png", _png(10, 10), "image/png")])
+    manifest = json.loads(zipfile.ZipFile(io.BytesIO(response.content)).read(MANIFEST_NAME))
+    assert manifest["succeeded"] == 0
+    assert manifest["items"][0]["status_code"] == 500
@@ -0,0 +1,97 @@
+"""
+推理微批处理测试用例
+"""
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.infrastructure.models.batching import BatchStats, MicroBatcher
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_batched():
+    """测试并发请求合并为一个批次，并按请求拆分输出"""
+    executed_shapes = []
+
+    async def execute(batch):
+        executed_shapes.append(batch.shape)
+        return [batch * 2]
+
+    stats = BatchStats()
+    batcher = MicroBatcher(execute, asyncio.Semaphore(1), max_batch_size=4, max_wait_ms=50, stats=stats)
+
+    inputs = [np.full((1, 3, 8, 8), i, dtype=np.float32) for i in range(3)]
+    results = await asyncio.gather(*(batcher.submit(x) for x in inputs))
+    await batcher.close()
+
+    assert executed_shapes == [(3, 3, 8, 8)]
+    for i, result in enumerate(results):
+        assert result[0].shape == (1, 3, 8, 8)
+        assert np.all(result[0] == i * 2)
+    assert stats.as_dict()["histogram"] == {"3": 1}
+
+
+@pytest.mark.asyncio
+async def test_batch_respects_max_size_and_shape():
+    """测试批次大小上限与不同形状的分组"""
+    executed_shapes = []
+
+    async def execute(batch):
+        executed_shapes.append(batch.shape)
+        return [batch]
+
+    batcher = MicroBatcher(execute, asyncio.Semaphore(1), max_batch_size=2, max_wait_ms=50)
+
+    inputs = [np.zeros((1, 3, 8, 8), dtype=np.float32) for _ in range(3)]
+    inputs.append(np.zeros((1, 3, 4, 4), dtype=np.float32))
+    await asyncio.gather(*(batcher.submit(x) for x in inputs))
+    await batcher.close()
+
+    assert sum(shape[0] for shape in executed_shapes) == 4
+    assert all(shape[0] <= 2 for shape in executed_shapes)
+    assert (1, 3, 4, 4) in executed_shapes
+
+
+@pytest.mark.asyncio
+async def test_batch_failure_propagates_to_callers():
+    """测试批次执行失败时所有等待方收到异常"""
+
+    async def execute(batch):
+        raise RuntimeError("boom")
+
+    batcher = MicroBatcher(execute, asyncio.Semaphore(1), max_batch_size=4, max_wait_ms=20)
+
+    results = await asyncio.gather(
+        *(batcher.submit(np.zeros((1, 3, 8, 8), dtype=np.float32)) for _ in range(2)),
+        return_exceptions=True
+    )
+    await batcher.close()
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_on_done_called_after_batch_finishes_for_cancelled_waiter():
+    """测试等待方取消后，结束回调在所在批次执行结束时才调用"""
+    started = asyncio.Event()
+    release = asyncio.Event()
+    done = []
+
+    async def execute(batch):
+        started.set()
+        await release.wait()
+        return [batch]
+
+    batcher = MicroBatcher(execute, asyncio.Semaphore(1), max_batch_size=1, max_wait_ms=0)
+
+    waiter = asyncio.create_task(batcher.submit(np.zeros((1, 3, 8, 8), dtype=np.float32), on_done=lambda: done.append(1)))
+    await started.wait()
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert done == []
+
+    release.set()
+    await batcher.close()
+    assert done == [1]
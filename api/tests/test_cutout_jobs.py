@@ -0,0 +1,141 @@
+"""
+抠图异步任务测试用例
+"""
+import asyncio
+
+import pytest
+
+from app.core.constants import CUTOUT_JOB_RETRY_AFTER
+from app.infrastructure.queue import MemoryTaskQueue, QueueFullError, SQLiteTaskQueue
+from app.modules.cutout.encoders import EncodedImage, EncodeOptions
+from app.modules.cutout.jobs import CutoutJobManager, JobStatus
+
+
+class _StubService:
+    """按固定延迟返回结果的抠图服务"""
+
+    def __init__(self, delay: float = 0.0):
+        self._delay = delay
+
+    async def segment(self, contents: bytes, options: EncodeOptions, inference=None) -> EncodedImage:
+        await asyncio.sleep(self._delay)
+        return EncodedImage(content=contents[::-1], media_type="image/png", extension="png", encode_ms=0.0)
+
+
+async def _wait_finished(manager: CutoutJobManager, job_id: str):
+    for _ in range(100):
+        job = await manager.get(job_id)
+        if job.finished:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+
+@pytest.mark.asyncio
+async def test_job_lifecycle_and_expiry(tmp_path):
+    """测试任务完成后可读取结果，过期后被清理"""
+    manager = CutoutJobManager(_StubService(), MemoryTaskQueue(), workers=1, result_ttl=0, spool_dir=tmp_path)
+    await manager.start()
+    try:
+        job = await manager.submit(b"abc", "a.png", EncodeOptions())
+        job = await _wait_finished(manager, job.id)
+
+        assert job.status == JobStatus.SUCCEEDED
+        assert (await manager.read_result(job)).content == b"cba"
+        assert not (tmp_path / f"{job.id}.input").exists()
+
+        await manager._sweep()
+        assert await manager.get(job.id) is None
+        assert list(tmp_path.iterdir()) == []
+    finally:
+        await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_job_timeout(tmp_path):
+    """测试处理超过 TASK_TIMEOUT 的任务判定失败"""
+    manager = CutoutJobManager(_StubService(delay=1), MemoryTaskQueue(), workers=1, task_timeout=0.05, spool_dir=tmp_path)
+    await manager.start()
+    try:
+        job = await manager.submit(b"abc", "a.png", EncodeOptions())
+        job = await _wait_finished(manager, job.id)
+
+        assert job.status == JobStatus.FAILED
+        assert "超过" in job.error
+    finally:
+        await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_submit_rejected_when_queue_full(tmp_path):
+    """测试队列已满时拒绝提交且不遗留暂存文件"""
+    manager = CutoutJobManager(_StubService(), MemoryTaskQueue(max_size=1), spool_dir=tmp_path)
+    tmp_path.mkdir(exist_ok=True)
+
+    job = await manager.submit(b"abc", "a.png", EncodeOptions())
+    with pytest.raises(QueueFullError):
+        await manager.submit(b"def", "b.png", EncodeOptions())
+
+    assert {path.stem for path in tmp_path.iterdir()} == {job.id}
+
+
+@pytest.mark.asyncio
+async def test_retry_after_estimated_from_queue_and_service_time(tmp_path):
+    """测试 Retry-After 在有处理耗时数据后按排队任务数 / 消费协程数 × 平均耗时估算"""
+    manager = CutoutJobManager(_StubService(), MemoryTaskQueue(), workers=2, spool_dir=tmp_path)
+    assert await manager.retry_after() == CUTOUT_JOB_RETRY_AFTER
+
+    for name in ("a", "b", "c"):
+        await manager.submit(b"abc", f"{name}.png", EncodeOptions())
+    manager._record_service_time(1.5)
+    # 3 个排队任务、2 个消费协程：需处理 2 轮
+    assert await manager.retry_after() == 3
+
+    manager._record_service_time(0.1)
+    # 平均耗时按指数移动平均更新：1.5 + 0.2 × (0.1 - 1.5) = 1.22，2 轮约 2.44 秒
+    assert await manager.retry_after() == 3
+
+
+@pytest.mark.asyncio
+async def test_dead_lettered_job_failed_and_removed(tmp_path):
+    """测试超过最大投递次数的任务判定失败，暂存文件在结果过期后删除"""
+    queue = SQLiteTaskQueue(f"sqlite+aiosqlite:///{tmp_path / 'queue.db'}", max_attempts=2)
+    spool_dir = tmp_path / "spool"
+    spool_dir.mkdir()
+    manager = CutoutJobManager(_StubService(), queue, result_ttl=60, spool_dir=spool_dir)
+    try:
+        job = await manager.submit(b"abc", "a.png", EncodeOptions())
+        # 模拟两次投递都未处理完成（处理进程崩溃）
+        for _ in range(2):
+            task = await queue.dequeue(timeout=0)
+            await queue.nack(task.id)
+        assert await queue.dequeue(timeout=0) is None
+
+        await manager._sweep()
+        job = await manager.get(job.id)
+        assert job.status == JobStatus.FAILED
+        assert [path.name for path in spool_dir.iterdir()] == [f"{job.id}.json"]
+        assert (await queue.get_stats())["dead"] == 0
+
+        manager._result_ttl = 0
+        await manager._sweep()
+        assert await manager.get(job.id) is None
+        assert list(spool_dir.iterdir()) == []
+    finally:
+        await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_unfinished_job_expired_after_timeout(tmp_path):
+    """测试超过 TASK_TIMEOUT 仍未处理的任务由清理协程判定失败"""
+    manager = CutoutJobManager(_StubService(), MemoryTaskQueue(), task_timeout=0.05, result_ttl=60, spool_dir=tmp_path)
+
+    job = await manager.submit(b"abc", "a.png", EncodeOptions())
+    await manager._sweep()
+    assert (await manager.get(job.id)).status == JobStatus.QUEUED
+
+    await asyncio.sleep(0.06)
+    await manager._sweep()
+    job = await manager.get(job.id)
+    assert job.status == JobStatus.FAILED
+    assert not (tmp_path / f"{job.id}.input").exists()
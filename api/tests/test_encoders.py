@@ -0,0 +1,64 @@
+"""
+抠图结果编码器测试用例
+"""
+import io
+
+from PIL import Image
+
+from app.modules.cutout.encoders import EncodeOptions, OutputFormat, encode_image, negotiate_format
+
+
+def _rgba(width: int = 32, height: int = 24) -> Image.Image:
+    image = Image.new("RGBA", (width, height), (255, 0, 0, 255))
+    image.paste((0, 0, 255, 0), (0, 0, width // 2, height))
+    return image
+
+
+def test_negotiate_format_parses_media_ranges_and_quality():
+    """测试查询参数优先；Accept 按媒体范围与 q 值协商，q=0 表示不接受，子串不匹配"""
+    assert negotiate_format(OutputFormat.MASK, "image/webp") == OutputFormat.MASK
+    assert negotiate_format(None, None) == OutputFormat.PNG
+    assert negotiate_format(None, "image/avif,image/webp,*/*;q=0.8") == OutputFormat.WEBP_LOSSLESS
+    assert negotiate_format(None, "IMAGE/WEBP") == OutputFormat.WEBP_LOSSLESS
+
+    assert negotiate_format(None, "image/webp;q=0, image/png") == OutputFormat.PNG
+    assert negotiate_format(None, "image/webp; q=0.0") == OutputFormat.PNG
+    assert negotiate_format(None, "image/png, image/webp;q=0.5") == OutputFormat.PNG
+    assert negotiate_format(None, "image/png;q=0.5, image/webp") == OutputFormat.WEBP_LOSSLESS
+    assert negotiate_format(None, "image/webp-x, application/image/webp") == OutputFormat.PNG
+    assert negotiate_format(None, "image/*, */*") == OutputFormat.PNG
+
+
+def test_encode_image_per_format():
+    """测试各格式的媒体类型、无损格式像素一致、mask 输出单通道 PNG"""
+    image = _rgba()
+
+    png = encode_image(image, EncodeOptions(OutputFormat.PNG))
+    assert (png.media_type, png.extension) == ("image/png", "png")
+    with Image.open(io.BytesIO(png.content)) as decoded:
+        assert decoded.format == "PNG"
+        assert decoded.convert("RGBA").tobytes() == image.tobytes()
+
+    lossless = encode_image(image, EncodeOptions(OutputFormat.WEBP_LOSSLESS))
+    assert (lossless.media_type, lossless.extension) == ("image/webp", "webp")
+    with Image.open(io.BytesIO(lossless.content)) as decoded:
+        assert decoded.format == "WEBP"
+        assert decoded.convert("RGBA").getchannel("A").tobytes() == image.getchannel("A").tobytes()
+        assert decoded.getpixel((31, 0)) == (255, 0, 0, 255)
+
+    lossy = encode_image(image, EncodeOptions(OutputFormat.WEBP, webp_quality=50))
+    assert lossy.media_type == "image/webp"
+    with Image.open(io.BytesIO(lossy.content)) as decoded:
+        assert decoded.size == image.size
+        assert decoded.convert("RGBA").getchannel("A").tobytes() == image.getchannel("A").tobytes()
+
+    mask = encode_image(image.getchannel("A"), EncodeOptions(OutputFormat.MASK))
+    assert (mask.media_type, mask.extension) == ("image/png", "png")
+    with Image.open(io.BytesIO(mask.content)) as decoded:
+        assert decoded.mode == "L"
+        assert decoded.tobytes() == image.getchannel("A").tobytes()
+
+    # 压缩级别只影响体积，不影响像素
+    smaller = encode_image(image, EncodeOptions(OutputFormat.PNG, png_compress_level=9))
+    with Image.open(io.BytesIO(smaller.content)) as decoded:
+        assert decoded.convert("RGBA").tobytes() == image.tobytes()
@@ -0,0 +1,133 @@
+"""
+远程推理（Unix socket）测试用例
+"""
+import asyncio
+import contextlib
+
+import numpy as np
+import pytest
+
+from app.infrastructure.models import InferenceOverloaded, RemoteInferenceError, RemoteModelLoader, admission_scope
+from app.infrastructure.models.admission import current_scope
+from app.infrastructure.models.server import InferenceServer
+
+
+class _StubLoader:
+    """输出 = 输入 × 2 的模型加载器"""
+
+    def __init__(self):
+        self.calls = 0
+        self.scopes = []
+
+    async def infer(self, model_id, input_data):
+        if model_id == "broken":
+            raise ValueError("model failed")
+        if model_id == "busy":
+            raise InferenceOverloaded("queue full", 7)
+        self.scopes.append(current_scope())
+        self.calls += 1
+        return [input_data * 2, np.array([input_data.shape[0]], dtype=np.int64)]
+
+    async def load_model(self, model_id):
+        return model_id
+
+    async def unload_model(self, model_id):
+        pass
+
+    def get_loaded_models(self):
+        return ["stub"]
+
+    def get_queue_size(self):
+        return 0
+
+    def get_pending_count(self):
+        return 0
+
+    def get_model_stats(self):
+        return {}
+
+    def get_batch_stats(self, model_id=None):
+        return {"stub": {"batches": self.calls}}
+
+    def get_admission_stats(self):
+        return {}
+
+
+@contextlib.asynccontextmanager
+async def _serve(tmp_path):
+    socket_path = tmp_path / "inference.sock"
+    loader = _StubLoader()
+    task = asyncio.create_task(InferenceServer(str(socket_path), loader).serve_forever())
+    for _ in range(100):
+        if socket_path.exists():
+            break
+        await asyncio.sleep(0.01)
+    try:
+        yield str(socket_path), loader
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+
+@pytest.mark.asyncio
+async def test_remote_infer_roundtrip(tmp_path):
+    """测试张量经 socket 往返后内容与 dtype 保持不变，并发请求复用连接池"""
+    async with _serve(tmp_path) as (socket_path, loader):
+        client = RemoteModelLoader(socket_path, max_connections=2)
+        data = np.random.default_rng(0).random((1, 3, 64, 64), dtype=np.float32)
+
+        results = await asyncio.gather(*(client.infer("stub", data) for _ in range(5)))
+
+        for outputs in results:
+            assert outputs[0].dtype == np.float32
+            np.testing.assert_array_equal(outputs[0], data * 2)
+            assert outputs[1].tolist() == [1]
+        assert loader.calls == 5
+        assert client.get_loaded_models() == ["stub"]
+        assert client.get_batch_stats("stub") == {"batches": 5}
+        assert len(client._idle) <= 2
+        await client.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_remote_error_keeps_connection_usable(tmp_path):
+    """测试推理服务的错误被传回客户端，连接可继续使用"""
+    async with _serve(tmp_path) as (socket_path, _):
+        client = RemoteModelLoader(socket_path, max_connections=1)
+        data = np.ones((1, 4), dtype=np.float32)
+
+        with pytest.raises(RemoteInferenceError, match="model failed"):
+            await client.infer("broken", data)
+        outputs = await client.infer("stub", data)
+
+        np.testing.assert_array_equal(outputs[0], data * 2)
+        await client.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_remote_admission_scope_and_rejection(tmp_path):
+    """测试准入参数随请求发送到推理服务，准入拒绝以原异常类型传回客户端"""
+    async with _serve(tmp_path) as (socket_path, loader):
+        client = RemoteModelLoader(socket_path, max_connections=1)
+        data = np.ones((1, 4), dtype=np.float32)
+
+        with admission_scope(timeout=30, bounded=False):
+            await client.infer("stub", data)
+        remaining = loader.scopes[-1].remaining()
+        assert 0 < remaining <= 30
+        assert loader.scopes[-1].bounded is False
+
+        with pytest.raises(InferenceOverloaded) as exc_info:
+            await client.infer("busy", data)
+        assert exc_info.value.retry_after == 7
+        assert exc_info.value.status_code == 429
+        await client.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_remote_unavailable(tmp_path):
+    """测试推理服务未启动时抛出 ConnectionError"""
+    client = RemoteModelLoader(str(tmp_path / "missing.sock"))
+    with pytest.raises(ConnectionError):
+        await client.infer("stub", np.ones((1, 4), dtype=np.float32))
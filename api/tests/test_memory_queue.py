@@ -0,0 +1,56 @@
+"""
+内存任务队列测试用例
+"""
+import asyncio
+
+import pytest
+
+from app.infrastructure.queue import MemoryTaskQueue, QueueFullError, Task, TaskPriority
+
+
+def _task(task_id: str, priority: TaskPriority) -> Task:
+    return Task(id=task_id, type="test", payload={}, priority=priority)
+
+
+@pytest.mark.asyncio
+async def test_priority_order_and_fifo_within_level():
+    """测试高优先级先出队，同一优先级内先进先出"""
+    queue = MemoryTaskQueue(max_size=10)
+    await queue.enqueue(_task("low", TaskPriority.LOW))
+    await queue.enqueue(_task("normal-1", TaskPriority.NORMAL))
+    await queue.enqueue(_task("urgent", TaskPriority.URGENT))
+    await queue.enqueue(_task("normal-2", TaskPriority.NORMAL))
+
+    order = [(await queue.dequeue(timeout=0)).id for _ in range(4)]
+
+    assert order == ["urgent", "normal-1", "normal-2", "low"]
+
+
+@pytest.mark.asyncio
+async def test_aging_prevents_starvation():
+    """测试低优先级任务等待超过老化时间后先于新到达的高优先级任务出队"""
+    queue = MemoryTaskQueue(max_size=10, aging_seconds=0.01)
+    await queue.enqueue(_task("low", TaskPriority.LOW))
+    await asyncio.sleep(0.05)
+    await queue.enqueue(_task("urgent", TaskPriority.URGENT))
+
+    assert (await queue.dequeue(timeout=0)).id == "low"
+    stats = await queue.get_stats()
+    assert stats["aged_dequeues"] == 1
+    assert stats["depths"]["urgent"] == 1
+
+
+@pytest.mark.asyncio
+async def test_dequeue_blocks_until_enqueue():
+    """测试出队在队列为空时等待，入队后立即唤醒；超时返回 None"""
+    queue = MemoryTaskQueue(max_size=1)
+    assert await queue.dequeue(timeout=0.01) is None
+
+    waiter = asyncio.create_task(queue.dequeue())
+    await asyncio.sleep(0)
+    await queue.enqueue(_task("a", TaskPriority.NORMAL))
+    assert (await asyncio.wait_for(waiter, timeout=1)).id == "a"
+
+    await queue.enqueue(_task("b", TaskPriority.NORMAL))
+    with pytest.raises(QueueFullError):
+        await queue.enqueue(_task("c", TaskPriority.NORMAL))
@@ -0,0 +1,56 @@
+"""
+监控指标测试用例
+"""
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.infrastructure.metrics import REGISTRY, MetricsMiddleware, MetricsRegistry
+
+
+def test_registry_renders_prometheus_text():
+    """测试计数器 / 直方图 / 回调仪表的文本格式：直方图桶累积，标签值转义"""
+    registry = MetricsRegistry()
+    counter = registry.counter("jobs_total", "任务数", ("status",))
+    histogram = registry.histogram("stage_seconds", "阶段耗时", ("stage",), buckets=(0.1, 1.0))
+    registry.gauge("queue_depth", "队列长度", collect=lambda: 3)
+
+    counter.labels('a"b').inc()
+    counter.labels('a"b').inc(2)
+    decode = histogram.labels("decode")
+    for value in (0.05, 0.1, 0.5, 5.0):
+        decode.observe(value)
+
+    lines = registry.render().splitlines()
+    assert "# TYPE jobs_total counter" in lines
+    assert 'jobs_total{status="a\\"b"} 3' in lines
+    assert 'stage_seconds_bucket{stage="decode",le="0.1"} 2' in lines
+    assert 'stage_seconds_bucket{stage="decode",le="1"} 3' in lines
+    assert 'stage_seconds_bucket{stage="decode",le="+Inf"} 4' in lines
+    assert 'stage_seconds_count{stage="decode"} 4' in lines
+    assert "queue_depth 3" in lines
+
+    with pytest.raises(ValueError):
+        registry.counter("jobs_total", "重复注册")
+
+
+@pytest.mark.asyncio
+async def test_middleware_records_route_template():
+    """测试请求按路由模板而不是实际路径计数，未匹配的请求归为 unmatched"""
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"id": item_id}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        for item_id in (1, 2, 3):
+            assert (await client.get(f"/items/{item_id}")).status_code == 200
+        assert (await client.get("/missing")).status_code == 404
+
+    text = REGISTRY.render()
+    assert 'http_requests_total{method="GET",route="/items/{item_id}",status="200"} 3' in text
+    assert 'http_requests_total{method="GET",route="unmatched",status="404"} 1' in text
+    assert 'http_request_duration_seconds_count{method="GET",route="/items/{item_id}"} 3' in text
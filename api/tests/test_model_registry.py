@@ -0,0 +1,89 @@
+"""
+模型注册表测试用例
+"""
+import asyncio
+
+import pytest
+
+from app.infrastructure.models.registry import ModelRegistry
+
+
+class _FakeModels:
+    """记录加载 / 卸载调用的模型工厂（每个模型占用 100 字节）"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.loaded = []
+        self.unloaded = []
+
+    async def load(self, model_id):
+        await asyncio.sleep(self.delay)
+        self.loaded.append(model_id)
+        return f"model:{model_id}", 100
+
+    async def unload(self, model_id, model):
+        self.unloaded.append(model_id)
+
+    def registry(self, budget_bytes: int = 250, idle_timeout: float = 0, pinned: tuple = ()) -> ModelRegistry:
+        return ModelRegistry(
+            load=self.load,
+            unload=self.unload,
+            estimate=lambda model_id: 100,
+            budget_bytes=budget_bytes,
+            idle_timeout=idle_timeout,
+            pinned=pinned
+        )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_loads_are_single_flight():
+    """测试同一模型的并发加载只执行一次"""
+    models = _FakeModels(delay=0.05)
+    registry = models.registry()
+
+    results = await asyncio.gather(*(registry.get("a") for _ in range(5)))
+
+    assert results == ["model:a"] * 5
+    assert models.loaded == ["a"]
+    assert registry.get_stats()["loads"] == 1
+    await registry.close()
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_skips_pinned_and_active_models():
+    """测试超出预算时淘汰最久未用的模型，固定与使用中的模型不淘汰"""
+    models = _FakeModels()
+    registry = models.registry(budget_bytes=250, pinned=("a",))
+
+    await registry.get("a")
+    await registry.get("b")
+    async with registry.use("b"):
+        # a 固定、b 使用中：无法腾出空间，超预算加载
+        await registry.get("c")
+        assert models.unloaded == []
+
+    # 预算 250，已占用 300：加载 d 前淘汰最久未用的空闲模型（b，然后 c）
+    await registry.get("d")
+    assert models.unloaded == ["b", "c"]
+    assert registry.loaded_models() == ["a", "d"]
+
+    stats = registry.get_stats()
+    assert stats["evictions"] == 2
+    assert stats["used_bytes"] == 200
+    await registry.close()
+
+
+@pytest.mark.asyncio
+async def test_idle_models_are_unloaded():
+    """测试空闲超时的模型被卸载，固定的模型保留"""
+    models = _FakeModels()
+    registry = models.registry(budget_bytes=1000, idle_timeout=0.01, pinned=("a",))
+
+    await registry.get("a")
+    await registry.get("b")
+    await asyncio.sleep(0.02)
+    await registry.sweep()
+
+    assert registry.loaded_models() == ["a"]
+    assert registry.get_stats()["idle_unloads"] == 1
+    await registry.close()
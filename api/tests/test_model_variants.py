@@ -0,0 +1,86 @@
+"""
+模型变体测试用例
+"""
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.infrastructure.models import ModelVariants
+from app.infrastructure.models.quantize import convert
+
+
+def test_missing_variant_falls_back_to_default(tmp_path):
+    """测试变体文件不存在或未注册时回退到默认变体"""
+    fp32 = tmp_path / "model.onnx"
+    int8 = tmp_path / "model.int8.onnx"
+    variants = ModelVariants({"fp32": fp32, "int8": int8}, default="fp32", refresh_seconds=0)
+
+    assert variants.resolve("int8") == ("fp32", str(fp32))
+    assert variants.resolve("unknown") == ("fp32", str(fp32))
+    assert variants.available() == {"fp32": str(fp32)}
+
+    int8.write_bytes(b"")
+    assert variants.resolve("int8") == ("int8", str(int8))
+    assert set(variants.available()) == {"fp32", "int8"}
+
+    with pytest.raises(ValueError):
+        ModelVariants({"int8": int8}, default="fp32")
+
+
+def test_variant_existence_cached_until_refresh(tmp_path, monkeypatch):
+    """测试变体文件存在性检查结果在缓存时间内复用，过期后重新检查"""
+    fp32 = tmp_path / "model.onnx"
+    int8 = tmp_path / "model.int8.onnx"
+    variants = ModelVariants({"fp32": fp32, "int8": int8}, default="fp32", refresh_seconds=30)
+
+    assert variants.resolve("int8") == ("fp32", str(fp32))
+
+    checks = []
+    original = Path.exists
+    monkeypatch.setattr(Path, "exists", lambda self: checks.append(self) or original(self))
+    int8.write_bytes(b"")
+    for _ in range(10):
+        assert variants.resolve("int8") == ("fp32", str(fp32))
+        assert variants.available() == {"fp32": str(fp32)}
+    assert checks == []
+
+    variants._checked_at -= 30
+    assert variants.resolve("int8") == ("int8", str(int8))
+    assert len(checks) == 2
+
+
+def test_int8_conversion_runs_with_close_output(tmp_path):
+    """测试 int8 动态量化生成的模型可推理，且输出接近原始模型"""
+    onnx = pytest.importorskip("onnx")
+    ort = pytest.importorskip("onnxruntime")
+    from onnx import TensorProto, helper, numpy_helper
+
+    rng = np.random.default_rng(0)
+    weight = numpy_helper.from_array(rng.normal(0, 0.3, (1, 3, 3, 3)).astype(np.float32), "weight")
+    graph = helper.make_graph(
+        [
+            helper.make_node("Conv", ["input", "weight"], ["conv"], pads=[1, 1, 1, 1]),
+            helper.make_node("Sigmoid", ["conv"], ["output"]),
+        ],
+        "cutout",
+        [helper.make_tensor_value_info("input", TensorProto.FLOAT, ["N", 3, "H", "W"])],
+        [helper.make_tensor_value_info("output", TensorProto.FLOAT, ["N", 1, "H", "W"])],
+        initializer=[weight]
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 17)])
+    model.ir_version = 9
+    fp32_path = tmp_path / "model.onnx"
+    int8_path = tmp_path / "model.int8.onnx"
+    onnx.save(model, str(fp32_path))
+
+    convert(fp32_path, int8_path, "int8")
+
+    x = rng.random((1, 3, 32, 32), dtype=np.float32) - 0.5
+    fp32_out = ort.InferenceSession(str(fp32_path)).run(None, {"input": x})[0]
+    int8_out = ort.InferenceSession(str(int8_path)).run(None, {"input": x})[0]
+    assert int8_out.shape == fp32_out.shape
+    assert np.abs(int8_out - fp32_out).max() < 0.05
+
+    with pytest.raises(ValueError):
+        convert(fp32_path, tmp_path / "model.int4.onnx", "int4")
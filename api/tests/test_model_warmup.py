@@ -0,0 +1,78 @@
+"""
+模型预热测试用例
+"""
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from app.infrastructure.models import ModelLoader
+from app.infrastructure.models.session_pool import SessionConfig, SessionPool
+
+
+class _FakeSession:
+    """记录调用的推理会话"""
+
+    def __init__(self, shape: list):
+        self.shape = shape
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def get_inputs(self):
+        return [SimpleNamespace(name="input", shape=self.shape, type="tensor(float)")]
+
+    def run(self, output_names, feed):
+        with self._lock:
+            self.calls.append(feed["input"].shape)
+        return [feed["input"]]
+
+
+def _patch_sessions(monkeypatch, shape: list) -> list:
+    created = []
+
+    def create_sessions(model_path, size, config):
+        sessions = [_FakeSession(shape) for _ in range(size)]
+        created.extend(sessions)
+        return sessions
+
+    monkeypatch.setattr(SessionPool, "create_sessions", staticmethod(create_sessions))
+    return created
+
+
+@pytest.mark.asyncio
+async def test_warmup_runs_every_session_once_per_model(monkeypatch):
+    """测试每个会话都被预热，并发预热只执行一次"""
+    sessions = _patch_sessions(monkeypatch, ["N", 3, "H", "W"])
+    loader = ModelLoader(max_concurrent=2, session_config=SessionConfig(intra_op_threads=1))
+    try:
+        results = await asyncio.gather(
+            loader.warmup("m", (1, 3, 8, 8), runs=2),
+            loader.warmup("m", (1, 3, 8, 8), runs=2),
+        )
+
+        assert all(session.calls == [(1, 3, 8, 8)] * 2 for session in sessions)
+        assert results[0] == results[1]
+        assert results[0]["sessions"] == len(sessions) and results[0]["runs"] == 2
+
+        await loader.warmup("m", (1, 3, 8, 8), runs=2)
+        assert sum(len(session.calls) for session in sessions) == 2 * len(sessions)
+        assert loader.get_warmup_stats() == {"m": results[0]}
+    finally:
+        await loader.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_warmup_requires_shape_for_dynamic_dimensions(monkeypatch):
+    """测试动态空间维度需要显式指定预热形状，失败后可重试"""
+    sessions = _patch_sessions(monkeypatch, ["N", 3, "H", "W"])
+    loader = ModelLoader(max_concurrent=1, session_config=SessionConfig(intra_op_threads=1))
+    try:
+        with pytest.raises(ValueError):
+            await loader.warmup("m")
+
+        stats = await loader.warmup("m", (1, 3, 4, 4))
+        assert stats["input_shape"] == [1, 3, 4, 4]
+        assert sessions[0].calls == [(1, 3, 4, 4)]
+    finally:
+        await loader.cleanup()
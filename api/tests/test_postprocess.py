@@ -0,0 +1,73 @@
+"""
+抠图后处理测试用例
+"""
+import numpy as np
+from PIL import Image
+
+from app.core.constants import CUTOUT_MASK_RESIZE_FILTER
+from app.modules.cutout.postprocess import compose_rgba, normalize_prediction, prediction_to_mask
+from app.modules.cutout.preprocess import RESIZE_FILTERS
+
+
+def test_normalize_prediction_stretches_to_uint8():
+    """测试最小 / 最大值拉伸到 0-255 并去掉 batch / 通道维"""
+    pred = np.array([[[[1.0, 2.0], [3.0, 5.0]]]], dtype=np.float32)
+
+    mask = normalize_prediction(pred)
+
+    assert mask.dtype == np.uint8
+    assert mask.shape == (2, 2)
+    assert mask.tolist() == [[0, 63], [127, 255]]
+
+    # 非 float32 / 只读输入不会原地修改
+    readonly = np.array([[0.0, 0.5]], dtype=np.float64)
+    readonly.flags.writeable = False
+    assert normalize_prediction(readonly).tolist() == [[0, 255]]
+
+
+def test_normalize_constant_prediction():
+    """测试常数输出（最大值等于最小值）不做除法，返回全 0 蒙版"""
+    pred = np.full((1, 1, 4, 4), 0.7, dtype=np.float32)
+
+    with np.errstate(all="raise"):
+        mask = normalize_prediction(pred)
+
+    assert mask.shape == (4, 4)
+    assert not mask.any()
+
+
+def test_prediction_to_mask_resized_with_configured_filter():
+    """测试蒙版按指定滤波器（默认 CUTOUT_MASK_RESIZE_FILTER）缩放到原图尺寸"""
+    rng = np.random.default_rng(0)
+    pred = rng.random((1, 1, 8, 8), dtype=np.float32)
+    small = Image.fromarray(normalize_prediction(pred.copy()))
+
+    mask = prediction_to_mask(pred.copy(), (32, 16), "nearest")
+    assert mask.mode == "L"
+    assert mask.size == (32, 16)
+    assert np.array_equal(np.asarray(mask), np.asarray(small.resize((32, 16), Image.NEAREST)))
+
+    mask = prediction_to_mask(pred.copy(), (32, 16))
+    expected = small.resize((32, 16), RESIZE_FILTERS[CUTOUT_MASK_RESIZE_FILTER])
+    assert np.array_equal(np.asarray(mask), np.asarray(expected))
+
+    # 尺寸相同时不缩放
+    assert prediction_to_mask(pred.copy(), (8, 8)).size == (8, 8)
+
+
+def test_compose_rgba_keeps_rgb_and_sets_alpha():
+    """测试 alpha 通道为蒙版，RGB 通道不变，RGBA 输入不被修改"""
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 256, (6, 5, 3), dtype=np.uint8)
+    alpha = rng.integers(0, 256, (6, 5), dtype=np.uint8)
+    image = Image.fromarray(pixels)
+    mask = Image.fromarray(alpha)
+
+    output = np.asarray(compose_rgba(image, mask))
+    assert output.shape == (6, 5, 4)
+    assert np.array_equal(output[..., :3], pixels)
+    assert np.array_equal(output[..., 3], alpha)
+
+    rgba = image.convert("RGBA")
+    compose_rgba(rgba, mask)
+    assert np.all(np.asarray(rgba)[..., 3] == 255)
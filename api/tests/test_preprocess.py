@@ -0,0 +1,73 @@
+"""
+抠图预处理测试用例
+"""
+import threading
+
+import numpy as np
+from PIL import Image
+
+from app.modules.cutout.preprocess import ImagePreprocessor, TensorBufferPool
+
+
+def _image(width: int, height: int) -> Image.Image:
+    rng = np.random.default_rng(0)
+    return Image.fromarray(rng.integers(0, 256, (height, width, 3), dtype=np.uint8))
+
+
+def test_to_tensor_matches_reference_normalization():
+    """测试输出为 NCHW float32，数值等于缩放后像素 / 255 - 0.5"""
+    img = _image(40, 30)
+    preprocessor = ImagePreprocessor(resize_filter="bilinear", reducing_gap=None)
+
+    tensor = preprocessor.to_tensor(img, 16)
+
+    resized = np.asarray(img.resize((16, 16), Image.BILINEAR), dtype=np.float32)
+    expected = (resized / 255 - 0.5).transpose(2, 0, 1)[np.newaxis]
+    assert tensor.shape == (1, 3, 16, 16)
+    assert tensor.dtype == np.float32
+    np.testing.assert_allclose(tensor, expected, atol=1e-6)
+
+    # 非 RGB 输入先转换为 RGB
+    gray = preprocessor.to_tensor(img.convert("L"), 16)
+    assert gray.shape == (1, 3, 16, 16)
+    np.testing.assert_array_equal(gray[0, 0], gray[0, 1])
+
+
+def test_buffer_reused_after_release():
+    """测试归还后同一线程再次获取复用同一缓冲区，使用中的缓冲区不会被重复分配"""
+    pool = TensorBufferPool()
+    first = pool.acquire((1, 3, 8, 8))
+    second = pool.acquire((1, 3, 8, 8))
+    assert first is not second
+
+    pool.release(first)
+    assert pool.acquire((1, 3, 8, 8)) is first
+    assert pool.acquire((1, 3, 8, 8)) is not first
+
+    # 形状不同的请求不复用
+    pool.release(second)
+    assert pool.acquire((1, 3, 4, 4)) is not second
+
+    # 重复归还只保留一份
+    pool.release(second)
+    pool.release(second)
+    assert pool.acquire((1, 3, 8, 8)) is second
+    assert pool.acquire((1, 3, 8, 8)) is not second
+
+
+def test_release_from_other_thread_returns_to_owner():
+    """测试在其他线程归还的缓冲区回到分配它的线程的空闲列表"""
+    pool = TensorBufferPool()
+    buffer = pool.acquire((1, 3, 8, 8))
+    acquired_in_worker = []
+
+    def worker():
+        pool.release(buffer)
+        acquired_in_worker.append(pool.acquire((1, 3, 8, 8)))
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+
+    assert acquired_in_worker[0] is not buffer
+    assert pool.acquire((1, 3, 8, 8)) is buffer
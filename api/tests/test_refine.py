@@ -0,0 +1,96 @@
+"""
+高分辨率精修测试用例
+"""
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.infrastructure.models import IModelLoader, admission_scope, current_scope
+from app.infrastructure.workers import WorkerPool
+from app.modules.cutout.refine import compose_mask, plan_refinement, tile_positions
+from app.modules.cutout.service import CutoutService
+
+
+def _square_prob(size: int, left: int, top: int, right: int, bottom: int) -> np.ndarray:
+    prob = np.zeros((size, size), dtype=np.float32)
+    prob[top:bottom, left:right] = 1.0
+    return prob
+
+
+def test_plan_only_keeps_tiles_on_subject_edge():
+    """测试只有与主体边缘相交的分块需要精修"""
+    assert tile_positions(2048, 1024, 128) == [0, 512, 1024]
+
+    # 主体位于左上角（模型网格 1024，工作分辨率 2048 -> 每个网格像素对应 2 个工作像素）
+    coarse = _square_prob(1024, 50, 50, 150, 150)
+    plan = plan_refinement(coarse, (4096, 4096), max_size=2048, tile_size=1024, overlap=128, edge_radius=4)
+
+    assert plan.working_size == (2048, 2048)
+    assert plan.grid_size == 9
+    assert plan.tiles == [(0, 0, 1024, 1024)]
+
+    empty = plan_refinement(np.zeros((1024, 1024), dtype=np.float32), (4096, 4096), 2048, 1024, 128, 4)
+    assert empty.tiles == []
+
+
+def test_compose_uses_tiles_only_inside_edge_band():
+    """测试边缘带内使用分块结果，带外保持粗分割结果"""
+    coarse = _square_prob(64, 16, 16, 48, 48)
+    plan = plan_refinement(coarse, (256, 256), max_size=128, tile_size=64, overlap=16, edge_radius=2)
+    assert plan.working_size == (128, 128)
+    assert len(plan.tiles) == plan.grid_size
+
+    # 分块全部给出 0：边缘带附近变为背景，主体中心与远处背景不受影响
+    tile_probs = [np.zeros((bottom - top, right - left), dtype=np.float32) for left, top, right, bottom in plan.tiles]
+    mask = np.asarray(compose_mask(coarse, plan, tile_probs, (128, 128), overlap=16))
+
+    assert mask[64, 64] == 255
+    assert mask[4, 4] == 0
+    assert mask[64, 33] == 0
+
+
+class _ScopeRecordingLoader(IModelLoader):
+    """记录每次推理时的准入作用域；粗分割返回中心方块，分块返回全前景"""
+
+    def __init__(self):
+        self.scopes = []
+
+    async def load_model(self, model_id: str):
+        return None
+
+    async def unload_model(self, model_id: str):
+        pass
+
+    async def get_input_shape(self, model_id: str):
+        return (None, 3, None, None)
+
+    async def infer(self, model_id: str, input_data):
+        self.scopes.append(current_scope())
+        size = input_data.shape[-1]
+        if len(self.scopes) == 1:
+            return [_square_prob(size, size // 4, size // 4, size * 3 // 4, size * 3 // 4)[None, None]]
+        return [np.ones((1, 1, size, size), dtype=np.float32)]
+
+    def get_pending_count(self) -> int:
+        return 0
+
+    async def cleanup(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_admitted_request_tiles_bypass_queue_bound():
+    """测试粗分割受等待队列上限约束，已接受请求的分块推理不受约束且保留截止时间"""
+    loader = _ScopeRecordingLoader()
+    workers = WorkerPool(max_workers=2, max_pending=8, name="test-refine")
+    service = CutoutService(loader, workers)
+    try:
+        with admission_scope(timeout=60):
+            await service._predict(Image.new("RGB", (2048, 2048)), "model.onnx", 1024, hires=True)
+    finally:
+        await workers.shutdown()
+
+    coarse, *tiles = loader.scopes
+    assert coarse.bounded
+    assert len(tiles) > 1
+    assert all(not scope.bounded and 0 < scope.remaining() <= 60 for scope in tiles)
@@ -0,0 +1,148 @@
+"""
+自适应推理分辨率测试用例
+"""
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.infrastructure.cache import MemoryLRUCache
+from app.infrastructure.models import ModelVariants
+from app.infrastructure.models.interfaces import IModelLoader
+from app.infrastructure.workers import WorkerPool
+from app.modules.cutout.inference import InferenceOptions, QualityTier, model_resolutions, select_resolution
+from app.modules.cutout.service import CutoutService
+
+
+LADDER = (512, 768, 1024)
+
+
+def test_select_resolution_by_size_tier_and_load():
+    """测试按原图尺寸选档，fast 档位与负载逐级降档，不低于最低档"""
+    sizes = list(LADDER)
+
+    assert select_resolution(sizes, (300, 200)) == 512
+    assert select_resolution(sizes, (700, 500)) == 768
+    assert select_resolution(sizes, (4000, 3000)) == 1024
+
+    assert select_resolution(sizes, (4000, 3000), QualityTier.FAST) == 768
+    assert select_resolution(sizes, (4000, 3000), load_steps=1) == 768
+    assert select_resolution(sizes, (4000, 3000), QualityTier.FAST, load_steps=5) == 512
+    assert select_resolution([1024], (300, 200), QualityTier.FAST, load_steps=2) == 1024
+
+
+def test_fixed_shape_model_uses_exported_resolutions(tmp_path):
+    """测试空间维度固定的模型只使用声明尺寸与按尺寸导出的模型"""
+    model = tmp_path / "model.int8.onnx"
+
+    dynamic = model_resolutions(str(model), (None, 3, None, None), LADDER, 1024)
+    assert dynamic == {512: str(model), 768: str(model), 1024: str(model)}
+
+    assert model_resolutions(str(model), (1, 3, 1024, 1024), LADDER, 1024) == {1024: str(model)}
+    assert model_resolutions(str(model), None, LADDER, 1024) == {1024: str(model)}
+
+    exported = tmp_path / "model.int8.512.onnx"
+    exported.write_bytes(b"")
+    assert model_resolutions(str(model), (1, 3, 1024, 1024), LADDER, 1024) == {
+        1024: str(model),
+        512: str(exported),
+    }
+
+
+class _DynamicShapeLoader(IModelLoader):
+    """输入尺寸可变的模型：记录每次推理的输入边长，返回全前景"""
+
+    def __init__(self):
+        self.sizes = []
+
+    async def load_model(self, model_id: str):
+        return None
+
+    async def unload_model(self, model_id: str):
+        pass
+
+    async def get_input_shape(self, model_id: str):
+        return (None, 3, None, None)
+
+    async def infer(self, model_id: str, input_data):
+        size = input_data.shape[-1]
+        self.sizes.append(size)
+        return [np.ones((1, 1, size, size), dtype=np.float32)]
+
+    def get_pending_count(self) -> int:
+        return 0
+
+    async def cleanup(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_tiers_do_not_share_cache_entries():
+    """测试 fast / quality 回退到同一模型时按档位分别缓存，fast 的低分辨率结果不会被 quality 命中"""
+    loader = _DynamicShapeLoader()
+    workers = WorkerPool(max_workers=1, max_pending=4, name="test-resolution")
+    service = CutoutService(loader, workers, MemoryLRUCache(max_bytes=16 * 1024 * 1024, ttl=60))
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (1200, 900), (10, 20, 30)).save(buffer, format="PNG")
+    contents = buffer.getvalue()
+    fast = InferenceOptions(tier=QualityTier.FAST)
+    quality = InferenceOptions(tier=QualityTier.QUALITY)
+    try:
+        assert service._resolve_model(fast) == service._resolve_model(quality)
+
+        assert not (await service.segment(contents, inference=fast)).cached
+        assert not (await service.segment(contents, inference=quality)).cached
+        assert loader.sizes == [768, 1024]
+
+        assert (await service.segment(contents, inference=fast)).cached
+        assert (await service.segment(contents, inference=quality)).cached
+        assert loader.sizes == [768, 1024]
+    finally:
+        await workers.shutdown()
+
+
+class _WarmupLoader(_DynamicShapeLoader):
+    """声明指定输入形状的模型：记录预热调用"""
+
+    def __init__(self, input_shape: tuple):
+        super().__init__()
+        self.input_shape = input_shape
+        self.warmups = []
+
+    async def get_input_shape(self, model_id: str):
+        return self.input_shape
+
+    async def warmup(self, model_id: str, input_shape=None, runs: int = 1) -> dict:
+        self.warmups.append((model_id, input_shape))
+        return {"model_id": model_id}
+
+
+@pytest.mark.asyncio
+async def test_warmup_covers_every_resolution_model(tmp_path):
+    """测试预热覆盖每个按尺寸导出的模型文件；动态尺寸模型只以默认边长预热一次"""
+    model = tmp_path / "model.onnx"
+    exported = tmp_path / "model.512.onnx"
+    exported.write_bytes(b"")
+    workers = WorkerPool(max_workers=1, max_pending=4, name="test-warmup")
+    try:
+        loader = _WarmupLoader((1, 3, 1024, 1024))
+        service = CutoutService(loader, workers)
+        service._variants = ModelVariants({"fp32": model}, "fp32")
+
+        stats = await service.warmup()
+        assert loader.warmups == [
+            (str(model), (1, 3, 1024, 1024)),
+            (str(exported), (1, 3, 512, 512)),
+        ]
+        assert stats == {"fp32": {"1024": {"model_id": str(model)}, "512": {"model_id": str(exported)}}}
+
+        dynamic = _WarmupLoader((None, 3, None, None))
+        service = CutoutService(dynamic, workers)
+        service._variants = ModelVariants({"fp32": model}, "fp32")
+
+        await service.warmup()
+        assert dynamic.warmups == [(str(model), (1, 3, 1024, 1024))]
+    finally:
+        await workers.shutdown()
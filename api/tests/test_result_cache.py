@@ -0,0 +1,86 @@
+"""
+结果缓存测试用例
+"""
+import asyncio
+
+import pytest
+
+from app.infrastructure.cache import CachedResult, DiskCache, MemoryLRUCache, TieredCache
+
+
+@pytest.mark.asyncio
+async def test_memory_lru_eviction_by_bytes():
+    """测试内存层按字节数淘汰最久未使用的条目"""
+    cache = MemoryLRUCache(max_bytes=10, ttl=60)
+
+    await cache.set("a", CachedResult(b"1234"))
+    await cache.set("b", CachedResult(b"1234"))
+    assert await cache.get("a") is not None  # a 变为最近使用
+    await cache.set("c", CachedResult(b"1234"))
+
+    assert await cache.get("b") is None
+    assert (await cache.get("a")).content == b"1234"
+    stats = cache.get_stats()
+    assert stats["evictions"] == 1
+    assert stats["bytes"] == 8
+
+
+@pytest.mark.asyncio
+async def test_memory_ttl_expiration():
+    """测试条目过期"""
+    cache = MemoryLRUCache(max_bytes=100, ttl=0.01)
+
+    await cache.set("a", CachedResult(b"data"))
+    await asyncio.sleep(0.02)
+
+    assert await cache.get("a") is None
+    assert cache.get_stats()["expirations"] == 1
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_restart_and_promotes(tmp_path):
+    """测试磁盘层持久化，以及磁盘命中回填内存层"""
+    disk = DiskCache(tmp_path, max_bytes=1024, ttl=60)
+    await disk.set("k1", CachedResult(b"payload", {"media_type": "image/png"}))
+
+    # 新实例重新扫描目录，模拟进程重启
+    cache = TieredCache(MemoryLRUCache(max_bytes=1024, ttl=60), DiskCache(tmp_path, max_bytes=1024, ttl=60))
+    value = await cache.get("k1")
+
+    assert value.content == b"payload"
+    assert value.metadata == {"media_type": "image/png"}
+    stats = cache.get_stats()
+    assert stats["hits"] == 1
+    assert stats["memory"]["entries"] == 1
+    assert stats["disk"]["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_eviction(tmp_path):
+    """测试磁盘层超出容量时删除最旧条目"""
+    disk = DiskCache(tmp_path, max_bytes=40, ttl=60)
+
+    await disk.set("k1", CachedResult(b"x" * 20))
+    await disk.set("k2", CachedResult(b"y" * 20))
+
+    assert await disk.get("k1") is None
+    assert (await disk.get("k2")).content == b"y" * 20
+    assert not (tmp_path / "k1"[:2] / "k1").exists()
+    assert disk.get_stats()["evictions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_disk_ttl_runs_from_write_and_concurrent_writes_do_not_collide(tmp_path):
+    """测试磁盘层有效期从写入开始计算（访问不延长，与内存层一致），多个实例同时写入同一键互不影响"""
+    disk = DiskCache(tmp_path, max_bytes=1024, ttl=0.2)
+    await disk.set("k1", CachedResult(b"data"))
+    await asyncio.sleep(0.12)
+    assert await disk.get("k1") is not None
+    await asyncio.sleep(0.12)
+    assert await disk.get("k1") is None
+    assert disk.get_stats()["expirations"] == 1
+
+    writers = [DiskCache(tmp_path, max_bytes=1024, ttl=60) for _ in range(4)]
+    await asyncio.gather(*(writer.set("k2", CachedResult(b"v" * 16)) for writer in writers for _ in range(5)))
+    assert (await DiskCache(tmp_path, max_bytes=1024, ttl=60).get("k2")).content == b"v" * 16
+    assert list(tmp_path.glob("*/*.tmp")) == []
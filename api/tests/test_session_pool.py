@@ -0,0 +1,49 @@
+"""
+ONNX Runtime 会话池测试用例
+"""
+import os
+
+from app.infrastructure.models.session_pool import SessionConfig, SessionPool, plan_session_pool
+
+
+def test_plan_session_pool_never_oversubscribes_cores():
+    """测试会话数不超过核数，自动线程数按核数均分，显式线程数超出时被限制"""
+    assert plan_session_pool(2, cpu_count=4) == (2, 2)
+    assert plan_session_pool(2, cpu_count=6) == (2, 3)
+    assert plan_session_pool(8, cpu_count=4) == (4, 1)
+    assert plan_session_pool(0, cpu_count=4) == (1, 4)
+    assert plan_session_pool(3, cpu_count=1) == (1, 1)
+
+    assert plan_session_pool(2, intra_op_threads=1, cpu_count=4) == (2, 1)
+    assert plan_session_pool(2, intra_op_threads=4, cpu_count=4) == (2, 2)
+
+    for max_concurrent in range(1, 9):
+        for cpus in range(1, 17):
+            sessions, threads = plan_session_pool(max_concurrent, cpu_count=cpus)
+            assert sessions * threads <= cpus
+
+
+def test_optimized_model_cache_path_and_freshness(tmp_path):
+    """测试优化模型缓存按优化级别命名、关闭优化或未配置目录时不缓存，缓存早于源模型时失效"""
+    model = tmp_path / "model.onnx"
+    model.write_bytes(b"model")
+    cache_dir = tmp_path / "optimized"
+
+    config = SessionConfig(graph_optimization_level="extended", optimized_model_dir=cache_dir)
+    cached = SessionPool._optimized_model_path(str(model), config)
+    assert cached == cache_dir / "model.extended.onnx"
+    assert SessionPool._optimized_model_path(str(model), SessionConfig()) is None
+    assert SessionPool._optimized_model_path(
+        str(model), SessionConfig(graph_optimization_level="disable", optimized_model_dir=cache_dir)
+    ) is None
+
+    assert not SessionPool._is_cache_fresh(str(model), cached)
+
+    cache_dir.mkdir()
+    cached.write_bytes(b"optimized")
+    assert SessionPool._is_cache_fresh(str(model), cached)
+
+    # 源模型更新后缓存失效
+    stat = cached.stat()
+    os.utime(model, (stat.st_atime, stat.st_mtime + 10))
+    assert not SessionPool._is_cache_fresh(str(model), cached)
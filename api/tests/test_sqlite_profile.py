@@ -0,0 +1,38 @@
+"""
+SQLite 调优测试用例
+"""
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.db.sqlite import SQLitePragmas, create_sqlite_engines
+
+
+@pytest.mark.asyncio
+async def test_engines_apply_pragmas_and_read_engine_is_read_only(tmp_path):
+    """写引擎与只读引擎都执行 PRAGMA，只读引擎拒绝写入但能读到已提交的数据"""
+    write_engine, read_engine = create_sqlite_engines(
+        f"sqlite+aiosqlite:///{tmp_path / 'app.db'}",
+        SQLitePragmas(cache_size_kb=4096, busy_timeout_ms=1234),
+        read_pool_size=2
+    )
+    try:
+        async with write_engine.begin() as conn:
+            assert (await conn.execute(text("PRAGMA journal_mode"))).scalar_one() == "wal"
+            assert (await conn.execute(text("PRAGMA synchronous"))).scalar_one() == 1  # NORMAL
+            assert (await conn.execute(text("PRAGMA cache_size"))).scalar_one() == -4096
+            assert (await conn.execute(text("PRAGMA busy_timeout"))).scalar_one() == 1234
+            await conn.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY)"))
+            await conn.execute(text("INSERT INTO t (id) VALUES (1)"))
+
+        async with read_engine.connect() as conn:
+            assert (await conn.execute(text("PRAGMA query_only"))).scalar_one() == 1
+            assert (await conn.execute(text("SELECT count(*) FROM t"))).scalar_one() == 1
+            with pytest.raises(OperationalError):
+                await conn.execute(text("INSERT INTO t (id) VALUES (2)"))
+    finally:
+        await write_engine.dispose()
+        await read_engine.dispose()
+
+    with pytest.raises(ValueError):
+        SQLitePragmas(synchronous="FAST")
@@ -0,0 +1,74 @@
+"""
+SQLite 持久化任务队列测试用例
+"""
+import asyncio
+
+import pytest
+
+from app.infrastructure.queue import QueueFullError, SQLiteTaskQueue, Task, TaskPriority
+
+
+def _task(task_id: str, priority: TaskPriority = TaskPriority.NORMAL) -> Task:
+    return Task(id=task_id, type="test", payload={"n": task_id}, priority=priority)
+
+
+def _url(tmp_path) -> str:
+    return f"sqlite+aiosqlite:///{tmp_path / 'queue.db'}"
+
+
+@pytest.mark.asyncio
+async def test_priority_order_and_batched_insert(tmp_path):
+    """测试并发入队合并写入，出队按优先级且同级 FIFO"""
+    queue = SQLiteTaskQueue(_url(tmp_path), max_size=10)
+    try:
+        await queue.enqueue(_task("low", TaskPriority.LOW))
+        await asyncio.gather(
+            queue.enqueue(_task("normal-1")),
+            queue.enqueue(_task("urgent", TaskPriority.URGENT)),
+            queue.enqueue(_task("normal-2")),
+        )
+
+        order = []
+        for _ in range(4):
+            task = await queue.dequeue(timeout=0)
+            order.append(task.id)
+            await queue.ack(task.id)
+
+        assert order == ["urgent", "normal-1", "normal-2", "low"]
+        assert (await queue.get_stats())["insert_batches"] < 4
+        assert await queue.dequeue(timeout=0.01) is None
+    finally:
+        await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_unacked_task_redelivered_after_crash(tmp_path):
+    """测试未确认的任务在租约到期后由新的队列实例重新投递"""
+    crashed = SQLiteTaskQueue(_url(tmp_path), lease_seconds=0.2)
+    await crashed.enqueue(_task("a"))
+    assert (await crashed.dequeue(timeout=0)).id == "a"
+    # 模拟进程崩溃：不 ack、不 close（不交还租约）
+    crashed._heartbeat_task.cancel()
+    await crashed._engine.dispose()
+
+    queue = SQLiteTaskQueue(_url(tmp_path), lease_seconds=0.2)
+    try:
+        assert await queue.dequeue(timeout=0) is None
+        task = await queue.dequeue(timeout=1)
+        assert task.id == "a"
+        assert task.payload == {"n": "a"}
+        assert (await queue.get_stats())["redelivered"] == 1
+    finally:
+        await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_queue_full(tmp_path):
+    """测试超过最大长度时拒绝入队"""
+    queue = SQLiteTaskQueue(_url(tmp_path), max_size=1)
+    try:
+        await queue.enqueue(_task("a"))
+        with pytest.raises(QueueFullError):
+            await queue.enqueue(_task("b"))
+    finally:
+        await queue.close()
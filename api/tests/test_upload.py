@@ -0,0 +1,133 @@
+"""
+流式上传接收测试用例
+"""
+import io
+import struct
+import zlib
+
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException, Request
+from PIL import Image
+
+from app.modules.cutout.upload import UploadRejected, receive_image_upload
+
+
+def _make_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/upload")
+    async def upload(request: Request):
+        try:
+            received = await receive_image_upload(request, max_bytes=1024 * 1024, max_pixels=10_000)
+        except UploadRejected as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+        try:
+            return {
+                "filename": received.filename,
+                "format": received.format,
+                "size": [received.width, received.height],
+                "bytes": len(received.read()),
+            }
+        finally:
+            received.close()
+
+    return app
+
+
+def _png(width: int, height: int) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (255, 0, 0)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _png_with_declared_size(width: int, height: int) -> bytes:
+    """只改写 IHDR 中声明的尺寸（并修正 CRC），像素数据不变"""
+    data = bytearray(_png(8, 8))
+    # 签名 8 字节 + 长度 4 字节 + "IHDR" 4 字节之后是宽高
+    struct.pack_into(">II", data, 16, width, height)
+    crc = zlib.crc32(bytes(data[12:29])) & 0xFFFFFFFF
+    struct.pack_into(">I", data, 29, crc)
+    return bytes(data)
+
+
+def _jpeg_with_large_icc_profile(width: int, height: int, profile_bytes: int) -> bytes:
+    """ICC 配置文件位于帧头之前，头部超过探测缓冲区"""
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (255, 0, 0)).save(buffer, format="JPEG", icc_profile=b"\0" * profile_bytes)
+    return buffer.getvalue()
+
+
+async def _post_chunked(content: bytes, chunk_size: int = 64 * 1024) -> httpx.Response:
+    """按块发送请求体（与网络上传一样分多次到达）"""
+    body = (
+        b"--x\r\nContent-Disposition: form-data; name=\"file\"; filename=\"a.jpg\"\r\n"
+        b"Content-Type: image/jpeg\r\n\r\n" + content + b"\r\n--x--\r\n"
+    )
+
+    async def chunks():
+        for offset in range(0, len(body), chunk_size):
+            yield body[offset:offset + chunk_size]
+
+    transport = httpx.ASGITransport(app=_make_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.post(
+            "/upload", content=chunks(), headers={"content-type": "multipart/form-data; boundary=x"}
+        )
+
+
+async def _post(content: bytes, headers: dict = None) -> httpx.Response:
+    transport = httpx.ASGITransport(app=_make_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        if headers:
+            return await client.post("/upload", content=content, headers=headers)
+        return await client.post("/upload", files={"file": ("a.png", content, "image/png")})
+
+
+@pytest.mark.asyncio
+async def test_accepts_valid_image():
+    """测试合法图片被接收，格式与尺寸来自头部探测"""
+    content = _png(40, 30)
+    response = await _post(content)
+
+    assert response.status_code == 200
+    assert response.json() == {"filename": "a.png", "format": "PNG", "size": [40, 30], "bytes": len(content)}
+
+
+@pytest.mark.asyncio
+async def test_rejects_unknown_format_and_oversized_dimensions():
+    """测试非图片返回 415，声明尺寸超限返回 422"""
+    response = await _post(b"not an image" * 100)
+    assert response.status_code == 415
+
+    response = await _post(_png_with_declared_size(1000, 1000))
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_large_header_with_allowed_magic_is_sniffed_from_spool():
+    """测试头部超过探测缓冲区的 JPEG 在数据全部到达后从暂存文件识别，魔数匹配但无法解析时仍返回 415"""
+    content = _jpeg_with_large_icc_profile(40, 30, 600 * 1024)
+    response = await _post_chunked(content)
+    assert response.status_code == 200
+    assert response.json()["format"] == "JPEG"
+    assert response.json()["size"] == [40, 30]
+    assert response.json()["bytes"] == len(content)
+
+    response = await _post_chunked(b"\xff\xd8\xff" + b"\0" * (600 * 1024))
+    assert response.status_code == 415
+
+    response = await _post_chunked(b"\0" * (600 * 1024))
+    assert response.status_code == 415
+
+
+@pytest.mark.asyncio
+async def test_rejects_declared_content_length_before_reading_body():
+    """测试 Content-Length 超限时直接返回 413"""
+    headers = {
+        "content-type": "multipart/form-data; boundary=x",
+        "content-length": str(10 * 1024 * 1024),
+    }
+    response = await _post(b"--x--\r\n", headers=headers)
+
+    assert response.status_code == 413
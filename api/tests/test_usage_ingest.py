@@ -0,0 +1,63 @@
+"""
+工具使用记录写缓冲测试用例
+"""
+import contextlib
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.base import Base
+from app.modules.tools.ingest import UsageIngestBuffer
+from app.modules.tools.models import ToolUsage
+
+
+@contextlib.asynccontextmanager
+async def _database(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'usage.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def _count(session_factory) -> int:
+    async with session_factory() as session:
+        return (await session.execute(select(func.count()).select_from(ToolUsage))).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_records_are_written_in_batches_and_flushed_on_stop(tmp_path):
+    """测试记录按批次写入，停止时写入剩余记录"""
+    async with _database(tmp_path) as session_factory:
+        ingest = UsageIngestBuffer(session_factory, batch_size=4, flush_interval=60)
+        await ingest.start()
+
+        for i in range(10):
+            assert await ingest.record(tool_id="cutout", tool_name="抠图", ip_address="127.0.0.1", extra_data={"i": i})
+        await ingest.stop()
+
+        assert await _count(session_factory) == 10
+        assert ingest.get_stats()["flushes"] == 3
+        async with session_factory() as session:
+            usage = (await session.execute(select(ToolUsage).order_by(ToolUsage.id.desc()).limit(1))).scalar_one()
+        assert usage.extra_data == {"i": 9}
+        assert usage.created_at is not None
+
+
+@pytest.mark.asyncio
+async def test_full_buffer_drops_and_failed_flush_keeps_records():
+    """测试缓冲已满时拒绝新记录，写入失败的记录保留在缓冲中"""
+    def broken_factory():
+        raise RuntimeError("database unavailable")
+
+    ingest = UsageIngestBuffer(broken_factory, max_pending=2, batch_size=10, flush_interval=60, retry_interval=60)
+    await ingest.start()
+
+    assert await ingest.record(tool_id="a", tool_name="A", ip_address="1.1.1.1")
+    assert await ingest.record(tool_id="b", tool_name="B", ip_address="1.1.1.1")
+    assert not await ingest.record(tool_id="c", tool_name="C", ip_address="1.1.1.1")
+    await ingest.stop()
+
+    stats = ingest.get_stats()
+    assert stats == {**stats, "pending": 2, "accepted": 2, "dropped": 1, "written": 0, "flush_errors": 1}
@@ -0,0 +1,63 @@
+"""
+工具使用记录游标分页测试用例
+"""
+import contextlib
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.base import Base
+from app.modules.tools.crud import tool_usage_crud
+from app.modules.tools.pagination import InvalidCursorError
+
+
+@contextlib.asynccontextmanager
+async def _session(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'usage.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        yield session
+    await engine.dispose()
+
+
+async def _all_pages(session, tool_id=None, limit=3) -> list[int]:
+    ids, cursor = [], None
+    while True:
+        usages, cursor = await tool_usage_crud.get_page(session, tool_id=tool_id, cursor=cursor, limit=limit)
+        ids.extend(u.id for u in usages)
+        if cursor is None:
+            return ids
+
+
+@pytest.mark.asyncio
+async def test_keyset_pages_cover_all_rows_in_order(tmp_path):
+    """逐页遍历不重复、不遗漏，同一时间的记录按 id 倒序"""
+    async with _session(tmp_path) as session:
+        base = datetime(2026, 1, 1)
+        rows = [
+            {"tool_id": "a" if i % 3 else "b", "tool_name": "T", "ip_address": "127.0.0.1",
+             "created_at": base + timedelta(seconds=i // 2), "updated_at": base}
+            for i in range(20)
+        ]
+        await tool_usage_crud.create_many(session, rows)
+        await session.commit()
+
+        all_ids = await _all_pages(session)
+        assert all_ids == sorted(all_ids, key=lambda id: ((id - 1) // 2, id), reverse=True)
+        assert len(all_ids) == 20
+
+        b_ids = await _all_pages(session, tool_id="b", limit=2)
+        assert b_ids == [id for id in all_ids if (id - 1) % 3 == 0]
+        assert await tool_usage_crud.count(session, tool_id="b") == len(b_ids)
+
+        plan = (await session.execute(text(
+            "EXPLAIN QUERY PLAN SELECT * FROM tool_usage WHERE (created_at, id) < ('2026-01-01 00:00:05.000000', 9) "
+            "ORDER BY created_at DESC, id DESC LIMIT 3"
+        ))).all()
+        assert "idx_created_id" in str(plan)
+
+        with pytest.raises(InvalidCursorError):
+            await tool_usage_crud.get_page(session, cursor="not-a-cursor")
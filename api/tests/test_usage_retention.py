@@ -0,0 +1,100 @@
+"""
+工具使用记录归档测试用例
+"""
+import contextlib
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.db.base import Base
+from app.db.sqlite import SQLitePragmas, create_sqlite_engines
+from app.modules.tools.archive import archive_lock, scan_archive, write_partitions
+from app.modules.tools.crud import tool_usage_crud
+from app.modules.tools.models import ToolUsage
+from app.modules.tools.retention import UsageRetention
+
+
+@contextlib.asynccontextmanager
+async def _database(tmp_path):
+    write_engine, read_engine = create_sqlite_engines(f"sqlite+aiosqlite:///{tmp_path / 'app.db'}", SQLitePragmas())
+    async with write_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(write_engine, expire_on_commit=False), async_sessionmaker(read_engine, expire_on_commit=False)
+    await write_engine.dispose()
+    await read_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_old_records_are_archived_deleted_and_scannable(tmp_path):
+    """过期记录分批写入日期分区并从数据库删除（截止时间取整到天），归档可按时间 / 工具读取，重复执行不重复归档"""
+    now = datetime(2026, 6, 1, 12, 0)
+    rows = [
+        {"tool_id": "a" if i % 2 else "b", "tool_name": "T", "ip_address": "127.0.0.1", "user_agent": "x" * 2000,
+         "extra_data": {"i": i}, "created_at": now - timedelta(hours=6 * i), "updated_at": now}
+        for i in range(40)
+    ]
+
+    async with _database(tmp_path) as (session_factory, read_session_factory):
+        async with session_factory() as session:
+            await tool_usage_crud.create_many(session, rows)
+            await session.commit()
+
+        archive_dir = tmp_path / "archive"
+        retention = UsageRetention(
+            session_factory, archive_dir, retention_days=5, read_session_factory=read_session_factory, chunk_size=7
+        )
+        assert await retention.run_once(now=now) == 17
+        assert await retention.run_once(now=now) == 0
+
+        async with session_factory() as session:
+            remaining = (await session.execute(select(func.count()).select_from(ToolUsage))).scalar_one()
+            assert remaining == 23
+            assert (await session.execute(text("PRAGMA freelist_count"))).scalar_one() == 0
+        assert retention.reclaimed_bytes > 0
+
+        archived = list(scan_archive(archive_dir))
+        assert sorted(row["extra_data"]["i"] for row in archived) == list(range(23, 40))
+        assert len({path.parent.name for path in archive_dir.glob("date=*/*.ndjson.zst")}) == 5
+
+        start = now - timedelta(days=7)
+        day = list(scan_archive(archive_dir, start=start, end=start + timedelta(days=1), tool_id="a"))
+        assert {row["tool_id"] for row in day} == {"a"}
+        assert all(start <= row["created_at"] < start + timedelta(days=1) for row in day)
+        assert len(day) == 2
+
+
+@pytest.mark.asyncio
+async def test_interrupted_and_concurrent_runs_do_not_duplicate(tmp_path):
+    """中断后以更晚的截止时间重新归档、残留不同边界的文件时读取不重复；其他进程持有锁时跳过"""
+    now = datetime(2026, 6, 1, 12, 0)
+    rows = [
+        {"tool_id": "a", "tool_name": "T", "ip_address": "127.0.0.1", "user_agent": "x",
+         "extra_data": {"i": i}, "created_at": now - timedelta(hours=3 * i), "updated_at": now}
+        for i in range(40)
+    ]
+
+    async with _database(tmp_path) as (session_factory, read_session_factory):
+        async with session_factory() as session:
+            await tool_usage_crud.create_many(session, rows)
+            await session.commit()
+            stored = [dict(row) for row in (await session.execute(select(ToolUsage.__table__))).mappings()]
+
+        archive_dir = tmp_path / "archive"
+        # 上一次执行写入文件后未删除记录就退出，且文件边界与本次执行不同
+        write_partitions(archive_dir, [row for row in stored if row["created_at"] < now - timedelta(days=3)][:5])
+
+        retention = UsageRetention(
+            session_factory, archive_dir, retention_days=2, read_session_factory=read_session_factory, chunk_size=4
+        )
+        with archive_lock(archive_dir) as locked:
+            assert locked
+            assert await retention.run_once(now=now) == 0
+
+        assert await retention.run_once(now=now) == 19
+        assert await retention.run_once(now=now + timedelta(hours=6)) == 0
+        assert await retention.run_once(now=now + timedelta(days=1)) == 8
+
+        ids = [row["id"] for row in scan_archive(archive_dir)]
+        assert len(ids) == len(set(ids)) == 27
@@ -0,0 +1,123 @@
+"""
+工具使用记录预聚合测试用例
+"""
+import contextlib
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.base import Base
+from app.modules.tools.crud import tool_usage_crud
+from app.modules.tools.models import ToolUsage
+from app.modules.tools.rollup import UsageRollup
+from app.utils.hyperloglog import HyperLogLog
+
+
+@contextlib.asynccontextmanager
+async def _session(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'usage.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        yield session
+    await engine.dispose()
+
+
+def test_hyperloglog_estimates_and_merges():
+    """草图估计误差在几个标准误差以内，合并得到并集，序列化后不变"""
+    a, b = HyperLogLog(12), HyperLogLog(12)
+    for i in range(20000):
+        a.add(f"user-{i}")
+    for i in range(10000, 30000):
+        b.add(f"user-{i}")
+
+    assert abs(a.count() - 20000) < 20000 * 0.05
+    a.merge(b)
+    assert abs(a.count() - 30000) < 30000 * 0.05
+    assert HyperLogLog.from_bytes(a.to_bytes()).count() == a.count()
+
+
+def test_hyperloglog_reduce_matches_lower_precision_sketch():
+    """降低精度后的草图与直接以低精度构建的草图相同，不能提高精度"""
+    high, low = HyperLogLog(14), HyperLogLog(10)
+    for i in range(5000):
+        high.add(f"user-{i}")
+        low.add(f"user-{i}")
+
+    reduced = high.reduce(10)
+    assert reduced.precision == 10
+    assert (reduced.registers == low.registers).all()
+    assert high.reduce(14) is high
+    with pytest.raises(ValueError):
+        low.reduce(12)
+
+
+@pytest.mark.asyncio
+async def test_rollup_is_updated_incrementally_and_matches_rebuild(tmp_path):
+    """分批写入时增量更新的预聚合与从原始记录重建的结果一致"""
+    rollup = UsageRollup(precision=12)
+    base = datetime(2026, 3, 1, 22, 0)
+    rows = [
+        {"tool_id": "a" if i % 4 else "b", "tool_name": "T", "ip_address": f"10.0.0.{i % 50}",
+         "anonymous_id": f"user-{i % 120}", "created_at": base + timedelta(minutes=i), "updated_at": base}
+        for i in range(300)
+    ]
+
+    async with _session(tmp_path) as session:
+        for offset in range(0, len(rows), 64):
+            batch = rows[offset:offset + 64]
+            await tool_usage_crud.create_many(session, batch)
+            await rollup.apply(session, batch)
+            await session.commit()
+
+        stats = await rollup.query(session, granularity="day", start=base, end=base + timedelta(days=2))
+        assert stats["total"]["count"] == 300
+        assert [b["count"] for b in stats["buckets"]] == [120, 180]
+        assert stats["total"]["unique_anonymous"] == pytest.approx(120, rel=0.05)
+        assert stats["total"]["unique_ips"] == pytest.approx(50, rel=0.05)
+
+        hourly = await rollup.query(session, granularity="hour", start=base, end=base + timedelta(hours=1), tool_id="b")
+        assert hourly["total"]["count"] == 15
+
+        await rollup.rebuild(session)
+        await session.commit()
+        assert await rollup.query(session, granularity="day", start=base, end=base + timedelta(days=2)) == stats
+
+        # 第一天的原始记录已归档：重建（包括更早的 --since）不删除该天的预聚合
+        await session.execute(delete(ToolUsage).where(ToolUsage.created_at < base + timedelta(hours=2)))
+        await rollup.rebuild(session, since=base - timedelta(days=30))
+        await session.commit()
+        assert await rollup.query(session, granularity="day", start=base, end=base + timedelta(days=2)) == stats
+
+        with pytest.raises(ValueError):
+            await rollup.query(session, granularity="hour", start=base, end=base + timedelta(days=365))
+
+
+
+@pytest.mark.asyncio
+async def test_query_merges_sketches_written_with_different_precision(tmp_path):
+    """修改精度后，已归档日期的旧精度草图与新写入的草图可以一起查询与合并"""
+    base = datetime(2026, 3, 1, 12, 0)
+    rows = [
+        {"tool_id": "a", "tool_name": "T", "ip_address": f"10.0.0.{i % 40}",
+         "anonymous_id": f"user-{i % 100}", "created_at": base + timedelta(hours=i // 100 * 24), "updated_at": base}
+        for i in range(200)
+    ]
+
+    async with _session(tmp_path) as session:
+        await UsageRollup(precision=12).apply(session, rows[:100])
+        await session.commit()
+
+        rollup = UsageRollup(precision=14)
+        await rollup.apply(session, rows[100:])
+        # 第一天的分桶是旧精度的行：新记录合并进去后保持较低的精度
+        await rollup.apply(session, rows[:10])
+        await session.commit()
+
+        stats = await rollup.query(session, granularity="day", start=base, end=base + timedelta(days=2))
+        assert stats["total"]["count"] == 210
+        assert [b["count"] for b in stats["buckets"]] == [110, 100]
+        assert stats["total"]["unique_anonymous"] == pytest.approx(100, rel=0.05)
+        assert stats["total"]["unique_ips"] == pytest.approx(40, rel=0.05)
@@ -0,0 +1,70 @@
+"""
+图像处理线程池测试用例
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.infrastructure.workers import WorkerPool
+
+
+@pytest.mark.asyncio
+async def test_run_uses_named_threads_and_propagates_errors():
+    """测试任务在线程池中执行（支持关键字参数），异常原样抛出"""
+    pool = WorkerPool(max_workers=2, max_pending=4, name="test-pool")
+
+    def work(value, *, scale=1):
+        return threading.current_thread().name, value * scale
+
+    def fail():
+        raise ValueError("bad input")
+
+    try:
+        thread_name, result = await pool.run(work, 3, scale=2)
+        assert thread_name.startswith("test-pool")
+        assert result == 6
+
+        with pytest.raises(ValueError):
+            await pool.run(fail)
+        assert pool.get_pending_count() == 0
+    finally:
+        await pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_submitted_tasks_are_bounded_and_exported():
+    """测试已提交任务数不超过 max_pending，超出的任务在事件循环侧等待，指标反映占用情况"""
+    pool = WorkerPool(max_workers=2, max_pending=3, name="bounded")
+    release = threading.Event()
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def work():
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        release.wait(timeout=5)
+        time.sleep(0.01)
+        with lock:
+            running -= 1
+
+    try:
+        tasks = [asyncio.create_task(pool.run(work)) for _ in range(6)]
+        await asyncio.sleep(0.05)
+        assert pool.get_pending_count() == 3
+
+        text = pool.metrics.render()
+        assert 'worker_pool_threads{pool="bounded"} 2' in text
+        assert 'worker_pool_busy_threads{pool="bounded"} 2' in text
+        assert 'worker_pool_queued_tasks{pool="bounded"} 4' in text
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert peak == 2
+        assert pool.get_pending_count() == 0
+    finally:
+        await pool.shutdown()